@@ -7,6 +7,8 @@ from app.agents.base_agent import (
     MessageRole,
     AgentState,
     AgentResult,
+    ToolCallSpec,
+    ToolSpan,
 )
 from app.agents.chat_agent import ChatAgent, ChatAgentConfig
 
@@ -18,6 +20,8 @@ __all__ = [
     "MessageRole",
     "AgentState",
     "AgentResult",
+    "ToolCallSpec",
+    "ToolSpan",
     "ChatAgent",
     "ChatAgentConfig",
 ]
@@ -14,6 +14,7 @@ from app.agents.base_agent import (
     AgentResult,
     AgentState,
     MessageRole,
+    ToolCallSpec,
 )
 
 
@@ -30,8 +31,12 @@ ALARM_SYSTEM_PROMPT = """你是一个专业的建筑设备告警处理助手。
 - get_alarm_stats: 获取告警统计
 - acknowledge_alarm: 确认告警
 - resolve_alarm: 解决告警
+- acknowledge_alarms: 批量确认告警（一次处理多条）
+- resolve_alarms: 批量解决告警（一次处理多条）
 - get_alarm_suggestions: 获取处理建议
 
+需要处理多条告警时，请使用批量工具，不要逐条调用。
+
 请用中文回答，保持专业、简洁的风格。在分析告警时，要考虑：
 - 告警的设备类型和位置
 - 告警的严重级别
@@ -135,17 +140,18 @@ class AlarmAgent(BaseAgent):
                     ]
                 })
 
-                # 执行工具调用
-                for tool_call in assistant_message.tool_calls:
-                    tool_name = tool_call.function.name
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                    except json.JSONDecodeError:
-                        arguments = {}
-
-                    # 执行工具
-                    tool_result = await self._execute_tool(tool_name, arguments)
-
+                # 执行工具调用（只读工具并发，结果按原顺序返回）
+                tool_calls = [
+                    ToolCallSpec(
+                        key=tc.id,
+                        tool_name=tc.function.name,
+                        arguments=self.parse_tool_arguments(tc.function.arguments),
+                    )
+                    for tc in assistant_message.tool_calls
+                ]
+                tool_results = await self.execute_tool_calls(tool_calls, context)
+
+                for tool_call, tool_result in zip(assistant_message.tool_calls, tool_results):
                     # 添加工具结果
                     tool_results_messages.append({
                         "role": "tool",
@@ -174,8 +180,8 @@ class AlarmAgent(BaseAgent):
         tool_mapping = {
             "list_alarms": ["get_alarm_list", "get_alarm_stats"],
             "alarm_detail": ["get_alarm_detail", "get_alarm_suggestions"],
-            "acknowledge": ["get_alarm_detail", "acknowledge_alarm"],
-            "resolve": ["get_alarm_detail", "resolve_alarm"],
+            "acknowledge": ["get_alarm_detail", "acknowledge_alarm", "acknowledge_alarms"],
+            "resolve": ["get_alarm_detail", "resolve_alarm", "resolve_alarms"],
             "statistics": ["get_alarm_stats"],
             "suggestions": ["get_alarm_detail", "get_alarm_suggestions"],
         }
@@ -216,6 +222,8 @@ class AlarmAgent(BaseAgent):
             "get_alarm_stats",
             "acknowledge_alarm",
             "resolve_alarm",
+            "acknowledge_alarms",
+            "resolve_alarms",
             "get_alarm_suggestions",
         }
 
@@ -246,25 +254,6 @@ class AlarmAgent(BaseAgent):
 
         return messages
 
-    async def _execute_tool(self, tool_name: str, arguments: dict) -> dict[str, Any]:
-        """执行工具调用"""
-        for server_name, server in self._mcp_servers.items():
-            tools = server.list_tools()
-            tool_names = []
-            for t in tools:
-                name = t.name
-                if callable(name):
-                    name = name()
-                tool_names.append(name)
-
-            if tool_name in tool_names:
-                return await self.call_tool(server_name, tool_name, arguments)
-
-        return {
-            "success": False,
-            "error": f"Tool '{tool_name}' not found",
-        }
-
     def _format_tool_result(self, result: dict[str, Any]) -> str:
         """格式化工具结果"""
         if result.get("success"):
@@ -297,8 +286,13 @@ class AlarmAgent(BaseAgent):
         Returns:
             dict: 分析结果
         """
-        # 获取告警详情
-        detail_result = await self._execute_tool("get_alarm_detail", {"alarm_id": alarm_id})
+        self._tool_spans = []
+
+        # 详情和处理建议互不依赖，并发获取
+        detail_result, suggestions_result = await self.execute_tool_calls([
+            ToolCallSpec("detail", "get_alarm_detail", {"alarm_id": alarm_id}),
+            ToolCallSpec("suggestions", "get_alarm_suggestions", {"alarm_id": alarm_id}),
+        ])
 
         if not detail_result.get("success"):
             return {
@@ -315,11 +309,6 @@ class AlarmAgent(BaseAgent):
 
         alarm = alarm_data.get("alarm", {})
 
-        # 获取处理建议
-        suggestions_result = await self._execute_tool(
-            "get_alarm_suggestions", {"alarm_id": alarm_id}
-        )
-
         suggestions = []
         if suggestions_result.get("success"):
             suggestions = suggestions_result.get("result", {}).get("suggestions", [])
@@ -337,6 +326,7 @@ class AlarmAgent(BaseAgent):
                 "impact": self._assess_impact(alarm),
                 "suggestions": suggestions,
             },
+            "tool_spans": [span.to_dict() for span in self._tool_spans],
         }
 
     def _assess_urgency(self, alarm: dict) -> str:
@@ -420,6 +410,32 @@ class AlarmAgent(BaseAgent):
         Returns:
             dict: 批量操作结果
         """
+        # 优先使用批量工具：每批一条 UPDATE
+        if self._find_tool_server("acknowledge_alarms") is not None:
+            result = await self._execute_tool(
+                "acknowledge_alarms",
+                {"alarm_ids": alarm_ids, "acknowledged_by": user}
+            )
+            if result.get("success"):
+                bulk = result.get("result", {})
+                return {
+                    "success": bulk.get("fail_count", 0) == 0,
+                    "total": bulk.get("total", len(alarm_ids)),
+                    "success_count": bulk.get("success_count", 0),
+                    "fail_count": bulk.get("fail_count", 0),
+                    "results": bulk.get("results", []),
+                }
+            return {
+                "success": False,
+                "total": len(alarm_ids),
+                "success_count": 0,
+                "fail_count": len(alarm_ids),
+                "results": [
+                    {"alarm_id": alarm_id, "success": False, "error": result.get("error", "操作失败")}
+                    for alarm_id in alarm_ids
+                ],
+            }
+
         results = []
         success_count = 0
         fail_count = 0
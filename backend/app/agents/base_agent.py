@@ -2,12 +2,23 @@
 
 提供Agent的基础抽象类和相关数据结构。
 """
+import asyncio
+import json
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Any
 
+# 只读工具名前缀：可并发执行、会话内可缓存
+READ_ONLY_TOOL_PREFIXES = ("get_", "list_", "search_", "query_")
+
+# 当前调用独占的数据库会话（并发执行只读工具时由规划器设置）
+_tool_session: ContextVar[Any] = ContextVar("agent_tool_session", default=None)
+
 
 class MessageRole(str, Enum):
     """消息角色"""
@@ -35,6 +46,7 @@ class AgentConfig:
     timeout: float = 30.0
     tools: list[str] = field(default_factory=list)
     system_prompt: str = ""
+    max_tool_concurrency: int = 4
 
 
 @dataclass
@@ -55,6 +67,7 @@ class AgentContext:
     messages: list[AgentMessage] = field(default_factory=list)
     variables: dict[str, Any] = field(default_factory=dict)
     metadata: dict[str, Any] = field(default_factory=dict)
+    tool_cache: dict[str, dict[str, Any]] = field(default_factory=dict)
 
     def add_message(self, message: AgentMessage) -> None:
         """添加消息"""
@@ -88,6 +101,43 @@ class AgentResult:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class ToolCallSpec:
+    """待执行的工具调用
+
+    Attributes:
+        key: 调用标识（LLM tool_call_id 或自定义名称）
+        tool_name: 工具名称
+        arguments: 工具参数
+        depends_on: 必须先完成的调用标识
+    """
+    key: str
+    tool_name: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+    depends_on: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ToolSpan:
+    """单次工具调用的耗时记录"""
+    key: str
+    tool_name: str
+    wave: int
+    start_ms: float
+    duration_ms: float
+    success: bool
+    cached: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为字典"""
+        return asdict(self)
+
+
+def tool_cache_key(tool_name: str, arguments: dict[str, Any]) -> str:
+    """生成只读工具调用的缓存键"""
+    return f"{tool_name}:{json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str)}"
+
+
 class BaseAgent(ABC):
     """Agent基类
 
@@ -108,6 +158,8 @@ class BaseAgent(ABC):
         self._state = AgentState.IDLE
         self._mcp_servers: dict[str, Any] = {}
         self._llm_client: Any = None
+        self._session_factory: Callable[[], Any] | None = None
+        self._tool_spans: list[ToolSpan] = []
 
     @property
     def state(self) -> AgentState:
@@ -122,6 +174,22 @@ class BaseAgent(ABC):
         """
         self._llm_client = client
 
+    def set_session_factory(self, factory: Callable[[], Any] | None) -> None:
+        """设置数据库会话工厂
+
+        设置后并发执行的只读工具各自使用独立会话（一个AsyncSession不能并发查询）；
+        未设置时，持有数据库会话的MCP服务器上的工具按顺序执行。
+
+        Args:
+            factory: 返回异步上下文管理器的会话工厂，如 async_sessionmaker
+        """
+        self._session_factory = factory
+
+    @property
+    def last_tool_spans(self) -> list[ToolSpan]:
+        """最近一次处理中的工具调用耗时"""
+        return list(self._tool_spans)
+
     def register_mcp_server(self, server: Any) -> None:
         """注册MCP服务器
 
@@ -149,6 +217,7 @@ class BaseAgent(ABC):
             AgentResult: 执行结果
         """
         self._state = AgentState.RUNNING
+        self._tool_spans = []
 
         # 添加用户消息到上下文
         user_message = AgentMessage(role=MessageRole.USER, content=message)
@@ -169,6 +238,7 @@ class BaseAgent(ABC):
             return AgentResult(
                 success=True,
                 response=response,
+                metadata=self._spans_metadata(),
             )
 
         except Exception as e:
@@ -176,6 +246,7 @@ class BaseAgent(ABC):
             return AgentResult(
                 success=False,
                 error=str(e),
+                metadata=self._spans_metadata(),
             )
 
     async def call_tool(
@@ -198,6 +269,10 @@ class BaseAgent(ABC):
                 "error": f"MCP server '{server_name}' not found",
             }
 
+        db_session = _tool_session.get()
+        if db_session is not None and getattr(server, "shares_db_session", False) is True:
+            server = server.bind_session(db_session)
+
         try:
             # 检查是否是mock对象（用于测试）
             if hasattr(server.call_tool, '_mock_name') or hasattr(server.call_tool, 'assert_called'):
@@ -245,6 +320,190 @@ class BaseAgent(ABC):
                 })
         return tools
 
+    # ========== 工具调用规划 ==========
+
+    def is_read_only_tool(self, tool_name: str) -> bool:
+        """判断工具是否只读（子类可覆盖）
+
+        只读工具之间可并发执行，结果在会话内按参数缓存。
+        """
+        return tool_name.startswith(READ_ONLY_TOOL_PREFIXES)
+
+    @staticmethod
+    def parse_tool_arguments(raw: str | None) -> dict[str, Any]:
+        """解析LLM返回的工具参数JSON，无效时返回空字典"""
+        try:
+            arguments = json.loads(raw or "{}")
+        except json.JSONDecodeError:
+            return {}
+        return arguments if isinstance(arguments, dict) else {}
+
+    def _find_tool_server(self, tool_name: str) -> str | None:
+        """查找提供指定工具的服务器名称"""
+        for server_name, server in self._mcp_servers.items():
+            for tool in server.list_tools():
+                name = tool.name
+                if callable(name):
+                    name = name()
+                if name == tool_name:
+                    return server_name
+        return None
+
+    async def _execute_tool(self, tool_name: str, arguments: dict) -> dict[str, Any]:
+        """执行工具调用（子类可覆盖工具查找方式）"""
+        server_name = self._find_tool_server(tool_name)
+        if server_name is not None:
+            return await self.call_tool(server_name, tool_name, arguments)
+
+        return {
+            "success": False,
+            "error": f"Tool '{tool_name}' not found",
+        }
+
+    def _plan_waves(self, calls: list[ToolCallSpec]) -> list[list[ToolCallSpec]]:
+        """按依赖关系把调用分层
+
+        - 显式依赖：在被依赖调用之后的层执行
+        - 写工具：作为屏障，位于之前所有调用之后，之后的调用也排在它后面
+        - 同层的只读调用可并发
+        """
+        levels: dict[str, int] = {}
+        floor = 0
+        for spec in calls:
+            level = floor
+            for dep in spec.depends_on:
+                if dep not in levels:
+                    raise ValueError(f"Tool call '{spec.key}' depends on unknown call '{dep}'")
+                level = max(level, levels[dep] + 1)
+            if not self.is_read_only_tool(spec.tool_name):
+                if levels:
+                    level = max(level, max(levels.values()) + 1)
+                floor = level + 1
+            levels[spec.key] = level
+
+        waves: list[list[ToolCallSpec]] = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+        for spec in calls:
+            waves[levels[spec.key]].append(spec)
+        return [wave for wave in waves if wave]
+
+    def _shares_db_session(self) -> bool:
+        """是否有MCP服务器持有共享的数据库会话"""
+        return any(
+            getattr(server, "shares_db_session", False) is True
+            for server in self._mcp_servers.values()
+        )
+
+    async def execute_tool_calls(
+        self,
+        calls: list[ToolCallSpec],
+        context: AgentContext | None = None,
+    ) -> list[dict[str, Any]]:
+        """按依赖图执行一组工具调用
+
+        同一层内的只读调用并发执行（受 max_tool_concurrency 限制），
+        相同参数的只读调用在会话内只执行一次；写工具执行后清空会话缓存。
+        每次调用的耗时记录在 last_tool_spans 中。
+
+        Args:
+            calls: 工具调用列表
+            context: 上下文，提供会话级缓存；为None时只在本次调用内去重
+
+        Returns:
+            list: 与 calls 顺序一致的工具执行结果
+        """
+        if not calls:
+            return []
+
+        keys = [spec.key for spec in calls]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Tool call keys must be unique")
+
+        waves = self._plan_waves(calls)
+        cache = context.tool_cache if context is not None else {}
+        inflight: dict[str, asyncio.Future] = {}
+        results: dict[str, dict[str, Any]] = {}
+        shared_session = self._shares_db_session()
+        semaphore = asyncio.Semaphore(max(1, self.config.max_tool_concurrency))
+        started = time.perf_counter()
+
+        async def invoke(spec: ToolCallSpec, own_session: bool) -> dict[str, Any]:
+            if not own_session:
+                return await self._execute_tool(spec.tool_name, spec.arguments)
+            async with self._session_factory() as db_session:
+                token = _tool_session.set(db_session)
+                try:
+                    return await self._execute_tool(spec.tool_name, spec.arguments)
+                finally:
+                    _tool_session.reset(token)
+
+        async def run_call(spec: ToolCallSpec, wave: int, own_session: bool) -> None:
+            start = time.perf_counter()
+            read_only = self.is_read_only_tool(spec.tool_name)
+            cache_key = tool_cache_key(spec.tool_name, spec.arguments) if read_only else None
+            cached = False
+
+            if cache_key is not None and cache_key in cache:
+                result, cached = cache[cache_key], True
+            elif cache_key is not None and cache_key in inflight:
+                result, cached = await asyncio.shield(inflight[cache_key]), True
+            else:
+                future: asyncio.Future | None = None
+                if cache_key is not None:
+                    future = asyncio.get_running_loop().create_future()
+                    inflight[cache_key] = future
+                result = None
+                try:
+                    try:
+                        async with semaphore:
+                            result = await invoke(spec, own_session and read_only)
+                    except Exception as e:
+                        result = {"success": False, "error": str(e)}
+                finally:
+                    # 被取消时也要了结 future，否则合并进来的调用会一直等待
+                    if future is not None:
+                        del inflight[cache_key]
+                        future.set_result(
+                            result if result is not None
+                            else {"success": False, "error": "Tool call cancelled"}
+                        )
+                if cache_key is not None and result.get("success"):
+                    cache[cache_key] = result
+                elif cache_key is None:
+                    cache.clear()
+
+            results[spec.key] = result
+            self._tool_spans.append(ToolSpan(
+                key=spec.key,
+                tool_name=spec.tool_name,
+                wave=wave,
+                start_ms=round((start - started) * 1000, 3),
+                duration_ms=round((time.perf_counter() - start) * 1000, 3),
+                success=bool(result.get("success")),
+                cached=cached,
+            ))
+
+        wrote = False
+        for wave_index, wave in enumerate(waves):
+            # 写操作之后的读取需要看到未提交的修改，只能走共享会话
+            own_session = self._session_factory is not None and not wrote
+            if len(wave) > 1 and (own_session or not shared_session):
+                await asyncio.gather(*(run_call(spec, wave_index, own_session) for spec in wave))
+            else:
+                for spec in wave:
+                    await run_call(spec, wave_index, own_session)
+            wrote = wrote or any(not self.is_read_only_tool(spec.tool_name) for spec in wave)
+
+        return [results[key] for key in keys]
+
+    def _spans_metadata(self) -> dict[str, Any]:
+        """把工具耗时整理为结果元数据"""
+        if not self._tool_spans:
+            return {}
+        return {
+            "tool_spans": [span.to_dict() for span in self._tool_spans],
+            "tool_time_ms": round(sum(span.duration_ms for span in self._tool_spans), 3),
+        }
+
     async def reset(self) -> None:
         """重置Agent状态"""
         self._state = AgentState.IDLE
@@ -14,6 +14,7 @@ from app.agents.base_agent import (
     AgentResult,
     AgentState,
     MessageRole,
+    ToolCallSpec,
 )
 
 
@@ -143,17 +144,18 @@ class ChatAgent(BaseAgent):
                     ]
                 })
 
-                # 执行工具调用
-                for tool_call in assistant_message.tool_calls:
-                    tool_name = tool_call.function.name
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                    except json.JSONDecodeError:
-                        arguments = {}
-
-                    # 查找并调用工具
-                    tool_result = await self._execute_tool(tool_name, arguments)
-
+                # 执行工具调用（只读工具并发，结果按原顺序返回）
+                tool_calls = [
+                    ToolCallSpec(
+                        key=tc.id,
+                        tool_name=tc.function.name,
+                        arguments=self.parse_tool_arguments(tc.function.arguments),
+                    )
+                    for tc in assistant_message.tool_calls
+                ]
+                tool_results = await self.execute_tool_calls(tool_calls, context)
+
+                for tool_call, tool_result in zip(assistant_message.tool_calls, tool_results):
                     # 添加工具结果
                     tool_results_messages.append({
                         "role": "tool",
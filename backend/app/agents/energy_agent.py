@@ -14,6 +14,7 @@ from app.agents.base_agent import (
     AgentResult,
     AgentState,
     MessageRole,
+    ToolCallSpec,
 )
 
 
@@ -134,17 +135,18 @@ class EnergyAgent(BaseAgent):
                     ]
                 })
 
-                # 执行工具调用
-                for tool_call in assistant_message.tool_calls:
-                    tool_name = tool_call.function.name
-                    try:
-                        arguments = json.loads(tool_call.function.arguments)
-                    except json.JSONDecodeError:
-                        arguments = {}
-
-                    # 执行工具
-                    tool_result = await self._execute_tool(tool_name, arguments)
-
+                # 执行工具调用（只读工具并发，结果按原顺序返回）
+                tool_calls = [
+                    ToolCallSpec(
+                        key=tc.id,
+                        tool_name=tc.function.name,
+                        arguments=self.parse_tool_arguments(tc.function.arguments),
+                    )
+                    for tc in assistant_message.tool_calls
+                ]
+                tool_results = await self.execute_tool_calls(tool_calls, context)
+
+                for tool_call, tool_result in zip(assistant_message.tool_calls, tool_results):
                     # 添加工具结果
                     tool_results_messages.append({
                         "role": "tool",
@@ -363,17 +365,27 @@ class EnergyAgent(BaseAgent):
             dict: 洞察结果
         """
         insights = []
+        self._tool_spans = []
 
-        # 获取趋势数据
-        trend_result = await self._execute_tool(
-            "get_energy_trend",
-            {
+        # 趋势、对比、异常三项查询互不依赖，并发获取
+        trend_result, comparison_result, anomaly_result = await self.execute_tool_calls([
+            ToolCallSpec("trend", "get_energy_trend", {
                 "energy_type": self.config.default_energy_type,
                 "building": building,
                 "period": "day",
                 "days": days,
-            }
-        )
+            }),
+            ToolCallSpec("comparison", "get_energy_comparison", {
+                "energy_type": self.config.default_energy_type,
+                "building": building,
+                "compare_type": "wow",  # 周环比
+            }),
+            ToolCallSpec("anomaly", "get_energy_anomaly", {
+                "building": building,
+                "threshold": self.config.anomaly_threshold,
+                "hours": days * 24,
+            }),
+        ])
 
         if trend_result.get("success"):
             trend_data = trend_result.get("result", {})
@@ -381,32 +393,12 @@ class EnergyAgent(BaseAgent):
             if trend_insight:
                 insights.append(trend_insight)
 
-        # 获取对比数据
-        comparison_result = await self._execute_tool(
-            "get_energy_comparison",
-            {
-                "energy_type": self.config.default_energy_type,
-                "building": building,
-                "compare_type": "wow",  # 周环比
-            }
-        )
-
         if comparison_result.get("success"):
             comparison_data = comparison_result.get("result", {})
             comparison_insight = self._analyze_comparison(comparison_data)
             if comparison_insight:
                 insights.append(comparison_insight)
 
-        # 获取异常数据
-        anomaly_result = await self._execute_tool(
-            "get_energy_anomaly",
-            {
-                "building": building,
-                "threshold": self.config.anomaly_threshold,
-                "hours": days * 24,
-            }
-        )
-
         if anomaly_result.get("success"):
             anomaly_data = anomaly_result.get("result", {})
             anomaly_insight = self._analyze_anomaly(anomaly_data)
@@ -419,6 +411,7 @@ class EnergyAgent(BaseAgent):
             "period_days": days,
             "insights": insights,
             "suggestions": self._generate_suggestions(insights),
+            "tool_spans": [span.to_dict() for span in self._tool_spans],
         }
 
     def _analyze_trend(self, trend_data: dict) -> dict[str, Any] | None:
@@ -1,9 +1,9 @@
 """告警管理MCP Server模块"""
 
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.mcp_servers.base_mcp_server import (
@@ -12,6 +12,7 @@ from app.mcp_servers.base_mcp_server import (
     MCPTool,
     ToolParameter,
 )
+from app.mcp_servers.bulk import any_of, chunked, dedupe_ids, summarize_results
 from app.models.alarm import Alarm, AlarmStatus, AlarmSeverity, AlarmCategory
 from app.models.device import Device
 
@@ -19,7 +20,7 @@ from app.models.device import Device
 class AlarmMCPServer(BaseMCPServer):
     """告警管理MCP Server
 
-    提供告警查询、确认、解决等功能。
+    提供告警查询、确认、解决等功能。批量确认/解决每批只执行一条 UPDATE。
     """
 
     def __init__(self, db_session: AsyncSession):
@@ -186,6 +187,72 @@ class AlarmMCPServer(BaseMCPServer):
             )
         )
 
+        # 7. 批量确认告警
+        self.register_tool(
+            MCPTool(
+                name="acknowledge_alarms",
+                description="批量确认告警，返回每条告警的处理结果。告警风暴时优先使用",
+                parameters=[
+                    ToolParameter(
+                        name="alarm_ids",
+                        type="array",
+                        description="告警ID列表",
+                        required=True,
+                        items={"type": "string"},
+                    ),
+                    ToolParameter(
+                        name="acknowledged_by",
+                        type="string",
+                        description="确认人，默认system",
+                        required=False,
+                    ),
+                    ToolParameter(
+                        name="comment",
+                        type="string",
+                        description="确认备注",
+                        required=False,
+                    ),
+                ],
+                handler=self._acknowledge_alarms,
+            )
+        )
+
+        # 8. 批量解决告警
+        self.register_tool(
+            MCPTool(
+                name="resolve_alarms",
+                description="批量解决告警，使用同一解决方案，返回每条告警的处理结果",
+                parameters=[
+                    ToolParameter(
+                        name="alarm_ids",
+                        type="array",
+                        description="告警ID列表",
+                        required=True,
+                        items={"type": "string"},
+                    ),
+                    ToolParameter(
+                        name="resolution",
+                        type="string",
+                        description="解决方案描述",
+                        required=True,
+                    ),
+                    ToolParameter(
+                        name="resolved_by",
+                        type="string",
+                        description="解决人，默认system",
+                        required=False,
+                    ),
+                    ToolParameter(
+                        name="comment",
+                        type="string",
+                        description="额外备注",
+                        required=False,
+                    ),
+                ],
+                handler=self._resolve_alarms,
+            )
+        )
+
     async def _get_alarm_list(self, args: dict[str, Any]) -> dict[str, Any]:
         """获取告警列表"""
         status = args.get("status")
@@ -366,6 +433,103 @@ class AlarmMCPServer(BaseMCPServer):
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
 
+    async def _acknowledge_alarms(self, args: dict[str, Any]) -> dict[str, Any]:
+        """批量确认告警"""
+        alarm_ids = dedupe_ids(args["alarm_ids"])
+        acknowledged_by = args.get("acknowledged_by") or "system"
+        comment = args.get("comment", "")
+        message = "告警已确认" + (f"，备注：{comment}" if comment else "")
+        now = datetime.now(timezone.utc)
+
+        results: dict[str, dict[str, Any]] = {}
+        for batch in chunked(alarm_ids):
+            stmt = (
+                update(Alarm)
+                .where(any_of(Alarm.alarm_id, batch), Alarm.status == AlarmStatus.ACTIVE.value)
+                .values(
+                    status=AlarmStatus.ACKNOWLEDGED.value,
+                    acknowledged_at=now,
+                    acknowledged_by=acknowledged_by,
+                )
+                .returning(Alarm.alarm_id)
+                .execution_options(synchronize_session="fetch")
+            )
+            updated = set((await self.db.execute(stmt)).scalars().all())
+            for alarm_id in updated:
+                results[alarm_id] = {
+                    "alarm_id": alarm_id,
+                    "success": True,
+                    "status": "acknowledged",
+                    "message": message,
+                }
+            await self._collect_failures(
+                batch, updated, results,
+                lambda status: f"告警状态为 {status}，无法确认",
+            )
+
+        await self.db.flush()
+
+        summary = summarize_results(alarm_ids, results)
+        summary["timestamp"] = now.isoformat()
+        return summary
+
+    async def _resolve_alarms(self, args: dict[str, Any]) -> dict[str, Any]:
+        """批量解决告警"""
+        alarm_ids = dedupe_ids(args["alarm_ids"])
+        resolution = args["resolution"]
+        comment = args.get("comment", "")
+        resolved_by = args.get("resolved_by") or "system"
+        now = datetime.now(timezone.utc)
+
+        results: dict[str, dict[str, Any]] = {}
+        for batch in chunked(alarm_ids):
+            stmt = (
+                update(Alarm)
+                .where(any_of(Alarm.alarm_id, batch), Alarm.status != AlarmStatus.RESOLVED.value)
+                .values(
+                    status=AlarmStatus.RESOLVED.value,
+                    resolved_at=now,
+                    resolved_by=resolved_by,
+                    resolution_notes=resolution + (f"\n备注：{comment}" if comment else ""),
+                )
+                .returning(Alarm.alarm_id)
+                .execution_options(synchronize_session="fetch")
+            )
+            updated = set((await self.db.execute(stmt)).scalars().all())
+            for alarm_id in updated:
+                results[alarm_id] = {"alarm_id": alarm_id, "success": True, "status": "resolved"}
+            await self._collect_failures(batch, updated, results, lambda status: "告警已解决")
+
+        await self.db.flush()
+
+        summary = summarize_results(alarm_ids, results)
+        summary["resolution"] = resolution
+        summary["timestamp"] = now.isoformat()
+        return summary
+
+    async def _collect_failures(
+        self,
+        batch: list[str],
+        updated: set[str],
+        results: dict[str, dict[str, Any]],
+        status_error: Callable[[str], str],
+    ) -> None:
+        """查询未更新告警的当前状态，生成失败原因（仅在有失败项时多一次查询）"""
+        missing = [alarm_id for alarm_id in batch if alarm_id not in updated]
+        if not missing:
+            return
+
+        rows = await self.db.execute(
+            select(Alarm.alarm_id, Alarm.status).where(any_of(Alarm.alarm_id, missing))
+        )
+        statuses = {alarm_id: status for alarm_id, status in rows.all()}
+        for alarm_id in missing:
+            if alarm_id in statuses:
+                error = status_error(statuses[alarm_id])
+            else:
+                error = f"告警 {alarm_id} 不存在"
+            results[alarm_id] = {"alarm_id": alarm_id, "success": False, "error": error}
+
     async def _get_alarm_suggestions(self, args: dict[str, Any]) -> dict[str, Any]:
         """获取处理建议"""
         alarm_id = args["alarm_id"]
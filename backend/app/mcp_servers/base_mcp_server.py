@@ -1,5 +1,6 @@
 """MCP Server基类模块"""
 
+import copy
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
@@ -27,6 +28,7 @@ class ToolParameter:
     required: bool = True
     enum: list[str] | None = None
     default: Any = None
+    items: dict | None = None  # array类型的元素定义，如 {"type": "string"}
 
 
 @dataclass
@@ -50,6 +52,8 @@ class MCPTool:
             }
             if param.enum:
                 prop["enum"] = param.enum
+            if param.type == "array":
+                prop["items"] = param.items or {"type": "string"}
             properties[param.name] = prop
 
             if param.required:
@@ -105,6 +109,22 @@ class BaseMCPServer(ABC):
         """获取所有工具"""
         return list(self._tools.values())
 
+    @property
+    def shares_db_session(self) -> bool:
+        """是否持有数据库会话（同一会话上的调用不能并发）"""
+        return getattr(self, "db", None) is not None
+
+    def bind_session(self, db_session: Any) -> "BaseMCPServer":
+        """返回绑定到另一个数据库会话的副本
+
+        工具处理函数是绑定方法，需在副本上重新注册。
+        """
+        server = copy.copy(self)
+        server.db = db_session
+        server._tools = {}
+        server._register_tools()
+        return server
+
     def get_tools_openai_format(self) -> list[dict]:
         """获取OpenAI格式的工具列表"""
         return [tool.to_openai_format() for tool in self._tools.values()]
@@ -165,6 +185,8 @@ class BaseMCPServer(ABC):
                     return f"Parameter '{param.name}' must be number"
                 if param.type == "boolean" and not isinstance(value, bool):
                     return f"Parameter '{param.name}' must be boolean"
+                if param.type == "array" and not isinstance(value, list):
+                    return f"Parameter '{param.name}' must be array"
                 # 枚举检查
                 if param.enum and value not in param.enum:
                     return f"Parameter '{param.name}' must be one of {param.enum}"
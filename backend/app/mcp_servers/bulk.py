@@ -0,0 +1,46 @@
+"""MCP Server批量操作辅助模块
+
+批量变更工具共用：ID去重分批、`column = ANY(:ids)` 条件、逐项结果汇总。
+"""
+
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy import String, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql.elements import ColumnElement
+
+# 单条 UPDATE 处理的ID数量上限
+BULK_BATCH_SIZE = 500
+
+
+def dedupe_ids(ids: list[str]) -> list[str]:
+    """去重并保持原有顺序"""
+    return list(dict.fromkeys(ids))
+
+
+def chunked(ids: list[str], size: int = BULK_BATCH_SIZE) -> Iterator[list[str]]:
+    """按批次切分ID列表"""
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def any_of(column: Any, ids: list[str]) -> ColumnElement[bool]:
+    """生成 `column = ANY(:ids)` 条件
+
+    ID列表作为单个数组参数绑定，批次大小变化时语句文本不变，可复用预编译语句。
+    """
+    return column == any_(bindparam(None, ids, type_=ARRAY(String)))
+
+
+def summarize_results(ids: list[str], results: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    """按请求顺序汇总逐项结果"""
+    items = [results[item_id] for item_id in ids]
+    success_count = sum(1 for item in items if item["success"])
+    return {
+        "success": success_count == len(items),
+        "total": len(items),
+        "success_count": success_count,
+        "fail_count": len(items) - success_count,
+        "results": items,
+    }
@@ -2,10 +2,19 @@
 
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.device import Device, DeviceReading
+from app.services.device_health import DeviceHealthEngine, health_engine
+from app.utils.downsample import (
+    DEFAULT_POINTS,
+    MAX_POINTS,
+    SeriesPoint,
+    choose_bucket_seconds,
+    clamp_points,
+    shape_series,
+)
 from .base_mcp_server import (
     BaseMCPServer,
     MCPServerType,
@@ -25,8 +34,19 @@ class DeviceNotFoundException(Exception):
 class DeviceMCPServer(BaseMCPServer):
     """设备管理MCP Server"""
 
-    def __init__(self, db_session: AsyncSession):
+    # 统计分组维度 -> 列
+    STATS_COLUMNS = {
+        "type": Device.type,
+        "system": Device.system,
+        "status": Device.status,
+        "building": Device.building,
+    }
+
+    def __init__(
+        self, db_session: AsyncSession, health: DeviceHealthEngine | None = None
+    ):
         self.db = db_session
+        self.health = health if health is not None else health_engine
         super().__init__(MCPServerType.DEVICE)
 
     def _register_tools(self) -> None:
@@ -143,24 +163,80 @@ class DeviceMCPServer(BaseMCPServer):
             )
         )
 
-        # 4. 获取设备健康度
+        # 4. 获取降采样读数序列
         self.register_tool(
             MCPTool(
-                name="get_device_health",
-                description="获取设备健康度详情，包括各项指标评分",
+                name="get_device_reading_series",
+                description="获取设备参数的图表序列，任意时间窗口都返回固定点数（服务端按时间桶聚合avg/min/max后LTTB降采样）",
                 parameters=[
                     ToolParameter(
                         name="device_id",
                         type="string",
                         description="设备唯一标识",
                         required=True,
-                    )
+                    ),
+                    ToolParameter(
+                        name="parameters",
+                        type="array",
+                        description="参数名列表，不指定则返回全部参数",
+                        required=False,
+                        items={"type": "string"},
+                    ),
+                    ToolParameter(
+                        name="hours",
+                        type="integer",
+                        description="查询最近多少小时（不指定start_time时使用）",
+                        required=False,
+                        default=24,
+                    ),
+                    ToolParameter(
+                        name="start_time",
+                        type="string",
+                        description="开始时间 ISO格式",
+                        required=False,
+                    ),
+                    ToolParameter(
+                        name="end_time",
+                        type="string",
+                        description="结束时间 ISO格式，默认当前时间",
+                        required=False,
+                    ),
+                    ToolParameter(
+                        name="points",
+                        type="integer",
+                        description=f"每个参数返回的点数（最大{MAX_POINTS}）",
+                        required=False,
+                        default=DEFAULT_POINTS,
+                    ),
+                ],
+                handler=self._get_device_reading_series,
+            )
+        )
+
+        # 5. 获取设备健康度
+        self.register_tool(
+            MCPTool(
+                name="get_device_health",
+                description="获取设备健康度详情，包括阈值越限、参数稳定性、故障频率等指标评分；指定building时返回该建筑全部设备的健康度",
+                parameters=[
+                    ToolParameter(
+                        name="device_id",
+                        type="string",
+                        description="设备唯一标识",
+                        required=False,
+                    ),
+                    ToolParameter(
+                        name="building",
+                        type="string",
+                        description="建筑名称（不指定device_id时按建筑查询）",
+                        required=False,
+                    ),
                 ],
                 handler=self._get_device_health,
             )
         )
 
-        # 5. 获取设备统计
+        # 6. 获取设备统计
         self.register_tool(
             MCPTool(
                 name="get_device_stats",
@@ -179,7 +255,7 @@ class DeviceMCPServer(BaseMCPServer):
             )
         )
 
-        # 6. 控制设备
+        # 7. 控制设备
         self.register_tool(
             MCPTool(
                 name="control_device",
@@ -312,9 +388,85 @@ class DeviceMCPServer(BaseMCPServer):
             ],
         }
 
+    async def _get_device_reading_series(self, args: dict) -> dict:
+        """获取降采样读数序列
+
+        一次查询取回所有参数的 date_bin 聚合结果（桶数不超过 points×4），
+        再按参数做 LTTB 整形，返回大小与窗口长度无关。
+        """
+        device_id = args["device_id"]
+        points = clamp_points(args.get("points"))
+        end = (
+            datetime.fromisoformat(args["end_time"].replace("Z", "+00:00"))
+            if args.get("end_time") else datetime.now(timezone.utc)
+        )
+        start = (
+            datetime.fromisoformat(args["start_time"].replace("Z", "+00:00"))
+            if args.get("start_time") else end - timedelta(hours=args.get("hours", 24))
+        )
+        if start >= end:
+            raise ValueError("start_time must be earlier than end_time")
+
+        bucket_seconds = choose_bucket_seconds(start, end, points)
+        # 粒度来自固定阶梯（整数秒），直接内联为 interval 常量；
+        # date_bin 为 PostgreSQL 14+ 内置函数，不依赖 TimescaleDB，按 Unix 纪元对齐
+        bucket = func.date_bin(
+            literal_column(f"interval '{bucket_seconds} seconds'"),
+            DeviceReading.timestamp,
+            literal_column("timestamptz '1970-01-01 00:00:00+00'"),
+        ).label("bucket")
+        query = (
+            select(
+                DeviceReading.parameter,
+                bucket,
+                func.avg(DeviceReading.value),
+                func.min(DeviceReading.value),
+                func.max(DeviceReading.value),
+                func.count(),
+            )
+            .where(
+                DeviceReading.device_id == device_id,
+                DeviceReading.timestamp >= start,
+                DeviceReading.timestamp < end,
+            )
+            .group_by(DeviceReading.parameter, "bucket")
+            .order_by(DeviceReading.parameter, "bucket")
+        )
+        parameters = args.get("parameters")
+        if parameters:
+            query = query.where(DeviceReading.parameter.in_(parameters))
+
+        result = await self.db.execute(query)
+        buckets: dict[str, list[SeriesPoint]] = {}
+        for parameter, ts, avg, low, high, count in result.all():
+            buckets.setdefault(parameter, []).append(
+                SeriesPoint(timestamp=ts, value=float(avg), min=low, max=high, count=count)
+            )
+
+        return {
+            "device_id": device_id,
+            "start_time": start.isoformat(),
+            "end_time": end.isoformat(),
+            "bucket_seconds": bucket_seconds,
+            "points": points,
+            "series": {
+                parameter: [p.to_dict() for p in shape_series(series, points)]
+                for parameter, series in buckets.items()
+            },
+        }
+
+    async def _ensure_health_loaded(self) -> None:
+        """首次查询时加载全部设备的阈值配置"""
+        if not self.health.loaded:
+            await self.health.load_devices(self.db)
+
     async def _get_device_health(self, args: dict) -> dict:
         """获取设备健康度"""
-        device_id = args["device_id"]
+        device_id = args.get("device_id")
+        if not device_id:
+            if not args.get("building"):
+                raise ValueError("device_id or building is required")
+            return await self._get_building_health(args["building"])
 
         result = await self.db.execute(
             select(Device).where(Device.device_id == device_id)
@@ -324,45 +476,81 @@ class DeviceMCPServer(BaseMCPServer):
         if not device:
             raise DeviceNotFoundException(device_id)
 
-        # MVP阶段：返回模拟的健康度详情
+        await self._ensure_health_loaded()
+        self.health.register_device(device.device_id, device.thresholds)
+        detail = self.health.health(device.device_id)
+        if detail is None:
+            # 尚无读数：沿用已持久化的健康度
+            detail = {
+                "overall_score": device.health_score,
+                "indicators": {},
+                "readings": 0,
+            }
+
+        overall = detail["overall_score"]
         recommendations = []
-        if device.health_score < 90:
+        if overall < 90:
             recommendations.append("建议在下月进行例行保养")
-        if device.health_score < 80:
+        if overall < 80:
             recommendations.append("健康度较低，请及时检查")
+        for name, indicator in detail["indicators"].items():
+            if indicator["score"] < 60:
+                recommendations.append(f"{name}指标异常，请排查相关参数")
 
         return {
             "device_id": device.device_id,
             "name": device.name,
-            "overall_score": device.health_score,
-            "indicators": {
-                "运行时长": {"score": 90, "status": "正常"},
-                "故障频率": {"score": 95, "status": "正常"},
-                "参数稳定性": {"score": 85, "status": "良好"},
-                "维护状态": {"score": 88, "status": "良好"},
-            },
+            "overall_score": overall,
+            "indicators": detail["indicators"],
+            "readings": detail["readings"],
             "recommendations": recommendations,
         }
 
+    async def _get_building_health(self, building: str) -> dict:
+        """获取建筑内全部设备的健康度（每台设备O(1)查询引擎状态）"""
+        await self._ensure_health_loaded()
+        result = await self.db.execute(
+            select(Device.device_id, Device.name, Device.health_score)
+            .where(Device.building == building)
+        )
+
+        devices = []
+        for device_id, name, persisted in result.all():
+            score = self.health.score(device_id)
+            devices.append({
+                "device_id": device_id,
+                "name": name,
+                "health_score": persisted if score is None else score,
+            })
+        devices.sort(key=lambda d: d["health_score"])
+
+        return {
+            "building": building,
+            "total": len(devices),
+            "average_score": (
+                round(sum(d["health_score"] for d in devices) / len(devices), 1)
+                if devices else None
+            ),
+            "devices": devices,
+        }
+
     async def _get_device_stats(self, args: dict) -> dict:
         """获取设备统计"""
         group_by = args.get("group_by", "type")
+        column = self.STATS_COLUMNS[group_by]
 
-        result = await self.db.execute(select(Device))
-        devices = result.scalars().all()
+        result = await self.db.execute(
+            select(func.coalesce(column, "unknown"), func.count())
+            .group_by(func.coalesce(column, "unknown"))
+        )
 
         stats: dict[str, int] = {}
-        for device in devices:
-            key = getattr(device, group_by, "unknown")
-            if hasattr(key, "value"):
-                key = key.value
-            if key is None:
-                key = "unknown"
-            stats[key] = stats.get(key, 0) + 1
+        for key, count in result.all():
+            stats[key] = count
 
         return {
             "group_by": group_by,
-            "total": len(devices),
+            "total": sum(stats.values()),
             "statistics": stats,
         }
 
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta, timezone
 from typing import Any
 import uuid
 
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import case, select, func, and_, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.mcp_servers.base_mcp_server import (
@@ -13,6 +13,7 @@ from app.mcp_servers.base_mcp_server import (
     MCPTool,
     ToolParameter,
 )
+from app.mcp_servers.bulk import any_of, chunked, dedupe_ids, summarize_results
 from app.models.ticket import Ticket, TicketType, TicketPriority, TicketStatus
 
 
@@ -233,6 +234,30 @@ class TicketMCPServer(BaseMCPServer):
             )
         )
 
+        # 7. 批量分配工单
+        self.register_tool(
+            MCPTool(
+                name="assign_tickets",
+                description="批量分配工单给同一负责人，返回每个工单的处理结果",
+                parameters=[
+                    ToolParameter(
+                        name="ticket_ids",
+                        type="array",
+                        description="工单ID列表",
+                        required=True,
+                        items={"type": "string"},
+                    ),
+                    ToolParameter(
+                        name="assigned_to",
+                        type="string",
+                        description="负责人",
+                        required=True,
+                    ),
+                ],
+                handler=self._assign_tickets,
+            )
+        )
+
     async def _get_ticket_list(self, args: dict[str, Any]) -> dict[str, Any]:
         """获取工单列表"""
         status = args.get("status")
@@ -389,6 +414,59 @@ class TicketMCPServer(BaseMCPServer):
             "message": f"工单已分配给 {assigned_to}",
         }
 
+    async def _assign_tickets(self, args: dict[str, Any]) -> dict[str, Any]:
+        """批量分配工单（每批一条 UPDATE）"""
+        ticket_ids = dedupe_ids(args["ticket_ids"])
+        assigned_to = args["assigned_to"]
+        closed = (TicketStatus.COMPLETED.value, TicketStatus.CANCELLED.value)
+
+        results: dict[str, dict[str, Any]] = {}
+        for batch in chunked(ticket_ids):
+            stmt = (
+                update(Ticket)
+                .where(any_of(Ticket.ticket_id, batch), Ticket.status.not_in(closed))
+                .values(
+                    assigned_to=assigned_to,
+                    status=case(
+                        (Ticket.status == TicketStatus.PENDING.value, TicketStatus.ASSIGNED.value),
+                        else_=Ticket.status,
+                    ),
+                )
+                .returning(Ticket.ticket_id, Ticket.status)
+                .execution_options(synchronize_session="fetch")
+            )
+            updated = {}
+            for ticket_id, status in (await self.db.execute(stmt)).all():
+                updated[ticket_id] = status
+                results[ticket_id] = {
+                    "ticket_id": ticket_id,
+                    "success": True,
+                    "new_status": status,
+                }
+
+            missing = [ticket_id for ticket_id in batch if ticket_id not in updated]
+            if not missing:
+                continue
+            rows = await self.db.execute(
+                select(Ticket.ticket_id, Ticket.status).where(any_of(Ticket.ticket_id, missing))
+            )
+            statuses = {ticket_id: status for ticket_id, status in rows.all()}
+            for ticket_id in missing:
+                status = statuses.get(ticket_id)
+                if status is None:
+                    error = f"工单 {ticket_id} 不存在"
+                elif status == TicketStatus.COMPLETED.value:
+                    error = "已完成的工单不能重新分配"
+                else:
+                    error = "已取消的工单不能分配"
+                results[ticket_id] = {"ticket_id": ticket_id, "success": False, "error": error}
+
+        await self.db.flush()
+
+        summary = summarize_results(ticket_ids, results)
+        summary["assigned_to"] = assigned_to
+        return summary
+
     async def _update_ticket_status(self, args: dict[str, Any]) -> dict[str, Any]:
         """更新工单状态"""
         ticket_id = args["ticket_id"]
@@ -0,0 +1,425 @@
+"""设备健康度评估服务
+
+增量消费 DeviceReading，按设备维护滚动指标：
+- 阈值越限率：Device.thresholds 中配置了上下限的参数，越限读数的指数加权比例
+- 参数稳定性：各参数指数加权方差的变异系数
+- 故障频率：低质量读数和故障事件的衰减计数（半衰期默认7天）
+
+状态以设备槽位为下标存放在紧凑数组中，单条读数更新和单台设备查询均为O(1)；
+健康度定期批量写回 Device.health_score。
+"""
+
+import asyncio
+import contextlib
+import math
+import time
+from array import array
+from collections.abc import AsyncIterator, Callable, Iterable
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import bindparam, event, select, update
+from sqlalchemy.orm import Session
+
+from app.models.device import Device, DeviceReading
+
+# 指数加权系数（约等于最近 1/ALPHA 条读数的滑动窗口）
+EWMA_ALPHA = 0.05
+# 变异系数达到该值时稳定性记为0分
+CV_LIMIT = 0.5
+# 参数至少有多少条读数才参与稳定性评估
+MIN_SAMPLES = 5
+# 读数质量低于该值视为一次故障
+FAULT_QUALITY = 60
+# 故障计数半衰期（秒）
+FAULT_HALF_LIFE = 7 * 24 * 3600.0
+# 衰减故障数达到该值时故障频率记为0分
+FAULT_LIMIT = 5.0
+# 各指标权重
+WEIGHTS = {"threshold": 0.4, "stability": 0.3, "fault": 0.3}
+# 写回 Device.health_score 的默认间隔（秒）
+PERSIST_INTERVAL = 300.0
+# Session.info 中暂存已 flush、未提交读数的键
+_PENDING_KEY = "device_health_pending"
+
+
+def parse_thresholds(thresholds: dict | None) -> dict[str, tuple[float, float]]:
+    """解析阈值配置
+
+    支持 {"temperature": {"min": 5, "max": 30}} 和 {"temperature": [5, 30]} 两种写法，
+    缺省的一侧视为不限。
+    """
+    parsed: dict[str, tuple[float, float]] = {}
+    for parameter, limits in (thresholds or {}).items():
+        if isinstance(limits, dict):
+            low, high = limits.get("min"), limits.get("max")
+        elif isinstance(limits, (list, tuple)) and len(limits) == 2:
+            low, high = limits
+        else:
+            continue
+        parsed[parameter] = (
+            float(low) if low is not None else -math.inf,
+            float(high) if high is not None else math.inf,
+        )
+    return parsed
+
+
+def _indicator_status(score: float) -> str:
+    if score >= 90:
+        return "正常"
+    if score >= 75:
+        return "良好"
+    if score >= 60:
+        return "关注"
+    return "异常"
+
+
+class DeviceHealthEngine:
+    """设备健康度增量计算引擎"""
+
+    def __init__(
+        self,
+        alpha: float = EWMA_ALPHA,
+        persist_interval: float = PERSIST_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.alpha = alpha
+        self.persist_interval = persist_interval
+        self._clock = clock
+        self._last_persist = clock()
+        self.loaded = False
+
+        # 设备槽位
+        self._slots: dict[str, int] = {}
+        self._device_ids: list[str] = []
+        self._readings = array("q")
+        self._violation_rate = array("d")
+        self._threshold_samples = array("q")
+        self._instability_sum = array("d")
+        self._stable_params = array("q")
+        self._faults = array("d")
+        self._fault_at = array("d")
+        self._persisted = array("q")
+
+        # 参数槽位: (设备槽位, 参数) -> 参数槽位
+        self._param_slots: dict[tuple[int, str], int] = {}
+        self._p_count = array("q")
+        self._p_mean = array("d")
+        self._p_var = array("d")
+        self._p_instability = array("d")
+        self._p_low = array("d")
+        self._p_high = array("d")
+
+        self._dirty: set[int] = set()
+        self._listening = False
+
+    def __len__(self) -> int:
+        return len(self._device_ids)
+
+    # ========== 设备登记 ==========
+
+    def _slot(self, device_id: str) -> int:
+        slot = self._slots.get(device_id)
+        if slot is None:
+            slot = len(self._device_ids)
+            self._slots[device_id] = slot
+            self._device_ids.append(device_id)
+            for column in (self._readings, self._threshold_samples, self._stable_params):
+                column.append(0)
+            for column in (self._violation_rate, self._instability_sum, self._faults, self._fault_at):
+                column.append(0.0)
+            self._persisted.append(-1)
+        return slot
+
+    def _param_slot(self, slot: int, parameter: str) -> int:
+        key = (slot, parameter)
+        pslot = self._param_slots.get(key)
+        if pslot is None:
+            pslot = len(self._p_count)
+            self._param_slots[key] = pslot
+            self._p_count.append(0)
+            self._p_mean.append(0.0)
+            self._p_var.append(0.0)
+            self._p_instability.append(0.0)
+            self._p_low.append(-math.inf)
+            self._p_high.append(math.inf)
+        return pslot
+
+    def register_device(
+        self, device_id: str, thresholds: dict | None = None, health_score: int | None = None
+    ) -> None:
+        """登记设备及其阈值配置（重复登记会更新阈值）"""
+        slot = self._slot(device_id)
+        if health_score is not None and self._persisted[slot] < 0:
+            self._persisted[slot] = health_score
+        for parameter, (low, high) in parse_thresholds(thresholds).items():
+            pslot = self._param_slot(slot, parameter)
+            self._p_low[pslot] = low
+            self._p_high[pslot] = high
+
+    async def load_devices(self, db: Any) -> int:
+        """从数据库加载全部设备的阈值配置
+
+        Returns:
+            int: 加载的设备数量
+        """
+        result = await db.execute(
+            select(Device.device_id, Device.thresholds, Device.health_score)
+        )
+        rows = result.all()
+        for device_id, thresholds, health_score in rows:
+            self.register_device(device_id, thresholds, health_score)
+        self.loaded = True
+        return len(rows)
+
+    # ========== 增量更新 ==========
+
+    def ingest(
+        self,
+        device_id: str,
+        parameter: str,
+        value: float,
+        timestamp: datetime | None = None,
+        quality: int | None = 100,
+    ) -> None:
+        """消费一条读数"""
+        slot = self._slot(device_id)
+        pslot = self._param_slot(slot, parameter)
+        alpha = self.alpha
+        self._readings[slot] += 1
+
+        # 阈值越限率
+        low, high = self._p_low[pslot], self._p_high[pslot]
+        if low != -math.inf or high != math.inf:
+            violated = 1.0 if (value < low or value > high) else 0.0
+            if self._threshold_samples[slot] == 0:
+                self._violation_rate[slot] = violated
+            else:
+                self._violation_rate[slot] += alpha * (violated - self._violation_rate[slot])
+            self._threshold_samples[slot] += 1
+
+        # 参数稳定性：指数加权均值/方差
+        count = self._p_count[pslot]
+        if count == 0:
+            self._p_mean[pslot] = value
+        else:
+            diff = value - self._p_mean[pslot]
+            incr = alpha * diff
+            self._p_mean[pslot] += incr
+            self._p_var[pslot] = (1 - alpha) * (self._p_var[pslot] + diff * incr)
+        count += 1
+        self._p_count[pslot] = count
+        if count >= MIN_SAMPLES:
+            cv = math.sqrt(self._p_var[pslot]) / max(abs(self._p_mean[pslot]), 1e-9)
+            instability = min(1.0, cv / CV_LIMIT)
+            if count == MIN_SAMPLES:
+                self._stable_params[slot] += 1
+            self._instability_sum[slot] += instability - self._p_instability[pslot]
+            self._p_instability[pslot] = instability
+
+        # 故障频率
+        if quality is not None and quality < FAULT_QUALITY:
+            self.record_fault(device_id, timestamp)
+
+        self._dirty.add(slot)
+
+    def ingest_reading(self, reading: DeviceReading) -> None:
+        """消费一条 DeviceReading"""
+        self.ingest(
+            reading.device_id,
+            reading.parameter,
+            reading.value,
+            reading.timestamp,
+            reading.quality,
+        )
+
+    def ingest_many(self, readings: Iterable[DeviceReading]) -> int:
+        """批量消费读数，返回条数"""
+        count = 0
+        for reading in readings:
+            self.ingest_reading(reading)
+            count += 1
+        return count
+
+    def record_fault(self, device_id: str, timestamp: datetime | None = None) -> None:
+        """记录一次故障（如设备状态转为 fault）"""
+        slot = self._slot(device_id)
+        at = (timestamp or datetime.now(timezone.utc)).timestamp()
+        self._faults[slot] = self._decayed_faults(slot, at) + 1.0
+        self._fault_at[slot] = max(at, self._fault_at[slot])
+        self._dirty.add(slot)
+
+    def _decayed_faults(self, slot: int, at: float) -> float:
+        faults = self._faults[slot]
+        if not faults:
+            return 0.0
+        elapsed = max(0.0, at - self._fault_at[slot])
+        return faults * 0.5 ** (elapsed / FAULT_HALF_LIFE)
+
+    # ========== 插入监听 ==========
+
+    def _on_after_flush(self, session: Session, flush_context: Any) -> None:
+        readings = [obj for obj in session.new if isinstance(obj, DeviceReading)]
+        if readings:
+            session.info.setdefault(_PENDING_KEY, []).extend(readings)
+
+    def _on_after_commit(self, session: Session) -> None:
+        self.ingest_many(session.info.pop(_PENDING_KEY, ()))
+
+    def _on_after_rollback(self, session: Session) -> None:
+        session.info.pop(_PENDING_KEY, None)
+
+    def _session_hooks(self) -> tuple[tuple[str, Callable[..., None]], ...]:
+        return (
+            ("after_flush", self._on_after_flush),
+            ("after_commit", self._on_after_commit),
+            ("after_rollback", self._on_after_rollback),
+        )
+
+    def listen_for_inserts(self) -> None:
+        """监听 DeviceReading 的ORM插入，事务提交后增量更新
+
+        flush 时暂存新插入的读数，提交后才计入；回滚的读数被丢弃。
+        """
+        if not self._listening:
+            for name, handler in self._session_hooks():
+                event.listen(Session, name, handler)
+            self._listening = True
+
+    def stop_listening(self) -> None:
+        """停止监听"""
+        if self._listening:
+            for name, handler in self._session_hooks():
+                event.remove(Session, name, handler)
+            self._listening = False
+
+    # ========== 查询 ==========
+
+    def has_data(self, device_id: str) -> bool:
+        slot = self._slots.get(device_id)
+        return slot is not None and (self._readings[slot] > 0 or self._faults[slot] > 0)
+
+    def indicator_scores(self, device_id: str, now: datetime | None = None) -> dict[str, float] | None:
+        """各指标得分（0-100），设备无数据时返回None"""
+        slot = self._slots.get(device_id)
+        if slot is None or not self.has_data(device_id):
+            return None
+        at = (now or datetime.now(timezone.utc)).timestamp()
+
+        threshold = 100.0 * (1.0 - self._violation_rate[slot])
+        stable_params = self._stable_params[slot]
+        stability = (
+            100.0 * (1.0 - self._instability_sum[slot] / stable_params)
+            if stable_params else 100.0
+        )
+        fault = 100.0 * max(0.0, 1.0 - self._decayed_faults(slot, at) / FAULT_LIMIT)
+        return {
+            "threshold": round(threshold, 1),
+            "stability": round(max(0.0, stability), 1),
+            "fault": round(fault, 1),
+        }
+
+    def score(self, device_id: str, now: datetime | None = None) -> int | None:
+        """综合健康度，设备无数据时返回None"""
+        scores = self.indicator_scores(device_id, now)
+        if scores is None:
+            return None
+        return round(sum(scores[name] * weight for name, weight in WEIGHTS.items()))
+
+    def health(self, device_id: str, now: datetime | None = None) -> dict[str, Any] | None:
+        """健康度详情，设备无数据时返回None"""
+        scores = self.indicator_scores(device_id, now)
+        if scores is None:
+            return None
+        slot = self._slots[device_id]
+        return {
+            "overall_score": round(sum(scores[name] * weight for name, weight in WEIGHTS.items())),
+            "indicators": {
+                "阈值越限": {
+                    "score": scores["threshold"],
+                    "status": _indicator_status(scores["threshold"]),
+                    "violation_rate": round(self._violation_rate[slot], 4),
+                },
+                "参数稳定性": {
+                    "score": scores["stability"],
+                    "status": _indicator_status(scores["stability"]),
+                },
+                "故障频率": {
+                    "score": scores["fault"],
+                    "status": _indicator_status(scores["fault"]),
+                },
+            },
+            "readings": self._readings[slot],
+        }
+
+    # ========== 持久化 ==========
+
+    async def flush(self, db: Any, force: bool = False) -> int:
+        """把变化的健康度批量写回 Device.health_score
+
+        未到写回间隔且未指定 force 时不写入。调用方负责提交事务。
+
+        Returns:
+            int: 更新的设备数量
+        """
+        now = self._clock()
+        if not force and now - self._last_persist < self.persist_interval:
+            return 0
+        self._last_persist = now
+
+        rows = []
+        for slot in self._dirty:
+            device_id = self._device_ids[slot]
+            score = self.score(device_id)
+            if score is not None and score != self._persisted[slot]:
+                rows.append({"b_device_id": device_id, "b_score": score})
+                self._persisted[slot] = score
+        self._dirty.clear()
+        if not rows:
+            return 0
+
+        table = Device.__table__
+        stmt = (
+            update(table)
+            .where(table.c.device_id == bindparam("b_device_id"))
+            .values(health_score=bindparam("b_score"))
+        )
+        await db.execute(stmt, rows)
+        return len(rows)
+
+    async def persist_periodically(
+        self, session_factory: Callable[[], Any], interval: float | None = None
+    ) -> None:
+        """后台任务：按间隔写回健康度（每轮使用独立会话并提交）"""
+        interval = interval or self.persist_interval
+        while True:
+            await asyncio.sleep(interval)
+            async with session_factory() as db:
+                if await self.flush(db, force=True):
+                    await db.commit()
+
+
+@contextlib.asynccontextmanager
+async def run_health_engine(
+    engine: DeviceHealthEngine, session_factory: Callable[[], Any]
+) -> AsyncIterator[DeviceHealthEngine]:
+    """应用生命周期内运行健康度引擎：监听读数插入并后台定期写回
+
+    退出时停止监听、取消写回任务，并做一次最终写回。
+    """
+    engine.listen_for_inserts()
+    task = asyncio.create_task(engine.persist_periodically(session_factory))
+    try:
+        yield engine
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        engine.stop_listening()
+        async with session_factory() as db:
+            if await engine.flush(db, force=True):
+                await db.commit()
+
+
+# 进程内共享的健康度引擎
+health_engine = DeviceHealthEngine()
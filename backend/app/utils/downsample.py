@@ -0,0 +1,109 @@
+"""时序图表降采样
+
+读数序列查询使用：按窗口选择 date_bin 聚合粒度，再用
+Largest-Triangle-Three-Buckets 把聚合序列整形到固定点数。
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Sequence
+
+DEFAULT_POINTS = 200
+MAX_POINTS = 2000
+# 服务端聚合的桶数 = 目标点数 × OVERSAMPLE，再由 LTTB 整形
+OVERSAMPLE = 4
+
+# 可选的聚合粒度（秒）
+BUCKET_LADDER = (
+    1, 5, 10, 15, 30,
+    60, 120, 300, 600, 900, 1800,
+    3600, 7200, 10800, 21600, 43200,
+    86400, 2 * 86400, 7 * 86400,
+)
+
+
+@dataclass
+class SeriesPoint:
+    """聚合后的序列点"""
+
+    timestamp: datetime
+    value: float
+    min: float
+    max: float
+    count: int = 1
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "avg": self.value,
+            "min": self.min,
+            "max": self.max,
+            "count": self.count,
+        }
+
+
+def clamp_points(points: int | None) -> int:
+    """把请求的点数限制在 [3, MAX_POINTS]"""
+    if not points:
+        return DEFAULT_POINTS
+    return max(3, min(int(points), MAX_POINTS))
+
+
+def choose_bucket_seconds(
+    start: datetime, end: datetime, points: int = DEFAULT_POINTS, oversample: int = OVERSAMPLE
+) -> int:
+    """选择聚合粒度，使窗口内的桶数不超过 points × oversample"""
+    window = max((end - start).total_seconds(), 1.0)
+    target = window / max(points * oversample, 1)
+    for seconds in BUCKET_LADDER:
+        if seconds >= target:
+            return seconds
+    return int(math.ceil(target / 86400)) * 86400
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets，返回选中点的下标（升序，含首尾）
+
+    xs 必须单调递增（时间戳秒数）。
+    """
+    n = len(xs)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][: max(threshold, 0)]
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        span = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / span
+        avg_y = sum(ys[avg_start:avg_end]) / span
+
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                next_a = j
+        selected.append(next_a)
+        a = next_a
+
+    selected.append(n - 1)
+    return selected
+
+
+def shape_series(points: Sequence[SeriesPoint], threshold: int) -> list[SeriesPoint]:
+    """把聚合序列整形到目标点数（按 avg 做 LTTB）"""
+    if len(points) <= threshold:
+        return list(points)
+    xs = [p.timestamp.timestamp() for p in points]
+    ys = [p.value for p in points]
+    return [points[i] for i in lttb_indices(xs, ys, threshold)]
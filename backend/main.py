@@ -11,10 +11,22 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import router as api_v1_router
 from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.device_health import health_engine, run_health_engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 设备健康度：监听读数写入，后台定期写回 Device.health_score
+    async with run_health_engine(health_engine, AsyncSessionLocal):
+        yield
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -22,7 +34,8 @@ app = FastAPI(
     description="ECIS 物业机器人服务平台 API",
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -303,6 +303,33 @@ class TestBatchAcknowledge:
         assert result["success_count"] == 2
         assert result["fail_count"] == 1
 
+    @pytest.mark.asyncio
+    async def test_batch_acknowledge_uses_bulk_tool(self, agent):
+        """测试服务器提供批量工具时只调用一次"""
+        bulk_tool = MagicMock()
+        bulk_tool.name = "acknowledge_alarms"
+        agent._mcp_servers["alarm"].list_tools.return_value.append(bulk_tool)
+        agent.call_tool = AsyncMock(return_value={
+            "success": True,
+            "result": {
+                "total": 2,
+                "success_count": 1,
+                "fail_count": 1,
+                "results": [
+                    {"alarm_id": "ALM-001", "success": True},
+                    {"alarm_id": "ALM-002", "success": False, "error": "告警 ALM-002 不存在"},
+                ],
+            },
+        })
+
+        result = await agent.batch_acknowledge(["ALM-001", "ALM-002"], "张工")
+
+        agent.call_tool.assert_awaited_once_with(
+            "alarm", "acknowledge_alarms", {"alarm_ids": ["ALM-001", "ALM-002"], "acknowledged_by": "张工"}
+        )
+        assert result["success"] is False
+        assert result["fail_count"] == 1
+
 
 class TestAssessUrgency:
     """紧急程度评估测试"""
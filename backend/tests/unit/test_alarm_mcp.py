@@ -24,7 +24,7 @@ class TestAlarmMCPServer:
     def test_init(self, alarm_mcp):
         """测试初始化"""
         assert alarm_mcp.server_type.value == "alarm"
-        assert len(alarm_mcp._tools) == 6
+        assert len(alarm_mcp._tools) == 8
 
     def test_tools_registered(self, alarm_mcp):
         """测试工具注册"""
@@ -35,6 +35,8 @@ class TestAlarmMCPServer:
         assert "acknowledge_alarm" in tool_names
         assert "resolve_alarm" in tool_names
         assert "get_alarm_suggestions" in tool_names
+        assert "acknowledge_alarms" in tool_names
+        assert "resolve_alarms" in tool_names
 
 
 class TestGetAlarmList:
@@ -279,6 +281,120 @@ class TestAcknowledgeAlarm:
         assert "error" in result
 
 
+class TestBulkAlarmTools:
+    """acknowledge_alarms / resolve_alarms测试"""
+
+    @pytest.fixture
+    def mock_db(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def alarm_mcp(self, mock_db):
+        return AlarmMCPServer(mock_db)
+
+    @staticmethod
+    def _returning(ids):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = ids
+        return result
+
+    @staticmethod
+    def _rows(rows):
+        result = MagicMock()
+        result.all.return_value = rows
+        return result
+
+    @pytest.mark.asyncio
+    async def test_acknowledge_alarms_all_success(self, alarm_mcp, mock_db):
+        """测试批量确认全部成功，只执行一条UPDATE"""
+        mock_db.execute = AsyncMock(return_value=self._returning(["ALM-001", "ALM-002"]))
+        mock_db.flush = AsyncMock()
+
+        result = await alarm_mcp._acknowledge_alarms({
+            "alarm_ids": ["ALM-001", "ALM-002", "ALM-001"],
+            "acknowledged_by": "张工",
+            "comment": "已通知维修",
+        })
+
+        assert result["success"] is True
+        assert result["total"] == 2
+        assert [r["alarm_id"] for r in result["results"]] == ["ALM-001", "ALM-002"]
+        assert result["results"][0]["message"] == "告警已确认，备注：已通知维修"
+        assert mock_db.execute.await_count == 1
+        stmt = mock_db.execute.await_args.args[0]
+        sql = str(stmt)
+        assert "UPDATE alarms" in sql and "RETURNING" in sql
+        assert stmt.get_execution_options()["synchronize_session"] == "fetch"
+
+    @pytest.mark.asyncio
+    async def test_acknowledge_alarms_partial_fail(self, alarm_mcp, mock_db):
+        """测试批量确认部分失败，逐项返回原因"""
+        mock_db.execute = AsyncMock(side_effect=[
+            self._returning(["ALM-001"]),
+            self._rows([("ALM-002", AlarmStatus.RESOLVED.value)]),
+        ])
+        mock_db.flush = AsyncMock()
+
+        result = await alarm_mcp._acknowledge_alarms({
+            "alarm_ids": ["ALM-001", "ALM-002", "ALM-404"],
+        })
+
+        assert result["success"] is False
+        assert result["success_count"] == 1
+        assert result["fail_count"] == 2
+        errors = {r["alarm_id"]: r.get("error") for r in result["results"]}
+        assert "resolved" in errors["ALM-002"]
+        assert "不存在" in errors["ALM-404"]
+
+    @pytest.mark.asyncio
+    async def test_acknowledge_alarms_batches(self, alarm_mcp, mock_db):
+        """测试超过批次大小时分批UPDATE"""
+        from app.mcp_servers.bulk import BULK_BATCH_SIZE
+
+        ids = [f"ALM-{i:04d}" for i in range(BULK_BATCH_SIZE + 1)]
+        mock_db.execute = AsyncMock(side_effect=[
+            self._returning(ids[:BULK_BATCH_SIZE]),
+            self._returning(ids[BULK_BATCH_SIZE:]),
+        ])
+        mock_db.flush = AsyncMock()
+
+        result = await alarm_mcp._acknowledge_alarms({"alarm_ids": ids})
+
+        assert result["success_count"] == len(ids)
+        assert mock_db.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_resolve_alarms(self, alarm_mcp, mock_db):
+        """测试批量解决告警"""
+        mock_db.execute = AsyncMock(side_effect=[
+            self._returning(["ALM-001"]),
+            self._rows([("ALM-002", AlarmStatus.RESOLVED.value)]),
+        ])
+        mock_db.flush = AsyncMock()
+
+        result = await alarm_mcp._resolve_alarms({
+            "alarm_ids": ["ALM-001", "ALM-002"],
+            "resolution": "已更换传感器",
+        })
+
+        assert result["success_count"] == 1
+        assert result["results"][1]["error"] == "告警已解决"
+
+    @pytest.mark.asyncio
+    async def test_bulk_tool_validates_array(self, alarm_mcp):
+        """测试array参数类型校验"""
+        from app.mcp_servers.base_mcp_server import MCPToolCall
+
+        result = await alarm_mcp.call_tool(MCPToolCall(
+            call_id="c1", tool_name="acknowledge_alarms", arguments={"alarm_ids": "ALM-001"}
+        ))
+        assert result.success is False
+        assert "array" in result.error
+
+        schema = alarm_mcp._tools["acknowledge_alarms"].to_openai_format()
+        assert schema["function"]["parameters"]["properties"]["alarm_ids"]["items"] == {"type": "string"}
+
+
 class TestResolveAlarm:
     """resolve_alarm测试"""
 
@@ -1,4 +1,6 @@
 """Agent基类单元测试"""
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, PropertyMock
 from datetime import datetime, timezone
@@ -11,6 +13,7 @@ from app.agents.base_agent import (
     MessageRole,
     AgentState,
     AgentResult,
+    ToolCallSpec,
 )
 
 
@@ -260,3 +263,164 @@ class TestAgentState:
         assert AgentState.RUNNING.value == "running"
         assert AgentState.WAITING.value == "waiting"
         assert AgentState.ERROR.value == "error"
+
+
+class TestToolCallPlanner:
+    """工具调用规划测试"""
+
+    @pytest.fixture
+    def agent(self):
+        agent = ConcreteAgent(AgentConfig(name="planner-agent"))
+        agent.calls = []
+        agent.active = 0
+        agent.max_active = 0
+
+        async def execute(tool_name, arguments):
+            agent.calls.append(tool_name)
+            agent.active += 1
+            agent.max_active = max(agent.max_active, agent.active)
+            await asyncio.sleep(0.01)
+            agent.active -= 1
+            return {"success": True, "result": {"tool": tool_name, **arguments}}
+
+        agent._execute_tool = execute
+        return agent
+
+    def test_plan_waves(self, agent):
+        """测试分层：只读并发，写工具作为屏障，显式依赖后移"""
+        waves = agent._plan_waves([
+            ToolCallSpec("a", "get_alarm_detail"),
+            ToolCallSpec("b", "get_alarm_suggestions"),
+            ToolCallSpec("c", "get_alarm_stats", depends_on=["a"]),
+            ToolCallSpec("d", "acknowledge_alarm"),
+            ToolCallSpec("e", "get_alarm_list"),
+        ])
+
+        assert [[spec.key for spec in wave] for wave in waves] == [["a", "b"], ["c"], ["d"], ["e"]]
+
+    def test_plan_unknown_dependency(self, agent):
+        """测试依赖未知调用"""
+        with pytest.raises(ValueError):
+            agent._plan_waves([ToolCallSpec("a", "get_x", depends_on=["missing"])])
+
+    @pytest.mark.asyncio
+    async def test_reads_run_concurrently(self, agent):
+        """测试只读调用并发执行，结果保持原顺序"""
+        results = await agent.execute_tool_calls([
+            ToolCallSpec("a", "get_energy_trend", {"days": 7}),
+            ToolCallSpec("b", "get_energy_comparison"),
+            ToolCallSpec("c", "get_energy_anomaly"),
+        ])
+
+        assert [r["result"]["tool"] for r in results] == [
+            "get_energy_trend", "get_energy_comparison", "get_energy_anomaly"
+        ]
+        assert agent.max_active == 3
+        assert {span.wave for span in agent.last_tool_spans} == {0}
+
+    @pytest.mark.asyncio
+    async def test_shared_session_runs_sequentially(self, agent):
+        """测试MCP服务器共享数据库会话且无会话工厂时顺序执行"""
+        server = MagicMock()
+        server.shares_db_session = True
+        agent._mcp_servers["alarm"] = server
+
+        await agent.execute_tool_calls([
+            ToolCallSpec("a", "get_alarm_detail"),
+            ToolCallSpec("b", "get_alarm_suggestions"),
+        ])
+
+        assert agent.max_active == 1
+
+    @pytest.mark.asyncio
+    async def test_memoize_reads_in_session(self, agent):
+        """测试相同只读调用在会话内只执行一次，写工具清空缓存"""
+        context = AgentContext(session_id="s1")
+        calls = [
+            ToolCallSpec("a", "get_alarm_detail", {"alarm_id": "ALM-1"}),
+            ToolCallSpec("b", "get_alarm_detail", {"alarm_id": "ALM-1"}),
+        ]
+
+        await agent.execute_tool_calls(calls, context)
+        await agent.execute_tool_calls(calls, context)
+        assert agent.calls == ["get_alarm_detail"]
+        assert [span.cached for span in agent.last_tool_spans] == [False, True, True, True]
+
+        await agent.execute_tool_calls([ToolCallSpec("w", "acknowledge_alarm", {"alarm_id": "ALM-1"})], context)
+        assert context.tool_cache == {}
+
+        await agent.execute_tool_calls(calls[:1], context)
+        assert agent.calls == ["get_alarm_detail", "acknowledge_alarm", "get_alarm_detail"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_releases_waiters(self, agent):
+        """测试首个调用被取消时，合并等待的相同调用不会挂起"""
+        async def execute(tool_name, arguments):
+            await asyncio.sleep(0.01)
+            raise asyncio.CancelledError()
+
+        agent._execute_tool = execute
+        calls = [
+            ToolCallSpec("a", "get_alarm_detail", {"alarm_id": "ALM-1"}),
+            ToolCallSpec("b", "get_alarm_detail", {"alarm_id": "ALM-1"}),
+        ]
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(agent.execute_tool_calls(calls), timeout=1)
+        await asyncio.sleep(0)
+
+        span = agent.last_tool_spans[-1]
+        assert span.key == "b" and span.cached and not span.success
+
+    @pytest.mark.asyncio
+    async def test_session_factory_binds_servers(self, agent):
+        """测试设置会话工厂后每个只读调用使用独立会话"""
+        sessions = []
+
+        class Factory:
+            def __call__(self):
+                return self
+
+            async def __aenter__(self):
+                session = object()
+                sessions.append(session)
+                return session
+
+            async def __aexit__(self, *exc):
+                return False
+
+        bound = []
+        server = MagicMock()
+        server.shares_db_session = True
+        server.bind_session = lambda db: bound.append(db) or server
+        server.call_tool = AsyncMock(return_value=MagicMock(success=True, result={}, error=None))
+        tool = MagicMock()
+        tool.name = "get_alarm_detail"
+        server.list_tools.return_value = [tool]
+
+        agent = ConcreteAgent(AgentConfig(name="planner-agent"))
+        agent._mcp_servers["alarm"] = server
+        agent.set_session_factory(Factory())
+
+        await agent.execute_tool_calls([
+            ToolCallSpec("a", "get_alarm_detail", {"alarm_id": "ALM-1"}),
+            ToolCallSpec("b", "get_alarm_detail", {"alarm_id": "ALM-2"}),
+        ])
+
+        assert len(sessions) == 2
+        assert bound == sessions
+
+    @pytest.mark.asyncio
+    async def test_run_attaches_tool_spans(self, agent):
+        """测试运行结果附带工具耗时"""
+
+        async def process(message, context):
+            await agent.execute_tool_calls([ToolCallSpec("a", "get_alarm_stats")], context)
+            return "ok"
+
+        agent._process_message = process
+        result = await agent.run("统计", AgentContext(session_id="s1"))
+
+        spans = result.metadata["tool_spans"]
+        assert [span["tool_name"] for span in spans] == ["get_alarm_stats"]
+        assert spans[0]["duration_ms"] > 0
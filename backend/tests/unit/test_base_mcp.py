@@ -1,7 +1,7 @@
 """MCP基类单元测试"""
 
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 from app.mcp_servers.base_mcp_server import (
     BaseMCPServer,
@@ -138,6 +138,21 @@ class TestBaseMCPServer:
         assert len(tools) == 1
         assert tools[0]["function"]["name"] == "test_tool"
 
+    @pytest.mark.asyncio
+    async def test_bind_session(self):
+        """测试绑定到另一个数据库会话的副本"""
+        from app.mcp_servers.alarm_mcp import AlarmMCPServer
+
+        server = AlarmMCPServer(MagicMock())
+        other_db = MagicMock()
+        bound = server.bind_session(other_db)
+
+        assert server.shares_db_session is True
+        assert bound.db is other_db
+        assert bound._tools["get_alarm_detail"].handler.__self__ is bound
+        assert server._tools["get_alarm_detail"].handler.__self__ is server
+        assert ConcreteMCPServer(MCPServerType.DEVICE).shares_db_session is False
+
     @pytest.mark.asyncio
     async def test_call_tool_success(self):
         """测试成功调用工具"""
@@ -0,0 +1,176 @@
+"""设备健康度引擎单元测试"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.device_health import (
+    DeviceHealthEngine,
+    FAULT_HALF_LIFE,
+    parse_thresholds,
+)
+
+NOW = datetime(2026, 1, 20, 12, 0, tzinfo=timezone.utc)
+
+
+class TestParseThresholds:
+    """阈值解析测试"""
+
+    def test_formats(self):
+        """测试支持的写法"""
+        parsed = parse_thresholds({
+            "temperature": {"min": 5, "max": 30},
+            "pressure": [0.1, 1.2],
+            "current": {"max": 50},
+            "invalid": "x",
+        })
+
+        assert parsed["temperature"] == (5.0, 30.0)
+        assert parsed["pressure"] == (0.1, 1.2)
+        assert parsed["current"][1] == 50.0
+        assert "invalid" not in parsed
+
+
+class TestDeviceHealthEngine:
+    """DeviceHealthEngine测试"""
+
+    def test_no_data(self):
+        """测试无读数设备"""
+        engine = DeviceHealthEngine()
+        engine.register_device("CH-01", {"temperature": [5, 30]})
+
+        assert engine.score("CH-01") is None
+        assert engine.health("UNKNOWN") is None
+
+    def test_healthy_device(self):
+        """测试读数正常的设备"""
+        engine = DeviceHealthEngine()
+        engine.register_device("CH-01", {"temperature": [5, 30]})
+        for _ in range(20):
+            engine.ingest("CH-01", "temperature", 20.0, NOW)
+
+        scores = engine.indicator_scores("CH-01", NOW)
+        assert scores == {"threshold": 100.0, "stability": 100.0, "fault": 100.0}
+        assert engine.score("CH-01", NOW) == 100
+
+    def test_threshold_violations(self):
+        """测试阈值越限降低得分"""
+        engine = DeviceHealthEngine(alpha=0.5)
+        engine.register_device("CH-01", {"temperature": [5, 30]})
+        for value in (20.0, 40.0, 45.0, 50.0):
+            engine.ingest("CH-01", "temperature", value, NOW)
+
+        assert engine.indicator_scores("CH-01", NOW)["threshold"] < 20
+
+    def test_unstable_parameter(self):
+        """测试参数波动降低稳定性得分"""
+        engine = DeviceHealthEngine()
+        for i in range(50):
+            engine.ingest("AHU-01", "flow", 10.0 if i % 2 else 1.0, NOW)
+
+        assert engine.indicator_scores("AHU-01", NOW)["stability"] < 50
+
+    def test_faults_decay(self):
+        """测试故障计数随时间衰减"""
+        engine = DeviceHealthEngine()
+        for _ in range(4):
+            engine.ingest("PUMP-01", "pressure", 1.0, NOW, quality=10)
+
+        recent = engine.indicator_scores("PUMP-01", NOW)["fault"]
+        later = engine.indicator_scores(
+            "PUMP-01", NOW + timedelta(seconds=FAULT_HALF_LIFE * 2)
+        )["fault"]
+        assert recent == pytest.approx(20.0)
+        assert later > recent
+
+    def test_ingest_reading_objects(self):
+        """测试消费DeviceReading对象"""
+        engine = DeviceHealthEngine()
+        reading = MagicMock(
+            device_id="CH-01", parameter="temperature", value=20.0,
+            timestamp=NOW, quality=100,
+        )
+
+        assert engine.ingest_many([reading, reading]) == 2
+        assert engine.health("CH-01")["readings"] == 2
+
+    @pytest.mark.asyncio
+    async def test_flush_changed_scores(self):
+        """测试批量写回变化的健康度"""
+        clock = MagicMock(return_value=0.0)
+        engine = DeviceHealthEngine(persist_interval=60, clock=clock)
+        engine.register_device("CH-01", {"temperature": [5, 30]}, health_score=100)
+        engine.register_device("CH-02", {"temperature": [5, 30]}, health_score=100)
+        engine.ingest("CH-01", "temperature", 50.0, NOW)
+        engine.ingest("CH-02", "temperature", 20.0, NOW)
+
+        db = MagicMock()
+        db.execute = AsyncMock()
+
+        assert await engine.flush(db) == 0
+        clock.return_value = 61.0
+        assert await engine.flush(db) == 1
+
+        rows = db.execute.call_args.args[1]
+        assert rows == [{"b_device_id": "CH-01", "b_score": engine.score("CH-01")}]
+        assert await engine.flush(db, force=True) == 0
+
+    def test_listener_counts_committed_readings_only(self):
+        """测试只计入已提交的读数，回滚的读数被丢弃"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+
+        from app.models.device import DeviceReading
+
+        db_engine = create_engine("sqlite://")
+        DeviceReading.__table__.create(db_engine)
+        engine = DeviceHealthEngine()
+        engine.listen_for_inserts()
+        try:
+            with Session(db_engine) as session:
+                session.add(DeviceReading(device_id="CH-01", parameter="temperature", value=20.0,
+                                          timestamp=NOW, quality=100))
+                session.flush()
+                session.rollback()
+                assert not engine.has_data("CH-01")
+
+                session.add(DeviceReading(device_id="CH-01", parameter="temperature", value=21.0,
+                                          timestamp=NOW, quality=100))
+                session.commit()
+        finally:
+            engine.stop_listening()
+
+        assert engine.health("CH-01")["readings"] == 1
+
+    @pytest.mark.asyncio
+    async def test_run_health_engine_lifecycle(self):
+        """测试生命周期内监听并在退出时写回"""
+        from app.services.device_health import run_health_engine
+
+        engine = DeviceHealthEngine()
+        engine.register_device("CH-01", {"temperature": [5, 30]}, health_score=100)
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=db)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        async with run_health_engine(engine, session_factory):
+            assert engine._listening
+            engine.ingest("CH-01", "temperature", 50.0, NOW)
+
+        assert not engine._listening
+        db.execute.assert_awaited_once()
+        db.commit.assert_awaited_once()
+
+    def test_app_lifespan_starts_engine(self):
+        """测试应用启动时注册监听、关闭时停止"""
+        from fastapi.testclient import TestClient
+
+        from app.services.device_health import health_engine
+        from main import app
+
+        with TestClient(app):
+            assert health_engine._listening
+        assert not health_engine._listening
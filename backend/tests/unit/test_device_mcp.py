@@ -30,7 +30,7 @@ class TestDeviceMCPServer:
         assert "get_device_health" in tool_names
         assert "get_device_stats" in tool_names
         assert "control_device" in tool_names
-        assert len(tools) == 6
+        assert len(tools) == 7
 
     def test_get_tools_openai_format(self):
         """测试OpenAI格式输出"""
@@ -38,7 +38,7 @@ class TestDeviceMCPServer:
         server = DeviceMCPServer(mock_session)
         tools = server.get_tools_openai_format()
 
-        assert len(tools) == 6
+        assert len(tools) == 7
         for tool in tools:
             assert tool["type"] == "function"
             assert "name" in tool["function"]
@@ -156,3 +156,130 @@ class TestControlDevice:
         assert result.success is True
         assert result.result["status"] == "simulated"
         assert "模拟" in result.result["message"]
+
+
+class TestGetDeviceHealth:
+    """get_device_health工具测试"""
+
+    @pytest.mark.asyncio
+    async def test_health_from_engine(self):
+        """测试健康度来自增量引擎"""
+        from app.services.device_health import DeviceHealthEngine
+
+        engine = DeviceHealthEngine()
+        engine.loaded = True
+        engine.register_device("CH-01", {"temperature": {"min": 5, "max": 30}})
+        for value in (20.0, 45.0, 50.0):
+            engine.ingest("CH-01", "temperature", value)
+
+        mock_device = MagicMock()
+        mock_device.device_id = "CH-01"
+        mock_device.name = "1#冷水机组"
+        mock_device.health_score = 100
+        mock_device.thresholds = {"temperature": {"min": 5, "max": 30}}
+
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = mock_device
+        mock_session = MagicMock()
+        mock_session.execute = AsyncMock(return_value=mock_result)
+
+        server = DeviceMCPServer(mock_session, health=engine)
+        engine.ingest("CH-01", "temperature", 50.0)
+        result = await server.call_tool(
+            MCPToolCall(call_id="1", tool_name="get_device_health", arguments={"device_id": "CH-01"})
+        )
+
+        assert result.success is True
+        assert result.result["overall_score"] == engine.score("CH-01")
+        assert result.result["indicators"]["阈值越限"]["score"] < 100
+        assert result.result["readings"] == 4
+
+    @pytest.mark.asyncio
+    async def test_building_health(self):
+        """测试按建筑查询健康度"""
+        from app.services.device_health import DeviceHealthEngine
+
+        engine = DeviceHealthEngine()
+        engine.loaded = True
+        engine.ingest("CH-01", "flow", 10.0, quality=10)
+
+        mock_result = MagicMock()
+        mock_result.all.return_value = [("CH-01", "1#冷水机组", 100), ("CH-02", "2#冷水机组", 88)]
+        mock_session = MagicMock()
+        mock_session.execute = AsyncMock(return_value=mock_result)
+
+        server = DeviceMCPServer(mock_session, health=engine)
+        result = await server.call_tool(
+            MCPToolCall(call_id="1", tool_name="get_device_health", arguments={"building": "A栋"})
+        )
+
+        assert result.success is True
+        assert result.result["total"] == 2
+        scores = {d["device_id"]: d["health_score"] for d in result.result["devices"]}
+        assert scores == {"CH-01": engine.score("CH-01"), "CH-02": 88}
+
+
+class TestGetDeviceStats:
+    """get_device_stats工具测试"""
+
+    @pytest.mark.asyncio
+    async def test_stats_group_by(self):
+        """测试统计使用SQL分组"""
+        mock_result = MagicMock()
+        mock_result.all.return_value = [("chiller", 3), ("pump", 5)]
+        mock_session = MagicMock()
+        mock_session.execute = AsyncMock(return_value=mock_result)
+
+        server = DeviceMCPServer(mock_session)
+        result = await server.call_tool(
+            MCPToolCall(call_id="1", tool_name="get_device_stats", arguments={"group_by": "type"})
+        )
+
+        assert result.success is True
+        assert result.result["total"] == 8
+        assert result.result["statistics"] == {"chiller": 3, "pump": 5}
+        sql = str(mock_session.execute.call_args.args[0])
+        assert "GROUP BY" in sql
+
+
+class TestGetDeviceReadingSeries:
+    """get_device_reading_series工具测试"""
+
+    @pytest.mark.asyncio
+    async def test_series_fixed_points(self):
+        """测试多参数一次查询并降采样到固定点数"""
+        from datetime import timedelta
+
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        rows = [
+            (parameter, start + timedelta(hours=i), float(i % 24), 0.0, 30.0, 12)
+            for parameter in ("temperature", "pressure")
+            for i in range(24 * 90)
+        ]
+        mock_result = MagicMock()
+        mock_result.all.return_value = rows
+        mock_session = MagicMock()
+        mock_session.execute = AsyncMock(return_value=mock_result)
+
+        server = DeviceMCPServer(mock_session)
+        result = await server.call_tool(
+            MCPToolCall(
+                call_id="1",
+                tool_name="get_device_reading_series",
+                arguments={
+                    "device_id": "CH-01",
+                    "parameters": ["temperature", "pressure"],
+                    "start_time": start.isoformat(),
+                    "end_time": (start + timedelta(days=90)).isoformat(),
+                    "points": 100,
+                },
+            )
+        )
+
+        assert result.success is True
+        assert mock_session.execute.await_count == 1
+        assert set(result.result["series"]) == {"temperature", "pressure"}
+        assert all(len(series) == 100 for series in result.result["series"].values())
+        assert result.result["bucket_seconds"] * 400 >= 90 * 86400
+        sql = str(mock_session.execute.call_args.args[0])
+        assert "date_bin" in sql and "GROUP BY" in sql
@@ -24,7 +24,7 @@ class TestTicketMCPServer:
     def test_init(self, ticket_mcp):
         """测试初始化"""
         assert ticket_mcp.server_type.value == "ticket"
-        assert len(ticket_mcp._tools) == 6
+        assert len(ticket_mcp._tools) == 7
 
     def test_tools_registered(self, ticket_mcp):
         """测试工具注册"""
@@ -265,6 +265,40 @@ class TestAssignTicket:
         assert result["success"] is False
 
 
+class TestAssignTickets:
+    """assign_tickets测试"""
+
+    @pytest.fixture
+    def mock_db(self):
+        return MagicMock()
+
+    @pytest.fixture
+    def ticket_mcp(self, mock_db):
+        return TicketMCPServer(mock_db)
+
+    @pytest.mark.asyncio
+    async def test_assign_tickets(self, ticket_mcp, mock_db):
+        """测试批量分配，逐项返回结果"""
+        updated = MagicMock()
+        updated.all.return_value = [("TKT-001", TicketStatus.ASSIGNED.value)]
+        current = MagicMock()
+        current.all.return_value = [("TKT-002", TicketStatus.COMPLETED.value)]
+        mock_db.execute = AsyncMock(side_effect=[updated, current])
+        mock_db.flush = AsyncMock()
+
+        result = await ticket_mcp._assign_tickets({
+            "ticket_ids": ["TKT-001", "TKT-002", "TKT-404"],
+            "assigned_to": "张工",
+        })
+
+        assert result["success"] is False
+        assert result["success_count"] == 1
+        assert result["results"][0]["new_status"] == TicketStatus.ASSIGNED.value
+        assert result["results"][1]["error"] == "已完成的工单不能重新分配"
+        assert "不存在" in result["results"][2]["error"]
+        assert mock_db.execute.await_count == 2
+
+
 class TestUpdateTicketStatus:
     """update_ticket_status测试"""
 
@@ -0,0 +1,5 @@
+"""
+LinkC Platform - 性能基准
+=========================
+热点路径基准脚本，使用 python -m bench.<name> 运行。
+"""
@@ -0,0 +1,173 @@
+"""
+告警批量确认基准
+================
+对比确认 N 条告警的两种方式:
+- per_item: 逐条调用 acknowledge_alarm (每条 SELECT + flush)
+- bulk:     acknowledge_alarms (每批一条 UPDATE ... WHERE alarm_id = ANY(:ids) RETURNING)
+
+默认使用模拟会话 (每次 execute / flush 计一次往返并等待 --rtt-ms)；
+指定 --database-url 时连接真实 PostgreSQL (需 asyncpg，会创建/清空 alarms 表)。
+
+用法 (backend 需在 PYTHONPATH 中):
+    PYTHONPATH=backend python -m bench.alarm_bulk_ack --alarms 1000 --rtt-ms 0.5
+    PYTHONPATH=backend python -m bench.alarm_bulk_ack --database-url postgresql+asyncpg://...
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import argparse
+import asyncio
+import json
+import time
+
+from app.mcp_servers.alarm_mcp import AlarmMCPServer
+from app.models.alarm import Alarm, AlarmStatus
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+    def scalars(self):
+        return SimpleNamespace(all=lambda: list(self._rows))
+
+    def all(self):
+        return list(self._rows)
+
+
+class SimulatedSession:
+    """模拟数据库会话: 内存告警表 + 固定往返延迟"""
+
+    def __init__(self, alarm_ids, rtt_seconds: float):
+        self.rtt = rtt_seconds
+        self.round_trips = 0
+        self.alarms = {
+            alarm_id: SimpleNamespace(
+                alarm_id=alarm_id, status=AlarmStatus.ACTIVE.value,
+                acknowledged_at=None, acknowledged_by=None,
+            )
+            for alarm_id in alarm_ids
+        }
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+    async def execute(self, stmt):
+        await self._round_trip()
+        params = stmt.compile().params
+        ids = next((v for v in params.values() if isinstance(v, list)), None)
+
+        if stmt.is_update:
+            updated = []
+            for alarm_id in ids:
+                alarm = self.alarms.get(alarm_id)
+                if alarm and alarm.status == AlarmStatus.ACTIVE.value:
+                    alarm.status = AlarmStatus.ACKNOWLEDGED.value
+                    updated.append(alarm_id)
+            return _Result(updated)
+
+        if ids is not None:
+            return _Result([(i, self.alarms[i].status) for i in ids if i in self.alarms])
+        alarm_id = next(v for v in params.values() if isinstance(v, str))
+        alarm = self.alarms.get(alarm_id)
+        return _Result([alarm] if alarm else [])
+
+    async def flush(self):
+        await self._round_trip()
+
+
+async def run_simulated(count: int, rtt_ms: float) -> dict:
+    ids = [f"ALM-{i:06d}" for i in range(count)]
+    rtt = rtt_ms / 1000
+
+    session = SimulatedSession(ids, rtt)
+    server = AlarmMCPServer(session)
+    start = time.perf_counter()
+    for alarm_id in ids:
+        await server._acknowledge_alarm({"alarm_id": alarm_id})
+    per_item_s = time.perf_counter() - start
+    per_item_trips = session.round_trips
+
+    session = SimulatedSession(ids, rtt)
+    server = AlarmMCPServer(session)
+    start = time.perf_counter()
+    result = await server._acknowledge_alarms({"alarm_ids": ids})
+    bulk_s = time.perf_counter() - start
+    assert result["success_count"] == count
+
+    return {
+        "mode": "simulated",
+        "alarms": count,
+        "rtt_ms": rtt_ms,
+        "per_item": {"seconds": round(per_item_s, 3), "round_trips": per_item_trips},
+        "bulk": {"seconds": round(bulk_s, 4), "round_trips": session.round_trips},
+        "speedup": round(per_item_s / bulk_s, 1) if bulk_s else None,
+    }
+
+
+async def run_postgres(count: int, database_url: str) -> dict:
+    from sqlalchemy import delete, insert
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Alarm.__table__.create(sync_conn, checkfirst=True))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def reset(ids):
+        now = datetime.now(timezone.utc)
+        async with sessions() as db:
+            await db.execute(delete(Alarm))
+            await db.execute(insert(Alarm), [
+                {"alarm_id": i, "device_id": "DEV-BENCH", "title": "bench",
+                 "severity": "warning", "status": AlarmStatus.ACTIVE.value, "triggered_at": now}
+                for i in ids
+            ])
+            await db.commit()
+
+    ids = [f"ALM-{i:06d}" for i in range(count)]
+    timings = {}
+    for mode in ("per_item", "bulk"):
+        await reset(ids)
+        async with sessions() as db:
+            server = AlarmMCPServer(db)
+            start = time.perf_counter()
+            if mode == "per_item":
+                for alarm_id in ids:
+                    await server._acknowledge_alarm({"alarm_id": alarm_id})
+            else:
+                await server._acknowledge_alarms({"alarm_ids": ids})
+            await db.commit()
+            timings[mode] = time.perf_counter() - start
+
+    await engine.dispose()
+    return {
+        "mode": "postgres",
+        "alarms": count,
+        "per_item_s": round(timings["per_item"], 3),
+        "bulk_s": round(timings["bulk"], 4),
+        "speedup": round(timings["per_item"] / timings["bulk"], 1) if timings["bulk"] else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk alarm acknowledgement benchmark")
+    parser.add_argument("--alarms", type=int, default=1000)
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="模拟模式下每次往返的延迟")
+    parser.add_argument("--database-url", help="真实 PostgreSQL 连接串 (postgresql+asyncpg://...)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        result = asyncio.run(run_postgres(args.alarms, args.database_url))
+    else:
+        result = asyncio.run(run_simulated(args.alarms, args.rtt_ms))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
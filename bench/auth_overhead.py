@@ -0,0 +1,170 @@
+"""
+认证开销基准
+============
+对比每个已认证请求的鉴权开销:
+- verify: 原实现，每次请求 JWT 验签 + 权限列表线性查找
+- cached: 验签载荷 LRU 缓存 + 解码时编译的权限位图
+
+dependency 模式直接调用 get_current_user / require_permission 依赖；
+asgi 模式经 FastAPI 路由 (httpx ASGITransport，不走网络) 发送请求。
+另外模拟持续登出，对比原黑名单集合与分桶吊销表的条目数。
+
+用法:
+    python -m bench.auth_overhead --requests 20000 --tokens 200
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import uuid
+
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+import httpx
+
+from src.shared.auth import jwt as auth_jwt
+from src.shared.auth.dependencies import get_current_user, require_permission, security
+from src.shared.auth.permissions import Permission, get_role_permissions, has_permission
+from src.shared.auth.models import TokenPayload, UserRole
+from src.shared.auth.token_cache import RevocationStore
+
+REQUIRED = Permission.ROBOT_READ.value
+
+
+def _tokens(count: int) -> List[str]:
+    now = datetime.now(timezone.utc)
+    permissions = get_role_permissions(UserRole.VIEWER)
+    return [
+        auth_jwt.jwt.encode(
+            {
+                "sub": str(uuid.uuid4()), "tenant_id": "tenant_bench", "role": "viewer",
+                "permissions": permissions, "exp": now + timedelta(minutes=30), "iat": now,
+                "type": "access",
+            },
+            auth_jwt.SECRET_KEY,
+            algorithm=auth_jwt.ALGORITHM,
+        )
+        for _ in range(count)
+    ]
+
+
+# 原实现: 每次请求验签，权限为列表查找
+async def verify_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenPayload:
+    payload = auth_jwt._verify(credentials.credentials) if credentials else None
+    if not payload or payload.type != "access":
+        raise HTTPException(status_code=401)
+    return payload
+
+
+async def verify_permission(user: TokenPayload = Depends(verify_user)) -> TokenPayload:
+    if not has_permission(user.permissions, REQUIRED):
+        raise HTTPException(status_code=403)
+    return user
+
+
+async def run_dependency(tokens: List[str], requests: int) -> dict:
+    cached_check = require_permission(REQUIRED)
+    credentials = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=t) for t in tokens]
+    auth_jwt.token_cache.clear()
+
+    results = {}
+    for mode in ("verify", "cached"):
+        start = time.perf_counter()
+        for i in range(requests):
+            cred = credentials[i % len(credentials)]
+            if mode == "verify":
+                await verify_permission(await verify_user(cred))
+            else:
+                await cached_check(await get_current_user(cred))
+        elapsed = time.perf_counter() - start
+        results[mode] = {"us_per_request": round(elapsed / requests * 1e6, 2)}
+    results["speedup"] = round(
+        results["verify"]["us_per_request"] / results["cached"]["us_per_request"], 1
+    )
+    return results
+
+
+async def run_asgi(tokens: List[str], requests: int) -> dict:
+    app = FastAPI()
+
+    @app.get("/verify")
+    async def verify_route(user: TokenPayload = Depends(verify_permission)):
+        return {"ok": True}
+
+    @app.get("/cached")
+    async def cached_route(user: TokenPayload = Depends(require_permission(REQUIRED))):
+        return {"ok": True}
+
+    @app.get("/anonymous")
+    async def anonymous_route():
+        return {"ok": True}
+
+    auth_jwt.token_cache.clear()
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("anonymous", "verify", "cached"):
+            samples = []
+            for i in range(requests):
+                headers = {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+                start = time.perf_counter()
+                response = await client.get(f"/{path}", headers=headers)
+                samples.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+            results[path] = {"median_us": round(statistics.median(samples) * 1e6, 1)}
+
+    base = results["anonymous"]["median_us"]
+    for path in ("verify", "cached"):
+        results[path]["auth_overhead_us"] = round(results[path]["median_us"] - base, 1)
+    return results
+
+
+def run_revocations(logouts: int, per_second: float, token_ttl: float) -> dict:
+    """持续登出 logouts 次 (每秒 per_second 次)，比较最终条目数"""
+    clock = [0.0]
+    store = RevocationStore(bucket_seconds=60, clock=lambda: clock[0])
+    blacklist = set()
+    for i in range(logouts):
+        clock[0] = i / per_second
+        token = f"token-{i}"
+        blacklist.add(token)
+        store.revoke(token, clock[0] + token_ttl)
+    return {
+        "logouts": logouts,
+        "simulated_hours": round(logouts / per_second / 3600, 1),
+        "set_entries": len(blacklist),
+        "bucketed_entries": len(store),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    tokens = _tokens(args.tokens)
+    return {
+        "benchmark": "auth_overhead",
+        "config": {"requests": args.requests, "tokens": args.tokens},
+        "dependency": await run_dependency(tokens, args.requests),
+        "asgi": await run_asgi(tokens, max(1, args.requests // 10)),
+        "revocation": run_revocations(args.logouts, args.logouts_per_second, args.token_ttl),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Authenticated request overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=200, help="不同 token 数 (活跃用户数)")
+    parser.add_argument("--logouts", type=int, default=200000)
+    parser.add_argument("--logouts-per-second", type=float, default=5.0)
+    parser.add_argument("--token-ttl", type=float, default=1800.0)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
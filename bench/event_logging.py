@@ -0,0 +1,189 @@
+"""
+事件日志写入基准
+================
+对比 PostgresEventLogService.log_event 的两种写入路径:
+- direct: 每个事件一条 INSERT，调用方等待往返
+- write_behind: EventWriter 入队后立即返回，按批 COPY
+
+吞吐包含最后的 flush()，调用方延迟只统计 log_event 本身。
+
+默认使用模拟数据库 (每次 execute / COPY 计一次往返并等待 --rtt-ms，COPY 另按
+--row-us 计每行开销)；指定 --dsn 时连接真实 PostgreSQL (需 asyncpg，会重建 event_logs 表)。
+
+用法:
+    python -m bench.event_logging --events 20000 --producers 16 --rtt-ms 0.5
+    python -m bench.event_logging --events 100000 --dsn postgresql://...
+"""
+
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+import time
+
+from src.data.storage.event_writer import EventWriter
+from src.data.storage.events import PostgresEventLogService
+
+
+class SimulatedConnection:
+    def __init__(self, db: "SimulatedDatabase"):
+        self._db = db
+
+    async def execute(self, query, *params):
+        await self._db.round_trip(1)
+
+    async def copy_records_to_table(self, table, records, columns):
+        await self._db.round_trip(len(records))
+
+
+class SimulatedDatabase:
+    """模拟数据库: 固定往返延迟 + 每行写入开销，连接池大小有限"""
+
+    def __init__(self, rtt_seconds: float, row_seconds: float, pool_size: int):
+        self.rtt = rtt_seconds
+        self.row = row_seconds
+        self.round_trips = 0
+        self.rows = 0
+        self._pool = asyncio.Semaphore(pool_size)
+
+    async def round_trip(self, rows: int) -> None:
+        self.round_trips += 1
+        self.rows += rows
+        await asyncio.sleep(self.rtt + self.row * rows)
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._pool:
+            yield SimulatedConnection(self)
+
+    async def close(self) -> None:
+        pass
+
+
+class PostgresDatabase:
+    def __init__(self, pool):
+        self._pool = pool
+
+    @classmethod
+    async def create(cls, dsn: str, pool_size: int) -> "PostgresDatabase":
+        import asyncpg
+
+        pool = await asyncpg.create_pool(dsn, min_size=1, max_size=pool_size)
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                DROP TABLE IF EXISTS event_logs;
+                CREATE TABLE event_logs (
+                    time TIMESTAMPTZ NOT NULL, event_id TEXT NOT NULL, tenant_id TEXT NOT NULL,
+                    event_type TEXT, level TEXT, source TEXT, data JSONB, tags TEXT[]
+                );
+            """)
+        return cls(pool)
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._pool.acquire() as conn:
+            yield conn
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩分位数 (输入需已排序)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(q * len(sorted_values))) - 1]
+
+
+async def run_mode(mode: str, db, args: argparse.Namespace) -> dict:
+    writer = None
+    if mode == "write_behind":
+        writer = EventWriter(db, batch_size=args.batch_size, flush_interval=args.flush_interval)
+    service = PostgresEventLogService(db, writer=writer)
+    latencies: List[float] = []
+    per_producer = args.events // args.producers
+
+    async def producer(p: int) -> None:
+        for i in range(per_producer):
+            start = time.perf_counter()
+            await service.log_event(
+                "robot.status_changed", "tenant_bench", f"collector_{p}",
+                {"robot_id": f"robot_{p:03d}", "seq": i, "battery": 80}
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(producer(p) for p in range(args.producers)))
+    await service.close()
+    wall_s = time.perf_counter() - start
+
+    latencies.sort()
+    total = per_producer * args.producers
+    result = {
+        "events": total,
+        "wall_s": round(wall_s, 3),
+        "events_per_s": round(total / wall_s, 1) if wall_s else None,
+        "log_event_p50_ms": round(percentile(latencies, 0.50), 4),
+        "log_event_p99_ms": round(percentile(latencies, 0.99), 4),
+    }
+    if isinstance(db, SimulatedDatabase):
+        result["round_trips"] = db.round_trips
+    if writer is not None:
+        result["writer"] = writer.get_stats()
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    modes = {}
+    for mode in ("direct", "write_behind"):
+        if args.dsn:
+            db = await PostgresDatabase.create(args.dsn, args.pool_size)
+        else:
+            db = SimulatedDatabase(args.rtt_ms / 1000, args.row_us / 1_000_000, args.pool_size)
+        try:
+            modes[mode] = await run_mode(mode, db, args)
+        finally:
+            await db.close()
+
+    direct = modes["direct"]["events_per_s"]
+    batched = modes["write_behind"]["events_per_s"]
+    return {
+        "benchmark": "event_logging",
+        "backend": "postgresql" if args.dsn else "simulated",
+        "config": {
+            "events": args.events,
+            "producers": args.producers,
+            "batch_size": args.batch_size,
+            "flush_interval": args.flush_interval,
+            "pool_size": args.pool_size,
+            "rtt_ms": None if args.dsn else args.rtt_ms,
+            "row_us": None if args.dsn else args.row_us,
+        },
+        "modes": modes,
+        "speedup": round(batched / direct, 1) if direct else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Event log write benchmark")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--producers", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=0.2)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    parser.add_argument("--row-us", type=float, default=2.0)
+    parser.add_argument("--dsn", help="PostgreSQL DSN (不指定时使用模拟数据库)")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
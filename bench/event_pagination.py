@@ -0,0 +1,247 @@
+"""
+事件日志分页基准
+================
+在大事件表上对比 PostgresEventLogService.query_events 的两种深分页方式:
+- offset: page=N，LIMIT/OFFSET 跳过前面所有行
+- keyset: cursor 续页，(time, event_id) 行比较直接定位
+
+并分别测量每页精确 COUNT(*) 与 count_mode="cached" (PostgreSQL 下另有
+"estimate") 的开销。
+
+默认使用临时 SQLite 文件 (复合索引等价，SQL 由同一服务生成，$n 占位符
+转换为 ?n)；指定 --dsn 时连接真实 PostgreSQL (需 asyncpg，会重建 event_logs 表)。
+
+用法:
+    python -m bench.event_pagination --rows 1000000 --page 1000
+    python -m bench.event_pagination --rows 10000000 --page 1000 --dsn postgresql://...
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from src.data.storage.events import EVENT_CURSOR_SCOPE, PostgresEventLogService
+from src.shared.pagination import encode_cursor
+
+TENANT = "tenant_bench"
+BASE_EPOCH = 1704067200  # 2024-01-01T00:00:00Z
+
+
+# ============================================================
+# SQLite 后端
+# ============================================================
+
+class _SqliteConnection:
+    """asyncpg 风格的 SQLite 连接 (只实现 query_events 用到的方法)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    @staticmethod
+    def _translate(query: str, params: tuple) -> tuple:
+        values = [p.isoformat() if isinstance(p, datetime) else p for p in params]
+        return re.sub(r"\$(\d+)", r"?\1", query), values
+
+    async def fetchval(self, query: str, *params: Any) -> Any:
+        row = self._conn.execute(*self._translate(query, params)).fetchone()
+        return row[0] if row else None
+
+    async def fetch(self, query: str, *params: Any) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(*self._translate(query, params)).fetchall()
+        result = []
+        for row in rows:
+            record = dict(row)
+            record["time"] = datetime.fromisoformat(record["time"])
+            result.append(record)
+        return result
+
+
+class _SqliteDatabase:
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+
+    @asynccontextmanager
+    async def connection(self):
+        yield _SqliteConnection(self._conn)
+
+    def seed(self, rows: int) -> None:
+        self._conn.executescript("""
+            DROP TABLE IF EXISTS event_logs;
+            CREATE TABLE event_logs (
+                time TEXT NOT NULL, event_id TEXT NOT NULL, tenant_id TEXT NOT NULL,
+                event_type TEXT, level TEXT, source TEXT, data TEXT, tags TEXT
+            );
+        """)
+        self._conn.execute(f"""
+            WITH RECURSIVE seq(x) AS (SELECT 0 UNION ALL SELECT x + 1 FROM seq LIMIT {rows})
+            INSERT INTO event_logs
+            SELECT strftime('%Y-%m-%dT%H:%M:%S+00:00', {BASE_EPOCH} - x / 4, 'unixepoch'),
+                   printf('evt_%012d', x), '{TENANT}', 'robot_status', 'info', 'bench', '{{}}', NULL
+            FROM seq
+        """)
+        self._conn.execute(
+            "CREATE INDEX idx_event_logs_page ON event_logs (tenant_id, time DESC, event_id DESC)"
+        )
+        self._conn.commit()
+
+    async def cursor_before(self, offset: int) -> Optional[str]:
+        """第 offset 行 (0 起) 之前一行的续页令牌"""
+        row = self._conn.execute(
+            "SELECT time, event_id FROM event_logs WHERE tenant_id = ? "
+            "ORDER BY time DESC, event_id DESC LIMIT 1 OFFSET ?",
+            (TENANT, offset - 1),
+        ).fetchone()
+        if row is None:
+            return None
+        return encode_cursor([datetime.fromisoformat(row[0]), row[1]], EVENT_CURSOR_SCOPE)
+
+    async def close(self) -> None:
+        self._conn.close()
+
+
+# ============================================================
+# PostgreSQL 后端
+# ============================================================
+
+class _PostgresDatabase:
+    def __init__(self, pool):
+        self._pool = pool
+
+    @classmethod
+    async def create(cls, dsn: str) -> "_PostgresDatabase":
+        import asyncpg
+
+        return cls(await asyncpg.create_pool(dsn, min_size=1, max_size=2))
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._pool.acquire() as conn:
+            yield conn
+
+    async def seed(self, rows: int) -> None:
+        async with self._pool.acquire() as conn:
+            await conn.execute("""
+                DROP TABLE IF EXISTS event_logs;
+                CREATE TABLE event_logs (
+                    time TIMESTAMPTZ NOT NULL, event_id TEXT NOT NULL, tenant_id TEXT NOT NULL,
+                    event_type TEXT, level TEXT, source TEXT, data JSONB, tags TEXT[]
+                );
+            """)
+            await conn.execute(f"""
+                INSERT INTO event_logs
+                SELECT to_timestamp({BASE_EPOCH}) - (x / 4) * interval '1 second',
+                       'evt_' || lpad(x::text, 12, '0'), '{TENANT}',
+                       'robot_status', 'info', 'bench', '{{}}'::jsonb, NULL
+                FROM generate_series(0, {rows - 1}) AS x
+            """)
+            await conn.execute(
+                "CREATE INDEX idx_event_logs_page ON event_logs (tenant_id, time DESC, event_id DESC)"
+            )
+            await conn.execute("ANALYZE event_logs")
+
+    async def cursor_before(self, offset: int) -> Optional[str]:
+        async with self._pool.acquire() as conn:
+            row = await conn.fetchrow(
+                "SELECT time, event_id FROM event_logs WHERE tenant_id = $1 "
+                "ORDER BY time DESC, event_id DESC LIMIT 1 OFFSET $2",
+                TENANT, offset - 1,
+            )
+        if row is None:
+            return None
+        return encode_cursor([row["time"], row["event_id"]], EVENT_CURSOR_SCOPE)
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+
+# ============================================================
+# 测量
+# ============================================================
+
+async def measure(fn, repeat: int) -> dict:
+    await fn()  # 预热 (cached 模式同时填充计数缓存)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.dsn:
+        db = await _PostgresDatabase.create(args.dsn)
+        await db.seed(args.rows)
+        count_modes = ["exact", "cached", "estimate"]
+        backend = "postgresql"
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="bench_events_"), "events.db")
+        db = _SqliteDatabase(path)
+        db.seed(args.rows)
+        count_modes = ["exact", "cached"]
+        backend = "sqlite"
+
+    service = PostgresEventLogService(db)
+    cursor = await db.cursor_before((args.page - 1) * args.size)
+    results: Dict[str, dict] = {}
+    try:
+        for mode in count_modes:
+            results[f"page1_{mode}"] = await measure(
+                lambda: service.query_events(TENANT, size=args.size, count_mode=mode), args.repeat
+            )
+            results[f"offset_{mode}"] = await measure(
+                lambda: service.query_events(
+                    TENANT, page=args.page, size=args.size, count_mode=mode
+                ),
+                args.repeat,
+            )
+            results[f"keyset_{mode}"] = await measure(
+                lambda: service.query_events(
+                    TENANT, size=args.size, cursor=cursor, count_mode=mode
+                ),
+                args.repeat,
+            )
+    finally:
+        await db.close()
+
+    offset = results["offset_cached"]["median_ms"]
+    keyset = results["keyset_cached"]["median_ms"]
+    return {
+        "benchmark": "event_pagination",
+        "backend": backend,
+        "config": {"rows": args.rows, "page": args.page, "size": args.size, "repeat": args.repeat},
+        "results": results,
+        "keyset_speedup": round(offset / keyset, 1) if keyset else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Event log pagination benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dsn", help="PostgreSQL DSN (不指定时使用 SQLite)")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""
+MCP 状态轮询基准
+================
+模拟采集器对整个机队的状态轮询: robot_batch_get_status (每批20台) ->
+MCPClient 结果包装 -> 边界 JSON 编码。
+
+对比两条路径:
+- legacy: 复现变更前的调用链 (pydantic 状态快照 + _snapshot_to_dict +
+          MCPClient hasattr 二次包装 + server 端 json.dumps(model_dump()))
+- fast:   当前 RobotTools / MCPClient，状态快照 to_dict + 直接透传 +
+          ToolResult.to_json (安装 orjson 时走 orjson)
+
+用法:
+    python -m bench.mcp_status_sweep --robots 1000 --rounds 50
+    python -m bench.mcp_status_sweep --profile
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import argparse
+import asyncio
+import cProfile
+import json
+import pstats
+import time
+
+from pydantic import BaseModel, Field
+
+from src.agents.runtime.mcp_client import MCPClient
+from src.shared import serialization
+from src.mcp_servers.robot_gaoxian.mock_client import MockGaoxianClient
+from src.mcp_servers.robot_gaoxian.storage import (
+    CleaningIntensity,
+    CleaningMode,
+    InMemoryRobotStorage,
+    Location,
+    Robot,
+    RobotBrand,
+    RobotStatus,
+    RobotStatusSnapshot,
+    RobotType,
+)
+from src.mcp_servers.robot_gaoxian.tools import RobotTools, ToolResult
+
+BATCH_SIZE = 20
+
+
+# ============================================================
+# legacy 路径 (变更前的实现，作为对照)
+# ============================================================
+
+class LegacyStatusSnapshot(BaseModel):
+    """变更前的 pydantic 状态快照"""
+    robot_id: str
+    status: RobotStatus
+    current_location: Optional[Location] = None
+    battery_level: int = Field(..., ge=0, le=100)
+    water_level: Optional[int] = Field(None, ge=0, le=100)
+    dustbin_level: Optional[int] = Field(None, ge=0, le=100)
+    current_task_id: Optional[str] = None
+    current_zone_id: Optional[str] = None
+    task_progress: Optional[float] = None
+    speed: Optional[float] = None
+    cleaning_mode: Optional[CleaningMode] = None
+    cleaning_intensity: Optional[CleaningIntensity] = None
+    error_code: Optional[str] = None
+    error_message: Optional[str] = None
+    timestamp: datetime
+
+
+def legacy_snapshot_to_dict(snapshot: LegacyStatusSnapshot) -> dict:
+    return {
+        "robot_id": snapshot.robot_id,
+        "status": snapshot.status.value,
+        "current_location": {
+            "x": snapshot.current_location.x,
+            "y": snapshot.current_location.y,
+            "floor_id": snapshot.current_location.floor_id
+        } if snapshot.current_location else None,
+        "battery_level": snapshot.battery_level,
+        "water_level": snapshot.water_level,
+        "dustbin_level": snapshot.dustbin_level,
+        "current_task_id": snapshot.current_task_id,
+        "current_zone_id": snapshot.current_zone_id,
+        "task_progress": snapshot.task_progress,
+        "speed": snapshot.speed,
+        "cleaning_mode": snapshot.cleaning_mode.value if snapshot.cleaning_mode else None,
+        "cleaning_intensity": snapshot.cleaning_intensity.value if snapshot.cleaning_intensity else None,
+        "error_code": snapshot.error_code,
+        "error_message": snapshot.error_message,
+        "timestamp": snapshot.timestamp.isoformat()
+    }
+
+
+@dataclass
+class LegacyClientResult:
+    """变更前 MCPClient 的结果 (dataclass)"""
+    success: bool
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    error_code: Optional[str] = None
+
+
+class LegacyRobotTools:
+    """变更前 RobotTools.robot_batch_get_status 的调用链"""
+
+    def __init__(self, snapshots: Dict[str, LegacyStatusSnapshot]):
+        self._status_snapshots = snapshots
+
+    async def batch_get_status(self, robot_ids: List[str]) -> List[LegacyStatusSnapshot]:
+        return [
+            self._status_snapshots[rid]
+            for rid in robot_ids
+            if rid in self._status_snapshots
+        ]
+
+    async def handle(self, name: str, arguments: Dict[str, Any]) -> ToolResult:
+        snapshots = await self.batch_get_status(arguments.get("robot_ids", []))
+        return ToolResult(success=True, data={
+            "statuses": [legacy_snapshot_to_dict(s) for s in snapshots],
+            "count": len(snapshots)
+        })
+
+
+async def legacy_call_tool(handler: LegacyRobotTools, tool_name: str, arguments: dict) -> LegacyClientResult:
+    """变更前 MCPClient.call_tool: hasattr 探测后二次包装"""
+    result = await handler.handle(tool_name, arguments)
+    if hasattr(result, 'success'):
+        return LegacyClientResult(
+            success=result.success,
+            data=result.data if hasattr(result, 'data') else None,
+            error=result.error if hasattr(result, 'error') else None
+        )
+    return LegacyClientResult(success=True, data=result)
+
+
+async def legacy_sweep(handler: LegacyRobotTools, batches: List[List[str]]) -> int:
+    size = 0
+    for batch in batches:
+        result = await legacy_call_tool(handler, "robot_batch_get_status", {"robot_ids": batch})
+        # 变更前 server 边界编码: json.dumps(result.model_dump())
+        payload = ToolResult(success=result.success, data=result.data, error=result.error)
+        size += len(json.dumps(payload.model_dump(), ensure_ascii=False))
+    return size
+
+
+# ============================================================
+# fast 路径
+# ============================================================
+
+async def fast_sweep(client: MCPClient, batches: List[List[str]]) -> int:
+    size = 0
+    for batch in batches:
+        result = await client.call_tool("robot_batch_get_status", {"robot_ids": batch})
+        size += len(ToolResult(success=result.success, data=result.data).to_json())
+    return size
+
+
+# ============================================================
+# 数据准备
+# ============================================================
+
+def build_fleet(robots: int):
+    storage = InMemoryRobotStorage()
+    now = datetime.utcnow()
+    legacy = {}
+    for i in range(robots):
+        robot_id = f"bench_robot_{i:05d}"
+        working = i % 3 == 0
+        fields = dict(
+            robot_id=robot_id,
+            status=RobotStatus.WORKING if working else RobotStatus.IDLE,
+            current_location=Location(x=float(i % 50), y=float(i // 50), floor_id=f"floor_{i % 10}"),
+            battery_level=50 + i % 50,
+            water_level=60,
+            dustbin_level=30,
+            current_task_id=f"task_{i}" if working else None,
+            current_zone_id=f"zone_{i % 40}" if working else None,
+            task_progress=42.0 if working else None,
+            speed=0.5 if working else None,
+            cleaning_mode=CleaningMode.VACUUM if working else None,
+            cleaning_intensity=CleaningIntensity.STANDARD if working else None,
+            timestamp=now,
+        )
+        storage._robots[robot_id] = Robot(
+            robot_id=robot_id,
+            tenant_id="tenant_bench",
+            name=f"Bench Robot {i}",
+            brand=RobotBrand.GAOXIAN,
+            model="GS-50",
+            serial_number=f"SN{i:08d}",
+            robot_type=RobotType.CLEANING,
+            building_id=f"building_{i % 5}",
+            status=fields["status"],
+            registered_at=now,
+        )
+        storage._status_snapshots[robot_id] = RobotStatusSnapshot(**fields)
+        legacy[robot_id] = LegacyStatusSnapshot(**fields)
+
+    ids = [f"bench_robot_{i:05d}" for i in range(robots)]
+    batches = [ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
+    return storage, legacy, batches
+
+
+async def run(robots: int, rounds: int, profile: bool) -> dict:
+    storage, legacy, batches = build_fleet(robots)
+
+    client = MCPClient()
+    client._mcp_handlers["gaoxian"] = RobotTools(MockGaoxianClient(storage), storage)
+    client._connected = True
+
+    legacy_tools = LegacyRobotTools(legacy)
+
+    # 预热
+    await legacy_sweep(legacy_tools, batches)
+    await fast_sweep(client, batches)
+
+    profiler = cProfile.Profile() if profile else None
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        legacy_size = await legacy_sweep(legacy_tools, batches)
+    legacy_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    if profiler:
+        profiler.enable()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fast_size = await fast_sweep(client, batches)
+    fast_ms = (time.perf_counter() - start) * 1000 / rounds
+    if profiler:
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+    return {
+        "robots": robots,
+        "batches_per_sweep": len(batches),
+        "rounds": rounds,
+        "legacy_ms_per_sweep": round(legacy_ms, 3),
+        "fast_ms_per_sweep": round(fast_ms, 3),
+        "speedup": round(legacy_ms / fast_ms, 2) if fast_ms else None,
+        "legacy_bytes": legacy_size,
+        "fast_bytes": fast_size,
+        "encoder": "orjson" if serialization.orjson is not None else "json",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MCP status sweep benchmark")
+    parser.add_argument("--robots", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--profile", action="store_true", help="cProfile the fast path")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.robots, args.rounds, args.profile))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+MCP 传输基准
+============
+对比 robot_batch_get_status 在三种传输下的吞吐与延迟:
+
+- local: 进程内 handler (MCPClient 默认方式)
+- remote: 独立进程的高仙 MCP Server (JSON-RPC over HTTP)，keep-alive 连接池
+  + 同轮次请求合并
+- remote_unbatched: 同上但 max_batch_size=1，每个调用一个 HTTP 请求
+
+Server 以子进程启动 (src.mcp_servers.jsonrpc_http)，可用 --server-processes 启动多个
+Server 进程，客户端按 Server 轮询分配调用。结果缓存关闭，所有调用都经过传输层。
+
+用法 (在仓库根目录运行):
+    python -m bench.mcp_transport --calls 2000 --concurrency 1,16,64
+    python -m bench.mcp_transport --server-processes 2 --output mcp_transport.json
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from src.agents.runtime.mcp_client import MCPClient
+from src.agents.runtime.remote_transport import RemoteTransportConfig
+
+ROBOT_IDS = ["robot_001", "robot_002", "robot_003"]
+TOOL_NAME = "robot_batch_get_status"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩分位数 (输入需已排序)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(1, math.ceil(q * len(sorted_values))) - 1]
+
+
+def summarize(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "p50_ms": round(percentile(ordered, 0.50), 4),
+        "p95_ms": round(percentile(ordered, 0.95), 4),
+        "p99_ms": round(percentile(ordered, 0.99), 4),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_servers(count: int) -> List[tuple]:
+    """启动 count 个高仙 MCP Server 子进程，返回 [(process, url), ...]"""
+    servers = []
+    for _ in range(count):
+        port = _free_port()
+        env = {**os.environ, "GAOXIAN_USE_MOCK": "true", "METRICS_ENABLED": "false"}
+        process = subprocess.Popen(
+            [
+                sys.executable, "-m", "src.mcp_servers.jsonrpc_http",
+                "--server", "gaoxian", "--port", str(port),
+            ],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        servers.append((process, f"http://127.0.0.1:{port}"))
+    return servers
+
+
+async def wait_ready(urls: List[str], timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as http:
+        for url in urls:
+            while True:
+                try:
+                    if (await http.get(f"{url}/health")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"MCP server not ready: {url}")
+                await asyncio.sleep(0.1)
+
+
+async def make_clients(mode: str, urls: List[str]) -> List[MCPClient]:
+    if mode == "local":
+        clients = [MCPClient(cache_size=0)]
+    else:
+        config = RemoteTransportConfig(max_batch_size=1 if mode == "remote_unbatched" else 32)
+        clients = [
+            MCPClient({"gaoxian": url}, cache_size=0, remote_config=config)
+            for url in urls
+        ]
+    for client in clients:
+        await client.connect()
+    return clients
+
+
+async def run_level(clients: List[MCPClient], concurrency: int, calls: int) -> dict:
+    """以固定并发度执行 calls 次调用"""
+    latencies: List[float] = []
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    arguments = {"robot_ids": ROBOT_IDS}
+
+    async def one(i: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            result = await clients[i % len(clients)].call_tool(TOOL_NAME, arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if not result.success:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    wall_s = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "calls": calls,
+        "failures": failures,
+        "wall_s": round(wall_s, 3),
+        "throughput_per_s": round(calls / wall_s, 1) if wall_s else None,
+        "latency": summarize(latencies),
+    }
+
+
+async def run_mode(mode: str, urls: List[str], args: argparse.Namespace) -> dict:
+    clients = await make_clients(mode, urls)
+    try:
+        await run_level(clients, max(args.concurrency), args.warmup)
+        levels = [await run_level(clients, c, args.calls) for c in args.concurrency]
+        transport: Dict[str, dict] = {}
+        for i, client in enumerate(clients):
+            for name, stats in client.get_transport_stats().items():
+                transport[f"{name}#{i}"] = stats
+    finally:
+        for client in clients:
+            await client.disconnect()
+    return {"levels": levels, "transport": transport}
+
+
+async def run(args: argparse.Namespace, urls: List[str]) -> dict:
+    await wait_ready(urls)
+    modes = {}
+    for mode in ("local", "remote", "remote_unbatched"):
+        modes[mode] = await run_mode(mode, urls, args)
+    return {
+        "benchmark": "mcp_transport",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "tool": TOOL_NAME,
+            "robot_ids": len(ROBOT_IDS),
+            "calls": args.calls,
+            "warmup": args.warmup,
+            "server_processes": len(urls),
+        },
+        "modes": modes,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="MCP transport benchmark")
+    parser.add_argument("--calls", type=int, default=2000, help="每个并发度执行的调用次数")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 16, 64])
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--server-processes", type=int, default=1)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    args = parser.parse_args(argv)
+
+    # handler 按 INFO 输出每次调用，基准只保留告警以免干扰计时和 JSON 输出
+    logging.getLogger().setLevel(logging.WARNING)
+
+    servers = start_servers(args.server_processes)
+    try:
+        result = asyncio.run(run(args, [url for _, url in servers]))
+    finally:
+        for process, _ in servers:
+            process.terminate()
+            process.wait(timeout=10)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+调度决策流水线基准
+==================
+在进程内驱动 demo_server.simulate_scheduling 的完整流水线:
+K1 知识加载 → Prompt 组装 → Agent 决策 (LLM 桩) → A5 校验 → K2 规则评估
+→ B5 自主性检查 → K3 决策日志 → WebSocket 广播。
+
+可配置机器人、区域、规则、知识条目规模及并发度，输出每个阶段的
+p50/p95/p99 与吞吐量 (JSON)。指定 --baseline 时与上次结果对比各阶段 p95，
+超过 --max-regression (且超出 --noise-floor-ms) 时以非零状态码退出，可用于部署前回归检查。
+
+用法 (src 需在 PYTHONPATH 中):
+    PYTHONPATH=src python -m bench.pipeline --robots 20 --zones 40 --rules 200 \\
+        --knowledge 500 --concurrency 1,8,32 --output pipeline.json
+    PYTHONPATH=src python -m bench.pipeline --baseline pipeline.json
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import math
+import platform
+import sys
+import time
+
+import demo_server
+from autonomy.human_agent_boundary import HumanAgentBoundary
+from knowledge.decision_logger import DecisionLogger
+from knowledge.rule_engine import GovernanceRule, GovernanceRuleEngine
+from knowledge.scenario_kb import ScenarioKnowledge, ScenarioKnowledgeBase
+from knowledge.seed_data import load_tower_c_seed_data
+from validation.decision_validator import DecisionValidator
+
+TOTAL_STAGE = "total"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """最近秩分位数 (输入需已排序)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(values: List[float]) -> dict:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 4) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 4),
+        "p95_ms": round(percentile(ordered, 0.95), 4),
+        "p99_ms": round(percentile(ordered, 0.99), 4),
+        "max_ms": round(ordered[-1], 4) if ordered else 0.0,
+    }
+
+
+def make_zones(count: int) -> List[str]:
+    """保留演示区域，不足部分按楼层补齐"""
+    zones = list(demo_server.DEMO_ZONES[:count])
+    i = 0
+    while len(zones) < count:
+        zones.append(f"{i % 45 + 1}F-zone-{i:04d}")
+        i += 1
+    return zones
+
+
+def make_knowledge(index: int) -> ScenarioKnowledge:
+    """合成知识条目；每 4 条中有 1 条带时段约束"""
+    time_ranges = [{"start": "22:00", "end": "06:00"}] if index % 4 == 0 else []
+    return ScenarioKnowledge(
+        knowledge_id=f"sk-bench-{index:05d}",
+        knowledge_type="domain_fact" if index % 2 else "scenario_rule",
+        scenario_category="cleaning",
+        name=f"合成知识 {index}",
+        description="bench.pipeline 合成数据",
+        tags=["bench"],
+        applicable_building_types=["office_tower"],
+        applicable_time_ranges=time_ranges,
+        content={"fact": f"区域 {index % 45 + 1}F 的清洁注意事项 #{index}"},
+        priority=index % 100,
+    )
+
+
+def make_rule(index: int) -> GovernanceRule:
+    """合成治理规则，条件字段与流水线评估上下文一致"""
+    if index % 3 == 0:
+        condition = {"field": "robot_status", "operator": "==", "value": "offline"}
+    else:
+        condition = {
+            "and": [
+                {"field": "battery_level", "operator": "<", "value": index % 40},
+                {"field": "task_type", "operator": "==", "value": "standard"},
+            ]
+        }
+    return GovernanceRule(
+        rule_id=f"gr-bench-{index:05d}",
+        rule_name=f"合成规则 {index}",
+        priority=index % 100,
+        condition=condition,
+        action_type="log" if index % 2 else "warn",
+        action_config={"message": f"合成规则 {index} 触发"},
+    )
+
+
+async def setup(zones: int, rules: int, knowledge: int) -> dict:
+    """替换 demo_server 的全局服务为指定规模的新实例"""
+    kb = ScenarioKnowledgeBase()
+    seeded = await load_tower_c_seed_data(kb)
+    for i in range(max(knowledge - seeded["knowledge_loaded"], 0)):
+        await kb.create_knowledge(make_knowledge(i))
+
+    engine = GovernanceRuleEngine()
+    seed_rules = await engine.load_tower_c_seed_rules()
+    for i in range(max(rules - seed_rules, 0)):
+        await engine.create_rule(make_rule(i))
+
+    boundary = HumanAgentBoundary()
+    await boundary.load_tower_c_defaults()
+
+    demo_server.kb = kb
+    demo_server.engine = engine
+    demo_server.boundary = boundary
+    demo_server.validator = DecisionValidator()
+    demo_server.decision_logger = DecisionLogger()
+    demo_server.ws_connections = []
+    demo_server.DEMO_ZONES = make_zones(zones)
+
+    return {
+        "knowledge": len(kb._knowledge),
+        "rules": len(engine._rules),
+        "zones": len(demo_server.DEMO_ZONES),
+    }
+
+
+async def run_level(robots: int, concurrency: int, pipelines: int, warmup: int) -> dict:
+    """以固定并发度执行 pipelines 次流水线"""
+    for _ in range(warmup):
+        await demo_server.simulate_scheduling(robot_count=robots, include_low_battery=True)
+
+    stages: Dict[str, List[float]] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            report = await demo_server.simulate_scheduling(
+                robot_count=robots, include_low_battery=True
+            )
+            stages.setdefault(TOTAL_STAGE, []).append((time.perf_counter() - start) * 1000)
+            for step in report["pipeline_steps"]:
+                stages.setdefault(step["step"], []).append(step["duration_ms"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(pipelines)))
+    wall_s = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "pipelines": pipelines,
+        "wall_s": round(wall_s, 3),
+        "throughput_per_s": round(pipelines / wall_s, 1) if wall_s else None,
+        "stages": {name: summarize(values) for name, values in stages.items()},
+    }
+
+
+def compare(result: dict, baseline: dict) -> List[dict]:
+    """按并发度、阶段对比 p95，返回 ratio = 当前 / 基线"""
+    base_levels = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    deltas = []
+    for level in result["levels"]:
+        base = base_levels.get(level["concurrency"])
+        if base is None:
+            continue
+        for name, stats in level["stages"].items():
+            base_stats = base["stages"].get(name)
+            if not base_stats or not base_stats["p95_ms"]:
+                continue
+            deltas.append({
+                "concurrency": level["concurrency"],
+                "stage": name,
+                "baseline_p95_ms": base_stats["p95_ms"],
+                "p95_ms": stats["p95_ms"],
+                "ratio": round(stats["p95_ms"] / base_stats["p95_ms"], 3),
+            })
+    return deltas
+
+
+async def run(args: argparse.Namespace) -> dict:
+    sizes = await setup(args.zones, args.rules, args.knowledge)
+    levels = [
+        await run_level(args.robots, concurrency, args.pipelines, args.warmup)
+        for concurrency in args.concurrency
+    ]
+    return {
+        "benchmark": "pipeline",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "robots": args.robots,
+            "pipelines": args.pipelines,
+            "warmup": args.warmup,
+            **sizes,
+        },
+        "levels": levels,
+    }
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Decision pipeline benchmark")
+    parser.add_argument("--robots", type=int, default=20)
+    parser.add_argument("--zones", type=int, default=40)
+    parser.add_argument("--rules", type=int, default=100)
+    parser.add_argument("--knowledge", type=int, default=200)
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8])
+    parser.add_argument("--pipelines", type=int, default=200, help="每个并发度执行的流水线次数")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--output", help="结果 JSON 写入路径")
+    parser.add_argument("--baseline", help="对比的基线结果 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="p95 相对基线允许的最大增幅")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.5,
+                        help="p95 绝对增量低于该值时不视为回归")
+    args = parser.parse_args(argv)
+
+    # 演示服务按 INFO 输出日志，基准只保留告警以免干扰计时和 JSON 输出
+    logging.getLogger().setLevel(logging.WARNING)
+
+    result = asyncio.run(run(args))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            deltas = compare(result, json.load(f))
+        regressions = [
+            d for d in deltas
+            if d["ratio"] > 1 + args.max_regression
+            and d["p95_ms"] - d["baseline_p95_ms"] > args.noise_floor_ms
+        ]
+        result["baseline"] = {
+            "path": args.baseline,
+            "max_regression": args.max_regression,
+            "deltas": deltas,
+            "regressions": regressions,
+        }
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
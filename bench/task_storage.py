@@ -0,0 +1,146 @@
+"""
+任务存储索引基准
+================
+对比 InMemoryTaskStorage 的索引查询与变更前的全量扫描:
+- get_pending_tasks 前 K 个 (调度器每个周期调用)
+- list_tasks 按状态 / 日期范围
+
+用法:
+    python -m bench.task_storage --tasks 1000000
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from src.mcp_servers.task_manager.storage import (
+    CleaningTask,
+    InMemoryTaskStorage,
+    TaskStatus,
+    TaskType,
+)
+
+TENANT = "tenant_bench"
+STATUSES = [
+    TaskStatus.PENDING, TaskStatus.COMPLETED, TaskStatus.COMPLETED,
+    TaskStatus.COMPLETED, TaskStatus.ASSIGNED, TaskStatus.FAILED,
+]
+
+
+# ============================================================
+# 变更前的全量扫描实现 (排序修正为先过滤后排序，保证结果可比)
+# ============================================================
+
+def scan_pending(tasks: dict, max_count: int) -> List[CleaningTask]:
+    result = [
+        t for t in tasks.values()
+        if t.tenant_id == TENANT and t.status == TaskStatus.PENDING
+    ]
+    result.sort(key=lambda t: (t.priority, t.scheduled_start or datetime.max, t.created_at))
+    return result[:max_count]
+
+
+def scan_list(tasks: dict, status=None, date_from=None, date_to=None, limit=50):
+    result = []
+    for task in tasks.values():
+        if task.tenant_id != TENANT:
+            continue
+        if status and task.status.value != status:
+            continue
+        if date_from and task.created_at.date() < date_from:
+            continue
+        if date_to and task.created_at.date() > date_to:
+            continue
+        result.append(task)
+    result.sort(key=lambda t: (t.priority, t.created_at))
+    return result[:limit], len(result)
+
+
+def build_tasks(count: int) -> List[CleaningTask]:
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    tasks = []
+    for i in range(count):
+        created = start + timedelta(seconds=i * 30)
+        tasks.append(CleaningTask.model_construct(
+            task_id=f"task_{i:08d}",
+            tenant_id=TENANT,
+            zone_id=f"zone_{i % 500}",
+            task_type=TaskType.ROUTINE,
+            status=STATUSES[i % len(STATUSES)],
+            priority=rng.randint(1, 10),
+            scheduled_start=created + timedelta(hours=rng.randint(0, 48)),
+            created_at=created,
+            updated_at=created,
+            assigned_robot_id=None,
+        ))
+    return tasks
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+async def run(count: int, repeat: int) -> dict:
+    tasks = build_tasks(count)
+
+    storage = InMemoryTaskStorage()
+    start = time.perf_counter()
+    await storage.save_tasks(tasks)
+    index_build_s = time.perf_counter() - start
+
+    raw = storage._tasks
+    mid = tasks[len(tasks) // 2].created_at.date()
+
+    async def indexed_ms(coro_fn) -> float:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await coro_fn()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    indexed_pending = await storage.get_pending_tasks(TENANT, max_count=20)
+    assert [t.task_id for t in indexed_pending] == [t.task_id for t in scan_pending(raw, 20)]
+
+    results = {
+        "tasks": count,
+        "index_build_s": round(index_build_s, 2),
+        "pending_top20": {
+            "scan_ms": round(timed(lambda: scan_pending(raw, 20), repeat), 3),
+            "indexed_ms": round(await indexed_ms(
+                lambda: storage.get_pending_tasks(TENANT, max_count=20)), 3),
+        },
+        "list_by_status_failed": {
+            "scan_ms": round(timed(lambda: scan_list(raw, status="failed"), repeat), 3),
+            "indexed_ms": round(await indexed_ms(
+                lambda: storage.list_tasks(TENANT, status="failed")), 3),
+        },
+        "list_one_day": {
+            "scan_ms": round(timed(lambda: scan_list(raw, date_from=mid, date_to=mid), repeat), 3),
+            "indexed_ms": round(await indexed_ms(
+                lambda: storage.list_tasks(TENANT, date_from=mid, date_to=mid)), 3),
+        },
+    }
+    for key in ("pending_top20", "list_by_status_failed", "list_one_day"):
+        entry = results[key]
+        entry["speedup"] = round(entry["scan_ms"] / entry["indexed_ms"], 1) if entry["indexed_ms"] else None
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Task storage index benchmark")
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.tasks, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+时序数据保留基准
+================
+默认 (内存后端): 模拟持续写入 + 按小时执行保留，对比
+- rebuild: 原实现，每次按截止时间过滤重建整个列表
+- segments: InMemoryTimeSeriesService 按时间分段，drop_chunks 整段丢弃
+
+指定 --dsn 时连接 TimescaleDB (会重建 robot_status 表)，测量:
+- 压缩前后的存储占用 (hypertable_size)
+- 压缩前后的范围查询 / 聚合延迟
+- 删除一天数据: DELETE vs drop_chunks
+
+用法:
+    python -m bench.timeseries_retention --rows-per-hour 20000 --hours 96
+    python -m bench.timeseries_retention --dsn postgresql://... --days 30 --rows-per-day 200000
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from src.data.storage.timeseries import InMemoryTimeSeriesService, PostgresTimeSeriesService
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+ROBOTS = 50
+
+
+# ============================================================
+# 内存后端
+# ============================================================
+
+def _hour_rows(hour: int, rows: int) -> List[dict]:
+    step = 3600 / rows
+    start = BASE + timedelta(hours=hour)
+    return [
+        {
+            "timestamp": start + timedelta(seconds=i * step),
+            "robot_id": f"robot_{i % ROBOTS:03d}",
+            "tenant_id": "tenant_bench",
+            "battery_level": 80,
+        }
+        for i in range(rows)
+    ]
+
+
+async def run_memory(args: argparse.Namespace) -> dict:
+    service = InMemoryTimeSeriesService(segment_seconds=3600)
+    rebuild: List[dict] = []
+    rebuild_s = segments_s = 0.0
+    rebuild_removed = segments_removed = 0
+
+    for hour in range(args.hours):
+        rows = _hour_rows(hour, args.rows_per_hour)
+        rebuild.extend(dict(r, time=r["timestamp"]) for r in rows)
+        await service.insert("robot_status", rows)
+
+        cutoff = BASE + timedelta(hours=hour + 1 - args.retention_hours)
+
+        start = time.perf_counter()
+        before = len(rebuild)
+        rebuild = [r for r in rebuild if r["time"] >= cutoff]
+        rebuild_removed += before - len(rebuild)
+        rebuild_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        segments_removed += await service.drop_chunks("robot_status", cutoff)
+        segments_s += time.perf_counter() - start
+
+    assert rebuild_removed == segments_removed
+    return {
+        "backend": "memory",
+        "config": {
+            "rows_per_hour": args.rows_per_hour,
+            "hours": args.hours,
+            "retention_hours": args.retention_hours,
+        },
+        "expired_rows": segments_removed,
+        "rebuild_ms": round(rebuild_s * 1000, 2),
+        "segments_ms": round(segments_s * 1000, 3),
+        "speedup": round(rebuild_s / segments_s, 1) if segments_s else None,
+    }
+
+
+# ============================================================
+# TimescaleDB
+# ============================================================
+
+async def _timed(conn, query: str, *params, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await conn.fetch(query, *params)
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+async def _queries(conn, end: datetime) -> dict:
+    recent = await _timed(
+        conn,
+        "SELECT * FROM robot_status WHERE robot_id = $1 AND time >= $2 ORDER BY time DESC LIMIT 500",
+        "robot_001", end - timedelta(hours=6),
+    )
+    old_range = await _timed(
+        conn,
+        "SELECT * FROM robot_status WHERE robot_id = $1 AND time BETWEEN $2 AND $3",
+        "robot_001", BASE + timedelta(days=2), BASE + timedelta(days=3),
+    )
+    aggregate = await _timed(
+        conn,
+        "SELECT time_bucket('1 hour', time) AS bucket, avg(battery_level) FROM robot_status "
+        "WHERE time BETWEEN $1 AND $2 GROUP BY bucket",
+        BASE, BASE + timedelta(days=7),
+    )
+    return {"recent_ms": recent, "old_range_ms": old_range, "aggregate_7d_ms": aggregate}
+
+
+async def run_timescale(args: argparse.Namespace) -> dict:
+    import asyncpg
+
+    from bench.event_logging import PostgresDatabase
+
+    pool = await asyncpg.create_pool(args.dsn, min_size=1, max_size=2)
+    db = PostgresDatabase(pool)
+    service = PostgresTimeSeriesService(db)
+    end = BASE + timedelta(days=args.days)
+    step = 86400 / args.rows_per_day
+
+    try:
+        async with db.connection() as conn:
+            await conn.execute("""
+                DROP TABLE IF EXISTS robot_status;
+                CREATE TABLE robot_status (
+                    time TIMESTAMPTZ NOT NULL, robot_id TEXT NOT NULL, tenant_id TEXT NOT NULL,
+                    status TEXT, battery_level INT, position_x DOUBLE PRECISION,
+                    position_y DOUBLE PRECISION
+                );
+            """)
+            await conn.execute(
+                "SELECT create_hypertable('robot_status', 'time', chunk_time_interval => interval '1 day')"
+            )
+            await conn.execute(f"""
+                INSERT INTO robot_status
+                SELECT $1::timestamptz + (x * {step}) * interval '1 second',
+                       'robot_' || lpad((x % {ROBOTS})::text, 3, '0'), 'tenant_bench',
+                       'working', 50 + x % 50, random() * 100, random() * 100
+                FROM generate_series(0, {args.days * args.rows_per_day - 1}) AS x
+            """, BASE)
+            await conn.execute("CREATE INDEX ON robot_status (robot_id, time DESC)")
+            await conn.execute("ANALYZE robot_status")
+
+            size_before = await conn.fetchval("SELECT hypertable_size('robot_status')")
+            uncompressed = await _queries(conn, end)
+
+        await service.enable_compression("robot_status", timedelta(days=1), ["tenant_id", "robot_id"])
+        async with db.connection() as conn:
+            await conn.execute(
+                "SELECT compress_chunk(c, if_not_compressed => true) "
+                "FROM show_chunks('robot_status', older_than => $1) AS c",
+                end - timedelta(days=1),
+            )
+            await conn.execute("ANALYZE robot_status")
+            size_after = await conn.fetchval("SELECT hypertable_size('robot_status')")
+            compressed = await _queries(conn, end)
+
+        # 删除最旧的两天: 一天 DELETE (带过滤条件强制走 DELETE)，一天 drop_chunks
+        start = time.perf_counter()
+        deleted = await service.delete_range(
+            "robot_status", BASE, BASE + timedelta(days=1) - timedelta(microseconds=1),
+            {"tenant_id": "tenant_bench"},
+        )
+        delete_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        await service.drop_chunks("robot_status", BASE + timedelta(days=2))
+        drop_ms = (time.perf_counter() - start) * 1000
+    finally:
+        await db.close()
+
+    return {
+        "backend": "timescaledb",
+        "config": {"days": args.days, "rows_per_day": args.rows_per_day},
+        "size_bytes": {"uncompressed": size_before, "compressed": size_after},
+        "compression_ratio": round(size_before / size_after, 1) if size_after else None,
+        "queries": {"uncompressed": uncompressed, "compressed": compressed},
+        "delete_one_day": {"delete_ms": round(delete_ms, 1), "rows": deleted,
+                           "drop_chunks_ms": round(drop_ms, 1)},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time-series retention benchmark")
+    parser.add_argument("--rows-per-hour", type=int, default=20000)
+    parser.add_argument("--hours", type=int, default=96)
+    parser.add_argument("--retention-hours", type=int, default=24)
+    parser.add_argument("--dsn", help="TimescaleDB DSN (不指定时测内存后端)")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--rows-per-day", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    runner = run_timescale if args.dsn else run_memory
+    print(json.dumps(asyncio.run(runner(args)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+区域定位基准
+============
+对比把机器人位置映射到区域的吞吐:
+- scan: 逐个区域做点在多边形内判断 (无索引，抽样计时后外推)
+- index: ZoneSpatialIndex 均匀网格，按楼层批量向量化查询
+
+区域为随机凸多边形，按 --floors 个楼层平均分配 (默认共 10k 个区域)。
+
+用法:
+    python -m bench.zone_lookup --zones 10000 --floors 1 --lookups 1000000
+    python -m bench.zone_lookup --zones 10000 --floors 100
+"""
+
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from src.shared.spatial import ZoneSpatialIndex, polygon_points
+
+ZONE_SIZE = 10.0   # 每个区域所占网格边长 (米)
+
+
+def _floor_zones(rng: np.random.Generator, count: int, prefix: str) -> List[Tuple[str, dict]]:
+    """count 个随机凸多边形，排成近似方形的网格"""
+    columns = math.ceil(math.sqrt(count))
+    zones = []
+    for i in range(count):
+        cx = (i % columns + 0.5) * ZONE_SIZE
+        cy = (i // columns + 0.5) * ZONE_SIZE
+        n = int(rng.integers(4, 9))
+        angles = np.sort(rng.uniform(0, 2 * math.pi, n))
+        radius = rng.uniform(0.35, 0.5) * ZONE_SIZE
+        coordinates = [[cx + radius * math.cos(a), cy + radius * math.sin(a)] for a in angles]
+        zones.append((f"{prefix}_zone_{i:05d}", {"type": "polygon", "coordinates": coordinates}))
+    return zones
+
+
+def _scan(zones: List[Tuple[str, dict]], x: float, y: float) -> Optional[str]:
+    for zone_id, boundary in zones:
+        points = polygon_points(boundary)
+        inside = False
+        for (xi, yi), (xj, yj) in zip(points, points[-1:] + points[:-1]):
+            if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+                inside = not inside
+        if inside:
+            return zone_id
+    return None
+
+
+def run(args: argparse.Namespace) -> dict:
+    rng = np.random.default_rng(args.seed)
+    per_floor = math.ceil(args.zones / args.floors)
+    floors: Dict[str, List[Tuple[str, dict]]] = {
+        f"floor_{f:03d}": _floor_zones(rng, per_floor, f"floor_{f:03d}") for f in range(args.floors)
+    }
+    extent = math.ceil(math.sqrt(per_floor)) * ZONE_SIZE
+
+    # 位置均匀分布在各楼层 (含区域之间的空隙)
+    per_floor_lookups = max(1, args.lookups // args.floors)
+    positions = {
+        floor_id: (rng.uniform(0, extent, per_floor_lookups), rng.uniform(0, extent, per_floor_lookups))
+        for floor_id in floors
+    }
+
+    index = ZoneSpatialIndex(lambda floor_id: floors[floor_id], cell_size=args.cell_size)
+    start = time.perf_counter()
+    for floor_id in floors:
+        index.floor(floor_id)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    located = 0
+    for floor_id, (xs, ys) in positions.items():
+        ids = index.locate_many(floor_id, xs, ys)
+        located += sum(1 for z in ids if z is not None)
+    index_seconds = time.perf_counter() - start
+    total = per_floor_lookups * args.floors
+
+    # 无索引线性扫描: 抽样后外推
+    floor_id = next(iter(floors))
+    xs, ys = positions[floor_id]
+    sample = min(args.scan_sample, xs.size)
+    start = time.perf_counter()
+    mismatches = 0
+    expected = index.locate_many(floor_id, xs[:sample], ys[:sample])
+    for i in range(sample):
+        if _scan(floors[floor_id], xs[i], ys[i]) != expected[i]:
+            mismatches += 1
+    scan_per_lookup = (time.perf_counter() - start) / sample
+
+    stats = [index.floor(f).get_stats() for f in floors]
+    return {
+        "benchmark": "zone_lookup",
+        "config": {
+            "zones": per_floor * args.floors, "floors": args.floors, "lookups": total,
+            "cell_size": args.cell_size,
+        },
+        "index": {
+            "build_seconds": round(build_seconds, 2),
+            "lookups_per_second": round(total / index_seconds),
+            "hit_rate": round(located / total, 3),
+            "grid_cells": sum(s["cells"] for s in stats),
+            "boundary_cells": sum(s["boundary_cells"] for s in stats),
+        },
+        "scan": {
+            "lookups_per_second": round(1 / scan_per_lookup),
+            "sampled": sample,
+            "mismatches": mismatches,
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Zone lookup spatial index benchmark")
+    parser.add_argument("--zones", type=int, default=10000, help="区域总数")
+    parser.add_argument("--floors", type=int, default=1)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--cell-size", type=float, default=0.5)
+    parser.add_argument("--scan-sample", type=int, default=200, help="线性扫描抽样的位置数")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
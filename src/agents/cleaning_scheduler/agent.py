@@ -14,6 +14,7 @@ from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 import logging
+import math
 
 from src.agents.runtime.base import BaseAgent, AgentConfig, AutonomyLevel
 from src.agents.runtime.decision import Decision, DecisionResult
@@ -63,10 +64,21 @@ class PriorityBasedStrategy(SchedulingStrategy):
     考虑因素：
     1. 任务优先级 (1-10, 1最高)
     2. 机器人电量
-    3. 机器人位置（同楼层优先）
+    3. 机器人位置（有行程代价时按到达时间评分，否则同区域 > 同楼层 > 跨楼层）
     4. 机器人能力匹配
     """
 
+    # 行程为该秒数时位置分数减半
+    TRAVEL_HALF_SCORE_SECONDS = 120.0
+
+    def __init__(self, travel_costs=None):
+        """
+        Args:
+            travel_costs: 区域间行程代价 (TravelCostService 或提供 cost(zone_a, zone_b) 的对象)，
+                查不到时退回同楼层判断
+        """
+        self.travel_costs = travel_costs
+
     def match(
         self,
         task: Dict[str, Any],
@@ -110,9 +122,14 @@ class PriorityBasedStrategy(SchedulingStrategy):
                 reasons.append(f"电量不足({battery}%)")
 
             # 2. 位置分数 (最高30分)
+            travel = self._travel_seconds(robot_zone, task_zone)
             if robot_zone == task_zone:
                 score += 30
                 reasons.append("同区域")
+            elif travel is not None:
+                half = self.TRAVEL_HALF_SCORE_SECONDS
+                score += 30 * half / (half + travel)
+                reasons.append(f"行程约{travel / 60:.1f}分钟" if math.isfinite(travel) else "不可达")
             elif self._same_floor(robot_zone, task_zone, context):
                 score += 20
                 reasons.append("同楼层")
@@ -151,6 +168,12 @@ class PriorityBasedStrategy(SchedulingStrategy):
 
         return None
 
+    def _travel_seconds(self, zone1: Optional[str], zone2: Optional[str]) -> Optional[float]:
+        """两个区域间的行程秒数 (没有行程代价或区域未知时为 None)"""
+        if self.travel_costs is None or not zone1 or not zone2:
+            return None
+        return self.travel_costs.cost(zone1, zone2)
+
     def _same_floor(
         self,
         zone1: str,
@@ -198,7 +221,8 @@ class CleaningSchedulerAgent(BaseAgent):
         task_tools=None,
         robot_tools=None,
         space_tools=None,
-        strategy: Optional[SchedulingStrategy] = None
+        strategy: Optional[SchedulingStrategy] = None,
+        travel_costs=None
     ):
         """
         初始化清洁调度Agent
@@ -209,6 +233,7 @@ class CleaningSchedulerAgent(BaseAgent):
             robot_tools: 机器人控制MCP工具
             space_tools: 空间管理MCP工具
             strategy: 调度策略（默认使用优先级策略）
+            travel_costs: 区域间行程代价服务，传给默认的优先级策略
         """
         if config is None:
             config = AgentConfig(
@@ -223,7 +248,7 @@ class CleaningSchedulerAgent(BaseAgent):
         self.task_tools = task_tools
         self.robot_tools = robot_tools
         self.space_tools = space_tools
-        self.strategy = strategy or PriorityBasedStrategy()
+        self.strategy = strategy or PriorityBasedStrategy(travel_costs)
 
         # 统计信息
         self._stats = {
@@ -87,7 +87,8 @@ class ConversationAgent(BaseAgent):
         return self.sessions[request.session_id]
 
     def _build_messages(self, session: ConversationSession) -> List[Message]:
-        messages = [Message(role="system", content=self.conv_config.system_prompt)]
+        # system prompt 固定不变，标记缓存断点以复用前缀
+        messages = [Message(role="system", content=self.conv_config.system_prompt, cache_control=True)]
         for turn in session.turns[-self.conv_config.max_history_turns:]:
             messages.append(Message(role=turn.role, content=turn.content))
         return messages
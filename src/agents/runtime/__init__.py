@@ -13,6 +13,12 @@ from src.agents.runtime.base import (
 from src.agents.runtime.manager import AgentManager
 from src.agents.runtime.decision import Decision, DecisionResult
 from src.agents.runtime.mcp_client import MCPClient, ToolResult
+from src.agents.runtime.tool_cache import ToolCachePolicy, ToolResultCache
+from src.agents.runtime.remote_transport import (
+    CircuitBreaker,
+    RemoteMCPTransport,
+    RemoteTransportConfig,
+)
 from src.agents.runtime.escalation import (
     EscalationHandler,
     EscalationLevel,
@@ -20,6 +26,8 @@ from src.agents.runtime.escalation import (
     EscalationRule,
 )
 from src.agents.runtime.activity import ActivityLogger, AgentActivity
+from src.agents.runtime.activity_sinks import JsonlActivitySink, PostgresActivitySink
+from src.agents.runtime.scheduler import AgentScheduler, LatencyHistogram, shard_for
 from src.agents.runtime.runtime import AgentRuntime
 
 __all__ = [
@@ -36,6 +44,11 @@ __all__ = [
     # MCP Client
     "MCPClient",
     "ToolResult",
+    "ToolCachePolicy",
+    "ToolResultCache",
+    "RemoteMCPTransport",
+    "RemoteTransportConfig",
+    "CircuitBreaker",
     # Escalation
     "EscalationHandler",
     "EscalationLevel",
@@ -44,6 +57,12 @@ __all__ = [
     # Activity
     "ActivityLogger",
     "AgentActivity",
+    "JsonlActivitySink",
+    "PostgresActivitySink",
+    # Scheduler
+    "AgentScheduler",
+    "LatencyHistogram",
+    "shard_for",
     # Runtime
     "AgentRuntime",
 ]
@@ -4,9 +4,10 @@ A1: 活动日志系统
 记录 Agent 的所有活动，用于追踪和审计
 """
 
+from collections import Counter, deque
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Any
 import uuid
 import logging
 import asyncio
@@ -59,23 +60,53 @@ class ActivityLogger:
     """
     活动日志记录器
 
-    带缓冲的异步日志记录，定期刷新到存储
+    两级存储:
+    - 内存层: 有界环形缓冲 + 按 Agent / 租户索引，按数量和时间保留
+    - 持久层: 可插拔 sink (需实现 save_activities)，批量、单飞刷新
     """
 
-    def __init__(self, storage=None, buffer_size: int = 100, flush_interval: int = 30):
+    def __init__(
+        self,
+        storage=None,
+        buffer_size: int = 100,
+        flush_interval: int = 30,
+        max_in_memory: int = 10000,
+        retention_seconds: Optional[int] = None,
+        max_buffered: Optional[int] = None
+    ):
         """
         初始化活动记录器
 
         Args:
-            storage: 存储服务 (可选)
-            buffer_size: 缓冲区大小
+            storage: 存储 sink (可选，需实现 save_activities，
+                     实现 query_activities 时查询走存储)
+            buffer_size: 缓冲区大小 (达到时触发刷新，也是单批写入条数)
             flush_interval: 刷新间隔 (秒)
+            max_in_memory: 内存层最多保留的活动条数
+            retention_seconds: 内存层保留时长 (None 表示只按条数)
+            max_buffered: 待写入缓冲上限，sink 持续失败时丢弃最旧记录
         """
         self.storage = storage
         self.buffer_size = buffer_size
         self.flush_interval = flush_interval
-        self._buffer: List[AgentActivity] = []
-        self._all_activities: List[AgentActivity] = []  # 内存存储
+        self.max_in_memory = max_in_memory
+        self.retention_seconds = retention_seconds
+        self.max_buffered = max_buffered or buffer_size * 10
+
+        self._buffer: Deque[AgentActivity] = deque()
+        self._all_activities: Deque[AgentActivity] = deque()  # 内存层 (按写入顺序)
+        self._by_agent: Dict[str, Deque[AgentActivity]] = {}
+        self._by_tenant: Dict[str, Deque[AgentActivity]] = {}
+
+        self._total = 0
+        self._by_type: Counter = Counter()
+        self._dropped = 0
+        self._evicted = 0
+        self._flushed = 0
+        self._flush_failures = 0
+
+        self._flush_lock = asyncio.Lock()
+        self._pending_flush: Optional[asyncio.Task] = None
         self._flush_task: Optional[asyncio.Task] = None
         self._running = False
 
@@ -94,6 +125,8 @@ class ActivityLogger:
                 await self._flush_task
             except asyncio.CancelledError:
                 pass
+        if self._pending_flush:
+            await asyncio.gather(self._pending_flush, return_exceptions=True)
         await self._flush()
         logger.info("Activity logger stopped")
 
@@ -104,17 +137,69 @@ class ActivityLogger:
         Args:
             activity: 活动记录
         """
-        self._buffer.append(activity)
-        self._all_activities.append(activity)  # 同时保存到内存
+        self._remember(activity)
 
+        self._buffer.append(activity)
+        if len(self._buffer) > self.max_buffered:
+            self._buffer.popleft()
+            self._count_discarded(1)
         if len(self._buffer) >= self.buffer_size:
-            asyncio.create_task(self._flush())
+            self._schedule_flush()
 
         logger.debug(
             f"Activity logged: {activity.activity_type} - {activity.agent_id}",
             extra={"activity_id": activity.activity_id}
         )
 
+    async def log_async(self, activity: AgentActivity) -> None:
+        """
+        记录活动，缓冲已满时等待刷新完成 (背压)
+
+        Args:
+            activity: 活动记录
+        """
+        while self.storage and len(self._buffer) >= self.max_buffered and self._running:
+            self._schedule_flush()
+            await self._pending_flush
+            if len(self._buffer) >= self.max_buffered:
+                # sink 不可用，退化为丢弃最旧记录
+                break
+        self.log(activity)
+
+    def _remember(self, activity: AgentActivity) -> None:
+        """写入内存层并维护索引和计数"""
+        self._total += 1
+        self._by_type[activity.activity_type] += 1
+
+        self._all_activities.append(activity)
+        self._by_agent.setdefault(activity.agent_id, deque()).append(activity)
+        self._by_tenant.setdefault(activity.tenant_id, deque()).append(activity)
+
+        while len(self._all_activities) > self.max_in_memory:
+            self._evict_oldest()
+        self._apply_retention()
+
+    def _evict_oldest(self) -> None:
+        """移除最旧的活动 (各索引也按写入顺序，最旧的一定在队首)"""
+        oldest = self._all_activities.popleft()
+        for index, key in (
+            (self._by_agent, oldest.agent_id),
+            (self._by_tenant, oldest.tenant_id),
+        ):
+            bucket = index.get(key)
+            if bucket:
+                bucket.popleft()
+                if not bucket:
+                    del index[key]
+
+    def _apply_retention(self) -> None:
+        """按保留时长清理内存层"""
+        if not self.retention_seconds:
+            return
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        while self._all_activities and self._all_activities[0].timestamp < cutoff:
+            self._evict_oldest()
+
     def log_tool_call(
         self,
         agent_id: str,
@@ -168,22 +253,53 @@ class ActivityLogger:
             metadata={"old_state": old_state, "new_state": new_state}
         ))
 
+    def _schedule_flush(self) -> None:
+        """触发后台刷新 (同一时间最多一个)"""
+        if self._pending_flush and not self._pending_flush.done():
+            return
+        try:
+            self._pending_flush = asyncio.get_running_loop().create_task(self._flush())
+        except RuntimeError:
+            # 无事件循环 (同步调用场景)，等待定时刷新
+            pass
+
     async def _flush(self) -> None:
-        """刷新缓冲区到存储"""
-        if not self._buffer:
+        """分批刷新缓冲区到存储"""
+        if not self.storage:
+            self._count_discarded(len(self._buffer))
+            self._buffer.clear()
             return
 
-        activities = self._buffer.copy()
-        self._buffer.clear()
+        async with self._flush_lock:
+            while self._buffer:
+                batch = [
+                    self._buffer.popleft()
+                    for _ in range(min(self.buffer_size, len(self._buffer)))
+                ]
+                try:
+                    await self.storage.save_activities(batch)
+                    self._flushed += len(batch)
+                    logger.debug(f"Flushed {len(batch)} activities to storage")
+                except Exception as e:
+                    self._flush_failures += 1
+                    logger.error(f"Failed to flush activities: {e}")
+                    # 重新放回缓冲区头部，超出上限的最旧记录丢弃
+                    self._buffer.extendleft(reversed(batch))
+                    while len(self._buffer) > self.max_buffered:
+                        self._buffer.popleft()
+                        self._dropped += 1
+                    break
+
+    def _count_discarded(self, count: int) -> None:
+        """
+        记录移出缓冲区但未写入的条数
 
+        无存储时缓冲区本就不会落盘，计为 evicted；有存储时才是丢失，计为 dropped。
+        """
         if self.storage:
-            try:
-                await self.storage.save_activities(activities)
-                logger.debug(f"Flushed {len(activities)} activities to storage")
-            except Exception as e:
-                logger.error(f"Failed to flush activities: {e}")
-                # 重新放回缓冲区
-                self._buffer.extend(activities)
+            self._dropped += count
+        else:
+            self._evicted += count
 
     async def _periodic_flush(self) -> None:
         """定期刷新"""
@@ -219,8 +335,8 @@ class ActivityLogger:
         Returns:
             活动记录列表
         """
-        # 如果有外部存储，从存储查询
-        if self.storage:
+        # 如果外部存储支持查询，从存储查询
+        if self.storage and hasattr(self.storage, "query_activities"):
             return await self.storage.query_activities(
                 agent_id=agent_id,
                 tenant_id=tenant_id,
@@ -230,34 +346,43 @@ class ActivityLogger:
                 limit=limit
             )
 
-        # 否则从内存查询
-        results = self._all_activities.copy()
-
-        if agent_id:
-            results = [a for a in results if a.agent_id == agent_id]
-        if tenant_id:
-            results = [a for a in results if a.tenant_id == tenant_id]
-        if activity_type:
-            results = [a for a in results if a.activity_type == activity_type]
-        if start_time:
-            results = [a for a in results if a.timestamp >= start_time]
-        if end_time:
-            results = [a for a in results if a.timestamp <= end_time]
-
-        # 按时间倒序
+        # 否则从内存层查询: 选最小的索引过滤
+        self._apply_retention()
+        if agent_id is not None:
+            candidates = self._by_agent.get(agent_id, ())
+        elif tenant_id is not None:
+            candidates = self._by_tenant.get(tenant_id, ())
+        else:
+            candidates = self._all_activities
+
+        results = [
+            a for a in reversed(candidates)
+            if (not agent_id or a.agent_id == agent_id)
+            and (not tenant_id or a.tenant_id == tenant_id)
+            and (not activity_type or a.activity_type == activity_type)
+            and (not start_time or a.timestamp >= start_time)
+            and (not end_time or a.timestamp <= end_time)
+        ]
+
+        # 时间戳可由调用方指定，写入顺序不一定是时间顺序，过滤后再按时间倒序
         results.sort(key=lambda x: x.timestamp, reverse=True)
         return results[:limit]
 
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
-        activities = self._all_activities
+        by_type = {
+            key: self._by_type.get(key, 0)
+            for key in ("tool_call", "decision", "state_change", "escalation")
+        }
+        for key, count in self._by_type.items():
+            by_type.setdefault(key, count)
         return {
-            "total": len(activities),
+            "total": self._total,
+            "in_memory": len(self._all_activities),
             "buffered": len(self._buffer),
-            "by_type": {
-                "tool_call": sum(1 for a in activities if a.activity_type == "tool_call"),
-                "decision": sum(1 for a in activities if a.activity_type == "decision"),
-                "state_change": sum(1 for a in activities if a.activity_type == "state_change"),
-                "escalation": sum(1 for a in activities if a.activity_type == "escalation"),
-            }
+            "flushed": self._flushed,
+            "dropped": self._dropped,
+            "evicted": self._evicted,
+            "flush_failures": self._flush_failures,
+            "by_type": by_type,
         }
@@ -0,0 +1,257 @@
+"""
+A1: 活动日志存储 Sink
+=====================
+ActivityLogger 的可插拔持久化后端，均实现 save_activities(batch)。
+
+- JsonlActivitySink: 本地滚动 JSONL 文件，按大小/时间切分，按文件数/时长保留
+- PostgresActivitySink: PostgreSQL COPY 批量写入，支持查询和按时间清理
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+import asyncio
+import json
+import logging
+import time
+
+from .activity import AgentActivity
+
+if TYPE_CHECKING:
+    from src.data.storage.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlActivitySink:
+    """滚动 JSONL 文件 Sink"""
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "activities",
+        max_bytes: int = 64 * 1024 * 1024,
+        rotate_seconds: int = 3600,
+        max_files: int = 168,
+        max_age_seconds: Optional[int] = None
+    ):
+        """
+        初始化 JSONL Sink
+
+        Args:
+            directory: 输出目录
+            prefix: 文件名前缀
+            max_bytes: 单文件大小上限，超过后切分
+            rotate_seconds: 单文件时间跨度上限
+            max_files: 最多保留文件数
+            max_age_seconds: 文件最长保留时长
+        """
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.max_files = max_files
+        self.max_age_seconds = max_age_seconds
+
+        self._current: Optional[Path] = None
+        self._opened_at = 0.0
+        self._seq = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    async def save_activities(self, activities: List[AgentActivity]) -> None:
+        """写入一批活动"""
+        payload = "".join(
+            json.dumps(a.to_dict(), ensure_ascii=False, default=str) + "\n"
+            for a in activities
+        )
+        await asyncio.to_thread(self._write, payload)
+
+    def _write(self, payload: str) -> None:
+        if self._should_rotate():
+            self._rotate()
+        with open(self._current, "a", encoding="utf-8") as f:
+            f.write(payload)
+
+    def _should_rotate(self) -> bool:
+        if self._current is None or not self._current.exists():
+            return True
+        if time.time() - self._opened_at >= self.rotate_seconds:
+            return True
+        return self._current.stat().st_size >= self.max_bytes
+
+    def _rotate(self) -> None:
+        self._seq += 1
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        self._current = self.directory / f"{self.prefix}-{stamp}-{self._seq:04d}.jsonl"
+        self._opened_at = time.time()
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        """删除超出数量或时长的旧文件"""
+        files = sorted(
+            self.directory.glob(f"{self.prefix}-*.jsonl"),
+            key=lambda p: p.stat().st_mtime
+        )
+        expired = []
+        if self.max_age_seconds:
+            cutoff = time.time() - self.max_age_seconds
+            expired = [p for p in files if p.stat().st_mtime < cutoff]
+            files = [p for p in files if p not in expired]
+        # 为即将创建的新文件预留一个名额
+        overflow = len(files) - (self.max_files - 1)
+        if overflow > 0:
+            expired.extend(files[:overflow])
+        for path in expired:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def list_files(self) -> List[Path]:
+        """当前保留的文件 (旧到新)"""
+        return sorted(
+            self.directory.glob(f"{self.prefix}-*.jsonl"),
+            key=lambda p: p.stat().st_mtime
+        )
+
+
+class PostgresActivitySink:
+    """PostgreSQL COPY 批量写入 Sink"""
+
+    COLUMNS = (
+        "activity_id", "agent_id", "tenant_id", "activity_type", "timestamp",
+        "tool_name", "arguments", "result_success", "result_data",
+        "decision_type", "decision_reason", "decision_confidence", "metadata",
+    )
+
+    CREATE_TABLE_SQL = """
+        CREATE TABLE IF NOT EXISTS {table} (
+            activity_id TEXT PRIMARY KEY,
+            agent_id TEXT NOT NULL,
+            tenant_id TEXT NOT NULL,
+            activity_type TEXT NOT NULL,
+            timestamp TIMESTAMPTZ NOT NULL,
+            tool_name TEXT,
+            arguments JSONB,
+            result_success BOOLEAN,
+            result_data JSONB,
+            decision_type TEXT,
+            decision_reason TEXT,
+            decision_confidence DOUBLE PRECISION,
+            metadata JSONB
+        );
+        CREATE INDEX IF NOT EXISTS idx_{table}_agent_time ON {table} (agent_id, timestamp DESC);
+        CREATE INDEX IF NOT EXISTS idx_{table}_tenant_time ON {table} (tenant_id, timestamp DESC);
+    """
+
+    def __init__(
+        self,
+        db: "DatabaseManager",
+        table: str = "agent_activities",
+        retention_days: Optional[int] = None
+    ):
+        """
+        初始化 PostgreSQL Sink
+
+        Args:
+            db: 数据库管理器
+            table: 表名
+            retention_days: 保留天数 (配合 purge_expired 定期调用)
+        """
+        self.db = db
+        self.table = table
+        self.retention_days = retention_days
+
+    async def ensure_table(self) -> None:
+        """创建表和索引"""
+        await self.db.execute(self.CREATE_TABLE_SQL.format(table=self.table))
+
+    @staticmethod
+    def _to_record(a: AgentActivity) -> tuple:
+        def _json(value: Optional[Dict[str, Any]]) -> Optional[str]:
+            return json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+
+        return (
+            a.activity_id, a.agent_id, a.tenant_id, a.activity_type, a.timestamp,
+            a.tool_name, _json(a.arguments), a.result_success, _json(a.result_data),
+            a.decision_type, a.decision_reason, a.decision_confidence, _json(a.metadata),
+        )
+
+    async def save_activities(self, activities: List[AgentActivity]) -> None:
+        """COPY 批量写入"""
+        records = [self._to_record(a) for a in activities]
+        async with self.db.connection() as conn:
+            await conn.copy_records_to_table(
+                self.table,
+                records=records,
+                columns=self.COLUMNS
+            )
+
+    async def query_activities(
+        self,
+        agent_id: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        activity_type: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100
+    ) -> List[AgentActivity]:
+        """查询活动"""
+        conditions = []
+        params: List[Any] = []
+        for column, value in (
+            ("agent_id", agent_id),
+            ("tenant_id", tenant_id),
+            ("activity_type", activity_type),
+        ):
+            if value:
+                params.append(value)
+                conditions.append(f"{column} = ${len(params)}")
+        if start_time:
+            params.append(start_time)
+            conditions.append(f"timestamp >= ${len(params)}")
+        if end_time:
+            params.append(end_time)
+            conditions.append(f"timestamp <= ${len(params)}")
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        rows = await self.db.fetch(
+            f"SELECT {', '.join(self.COLUMNS)} FROM {self.table} {where} "
+            f"ORDER BY timestamp DESC LIMIT ${len(params)}",
+            *params
+        )
+
+        def _load(value):
+            return json.loads(value) if isinstance(value, str) else value
+
+        return [
+            AgentActivity(
+                activity_id=row["activity_id"],
+                agent_id=row["agent_id"],
+                tenant_id=row["tenant_id"],
+                activity_type=row["activity_type"],
+                timestamp=row["timestamp"],
+                tool_name=row["tool_name"],
+                arguments=_load(row["arguments"]),
+                result_success=row["result_success"],
+                result_data=_load(row["result_data"]),
+                decision_type=row["decision_type"],
+                decision_reason=row["decision_reason"],
+                decision_confidence=row["decision_confidence"],
+                metadata=_load(row["metadata"]),
+            )
+            for row in rows
+        ]
+
+    async def purge_expired(self) -> int:
+        """按 retention_days 删除过期记录，返回删除条数"""
+        if not self.retention_days:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        result = await self.db.execute(
+            f"DELETE FROM {self.table} WHERE timestamp < $1", cutoff
+        )
+        deleted = int(result.split()[-1]) if result else 0
+        logger.info(f"Purged {deleted} expired activities from {self.table}")
+        return deleted
@@ -1,16 +1,36 @@
 """
 A1: MCP 客户端封装
 ==================
-统一的 MCP Tool 调用接口
+统一的 MCP Tool 调用接口，只读工具经 ToolResultCache 读穿透缓存。
+servers 中配置 http(s) 地址的 Server 经 RemoteMCPTransport 远程调用。
+远程不可用时，只读幂等工具回退到本地 handler；写操作只在请求确定未送达
+(熔断或连接失败) 时回退，其余错误 (如已发出后超时) 直接返回，避免重复执行。
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 import asyncio
 import logging
 
+from src.shared.metrics import histogram, span
+from .remote_transport import (
+    CircuitOpenError,
+    RemoteConnectError,
+    RemoteMCPTransport,
+    RemoteTransportConfig,
+    RemoteTransportError,
+    build_remote_transports,
+)
+from .tool_cache import DEFAULT_CACHE_POLICIES, ToolCachePolicy, ToolResultCache
+
 logger = logging.getLogger(__name__)
 
+MCP_TOOL_SECONDS = histogram(
+    "linkc_mcp_tool_call_seconds",
+    "MCP tool call latency",
+    ["tenant", "agent", "server", "tool", "transport", "status"],
+)
+
 
 @dataclass
 class ToolResult:
@@ -38,16 +58,34 @@ class MCPClient:
     统一管理与多个 MCP Server 的连接和工具调用
     """
     
-    def __init__(self, servers: Optional[Dict[str, str]] = None):
+    def __init__(
+        self,
+        servers: Optional[Dict[str, str]] = None,
+        cache_policies: Optional[Dict[str, ToolCachePolicy]] = None,
+        cache_size: int = 0,
+        remote_config: Optional[RemoteTransportConfig] = None
+    ):
         """
         初始化 MCP 客户端
         
         Args:
             servers: MCP Server 配置 {"gaoxian": "http://localhost:8001", ...}
+            cache_policies: 工具缓存策略 (默认 DEFAULT_CACHE_POLICIES)
+            cache_size: 结果缓存条目上限，默认 0 不缓存 (按需开启)
+            remote_config: 远程传输配置 (超时、连接池、合并、熔断)
         """
         self.servers = servers or {}
+        self.remote_config = remote_config or RemoteTransportConfig()
         self._mcp_handlers: Dict[str, Any] = {}
+        self._remotes: Dict[str, RemoteMCPTransport] = {}
+        self._fallbacks: Dict[str, int] = {}
         self._connected = False
+        self.cache_policies: Dict[str, ToolCachePolicy] = dict(
+            DEFAULT_CACHE_POLICIES if cache_policies is None else cache_policies
+        )
+        self.cache: Optional[ToolResultCache] = (
+            ToolResultCache(max_entries=cache_size) if cache_size > 0 else None
+        )
     
     async def connect(self) -> None:
         """连接所有 MCP Server"""
@@ -55,13 +93,22 @@ class MCPClient:
         
         # 尝试加载本地 MCP handlers
         await self._load_local_handlers()
+        self._remotes = build_remote_transports(self.servers, self.remote_config)
         
         self._connected = True
-        logger.info(f"MCP client connected, handlers: {list(self._mcp_handlers.keys())}")
+        logger.info(
+            f"MCP client connected, handlers: {list(self._mcp_handlers.keys())}, "
+            f"remote: {list(self._remotes.keys())}"
+        )
     
     async def disconnect(self) -> None:
         """断开所有连接"""
+        for remote in self._remotes.values():
+            await remote.close()
+        self._remotes.clear()
         self._mcp_handlers.clear()
+        if self.cache is not None:
+            self.cache.clear()
         self._connected = False
         logger.info("MCP client disconnected")
     
@@ -72,9 +119,10 @@ class MCPClient:
             from src.mcp_servers.robot_gaoxian.storage import InMemoryRobotStorage
             from src.mcp_servers.robot_gaoxian.mock_client import MockGaoxianClient
             from src.mcp_servers.robot_gaoxian.tools import RobotTools
+            from src.mcp_servers.space_manager.travel import get_travel_costs
             
             storage = InMemoryRobotStorage()
-            client = MockGaoxianClient(storage)
+            client = MockGaoxianClient(storage, travel_costs=get_travel_costs())
             self._mcp_handlers["gaoxian"] = RobotTools(client, storage)
             logger.info("Loaded Gaoxian MCP handler")
         except ImportError as e:
@@ -109,6 +157,9 @@ class MCPClient:
     ) -> ToolResult:
         """
         调用 MCP Tool
+
+        启用缓存时，cache_policies 中声明为幂等的工具走读穿透缓存；
+        其他工具调用后失效相关读工具的缓存条目。
         
         Args:
             tool_name: 工具名称 (如 robot_list_robots, space_get_building)
@@ -128,25 +179,101 @@ class MCPClient:
         server_name = self._get_server_for_tool(tool_name)
         
         handler = self._mcp_handlers.get(server_name)
-        if not handler:
+        if not handler and server_name not in self._remotes:
             return ToolResult(
                 success=False,
                 error=f"No handler for server: {server_name}",
                 error_code="UNKNOWN_SERVER"
             )
         
+        policy = self.cache_policies.get(tool_name)
+        if self.cache is None or policy is None:
+            result = await self._call_handler(server_name, handler, tool_name, arguments)
+            if self.cache is not None:
+                # 未声明策略的工具视为写操作
+                self.cache.invalidate_for_write(
+                    tool_name, arguments,
+                    same_server=lambda name: self._get_server_for_tool(name) == server_name
+                )
+            return result
+
+        if not policy.idempotent:
+            return await self._call_handler(server_name, handler, tool_name, arguments)
+
+        return await self.cache.get_or_load(
+            tool_name, arguments, policy,
+            loader=lambda: self._call_handler(server_name, handler, tool_name, arguments),
+            cacheable=lambda r: r.success,
+        )
+
+    async def _call_handler(
+        self,
+        server_name: str,
+        handler: Any,
+        tool_name: str,
+        arguments: Dict[str, Any]
+    ) -> ToolResult:
+        """远程或本地调用并记录耗时"""
+        with span(MCP_TOOL_SECONDS, server=server_name, tool=tool_name) as tool_span:
+            remote = self._remotes.get(server_name)
+            result = None
+            if remote is not None:
+                try:
+                    result = self._to_tool_result(await remote.call(tool_name, arguments))
+                    tool_span.label(transport="remote")
+                except RemoteTransportError as e:
+                    if handler is None or not self._can_fallback(tool_name, e):
+                        result = ToolResult(
+                            success=False,
+                            error=str(e),
+                            error_code="REMOTE_UNAVAILABLE"
+                        )
+                        tool_span.label(transport="remote")
+                    else:
+                        self._fallbacks[server_name] = self._fallbacks.get(server_name, 0) + 1
+            if result is None:
+                result = await self._invoke(handler, tool_name, arguments)
+                tool_span.label(transport="local")
+            if not result.success:
+                tool_span.status = "error"
+            return result
+
+    def _can_fallback(self, tool_name: str, error: RemoteTransportError) -> bool:
+        """远程失败后能否改走本地 handler: 请求未送达，或工具为只读幂等"""
+        if isinstance(error, (CircuitOpenError, RemoteConnectError)):
+            return True
+        policy = self.cache_policies.get(tool_name)
+        return policy is not None and policy.idempotent
+
+    async def call_tools(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[ToolResult]:
+        """
+        并发调用多个工具，结果与 calls 顺序一致
+
+        发往同一远程 Server 的调用合并为一个 JSON-RPC batch 请求。
+        """
+        return list(await asyncio.gather(
+            *(self.call_tool(tool_name, arguments) for tool_name, arguments in calls)
+        ))
+
+    async def _invoke(self, handler: Any, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        """调用 handler 并统一为 ToolResult"""
         try:
             # 调用 MCP handler
             result = await handler.handle(tool_name, arguments)
-            
-            if hasattr(result, 'success'):
-                return ToolResult(
-                    success=result.success,
-                    data=result.data if hasattr(result, 'data') else None,
-                    error=result.error if hasattr(result, 'error') else None
-                )
-            else:
+
+            if isinstance(result, ToolResult):
+                return result
+
+            # 直接引用 handler 返回的数据，不做拷贝或再校验
+            success = getattr(result, 'success', None)
+            if success is None:
                 return ToolResult(success=True, data=result)
+            return ToolResult(
+                success=success,
+                data=getattr(result, 'data', None),
+                error=getattr(result, 'error', None),
+                error_code=getattr(result, 'error_code', None)
+            )
                 
         except Exception as e:
             logger.error(f"MCP call error: {tool_name} - {e}")
@@ -156,6 +283,18 @@ class MCPClient:
                 error_code="MCP_ERROR"
             )
     
+    @staticmethod
+    def _to_tool_result(payload: Any) -> ToolResult:
+        """远程返回的 ToolResult 字典 → ToolResult"""
+        if isinstance(payload, dict) and "success" in payload:
+            return ToolResult(
+                success=bool(payload["success"]),
+                data=payload.get("data"),
+                error=payload.get("error"),
+                error_code=payload.get("error_code")
+            )
+        return ToolResult(success=True, data=payload)
+
     def _get_server_for_tool(self, tool_name: str) -> str:
         """根据工具名称确定 MCP Server"""
         # 工具命名规则: {prefix}_{action}
@@ -166,6 +305,19 @@ class MCPClient:
     @property
     def is_connected(self) -> bool:
         return self._connected
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """工具结果缓存统计 (按工具的命中率)"""
+        if self.cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+
+    def get_transport_stats(self) -> Dict[str, Any]:
+        """远程传输统计 (请求数、合并数、熔断状态、本地回退次数)"""
+        return {
+            name: {**remote.get_stats(), "fallbacks": self._fallbacks.get(name, 0)}
+            for name, remote in self._remotes.items()
+        }
     
     def get_available_tools(self) -> Dict[str, list]:
         """获取可用的工具列表"""
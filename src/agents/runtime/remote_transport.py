@@ -0,0 +1,296 @@
+"""
+A1: MCP 远程传输
+================
+MCPClient 访问独立进程 MCP Server 的 JSON-RPC 2.0 over HTTP 传输:
+
+- 连接池: 每个 Server 一个 keep-alive httpx.AsyncClient，并发调用复用连接
+- 请求合并: 同一事件循环轮次 (或 batch_window_ms 窗口) 内的并发调用
+  合并为一个 JSON-RPC batch 请求，按 id 分发响应
+- 超时与熔断: 每个 Server 独立的请求超时和 CircuitBreaker；熔断打开期间
+  直接拒绝，由 MCPClient 回退到本地 handler
+
+服务端见 src/mcp_servers/jsonrpc_http.py。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import itertools
+import logging
+import time
+
+import httpx
+
+from src.shared.metrics import current_trace_id
+from src.shared.serialization import dumps_bytes, loads
+
+logger = logging.getLogger(__name__)
+
+RPC_PATH = "/rpc"
+
+
+class RemoteTransportError(Exception):
+    """远程调用失败 (网络错误、超时、HTTP 错误或响应缺失)"""
+
+
+class CircuitOpenError(RemoteTransportError):
+    """熔断打开，未发出请求"""
+
+
+class RemoteConnectError(RemoteTransportError):
+    """连接失败 (拒绝连接或连接超时)，请求未送达远端"""
+
+
+@dataclass
+class RemoteTransportConfig:
+    """远程传输配置 (每个 Server 独立生效)"""
+    timeout_seconds: float = 5.0
+    max_connections: int = 8
+    max_batch_size: int = 32
+    batch_window_ms: float = 0.0        # 0: 只合并同一事件循环轮次内的调用
+    failure_threshold: int = 5          # 连续失败次数达到后熔断
+    reset_timeout_seconds: float = 30.0  # 熔断后多久放行一个探测请求
+
+
+class CircuitBreaker:
+    """
+    熔断器: closed → open → half_open → closed
+
+    - closed: 正常放行，连续失败达到阈值后打开
+    - open: 拒绝全部请求，reset_timeout 后进入 half_open
+    - half_open: 只放行一个探测请求，成功则关闭，失败则重新打开；
+      探测请求超过 reset_timeout 未返回结果 (如调用方被取消) 时重新放行
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """是否放行本次请求 (half_open 时占用唯一的探测名额)"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            now = self._clock()
+            if self._state == self.HALF_OPEN and now - self._probe_started < self.reset_timeout:
+                return False
+            self._state = self.HALF_OPEN
+            self._probe_started = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+
+
+@dataclass
+class _PendingCall:
+    request_id: int
+    payload: Dict[str, Any]
+    future: asyncio.Future
+
+
+class RemoteMCPTransport:
+    """
+    单个 MCP Server 的远程传输
+
+    call() 返回服务端 ToolResult 的字典形式 ({"success": ..., "data": ...})；
+    传输层失败抛出 RemoteTransportError。
+    """
+
+    def __init__(
+        self,
+        server_name: str,
+        base_url: str,
+        config: Optional[RemoteTransportConfig] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            server_name: Server 名称 (日志与统计用)
+            base_url: Server 地址，如 http://localhost:8001
+            config: 传输配置
+            transport: 自定义 httpx 传输 (测试时注入 ASGI / Mock 传输)
+        """
+        self.server_name = server_name
+        self.base_url = base_url.rstrip("/")
+        self.config = config or RemoteTransportConfig()
+        self.breaker = CircuitBreaker(
+            self.config.failure_threshold, self.config.reset_timeout_seconds
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.config.timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_connections,
+            ),
+            headers={"Content-Type": "application/json"},
+            transport=transport,
+        )
+        self._ids = itertools.count(1)
+        self._pending: List[_PendingCall] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._sending: set = set()
+        self._stats = {
+            "calls": 0,
+            "requests": 0,
+            "batched_calls": 0,
+            "failures": 0,
+            "rejected": 0,
+        }
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """调用远程工具；并发调用自动合并为 batch 请求"""
+        if not self.breaker.allow():
+            self._stats["rejected"] += 1
+            raise CircuitOpenError(f"Circuit open for MCP server: {self.server_name}")
+
+        params: Dict[str, Any] = {"name": tool_name, "arguments": arguments}
+        trace_id = current_trace_id()
+        if trace_id:
+            params["_meta"] = {"trace_id": trace_id}
+
+        request_id = next(self._ids)
+        loop = asyncio.get_running_loop()
+        call = _PendingCall(
+            request_id,
+            {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": params},
+            loop.create_future(),
+        )
+        self._pending.append(call)
+        self._stats["calls"] += 1
+
+        if len(self._pending) >= self.config.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            if self.config.batch_window_ms > 0:
+                self._flush_handle = loop.call_later(self.config.batch_window_ms / 1000, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+
+        return await call.future
+
+    def _flush(self) -> None:
+        """把待发送的调用打包成一个请求"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch = [c for c in self._pending if not c.future.done()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[_PendingCall]) -> None:
+        self._stats["requests"] += 1
+        if len(batch) > 1:
+            self._stats["batched_calls"] += len(batch)
+        body = batch[0].payload if len(batch) == 1 else [c.payload for c in batch]
+
+        try:
+            response = await self._client.post(RPC_PATH, content=dumps_bytes(body))
+            response.raise_for_status()
+            replies = loads(response.content)
+        except Exception as e:
+            self._stats["failures"] += 1
+            self.breaker.record_failure()
+            logger.warning(f"MCP remote call failed: {self.server_name} - {e!r}")
+            # 连接阶段失败说明请求没有送达，调用方可以安全地改走本地
+            error_type = (
+                RemoteConnectError
+                if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                else RemoteTransportError
+            )
+            error = error_type(f"{self.server_name}: {e!r}")
+            for call in batch:
+                if not call.future.done():
+                    call.future.set_exception(error)
+            return
+
+        self.breaker.record_success()
+        if isinstance(replies, dict):
+            replies = [replies]
+        by_id = {reply.get("id"): reply for reply in replies if isinstance(reply, dict)}
+        for call in batch:
+            if call.future.done():
+                continue
+            reply = by_id.get(call.request_id)
+            if reply is None:
+                call.future.set_exception(
+                    RemoteTransportError(f"{self.server_name}: missing response {call.request_id}")
+                )
+            else:
+                call.future.set_result(self._parse_reply(reply))
+
+    @staticmethod
+    def _parse_reply(reply: Dict[str, Any]) -> Dict[str, Any]:
+        """JSON-RPC 响应 → ToolResult 字典；协议错误映射为失败结果"""
+        if "error" in reply:
+            error = reply["error"] or {}
+            return {
+                "success": False,
+                "error": error.get("message", "JSON-RPC error"),
+                "error_code": f"RPC_{error.get('code', 'ERROR')}",
+            }
+        result = reply.get("result")
+        if isinstance(result, dict) and "success" in result:
+            return result
+        return {"success": True, "data": result}
+
+    async def close(self) -> None:
+        if self._flush_handle is not None:
+            self._flush()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        await self._client.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.base_url,
+            "breaker": self.breaker.state,
+            **self._stats,
+        }
+
+
+def build_remote_transports(
+    servers: Dict[str, str],
+    config: Optional[RemoteTransportConfig] = None
+) -> Dict[str, RemoteMCPTransport]:
+    """为 servers 中的 http(s) 地址创建远程传输，其他地址忽略"""
+    return {
+        name: RemoteMCPTransport(name, url, config)
+        for name, url in servers.items()
+        if isinstance(url, str) and url.startswith(("http://", "https://"))
+    }
+
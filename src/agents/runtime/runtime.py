@@ -14,9 +14,17 @@ from .decision import Decision, DecisionResult
 from .mcp_client import MCPClient, ToolResult
 from .escalation import EscalationHandler, EscalationLevel, EscalationEvent
 from .activity import ActivityLogger, AgentActivity
+from .scheduler import AgentScheduler
+from src.shared.metrics import histogram, span, trace
 
 logger = logging.getLogger(__name__)
 
+AGENT_CYCLE_SECONDS = histogram(
+    "linkc_agent_cycle_seconds",
+    "Agent decision cycle latency",
+    ["tenant", "agent", "agent_type", "trigger", "status"],
+)
+
 
 class AgentRuntime:
     """
@@ -34,7 +42,14 @@ class AgentRuntime:
         self,
         mcp_servers: Optional[Dict[str, str]] = None,
         redis_url: Optional[str] = None,
-        storage=None
+        storage=None,
+        max_concurrent_cycles: Optional[int] = None,
+        max_cycles_per_tenant: Optional[int] = None,
+        max_cycles_per_agent_type: Optional[Dict[str, int]] = None,
+        cycle_budget_seconds: Optional[float] = None,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        tool_cache_size: int = 0
     ):
         """
         初始化运行时
@@ -43,15 +58,30 @@ class AgentRuntime:
             mcp_servers: MCP Server 配置
             redis_url: Redis URL (用于事件总线)
             storage: 存储服务
+            max_concurrent_cycles: 全局并发周期上限
+            max_cycles_per_tenant: 每租户并发周期上限
+            max_cycles_per_agent_type: 每 Agent 类型并发周期上限
+            cycle_budget_seconds: 默认周期时间预算，超时取消
+            shard_index: 当前工作进程分片序号
+            shard_count: 分片总数
+            tool_cache_size: MCP 工具结果缓存条目上限，默认 0 不缓存
         """
         # 核心组件
-        self.mcp_client = MCPClient(mcp_servers or {})
+        self.mcp_client = MCPClient(mcp_servers or {}, cache_size=tool_cache_size)
         self.escalation_handler = EscalationHandler(self)
         self.activity_logger = ActivityLogger(storage)
+        self.scheduler = AgentScheduler(
+            max_concurrency=max_concurrent_cycles,
+            max_per_tenant=max_cycles_per_tenant,
+            max_per_agent_type=max_cycles_per_agent_type,
+            default_budget_seconds=cycle_budget_seconds,
+            shard_index=shard_index,
+            shard_count=shard_count,
+            on_error=self._on_cycle_error,
+        )
 
         # Agent 管理
         self._agents: Dict[str, BaseAgent] = {}
-        self._running_tasks: Dict[str, asyncio.Task] = {}
         self._pending_approvals: Dict[str, dict] = {}
 
         # 事件总线
@@ -98,6 +128,7 @@ class AgentRuntime:
         # 停止所有 Agent
         for agent_id in list(self._agents.keys()):
             await self.stop_agent(agent_id)
+        await self.scheduler.stop()
 
         # 停止活动日志
         await self.activity_logger.stop()
@@ -142,9 +173,7 @@ class AgentRuntime:
             return False
 
         # 停止运行中的任务
-        if agent_id in self._running_tasks:
-            self._running_tasks[agent_id].cancel()
-            del self._running_tasks[agent_id]
+        self.scheduler.unschedule(agent_id)
 
         del self._agents[agent_id]
         logger.info(f"Agent unregistered: {agent_id}")
@@ -178,7 +207,7 @@ class AgentRuntime:
         if not agent:
             return False
 
-        if agent_id in self._running_tasks:
+        if self.scheduler.is_scheduled(agent_id):
             logger.warning(f"Agent {agent_id} already running")
             return False
 
@@ -202,14 +231,8 @@ class AgentRuntime:
         if not agent:
             return False
 
-        # 取消运行任务
-        if agent_id in self._running_tasks:
-            self._running_tasks[agent_id].cancel()
-            try:
-                await self._running_tasks[agent_id]
-            except asyncio.CancelledError:
-                pass
-            del self._running_tasks[agent_id]
+        # 取消运行任务并等待其结束
+        await self.scheduler.remove(agent_id)
 
         old_state = agent.state
         agent.state = AgentState.STOPPED
@@ -232,9 +255,7 @@ class AgentRuntime:
             return False
 
         # 取消运行任务
-        if agent_id in self._running_tasks:
-            self._running_tasks[agent_id].cancel()
-            del self._running_tasks[agent_id]
+        self.scheduler.unschedule(agent_id)
 
         old_state = agent.state
         agent.state = AgentState.WAITING_APPROVAL  # 用作暂停状态
@@ -279,7 +300,11 @@ class AgentRuntime:
                 error=f"Agent {agent_id} not found"
             )
 
-        result = await agent.run_cycle(context)
+        with trace(tenant=agent.config.tenant_id, agent=agent_id):
+            with span(AGENT_CYCLE_SECONDS, agent_type=type(agent).__name__, trigger="once") as cycle_span:
+                result = await agent.run_cycle(context)
+                if not result.success:
+                    cycle_span.status = "error"
 
         # 如果需要审批，保存到待审批列表
         if result.requires_approval and result.decision:
@@ -295,50 +320,70 @@ class AgentRuntime:
         self,
         agent_id: str,
         context_provider: callable,
-        interval_seconds: int = 60
+        interval_seconds: int = 60,
+        budget_seconds: Optional[float] = None
     ) -> bool:
-        """启动 Agent 循环"""
+        """
+        启动 Agent 循环
+
+        周期由调度器按固定速率派发，受并发上限和周期预算约束；
+        上一周期未结束时跳过本次。
+
+        Args:
+            agent_id: Agent ID
+            context_provider: 返回周期上下文的协程函数
+            interval_seconds: 周期间隔
+            budget_seconds: 周期时间预算 (默认使用运行时配置)
+        """
         agent = self._agents.get(agent_id)
         if not agent:
             return False
 
-        if agent_id in self._running_tasks:
+        if self.scheduler.is_scheduled(agent_id):
             return False
 
-        async def _loop():
-            while True:
-                try:
+        async def _cycle():
+            # 每个周期开启新的 trace
+            with trace(tenant=agent.config.tenant_id, agent=agent_id, new=True):
+                with span(AGENT_CYCLE_SECONDS, agent_type=type(agent).__name__, trigger="loop"):
                     context = await context_provider()
                     await agent.run_cycle(context)
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    logger.error(f"Agent loop error: {agent_id} - {e}")
-                    await self.escalate(
-                        agent_id=agent_id,
-                        level=EscalationLevel.ERROR,
-                        reason=str(e),
-                        context={"exception": type(e).__name__}
-                    )
-                await asyncio.sleep(interval_seconds)
-
-        task = asyncio.create_task(_loop())
-        self._running_tasks[agent_id] = task
+
+        scheduled = self.scheduler.schedule(
+            agent_id=agent_id,
+            cycle=_cycle,
+            interval_seconds=interval_seconds,
+            tenant_id=agent.config.tenant_id,
+            agent_type=type(agent).__name__,
+            budget_seconds=budget_seconds,
+        )
+        if not scheduled:
+            return False
 
         logger.info(f"Agent loop started: {agent_id}, interval={interval_seconds}s")
         return True
 
-    def stop_agent_loop(self, agent_id: str) -> bool:
-        """停止 Agent 循环"""
-        if agent_id not in self._running_tasks:
+    async def stop_agent_loop(self, agent_id: str) -> bool:
+        """停止 Agent 循环 (等待运行中的周期取消完成)"""
+        if not await self.scheduler.remove(agent_id):
             return False
 
-        self._running_tasks[agent_id].cancel()
-        del self._running_tasks[agent_id]
-
         logger.info(f"Agent loop stopped: {agent_id}")
         return True
 
+    async def _on_cycle_error(self, agent_id: str, error: BaseException) -> None:
+        """调度周期异常或超时时升级"""
+        if isinstance(error, asyncio.TimeoutError):
+            reason = "Cycle exceeded budget"
+        else:
+            reason = str(error)
+        await self.escalate(
+            agent_id=agent_id,
+            level=EscalationLevel.ERROR,
+            reason=reason,
+            context={"exception": type(error).__name__}
+        )
+
     # ==================== 工具调用 ====================
 
     async def call_tool(
@@ -351,7 +396,8 @@ class AgentRuntime:
         agent = self._agents.get(agent_id)
         tenant_id = agent.config.tenant_id if agent else ""
 
-        result = await self.mcp_client.call_tool(tool_name, arguments)
+        with trace(tenant=tenant_id, agent=agent_id):
+            result = await self.mcp_client.call_tool(tool_name, arguments)
 
         # 记录活动
         self.activity_logger.log_tool_call(
@@ -506,16 +552,19 @@ class AgentRuntime:
             "running": self._running,
             "agents": {
                 "total": len(self._agents),
-                "running_loops": len(self._running_tasks),
+                "running_loops": self.scheduler.job_count,
                 "by_state": {
                     state.value: sum(1 for a in self._agents.values() if a.state == state)
                     for state in AgentState
                 }
             },
             "pending_approvals": len(self._pending_approvals),
+            "scheduler": self.scheduler.get_stats(),
             "mcp": {
                 "connected": self.mcp_client.is_connected,
-                "available_tools": list(self.mcp_client.get_available_tools().keys())
+                "available_tools": list(self.mcp_client.get_available_tools().keys()),
+                "cache": self.mcp_client.get_cache_stats(),
+                "transport": self.mcp_client.get_transport_stats(),
             },
             "escalations": self.escalation_handler.get_stats(),
             "activities": self.activity_logger.get_stats(),
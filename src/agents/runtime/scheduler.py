@@ -0,0 +1,429 @@
+"""
+A1: Agent 周期调度器
+====================
+基于截止时间堆的 Agent 周期调度，替代每个 Agent 一个自由运行的循环任务。
+
+- 固定速率 (fixed-rate): 下一次截止时间 = 上一次截止时间 + 间隔，不随执行耗时漂移
+- 并发上限: 全局 / 每租户 / 每 Agent 类型
+- 周期预算: 超过 budget 的周期被取消
+- 重叠处理: 上一周期仍在运行时跳过本次 (skip-if-still-running)
+- 分片: 按 agent_id 稳定哈希分配到多个工作进程
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import multiprocessing
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+# 周期延迟直方图桶上界 (毫秒)
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000,
+)
+
+
+def shard_for(agent_id: str, shard_count: int) -> int:
+    """计算 Agent 所属分片 (跨进程稳定，不依赖 PYTHONHASHSEED)"""
+    if shard_count <= 1:
+        return 0
+    return zlib.crc32(agent_id.encode("utf-8")) % shard_count
+
+
+def start_shard_workers(
+    target: Callable[[int, int], Any],
+    shard_count: int
+) -> List[multiprocessing.Process]:
+    """
+    启动分片工作进程
+
+    每个进程调用 target(shard_index, shard_count)，由 target 构造
+    AgentRuntime(shard_index=..., shard_count=...) 并注册全部 Agent，
+    运行时只会调度属于自己分片的 Agent。
+
+    Args:
+        target: 模块级可导入的进程入口函数
+        shard_count: 分片数量
+
+    Returns:
+        已启动的进程列表
+    """
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(shard_count):
+        process = ctx.Process(
+            target=target,
+            args=(index, shard_count),
+            name=f"agent-shard-{index}",
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+    logger.info(f"Started {shard_count} agent shard workers")
+    return processes
+
+
+class LatencyHistogram:
+    """固定桶延迟直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, q: float) -> float:
+        """按桶上界估算分位数"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return float(self.buckets[i]) if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        labels = [f"le_{b:g}" for b in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "avg_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+@dataclass
+class ScheduledJob:
+    """调度中的 Agent 周期"""
+    agent_id: str
+    tenant_id: str
+    agent_type: str
+    cycle: Callable[[], Awaitable[Any]]
+    interval_seconds: float
+    budget_seconds: Optional[float] = None
+    next_run: float = 0.0
+    generation: int = 0
+
+    # 运行状态
+    inflight: Optional[asyncio.Task] = None
+
+    # 统计
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    completed: int = 0
+    failed: int = 0
+    timed_out: int = 0
+    overruns: int = 0       # 上一周期未结束而跳过
+    missed_ticks: int = 0   # 调度落后而丢弃的截止时间
+
+    @property
+    def running(self) -> bool:
+        return self.inflight is not None and not self.inflight.done()
+
+    def to_dict(self) -> dict:
+        return {
+            "tenant_id": self.tenant_id,
+            "agent_type": self.agent_type,
+            "interval_seconds": self.interval_seconds,
+            "budget_seconds": self.budget_seconds,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "overruns": self.overruns,
+            "missed_ticks": self.missed_ticks,
+            "latency": self.latency.to_dict(),
+        }
+
+
+class AgentScheduler:
+    """
+    Agent 周期调度器
+
+    单个调度协程维护 (next_run, generation, agent_id) 截止时间堆，
+    到期时派发周期任务；并发由信号量限制。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_per_tenant: Optional[int] = None,
+        max_per_agent_type: Optional[Dict[str, int]] = None,
+        default_budget_seconds: Optional[float] = None,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        on_error: Optional[Callable[[str, BaseException], Awaitable[Any]]] = None,
+    ):
+        """
+        初始化调度器
+
+        Args:
+            max_concurrency: 全局并发周期上限 (None 表示不限)
+            max_per_tenant: 每租户并发周期上限
+            max_per_agent_type: 每 Agent 类型并发上限 {"CleaningSchedulerAgent": 2}
+            default_budget_seconds: 默认周期时间预算
+            shard_index: 当前进程分片序号
+            shard_count: 分片总数
+            on_error: 周期异常/超时回调 (agent_id, exception)
+        """
+        if not 0 <= shard_index < max(shard_count, 1):
+            raise ValueError(f"Invalid shard {shard_index}/{shard_count}")
+
+        self.max_per_tenant = max_per_tenant
+        self.max_per_agent_type = max_per_agent_type or {}
+        self.default_budget_seconds = default_budget_seconds
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.on_error = on_error
+
+        self._global_limit = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+        self._tenant_limits: Dict[str, asyncio.Semaphore] = {}
+        self._type_limits: Dict[str, asyncio.Semaphore] = {}
+
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._generation = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    # ==================== 任务管理 ====================
+
+    def owns(self, agent_id: str) -> bool:
+        """Agent 是否属于当前分片"""
+        return shard_for(agent_id, self.shard_count) == self.shard_index
+
+    def schedule(
+        self,
+        agent_id: str,
+        cycle: Callable[[], Awaitable[Any]],
+        interval_seconds: float,
+        tenant_id: str = "",
+        agent_type: str = "",
+        budget_seconds: Optional[float] = None,
+        start_immediately: bool = True,
+    ) -> bool:
+        """
+        加入调度
+
+        Args:
+            agent_id: Agent ID
+            cycle: 执行一个周期的协程工厂
+            interval_seconds: 周期间隔
+            tenant_id: 租户 ID (用于并发上限)
+            agent_type: Agent 类型 (用于并发上限)
+            budget_seconds: 周期时间预算 (默认使用 default_budget_seconds)
+            start_immediately: 是否立即执行第一个周期
+
+        Returns:
+            是否加入成功 (已调度或不属于本分片返回 False)
+        """
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        if agent_id in self._jobs:
+            return False
+        if not self.owns(agent_id):
+            logger.debug(
+                f"Agent {agent_id} belongs to shard "
+                f"{shard_for(agent_id, self.shard_count)}, skipped on shard {self.shard_index}"
+            )
+            return False
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        self._generation += 1
+        job = ScheduledJob(
+            agent_id=agent_id,
+            tenant_id=tenant_id,
+            agent_type=agent_type,
+            cycle=cycle,
+            interval_seconds=interval_seconds,
+            budget_seconds=budget_seconds if budget_seconds is not None else self.default_budget_seconds,
+            next_run=now if start_immediately else now + interval_seconds,
+            generation=self._generation,
+        )
+        self._jobs[agent_id] = job
+        heapq.heappush(self._heap, (job.next_run, job.generation, agent_id))
+
+        self._ensure_dispatcher()
+        self._wakeup.set()
+        return True
+
+    def unschedule(self, agent_id: str) -> bool:
+        """移出调度并取消运行中的周期 (堆中条目惰性删除)"""
+        job = self._jobs.pop(agent_id, None)
+        if not job:
+            return False
+        if job.running:
+            job.inflight.cancel()
+        return True
+
+    async def remove(self, agent_id: str) -> bool:
+        """移出调度，并等待被取消的周期结束后返回"""
+        job = self._jobs.get(agent_id)
+        if not self.unschedule(agent_id):
+            return False
+        inflight = job.inflight
+        # 周期内停止自身时不能等待自己
+        if inflight is not None and inflight is not asyncio.current_task():
+            await asyncio.wait([inflight])
+        return True
+
+    def is_scheduled(self, agent_id: str) -> bool:
+        return agent_id in self._jobs
+
+    @property
+    def job_count(self) -> int:
+        return len(self._jobs)
+
+    async def stop(self) -> None:
+        """停止调度器并取消所有运行中的周期"""
+        inflight = [job.inflight for job in self._jobs.values() if job.running]
+        for agent_id in list(self._jobs.keys()):
+            self.unschedule(agent_id)
+        self._heap.clear()
+
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            inflight.append(self._dispatcher)
+            self._dispatcher = None
+        if inflight:
+            await asyncio.gather(*inflight, return_exceptions=True)
+
+    # ==================== 调度循环 ====================
+
+    def _ensure_dispatcher(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def _dispatch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+
+            timeout = None
+            while self._heap:
+                due, generation, agent_id = self._heap[0]
+                job = self._jobs.get(agent_id)
+                if job is None or job.generation != generation:
+                    heapq.heappop(self._heap)  # 已移除的任务
+                    continue
+
+                now = loop.time()
+                if due > now:
+                    timeout = due - now
+                    break
+
+                heapq.heappop(self._heap)
+                self._advance(job, now)
+                heapq.heappush(self._heap, (job.next_run, job.generation, agent_id))
+
+                if job.running:
+                    job.overruns += 1
+                    logger.warning(f"Agent cycle overrun, skipping tick: {agent_id}")
+                    continue
+                job.inflight = asyncio.create_task(self._run_job(job))
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _advance(self, job: ScheduledJob, now: float) -> None:
+        """固定速率推进截止时间，落后时丢弃错过的 tick 而不是补跑"""
+        job.next_run += job.interval_seconds
+        if job.next_run <= now:
+            missed = math.floor((now - job.next_run) / job.interval_seconds) + 1
+            job.next_run += missed * job.interval_seconds
+            job.missed_ticks += missed
+
+    def _limits_for(self, job: ScheduledJob) -> List[asyncio.Semaphore]:
+        limits = []
+        if self._global_limit:
+            limits.append(self._global_limit)
+        if self.max_per_tenant:
+            sem = self._tenant_limits.get(job.tenant_id)
+            if sem is None:
+                sem = self._tenant_limits[job.tenant_id] = asyncio.Semaphore(self.max_per_tenant)
+            limits.append(sem)
+        type_cap = self.max_per_agent_type.get(job.agent_type)
+        if type_cap:
+            sem = self._type_limits.get(job.agent_type)
+            if sem is None:
+                sem = self._type_limits[job.agent_type] = asyncio.Semaphore(type_cap)
+            limits.append(sem)
+        return limits
+
+    async def _run_job(self, job: ScheduledJob) -> None:
+        acquired: List[asyncio.Semaphore] = []
+        loop = asyncio.get_running_loop()
+        try:
+            # 固定顺序获取，避免死锁
+            for sem in self._limits_for(job):
+                await sem.acquire()
+                acquired.append(sem)
+
+            started = loop.time()
+            try:
+                if job.budget_seconds:
+                    await asyncio.wait_for(job.cycle(), job.budget_seconds)
+                else:
+                    await job.cycle()
+                job.completed += 1
+            except asyncio.TimeoutError as e:
+                job.timed_out += 1
+                logger.error(f"Agent cycle exceeded budget {job.budget_seconds}s: {job.agent_id}")
+                await self._report_error(job, e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.failed += 1
+                logger.error(f"Agent loop error: {job.agent_id} - {e}")
+                await self._report_error(job, e)
+            finally:
+                job.latency.observe((loop.time() - started) * 1000)
+        finally:
+            for sem in reversed(acquired):
+                sem.release()
+
+    async def _report_error(self, job: ScheduledJob, error: BaseException) -> None:
+        if not self.on_error:
+            return
+        try:
+            await self.on_error(job.agent_id, error)
+        except Exception as e:
+            logger.error(f"Scheduler error callback failed: {e}")
+
+    # ==================== 统计 ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "shard": {"index": self.shard_index, "count": self.shard_count},
+            "scheduled": len(self._jobs),
+            "running": sum(1 for job in self._jobs.values() if job.running),
+            "overruns": sum(job.overruns for job in self._jobs.values()),
+            "timed_out": sum(job.timed_out for job in self._jobs.values()),
+            "cycles": {agent_id: job.to_dict() for agent_id, job in self._jobs.items()},
+        }
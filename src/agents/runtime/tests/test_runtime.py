@@ -5,14 +5,26 @@ A1: Agent运行时框架 - 单元测试
 
 import pytest
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import httpx
 
 from src.agents.runtime.base import BaseAgent, AgentConfig, AgentState, AutonomyLevel
 from src.agents.runtime.decision import Decision, DecisionResult
 from src.agents.runtime.mcp_client import MCPClient, ToolResult
+from src.agents.runtime.tool_cache import ToolCachePolicy, ToolResultCache
+from src.agents.runtime.remote_transport import (
+    CircuitBreaker,
+    RemoteMCPTransport,
+    RemoteTransportConfig,
+)
 from src.agents.runtime.escalation import EscalationHandler, EscalationLevel, EscalationEvent
 from src.agents.runtime.activity import ActivityLogger, AgentActivity
+from src.agents.runtime.activity_sinks import JsonlActivitySink
 from src.agents.runtime.runtime import AgentRuntime
+from src.agents.runtime.scheduler import AgentScheduler, LatencyHistogram, shard_for
+from src.shared.metrics import recent_spans
+from src.mcp_servers.jsonrpc_http import create_jsonrpc_app
 
 
 # ============================================================
@@ -85,6 +97,306 @@ class TestMCPClient:
         await client.disconnect()
 
 
+class _CountingHandler:
+    """记录调用次数的 MCP handler"""
+
+    def __init__(self, delay: float = 0):
+        self.calls = []
+        self.delay = delay
+
+    async def handle(self, tool_name, arguments):
+        self.calls.append(tool_name)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return ToolResult(success=True, data={"tool": tool_name, "n": len(self.calls)})
+
+
+class TestToolResultCache:
+    """MCP 工具结果缓存测试"""
+
+    @pytest.mark.asyncio
+    async def test_read_through_and_key_fields(self):
+        """测试只读工具命中缓存，键只取声明字段和租户"""
+        client = MCPClient(cache_size=1024)
+        await client.connect()
+        handler = client._mcp_handlers["gaoxian"] = _CountingHandler()
+
+        await client.call_tool("robot_get_status", {"robot_id": "r1", "tenant_id": "t1", "verbose": True})
+        await client.call_tool("robot_get_status", {"robot_id": "r1", "tenant_id": "t1"})
+        await client.call_tool("robot_get_status", {"robot_id": "r1", "tenant_id": "t2"})
+
+        assert handler.calls == ["robot_get_status", "robot_get_status"]
+        stats = client.get_cache_stats()["tools"]["robot_get_status"]
+        assert stats["hits"] == 1 and stats["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_single_flight(self):
+        """测试并发的相同调用只执行一次"""
+        client = MCPClient(cache_size=1024)
+        await client.connect()
+        handler = client._mcp_handlers["gaoxian"] = _CountingHandler(delay=0.01)
+
+        results = await asyncio.gather(*(
+            client.call_tool("robot_list_robots", {"tenant_id": "t1"}) for _ in range(5)
+        ))
+
+        assert len(handler.calls) == 1
+        assert all(r.data == results[0].data for r in results)
+        assert client.get_cache_stats()["tools"]["robot_list_robots"]["coalesced"] == 4
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_related_keys(self):
+        """测试写工具按机器人失效相关缓存"""
+        client = MCPClient(cache_size=1024)
+        await client.connect()
+        handler = client._mcp_handlers["gaoxian"] = _CountingHandler()
+
+        await client.call_tool("robot_get_status", {"robot_id": "r1"})
+        await client.call_tool("robot_get_status", {"robot_id": "r2"})
+        await client.call_tool("robot_start_task", {"robot_id": "r1", "zone_id": "z1"})
+        await client.call_tool("robot_get_status", {"robot_id": "r1"})
+        await client.call_tool("robot_get_status", {"robot_id": "r2"})
+
+        assert handler.calls.count("robot_get_status") == 3
+        assert client.get_cache_stats()["tools"]["robot_get_status"]["invalidated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_not_cached_and_lru_bounded(self):
+        """测试失败结果不缓存，条目数受上限约束"""
+        client = MCPClient(cache_size=2)
+        await client.connect()
+
+        class _Failing:
+            async def handle(self, tool_name, arguments):
+                return ToolResult(success=False, error="boom")
+
+        client._mcp_handlers["gaoxian"] = _Failing()
+        await client.call_tool("robot_get_robot", {"robot_id": "r1"})
+        assert client.get_cache_stats()["entries"] == 0
+
+        client._mcp_handlers["gaoxian"] = _CountingHandler()
+        for robot_id in ("r1", "r2", "r3"):
+            await client.call_tool("robot_get_robot", {"robot_id": robot_id})
+        assert client.get_cache_stats()["entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        """测试默认不缓存"""
+        client = MCPClient()
+        await client.connect()
+        handler = client._mcp_handlers["gaoxian"] = _CountingHandler()
+
+        await client.call_tool("robot_get_robot", {"robot_id": "r1"})
+        await client.call_tool("robot_get_robot", {"robot_id": "r1"})
+
+        assert len(handler.calls) == 2
+        assert client.get_cache_stats() == {"enabled": False}
+
+    @pytest.mark.asyncio
+    async def test_undeclared_write_blocks_inflight_backfill(self):
+        """测试未声明的写工具推进全局代数，进行中的读调用不回填"""
+        cache = ToolResultCache()
+        policy = ToolCachePolicy(ttl_seconds=60)
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_loader():
+            started.set()
+            await release.wait()
+            return "stale"
+
+        read = asyncio.create_task(cache.get_or_load("robot_get_robot", {}, policy, slow_loader))
+        await started.wait()
+        cache.invalidate_for_write("robot_reboot", {}, same_server=lambda name: True)
+        release.set()
+        assert await read == "stale"
+
+        async def fresh_loader():
+            return "fresh"
+
+        assert await cache.get_or_load("robot_get_robot", {}, policy, fresh_loader) == "fresh"
+
+    @pytest.mark.asyncio
+    async def test_leader_cancelled_follower_loads(self):
+        """测试发起调用被取消时，合并进来的调用方自行加载而不被取消"""
+        cache = ToolResultCache()
+        policy = ToolCachePolicy(ttl_seconds=60)
+        started = asyncio.Event()
+
+        async def hanging_loader():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def follower_loader():
+            return "ok"
+
+        leader = asyncio.create_task(cache.get_or_load("robot_get_robot", {}, policy, hanging_loader))
+        await started.wait()
+        follower = asyncio.create_task(cache.get_or_load("robot_get_robot", {}, policy, follower_loader))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == "ok"
+        assert cache.get_stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self):
+        """测试条目过期后重新加载"""
+        now = [0.0]
+        cache = ToolResultCache(clock=lambda: now[0])
+        policy = ToolCachePolicy(ttl_seconds=1)
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return len(calls)
+
+        assert await cache.get_or_load("t", {}, policy, loader) == 1
+        assert await cache.get_or_load("t", {}, policy, loader) == 1
+        now[0] = 2.0
+        assert await cache.get_or_load("t", {}, policy, loader) == 2
+
+
+class TestRemoteTransport:
+    """MCP 远程传输测试"""
+
+    @staticmethod
+    async def _client_with_remote(transport, **config) -> MCPClient:
+        client = MCPClient(cache_size=0)
+        await client.connect()
+        client._remotes["gaoxian"] = RemoteMCPTransport(
+            "gaoxian", "http://gaoxian", RemoteTransportConfig(**config), transport=transport
+        )
+        return client
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_batched(self):
+        """测试并发调用合并为一个 JSON-RPC batch 请求"""
+        server_handler = _CountingHandler()
+        client = await self._client_with_remote(
+            httpx.ASGITransport(app=create_jsonrpc_app(server_handler))
+        )
+        local_handler = client._mcp_handlers["gaoxian"] = _CountingHandler()
+
+        results = await client.call_tools([
+            ("robot_get_status", {"robot_id": f"r{i}"}) for i in range(5)
+        ])
+
+        assert all(r.success for r in results)
+        assert [r.data["tool"] for r in results] == ["robot_get_status"] * 5
+        assert len(server_handler.calls) == 5
+        assert local_handler.calls == []
+        stats = client.get_transport_stats()["gaoxian"]
+        assert stats["requests"] == 1
+        assert stats["batched_calls"] == 5
+        await client.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_fallback_to_local_and_circuit_opens(self):
+        """测试远程失败时回退本地 handler，连续失败后熔断"""
+        def refuse(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        client = await self._client_with_remote(
+            httpx.MockTransport(refuse), failure_threshold=2
+        )
+        local_handler = client._mcp_handlers["gaoxian"] = _CountingHandler()
+
+        for _ in range(3):
+            result = await client.call_tool("robot_get_status", {"robot_id": "r1"})
+            assert result.success
+
+        assert len(local_handler.calls) == 3
+        stats = client.get_transport_stats()["gaoxian"]
+        assert stats["failures"] == 2
+        assert stats["rejected"] == 1
+        assert stats["breaker"] == "open"
+        assert stats["fallbacks"] == 3
+        await client.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_write_not_replayed_locally_after_send(self):
+        """测试写操作发出后失败 (如读超时) 不回退本地，连接失败时才回退"""
+        def read_timeout(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        client = await self._client_with_remote(httpx.MockTransport(read_timeout))
+        local_handler = client._mcp_handlers["gaoxian"] = _CountingHandler()
+
+        write = await client.call_tool("robot_start_task", {"robot_id": "r1"})
+        read = await client.call_tool("robot_get_status", {"robot_id": "r1"})
+
+        assert not write.success and write.error_code == "REMOTE_UNAVAILABLE"
+        assert read.success
+        assert local_handler.calls == ["robot_get_status"]
+        await client.disconnect()
+
+        def refuse(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        client = await self._client_with_remote(httpx.MockTransport(refuse))
+        local_handler = client._mcp_handlers["gaoxian"] = _CountingHandler()
+
+        assert (await client.call_tool("robot_start_task", {"robot_id": "r1"})).success
+        assert len(local_handler.calls) == 1
+        await client.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_remote_error_without_local_handler(self):
+        """测试没有本地 handler 时返回 REMOTE_UNAVAILABLE"""
+        def refuse(request):
+            raise httpx.ConnectError("connection refused", request=request)
+
+        client = await self._client_with_remote(httpx.MockTransport(refuse))
+        client._mcp_handlers.pop("gaoxian")
+
+        result = await client.call_tool("robot_get_status", {"robot_id": "r1"})
+
+        assert not result.success
+        assert result.error_code == "REMOTE_UNAVAILABLE"
+        await client.disconnect()
+
+    def test_circuit_breaker_half_open(self):
+        """测试熔断到期后只放行一个探测请求"""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+
+        now[0] = 10.0
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        now[0] = 20.0
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.allow()
+
+    @pytest.mark.asyncio
+    async def test_jsonrpc_errors(self):
+        """测试 JSON-RPC 协议错误"""
+        app = create_jsonrpc_app(_CountingHandler())
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://mcp"
+        ) as http:
+            response = await http.post("/rpc", content=b"{not json")
+            assert response.json()["error"]["code"] == -32700
+
+            response = await http.post("/rpc", json=[
+                {"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+                {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+                 "params": {"name": "robot_get_status", "arguments": {}}},
+            ])
+            first, second = response.json()
+            assert first["error"]["code"] == -32601
+            assert second["result"]["success"] is True
+
+
 # ============================================================
 # Escalation Tests
 # ============================================================
@@ -245,6 +557,237 @@ class TestActivityLogger:
         assert stats["by_type"]["tool_call"] == 1
         assert stats["by_type"]["decision"] == 1
 
+    def test_memory_bounded(self):
+        """测试内存层有界，索引随淘汰同步收缩"""
+        logger = ActivityLogger(buffer_size=1000, max_in_memory=50)
+        for i in range(500):
+            logger.log_tool_call(f"agent_{i % 7}", f"tenant_{i % 3}", "tool", {}, True)
+
+        assert len(logger._all_activities) == 50
+        assert sum(len(q) for q in logger._by_agent.values()) == 50
+        assert sum(len(q) for q in logger._by_tenant.values()) == 50
+        assert logger.get_stats()["total"] == 500
+        assert logger.get_stats()["by_type"]["tool_call"] == 500
+
+    @pytest.mark.asyncio
+    async def test_query_uses_newest_first(self, logger):
+        """测试查询按时间倒序并遵守 limit"""
+        for i in range(5):
+            logger.log_tool_call("agent_1", "tenant_001", f"tool_{i}", {}, True)
+
+        results = await logger.query(tenant_id="tenant_001", limit=2)
+        assert [a.tool_name for a in results] == ["tool_4", "tool_3"]
+
+    @pytest.mark.asyncio
+    async def test_query_out_of_order_timestamps(self, logger):
+        """测试写入顺序与时间戳不一致时按时间过滤和排序"""
+        base = datetime(2026, 1, 20, 8, 0)
+        for name, minutes in (("late", 30), ("early", 0), ("middle", 10)):
+            logger.log(AgentActivity(
+                agent_id="agent_1", tenant_id="tenant_001", activity_type="tool_call",
+                tool_name=name, timestamp=base + timedelta(minutes=minutes)
+            ))
+
+        results = await logger.query(agent_id="agent_1", start_time=base + timedelta(minutes=5))
+        assert [a.tool_name for a in results] == ["late", "middle"]
+
+    def test_buffer_evicted_without_storage(self):
+        """测试无存储时缓冲区溢出计为 evicted 而非 dropped"""
+        logger = ActivityLogger(buffer_size=10, max_buffered=25)
+        for _ in range(40):
+            logger.log_tool_call("agent_1", "tenant_001", "tool", {}, True)
+
+        stats = logger.get_stats()
+        assert stats["buffered"] == 25
+        assert stats["evicted"] == 15
+        assert stats["dropped"] == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_single_flight_and_retry(self):
+        """测试单飞刷新、分批写入和失败重试"""
+
+        class FlakySink:
+            def __init__(self):
+                self.batches = []
+                self.fail = True
+
+            async def save_activities(self, activities):
+                if self.fail:
+                    raise ConnectionError("db down")
+                self.batches.append(len(activities))
+
+        sink = FlakySink()
+        logger = ActivityLogger(storage=sink, buffer_size=10, max_buffered=25)
+        for _ in range(40):
+            logger.log_tool_call("agent_1", "tenant_001", "tool", {}, True)
+        await logger._pending_flush
+
+        stats = logger.get_stats()
+        assert stats["buffered"] == 25
+        assert stats["dropped"] == 15
+        assert stats["flush_failures"] == 1
+
+        sink.fail = False
+        await logger._flush()
+        assert sink.batches == [10, 10, 5]
+        assert logger.get_stats()["flushed"] == 25
+
+    @pytest.mark.asyncio
+    async def test_jsonl_sink_rotation(self, tmp_path):
+        """测试 JSONL sink 按大小切分并保留有限文件"""
+        sink = JsonlActivitySink(str(tmp_path), max_bytes=200, max_files=3)
+        for i in range(10):
+            await sink.save_activities([AgentActivity(agent_id=f"agent_{i}")])
+
+        files = sink.list_files()
+        assert 1 < len(files) <= 3
+        last = files[-1].read_text(encoding="utf-8").strip().splitlines()
+        assert '"agent_9"' in last[-1]
+
+
+# ============================================================
+# Scheduler Tests
+# ============================================================
+
+class TestAgentScheduler:
+    """周期调度器测试"""
+
+    def test_latency_histogram(self):
+        """测试延迟直方图分位数"""
+        hist = LatencyHistogram()
+        for value in [1, 2, 3, 40, 900]:
+            hist.observe(value)
+
+        data = hist.to_dict()
+        assert data["count"] == 5
+        assert data["p50_ms"] == 5
+        assert data["p99_ms"] == 1000
+        assert data["max_ms"] == 900
+
+    def test_shard_for_stable(self):
+        """测试分片分配稳定且覆盖所有分片"""
+        shards = {shard_for(f"agent_{i}", 4) for i in range(100)}
+        assert shards == {0, 1, 2, 3}
+        assert shard_for("agent_1", 4) == shard_for("agent_1", 4)
+        assert shard_for("agent_1", 1) == 0
+
+    @pytest.mark.asyncio
+    async def test_fixed_rate_cycles(self):
+        """测试固定速率周期执行"""
+        scheduler = AgentScheduler()
+        runs = []
+
+        async def cycle():
+            runs.append(asyncio.get_running_loop().time())
+
+        scheduler.schedule("agent_1", cycle, interval_seconds=0.02)
+        await asyncio.sleep(0.11)
+        await scheduler.stop()
+
+        assert 4 <= len(runs) <= 7
+        # 截止时间不随执行耗时漂移
+        assert runs[-1] - runs[0] == pytest.approx(0.02 * (len(runs) - 1), abs=0.02)
+
+    @pytest.mark.asyncio
+    async def test_skip_if_still_running(self):
+        """测试上一周期未结束时跳过"""
+        scheduler = AgentScheduler()
+        started = []
+
+        async def slow_cycle():
+            started.append(1)
+            await asyncio.sleep(0.1)
+
+        scheduler.schedule("agent_1", slow_cycle, interval_seconds=0.02)
+        await asyncio.sleep(0.07)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+
+        assert len(started) == 1
+        assert stats["cycles"]["agent_1"]["overruns"] >= 2
+
+    @pytest.mark.asyncio
+    async def test_cycle_budget_cancels(self):
+        """测试周期超出预算被取消并回调"""
+        errors = []
+
+        async def on_error(agent_id, error):
+            errors.append((agent_id, type(error).__name__))
+
+        scheduler = AgentScheduler(default_budget_seconds=0.01, on_error=on_error)
+
+        async def hanging_cycle():
+            await asyncio.sleep(10)
+
+        scheduler.schedule("agent_1", hanging_cycle, interval_seconds=1)
+        await asyncio.sleep(0.05)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+
+        assert stats["cycles"]["agent_1"]["timed_out"] == 1
+        assert errors == [("agent_1", "TimeoutError")]
+
+    @pytest.mark.asyncio
+    async def test_remove_waits_for_cancelled_cycle(self):
+        """测试 remove 等被取消的周期清理完成后才返回"""
+        scheduler = AgentScheduler()
+        events = []
+
+        async def cycle():
+            events.append("start")
+            try:
+                await asyncio.sleep(10)
+            finally:
+                await asyncio.sleep(0.01)
+                events.append("cleanup")
+
+        scheduler.schedule("agent_1", cycle, interval_seconds=1)
+        await asyncio.sleep(0.01)
+
+        assert await scheduler.remove("agent_1") is True
+        assert events == ["start", "cleanup"]
+        assert await scheduler.remove("agent_1") is False
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_tenant_concurrency_cap(self):
+        """测试每租户并发上限"""
+        scheduler = AgentScheduler(max_per_tenant=1)
+        active = 0
+        peak = 0
+
+        async def cycle():
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+        for i in range(3):
+            scheduler.schedule(f"agent_{i}", cycle, interval_seconds=1, tenant_id="tenant_001")
+        await asyncio.sleep(0.1)
+        stats = scheduler.get_stats()
+        await scheduler.stop()
+
+        assert peak == 1
+        assert sum(c["completed"] for c in stats["cycles"].values()) == 3
+
+    @pytest.mark.asyncio
+    async def test_shard_ownership(self):
+        """测试只调度本分片的 Agent"""
+        scheduler = AgentScheduler(shard_index=0, shard_count=2)
+
+        async def cycle():
+            pass
+
+        owned = [f"agent_{i}" for i in range(20) if shard_for(f"agent_{i}", 2) == 0]
+        foreign = [f"agent_{i}" for i in range(20) if shard_for(f"agent_{i}", 2) == 1]
+
+        assert scheduler.schedule(owned[0], cycle, interval_seconds=1)
+        assert not scheduler.schedule(foreign[0], cycle, interval_seconds=1)
+        assert scheduler.job_count == 1
+        await scheduler.stop()
+
 
 # ============================================================
 # Agent Runtime Tests
@@ -350,6 +893,50 @@ class TestAgentRuntime:
 
         await runtime.stop()
 
+    @pytest.mark.asyncio
+    async def test_run_agent_once_traced(self, runtime, mock_agent):
+        """测试Agent周期与MCP工具调用共享trace_id和租户标签"""
+        class _Handler:
+            async def handle(self, tool_name, arguments):
+                return {"tasks": []}
+
+        async def execute(decision):
+            await runtime.mcp_client.call_tool("task_list_tasks", {})
+            return DecisionResult(success=True, decision=decision)
+
+        await runtime.start()
+        runtime.mcp_client._mcp_handlers["task"] = _Handler()
+        runtime.register_agent(mock_agent)
+        await runtime.start_agent("test_agent_001")
+        mock_agent.execute = execute
+
+        await runtime.run_agent_once("test_agent_001", {})
+
+        tool_span, cycle_span = recent_spans()[-2:]
+        assert cycle_span["name"] == "linkc_agent_cycle_seconds"
+        assert tool_span["name"] == "linkc_mcp_tool_call_seconds"
+        assert tool_span["trace_id"] == cycle_span["trace_id"] is not None
+        assert tool_span["labels"]["tenant"] == "tenant_001"
+        assert tool_span["labels"]["agent"] == "test_agent_001"
+        assert tool_span["labels"]["server"] == "task"
+
+        await runtime.stop()
+
+    @pytest.mark.asyncio
+    async def test_stats_include_tool_cache(self):
+        """测试运行时统计包含工具缓存命中率"""
+        runtime = AgentRuntime(tool_cache_size=64)
+        await runtime.start()
+        runtime.mcp_client._mcp_handlers["task"] = _CountingHandler()
+
+        await runtime.call_tool("agent-x", "task_get_pending_tasks", {"tenant_id": "t1"})
+        await runtime.call_tool("agent-y", "task_get_pending_tasks", {"tenant_id": "t1"})
+
+        cache = runtime.get_stats()["mcp"]["cache"]
+        assert cache["tools"]["task_get_pending_tasks"]["hit_rate"] == 0.5
+
+        await runtime.stop()
+
     @pytest.mark.asyncio
     async def test_escalate(self, runtime, mock_agent):
         """测试异常升级"""
@@ -389,6 +976,34 @@ class TestAgentRuntime:
 
         await runtime.stop()
 
+    @pytest.mark.asyncio
+    async def test_agent_loop_stats(self, runtime, mock_agent):
+        """测试 Agent 循环的周期延迟统计"""
+        await runtime.start()
+        runtime.register_agent(mock_agent)
+
+        async def context_provider():
+            return {"key": "value"}
+
+        result = await runtime.start_agent_loop(
+            "test_agent_001", context_provider, interval_seconds=0.02
+        )
+        assert result is True
+        assert await runtime.start_agent_loop("test_agent_001", context_provider) is False
+
+        await asyncio.sleep(0.05)
+        stats = runtime.get_stats()
+        cycle_stats = stats["scheduler"]["cycles"]["test_agent_001"]
+        assert stats["agents"]["running_loops"] == 1
+        assert cycle_stats["completed"] >= 2
+        assert cycle_stats["latency"]["count"] >= 2
+        assert cycle_stats["agent_type"] == "MockAgent"
+
+        assert await runtime.stop_agent_loop("test_agent_001") is True
+        assert runtime.get_stats()["agents"]["running_loops"] == 0
+
+        await runtime.stop()
+
 
 # ============================================================
 # Integration Tests
@@ -0,0 +1,313 @@
+"""
+A1: MCP 工具结果缓存
+====================
+MCPClient 的读穿透缓存，按工具元数据决定是否缓存:
+
+- ToolCachePolicy: 幂等标记、TTL、参与缓存键的参数字段
+- 有界 LRU: 超过 max_entries 时淘汰最久未使用的条目
+- single-flight: 并发的相同调用只执行一次 handler
+- 写工具失效: 按 WRITE_INVALIDATIONS 精确失效相关读工具的条目；
+  未声明策略的工具视为写操作，失效同一 MCP Server 的全部缓存，
+  并推进全局代数，进行中的读调用都不再回填
+
+MCPClient 默认不启用缓存 (cache_size=0)，由调用方按需开启。
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import json
+import time
+
+from src.shared.metrics import counter
+
+TOOL_CACHE_TOTAL = counter(
+    "linkc_mcp_tool_cache_total",
+    "MCP tool result cache lookups",
+    ["tool", "result"],
+)
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """工具缓存策略"""
+    ttl_seconds: float = 5.0
+    key_fields: Tuple[str, ...] = ()    # 为空时使用全部参数
+    idempotent: bool = True             # False: 读但有副作用 (如游标)，不缓存也不触发失效
+
+
+# 默认缓存策略 (只读工具)
+DEFAULT_CACHE_POLICIES: Dict[str, ToolCachePolicy] = {
+    # M1 空间
+    "space_list_buildings": ToolCachePolicy(300, ("tenant_id",)),
+    "space_get_building": ToolCachePolicy(300, ("building_id",)),
+    "space_list_floors": ToolCachePolicy(300, ("building_id",)),
+    "space_get_floor": ToolCachePolicy(300, ("floor_id",)),
+    "space_list_zones": ToolCachePolicy(60),
+    "space_get_zone": ToolCachePolicy(60, ("zone_id",)),
+    "space_list_points": ToolCachePolicy(60),
+    # M2 任务
+    "task_get_task": ToolCachePolicy(5, ("task_id",)),
+    "task_list_tasks": ToolCachePolicy(5),
+    "task_get_pending_tasks": ToolCachePolicy(5),
+    "task_get_schedule": ToolCachePolicy(60, ("schedule_id",)),
+    "task_list_schedules": ToolCachePolicy(60),
+    "task_get_upcoming_schedules": ToolCachePolicy(5),
+    # M3 机器人
+    "robot_list_robots": ToolCachePolicy(5),
+    "robot_get_robot": ToolCachePolicy(30, ("robot_id",)),
+    "robot_get_status": ToolCachePolicy(2, ("robot_id",)),
+    "robot_batch_get_status": ToolCachePolicy(2),
+    "robot_get_errors": ToolCachePolicy(5),
+    "robot_get_status_changes": ToolCachePolicy(idempotent=False),
+}
+
+# 写工具 → ((读工具, 匹配字段), ...)；匹配字段为空时失效该读工具的全部条目
+_ROBOT_STATE_READS = (
+    ("robot_get_status", ("robot_id",)),
+    ("robot_get_robot", ("robot_id",)),
+    ("robot_batch_get_status", ()),
+    ("robot_list_robots", ()),
+)
+_TASK_LIST_READS = (
+    ("task_get_pending_tasks", ()),
+    ("task_list_tasks", ()),
+)
+
+WRITE_INVALIDATIONS: Dict[str, Tuple[Tuple[str, Tuple[str, ...]], ...]] = {
+    "robot_start_task": _ROBOT_STATE_READS + _TASK_LIST_READS,
+    "robot_pause_task": _ROBOT_STATE_READS,
+    "robot_resume_task": _ROBOT_STATE_READS,
+    "robot_cancel_task": _ROBOT_STATE_READS + _TASK_LIST_READS,
+    "robot_go_to_location": _ROBOT_STATE_READS,
+    "robot_go_to_charge": _ROBOT_STATE_READS,
+    "robot_clear_error": _ROBOT_STATE_READS + (("robot_get_errors", ()),),
+    "task_update_status": (("task_get_task", ("task_id",)),) + _TASK_LIST_READS,
+    "task_create_task": _TASK_LIST_READS,
+    "task_generate_daily_tasks": _TASK_LIST_READS,
+    "task_create_schedule": (("task_list_schedules", ()), ("task_get_upcoming_schedules", ())),
+    "task_update_schedule": (
+        ("task_get_schedule", ("schedule_id",)),
+        ("task_list_schedules", ()),
+        ("task_get_upcoming_schedules", ()),
+    ),
+    "space_update_zone": (("space_get_zone", ("zone_id",)), ("space_list_zones", ())),
+}
+
+
+@dataclass
+class ToolCacheStats:
+    """单个工具的缓存统计"""
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0      # 合并到进行中调用的次数
+    invalidated: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidated": self.invalidated,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    value: Any
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+CacheKey = Tuple[str, str]
+
+
+class _LeaderCancelled(Exception):
+    """进行中的调用被其发起方取消，等待者需重试"""
+
+
+class ToolResultCache:
+    """
+    有界 LRU + single-flight 的工具结果缓存
+
+    缓存的结果在多个调用方之间共享，调用方应视为只读。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        # 失效代数，防止失效前发起的调用回填旧结果:
+        # 每个读工具一个；全局代数在未声明的写工具和 clear() 时推进
+        self._generations: Dict[str, int] = {}
+        self._global_generation = 0
+        self._stats: Dict[str, ToolCacheStats] = {}
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: Dict[str, Any], policy: ToolCachePolicy) -> CacheKey:
+        """缓存键: 工具名 + 参与键的参数 (tenant_id 总是参与，避免跨租户共享)"""
+        if policy.key_fields:
+            fields = set(policy.key_fields)
+            if "tenant_id" in arguments:
+                fields.add("tenant_id")
+            selected = {name: arguments.get(name) for name in sorted(fields)}
+        else:
+            selected = arguments
+        return tool_name, json.dumps(selected, sort_keys=True, default=str)
+
+    def _stat(self, tool_name: str) -> ToolCacheStats:
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            stats = self._stats[tool_name] = ToolCacheStats()
+        return stats
+
+    async def get_or_load(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        policy: ToolCachePolicy,
+        loader: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """
+        读穿透
+
+        Args:
+            loader: 未命中时调用的协程函数
+            cacheable: 判断结果是否写入缓存 (如只缓存成功结果)
+        """
+        key = self.make_key(tool_name, arguments, policy)
+        stats = self._stat(tool_name)
+
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    stats.hits += 1
+                    TOOL_CACHE_TOTAL.inc(tool=tool_name, result="hit")
+                    return entry.value
+                del self._entries[key]
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            stats.coalesced += 1
+            TOOL_CACHE_TOTAL.inc(tool=tool_name, result="coalesced")
+            try:
+                return await asyncio.shield(pending)
+            except _LeaderCancelled:
+                # 发起调用的一方被取消 (如周期超时)，本调用方重新查找或自行加载
+                continue
+
+        stats.misses += 1
+        TOOL_CACHE_TOTAL.inc(tool=tool_name, result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = (self._global_generation, self._generations.get(tool_name, 0))
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # 不取消共享的 future，否则合并进来的其他调用方也会被取消
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(value)
+        if (
+            policy.ttl_seconds > 0
+            and cacheable(value)
+            and (self._global_generation, self._generations.get(tool_name, 0)) == generation
+        ):
+            self._put(key, _Entry(self._clock() + policy.ttl_seconds, value, dict(arguments)))
+        return value
+
+    def _put(self, key: CacheKey, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_tool(
+        self,
+        tool_name: str,
+        match: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        失效某读工具的条目
+
+        Args:
+            match: 仅失效参数与之相同的条目；None 表示全部
+        """
+        self._generations[tool_name] = self._generations.get(tool_name, 0) + 1
+        doomed = [
+            key for key, entry in self._entries.items()
+            if key[0] == tool_name and (
+                not match
+                or all(entry.arguments.get(k) == v for k, v in match.items())
+            )
+        ]
+        for key in doomed:
+            del self._entries[key]
+        if doomed:
+            self._stat(tool_name).invalidated += len(doomed)
+        return len(doomed)
+
+    def invalidate_for_write(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        same_server: Callable[[str], bool]
+    ) -> int:
+        """
+        写工具调用后的失效
+
+        已声明的写工具按 WRITE_INVALIDATIONS 精确失效 (匹配字段缺失时失效全部)；
+        未声明的写工具失效 same_server 为真的所有读工具，并推进全局代数，
+        使所有进行中的读调用 (包括尚无条目的工具) 不再写入缓存。
+        """
+        targets = WRITE_INVALIDATIONS.get(tool_name)
+        if targets is None:
+            self._global_generation += 1
+            tools = {key[0] for key in self._entries}
+            return sum(self.invalidate_tool(name) for name in tools if same_server(name))
+
+        removed = 0
+        for read_tool, fields in targets:
+            match = {name: arguments[name] for name in fields if name in arguments}
+            removed += self.invalidate_tool(read_tool, match if len(match) == len(fields) else None)
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._global_generation += 1
+
+    def get_stats(self) -> dict:
+        hits = sum(s.hits + s.coalesced for s in self._stats.values())
+        total = sum(s.hits + s.misses + s.coalesced for s in self._stats.values())
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "inflight": len(self._inflight),
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "tools": {name: stats.to_dict() for name, stats in sorted(self._stats.items())},
+        }
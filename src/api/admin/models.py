@@ -194,6 +194,7 @@ class AuditLogResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class SystemConfig(BaseModel):
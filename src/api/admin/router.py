@@ -15,6 +15,7 @@ from .models import (
     AuditLogResponse, SystemConfigListResponse, SystemConfig, SystemHealthResponse
 )
 from .service import AdminService
+from src.shared.pagination import InvalidCursorError
 
 router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
 
@@ -177,13 +178,17 @@ async def get_audit_logs(
     end_time: Optional[datetime] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="分页游标 (上一页的 next_cursor)"),
     service: AdminService = Depends(get_admin_service)
 ):
     """获取审计日志"""
-    return await service.get_audit_logs(
-        tenant_id, user_id, action, resource_type,
-        start_time, end_time, page, page_size
-    )
+    try:
+        return await service.get_audit_logs(
+            tenant_id, user_id, action, resource_type,
+            start_time, end_time, page, page_size, cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 # ============================================================
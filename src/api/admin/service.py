@@ -10,6 +10,7 @@ import uuid
 import secrets
 import string
 
+from src.shared.pagination import keyset_page
 from .models import (
     TenantStatus, UserStatus, UserRole, AuditAction,
     TenantCreate, TenantUpdate, TenantContact, TenantSettings,
@@ -433,9 +434,10 @@ class AdminService:
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
         page: int = 1,
-        page_size: int = 50
+        page_size: int = 50,
+        cursor: Optional[str] = None
     ) -> AuditLogResponse:
-        """获取审计日志"""
+        """获取审计日志 (传入 cursor 时按令牌续页，忽略 page)"""
         logs = self._audit_logs.copy()
 
         if user_id:
@@ -449,13 +451,17 @@ class AdminService:
         if end_time:
             logs = [l for l in logs if l["timestamp"] <= end_time]
 
-        # 按时间倒序
-        logs.sort(key=lambda x: x["timestamp"], reverse=True)
+        # 按 (时间, 日志ID) 倒序
+        def key(log: Dict[str, Any]) -> tuple:
+            return log["timestamp"], log["log_id"]
+
+        logs.sort(key=key, reverse=True)
 
         total = len(logs)
-        start = (page - 1) * page_size
-        end = start + page_size
-        page_logs = logs[start:end]
+        page_logs, next_cursor = keyset_page(
+            logs, key, page_size, cursor,
+            descending=True, scope="timestamp:desc,log_id:desc", offset=(page - 1) * page_size
+        )
 
         items = [
             AuditLogItem(
@@ -476,7 +482,8 @@ class AdminService:
             items=items,
             total=total,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=next_cursor
         )
 
     # ========== 系统配置 ==========
@@ -58,8 +58,10 @@ from .models import (
     ApiResponse,
 )
 
+from .export import ExportEngine, ExportJob, EXPORT_SECTIONS, resolve_sections
+from .export_storage import ExportStorage, LocalExportStorage, S3ExportStorage, StoredExport
 from .service import DataService
-from .router import router
+from .router import router, get_data_service, set_data_service
 
 __all__ = [
     # 枚举
@@ -115,6 +117,17 @@ __all__ = [
     "ApiResponse",
     # 服务
     "DataService",
+    # 导出
+    "ExportEngine",
+    "ExportJob",
+    "EXPORT_SECTIONS",
+    "resolve_sections",
+    "ExportStorage",
+    "LocalExportStorage",
+    "S3ExportStorage",
+    "StoredExport",
     # 路由
     "router",
+    "get_data_service",
+    "set_data_service",
 ]
@@ -0,0 +1,543 @@
+"""
+G6: 数据查询API - 流式导出
+============================
+原始时序数据 (状态 / 位置 / 任务) 导出为 CSV、XLSX 或 Parquet:
+- TimeSeriesService.stream_range 按时间升序分批读取 (PostgreSQL 为服务端游标)
+- 编码器逐批增量写入，内存只与批大小有关，与导出行数无关
+- 后台任务执行，进度按已写出数据的时间位置估算，无需预先 COUNT
+- 写入可插拔的 ExportStorage (本地目录 / 对象存储)
+
+多个数据段时: XLSX 每段一个工作表；CSV / Parquet 每段一个文件，打包为 zip。
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, BinaryIO, Dict, List, Optional, Type
+from xml.sax.saxutils import escape
+import asyncio
+import csv
+import io
+import json
+import logging
+import math
+import re
+import zipfile
+
+from .export_storage import ExportStorage, StoredExport
+from .models import ExportFormat, ExportStatus
+from src.data.storage.base import TimeSeriesService
+from src.shared.metrics import counter, histogram, span
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - 依赖可选
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+# 导出段 → 时序表
+EXPORT_SECTIONS: Dict[str, str] = {
+    "status": "robot_status",
+    "positions": "robot_position",
+    "tasks": "task_execution",
+    "robot_status": "robot_status",
+    "robot_position": "robot_position",
+    "task_execution": "task_execution",
+}
+
+EXPORT_ROWS = counter(
+    "linkc_export_rows_total",
+    "Rows written by data exports",
+    ["format"],
+)
+EXPORT_SECONDS = histogram(
+    "linkc_export_seconds",
+    "Data export job duration",
+    ["format", "status"],
+    buckets=(1, 5, 15, 60, 300, 900, 3600),
+)
+
+_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def resolve_sections(sections: List[str]) -> List[str]:
+    """导出段 → 时序表 (去重、保持顺序)；含未知段或为空时抛出 ValueError"""
+    unknown = [section for section in sections if section not in EXPORT_SECTIONS]
+    if unknown or not sections:
+        raise ValueError(
+            f"Unsupported export sections {unknown or sections}; "
+            f"supported: {sorted(EXPORT_SECTIONS)}"
+        )
+    tables: List[str] = []
+    for section in sections:
+        table = EXPORT_SECTIONS[section]
+        if table not in tables:
+            tables.append(table)
+    return tables
+
+
+def _text(value: Any) -> Any:
+    """CSV / XLSX 单元格: 时间转 ISO 字符串，嵌套结构转 JSON"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+class _TellWriter(io.RawIOBase):
+    """为不可 seek 的 zip 条目补上 tell() (Parquet 写入需要)"""
+
+    def __init__(self, raw: BinaryIO):
+        self._raw = raw
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        n = self._raw.write(data)
+        self._pos += n
+        return n
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self) -> None:
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+
+# ============================================================
+# 编码器
+# ============================================================
+
+class ExportEncoder(ABC):
+    """
+    增量编码器
+
+    调用顺序: (begin_section → write_rows* → end_section)* → close。
+    列在段内第一批数据时确定，之后缺失的列留空、多出的列忽略。
+    所有方法都是同步阻塞的，由导出任务放到工作线程执行。
+    """
+
+    file_extension = ""
+
+    def __init__(self, fileobj: BinaryIO, archive: bool = False):
+        """
+        Args:
+            fileobj: 写入目标 (二进制)
+            archive: 多段导出，每段作为 zip 中的一个文件
+        """
+        self._fileobj = fileobj
+        self._zip = zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) if archive else None
+        self._columns: Optional[List[str]] = None
+
+    @classmethod
+    def extension_for(cls, archive: bool) -> str:
+        return "zip" if archive else cls.file_extension
+
+    def _open_entry(self, name: str) -> BinaryIO:
+        if self._zip is None:
+            return self._fileobj
+        return self._zip.open(f"{name}.{self.file_extension}", "w", force_zip64=True)
+
+    def _close_entry(self, stream: BinaryIO) -> None:
+        if self._zip is not None:
+            stream.close()
+
+    @abstractmethod
+    def begin_section(self, name: str) -> None:
+        pass
+
+    @abstractmethod
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        pass
+
+    @abstractmethod
+    def end_section(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+
+
+class CsvEncoder(ExportEncoder):
+    """CSV (UTF-8，首行为列名)"""
+
+    file_extension = "csv"
+
+    def begin_section(self, name: str) -> None:
+        self._stream = self._open_entry(name)
+        self._text = io.TextIOWrapper(self._stream, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text)
+        self._columns = None
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if self._columns is None:
+            self._columns = list(rows[0])
+            self._writer.writerow(self._columns)
+        columns = self._columns
+        self._writer.writerows([_text(row.get(c)) for c in columns] for row in rows)
+
+    def end_section(self) -> None:
+        self._text.flush()
+        self._text.detach()
+        self._close_entry(self._stream)
+
+
+class XlsxEncoder(ExportEncoder):
+    """
+    XLSX (Office Open XML)，直接流式生成工作表 XML
+
+    不依赖 openpyxl: 单元格以内联字符串 / 数值写入 zip 条目，不维护共享字符串表
+    与样式，内存与行数无关。单个工作表超过 Excel 行数上限时续写到 <名称>_2 等新表。
+    """
+
+    file_extension = "xlsx"
+    MAX_ROWS = 1_048_576
+    MAX_CELL_CHARS = 32_767
+    _ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+    _SHEET_XML = ("<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>\n"
+                  "<worksheet xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\">"
+                  "<sheetData>")
+
+    @classmethod
+    def extension_for(cls, archive: bool) -> str:
+        # 工作簿本身就是 zip 容器，多段导出写成多个工作表
+        return cls.file_extension
+
+    def __init__(self, fileobj: BinaryIO, archive: bool = False):
+        super().__init__(fileobj)
+        self._book = zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED)
+        self._sheets: List[str] = []
+        self._sheet = None
+
+    def _cell(self, value: Any) -> str:
+        if value is None:
+            return "<c/>"
+        if isinstance(value, bool):
+            return f"<c t=\"b\"><v>{int(value)}</v></c>"
+        if isinstance(value, (int, float)) and math.isfinite(value):
+            return f"<c><v>{value!r}</v></c>"
+        text = str(_text(value))[:self.MAX_CELL_CHARS]
+        text = escape(self._ILLEGAL_XML.sub("", text))
+        return f"<c t=\"inlineStr\"><is><t xml:space=\"preserve\">{text}</t></is></c>"
+
+    def _row(self, values) -> str:
+        return "<row>" + "".join(self._cell(v) for v in values) + "</row>"
+
+    def _open_sheet(self, name: str) -> None:
+        self._sheets.append(name[:31])
+        path = f"xl/worksheets/sheet{len(self._sheets)}.xml"
+        self._sheet = self._book.open(path, "w", force_zip64=True)
+        self._sheet.write(self._SHEET_XML.encode())
+        self._sheet_rows = 0
+        if self._columns is not None:
+            self._write([self._row(self._columns)])
+
+    def _close_sheet(self) -> None:
+        self._sheet.write(b"</sheetData></worksheet>")
+        self._sheet.close()
+        self._sheet = None
+
+    def _write(self, rows_xml: List[str]) -> None:
+        self._sheet.write("".join(rows_xml).encode("utf-8"))
+        self._sheet_rows += len(rows_xml)
+
+    def begin_section(self, name: str) -> None:
+        self._section = name
+        self._part = 1
+        self._columns = None
+        self._open_sheet(name)
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if self._columns is None:
+            self._columns = list(rows[0])
+            self._write([self._row(self._columns)])
+        columns = self._columns
+        while rows:
+            room = self.MAX_ROWS - self._sheet_rows
+            if room <= 0:
+                self._close_sheet()
+                self._part += 1
+                self._open_sheet(f"{self._section[:28]}_{self._part}")
+                continue
+            chunk, rows = rows[:room], rows[room:]
+            self._write([self._row([row.get(c) for c in columns]) for row in chunk])
+
+    def end_section(self) -> None:
+        self._close_sheet()
+
+    def close(self) -> None:
+        if not self._sheets:
+            self._open_sheet("Sheet1")
+            self._close_sheet()
+
+        sheets = range(1, len(self._sheets) + 1)
+        book = self._book
+        book.writestr("[Content_Types].xml", (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>\n"
+            "<Types xmlns=\"http://schemas.openxmlformats.org/package/2006/content-types\">"
+            "<Default Extension=\"rels\" ContentType=\"application/vnd.openxmlformats-package.relationships+xml\"/>"
+            "<Default Extension=\"xml\" ContentType=\"application/xml\"/>"
+            "<Override PartName=\"/xl/workbook.xml\" "
+            "ContentType=\"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml\"/>"
+            + "".join(
+                f"<Override PartName=\"/xl/worksheets/sheet{i}.xml\" "
+                "ContentType=\"application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml\"/>"
+                for i in sheets
+            )
+            + "</Types>"
+        ))
+        book.writestr("_rels/.rels", (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>\n"
+            "<Relationships xmlns=\"http://schemas.openxmlformats.org/package/2006/relationships\">"
+            "<Relationship Id=\"rId1\" "
+            "Type=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument\" "
+            "Target=\"xl/workbook.xml\"/></Relationships>"
+        ))
+        book.writestr("xl/workbook.xml", (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>\n"
+            "<workbook xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\" "
+            "xmlns:r=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships\"><sheets>"
+            + "".join(
+                f"<sheet name=\"{escape(name, {chr(34): '&quot;'})}\" sheetId=\"{i}\" r:id=\"rId{i}\"/>"
+                for i, name in zip(sheets, self._sheets)
+            )
+            + "</sheets></workbook>"
+        ))
+        book.writestr("xl/_rels/workbook.xml.rels", (
+            "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>\n"
+            "<Relationships xmlns=\"http://schemas.openxmlformats.org/package/2006/relationships\">"
+            + "".join(
+                f"<Relationship Id=\"rId{i}\" "
+                "Type=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet\" "
+                f"Target=\"worksheets/sheet{i}.xml\"/>"
+                for i in sheets
+            )
+            + "</Relationships>"
+        ))
+        book.close()
+
+
+class ParquetEncoder(ExportEncoder):
+    """
+    Parquet (需 pyarrow)
+
+    schema 由段内第一个行组推断，行组满 row_group_size 行写出一次。
+    """
+
+    file_extension = "parquet"
+    row_group_size = 50_000
+
+    def __init__(self, fileobj: BinaryIO, archive: bool = False):
+        if pyarrow is None:
+            raise RuntimeError("Parquet export requires pyarrow")
+        super().__init__(fileobj, archive)
+
+    def begin_section(self, name: str) -> None:
+        stream = self._open_entry(name)
+        self._stream = _TellWriter(stream) if self._zip is not None else stream
+        self._writer = None
+        self._buffer: List[Dict[str, Any]] = []
+
+    def write_rows(self, rows: List[Dict[str, Any]]) -> None:
+        self._buffer.extend(
+            {k: (_text(v) if isinstance(v, (dict, list, tuple)) else v) for k, v in row.items()}
+            for row in rows
+        )
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        if self._writer is None:
+            table = pyarrow.Table.from_pylist(self._buffer)
+            self._writer = pyarrow.parquet.ParquetWriter(self._stream, table.schema)
+        else:
+            table = pyarrow.Table.from_pylist(self._buffer, schema=self._writer.schema)
+        self._writer.write_table(table)
+        self._buffer = []
+
+    def end_section(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+        if self._zip is not None:
+            self._stream.close()
+
+
+ENCODERS: Dict[ExportFormat, Type[ExportEncoder]] = {
+    ExportFormat.CSV: CsvEncoder,
+    ExportFormat.XLSX: XlsxEncoder,
+    ExportFormat.PARQUET: ParquetEncoder,
+}
+
+
+# ============================================================
+# 导出任务
+# ============================================================
+
+@dataclass
+class ExportJob:
+    """导出任务状态"""
+    export_id: str
+    tenant_id: str
+    format: ExportFormat
+    sections: List[str]
+    start_date: date
+    end_date: date
+    filters: Dict[str, Any] = field(default_factory=dict)
+    status: ExportStatus = ExportStatus.PROCESSING
+    rows_exported: int = 0
+    progress: float = 0.0
+    result: Optional[StoredExport] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    completed_at: Optional[datetime] = None
+
+    @property
+    def time_range(self):
+        """[开始日 00:00, 结束日 24:00) (UTC)"""
+        start = datetime.combine(self.start_date, time.min, tzinfo=timezone.utc)
+        end = datetime.combine(self.end_date + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        return start, end - timedelta(microseconds=1)
+
+
+class ExportEngine:
+    """
+    流式导出执行器
+
+    每个任务在后台 asyncio 任务中运行；数据库读取在事件循环上，
+    编码与写文件放到工作线程，同时运行的任务数受 max_concurrent 限制。
+    """
+
+    def __init__(
+        self,
+        timeseries: Optional[TimeSeriesService],
+        storage: ExportStorage,
+        batch_size: int = 5000,
+        max_concurrent: int = 2
+    ):
+        """
+        Args:
+            timeseries: 时序数据服务 (未配置时导出任务直接失败)
+            storage: 导出文件存储
+            batch_size: 每批读取 / 编码的行数 (决定内存占用)
+            max_concurrent: 同时运行的导出任务数
+        """
+        self.timeseries = timeseries
+        self.storage = storage
+        self.batch_size = batch_size
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, job: ExportJob) -> asyncio.Task:
+        """在后台启动导出任务"""
+        task = asyncio.get_running_loop().create_task(self._guarded_run(job))
+        self._tasks[job.export_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job.export_id, None))
+        return task
+
+    async def wait(self, export_id: str) -> None:
+        """等待后台任务结束 (任务不存在或已结束时立即返回)"""
+        task = self._tasks.get(export_id)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _guarded_run(self, job: ExportJob) -> None:
+        async with self._slots:
+            await self.run(job)
+
+    def _filters(self, job: ExportJob) -> Dict[str, Any]:
+        # 过滤条件的键会拼进 SQL，只接受普通列名
+        filters = dict(job.filters)
+        for key in filters:
+            if not _IDENTIFIER.match(key):
+                raise ValueError(f"Invalid export filter: {key}")
+        filters["tenant_id"] = job.tenant_id
+        return filters
+
+    async def run(self, job: ExportJob) -> None:
+        """执行导出，结果与进度写回 job"""
+        key = fileobj = None
+        try:
+            with span(EXPORT_SECONDS, format=job.format.value):
+                encoder_cls = ENCODERS.get(job.format)
+                if encoder_cls is None:
+                    raise ValueError(f"Raw data export does not support {job.format.value}")
+                if self.timeseries is None:
+                    raise RuntimeError("No timeseries service configured for data export")
+                tables = resolve_sections(job.sections)
+                filters = self._filters(job)
+
+                archive = len(tables) > 1
+                key = f"{job.export_id}.{encoder_cls.extension_for(archive)}"
+                fileobj = await asyncio.to_thread(self.storage.open, key)
+                encoder = encoder_cls(fileobj, archive=archive)
+                for index, table in enumerate(tables):
+                    await self._export_table(job, encoder, table, filters, index, len(tables))
+                await asyncio.to_thread(encoder.close)
+
+                job.result = await self.storage.commit(key, fileobj)
+                fileobj = None
+        except asyncio.CancelledError:
+            job.status = ExportStatus.FAILED
+            job.error = "Export cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Export {job.export_id} failed: {e}")
+            job.status = ExportStatus.FAILED
+            job.error = str(e)
+        else:
+            job.status = ExportStatus.COMPLETED
+            job.progress = 1.0
+            logger.info(
+                f"Export {job.export_id} completed: {job.rows_exported} rows, "
+                f"{job.result.size} bytes"
+            )
+        finally:
+            if fileobj is not None:
+                self.storage.abort(key, fileobj)
+            job.completed_at = datetime.now(timezone.utc)
+
+    async def _export_table(
+        self,
+        job: ExportJob,
+        encoder: ExportEncoder,
+        table: str,
+        filters: Dict[str, Any],
+        index: int,
+        total: int
+    ) -> None:
+        start, end = job.time_range
+        span_seconds = (end - start).total_seconds()
+
+        await asyncio.to_thread(encoder.begin_section, table)
+        async for batch in self.timeseries.stream_range(
+            table, start, end, filters, batch_size=self.batch_size
+        ):
+            await asyncio.to_thread(encoder.write_rows, batch)
+            job.rows_exported += len(batch)
+            EXPORT_ROWS.inc(len(batch), format=job.format.value)
+
+            # 数据按时间升序到达，最后一行的时间位置即本段进度
+            last = batch[-1].get("time")
+            fraction = 0.0
+            if isinstance(last, datetime) and span_seconds > 0:
+                if last.tzinfo is None:
+                    last = last.replace(tzinfo=timezone.utc)
+                fraction = min(max((last - start).total_seconds() / span_seconds, 0.0), 1.0)
+            job.progress = round((index + fraction) / total, 4)
+        await asyncio.to_thread(encoder.end_section)
+        job.progress = round((index + 1) / total, 4)
@@ -0,0 +1,177 @@
+"""
+G6: 数据查询API - 导出文件存储
+================================
+导出文件的落地位置 (可插拔):
+- LocalExportStorage: 本地目录，经 /export/files/{name} 下载
+- S3ExportStorage: 对象存储 (需 boto3)，上传后返回预签名下载链接
+
+编码器在工作线程中同步写入 open() 返回的二进制文件对象；
+成功后 commit() 返回 StoredExport，失败或取消时 abort() 清理半成品。
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+import asyncio
+import os
+import tempfile
+
+try:
+    import boto3
+except ImportError:  # pragma: no cover - 依赖可选
+    boto3 = None
+
+
+@dataclass
+class StoredExport:
+    """已落地的导出文件"""
+    key: str
+    url: str
+    size: int
+    expires_at: Optional[datetime] = None
+
+
+class ExportStorage(ABC):
+    """导出文件存储接口"""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """打开写入目标 (在工作线程中调用)"""
+        pass
+
+    @abstractmethod
+    async def commit(self, key: str, fileobj: BinaryIO) -> StoredExport:
+        """写入完成: 关闭文件并发布，返回下载信息"""
+        pass
+
+    @abstractmethod
+    def abort(self, key: str, fileobj: BinaryIO) -> None:
+        """放弃写入: 关闭并删除半成品"""
+        pass
+
+
+class LocalExportStorage(ExportStorage):
+    """
+    本地目录存储
+
+    写入 <key>.part，完成后原子改名，下载方不会读到未写完的文件。
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        base_url: str = "/api/v1/data/export/files",
+        url_ttl: timedelta = timedelta(hours=24)
+    ):
+        """
+        Args:
+            directory: 导出目录 (默认 $LINKC_EXPORT_DIR 或系统临时目录下 linkc-exports)
+            base_url: 下载链接前缀
+            url_ttl: 下载链接有效期 (写入 expires_at，过期清理由部署侧负责)
+        """
+        self.directory = Path(
+            directory
+            or os.environ.get("LINKC_EXPORT_DIR")
+            or Path(tempfile.gettempdir()) / "linkc-exports"
+        )
+        self.base_url = base_url.rstrip("/")
+        self.url_ttl = url_ttl
+
+    def path_for(self, key: str) -> Optional[Path]:
+        """已完成文件的路径 (key 只允许单层文件名)"""
+        if not key or Path(key).name != key or key.endswith(".part"):
+            return None
+        path = self.directory / key
+        return path if path.is_file() else None
+
+    def open(self, key: str) -> BinaryIO:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return open(self.directory / f"{key}.part", "wb")
+
+    async def commit(self, key: str, fileobj: BinaryIO) -> StoredExport:
+        fileobj.close()
+        final = self.directory / key
+        os.replace(self.directory / f"{key}.part", final)
+        return StoredExport(
+            key=key,
+            url=f"{self.base_url}/{key}",
+            size=final.stat().st_size,
+            expires_at=datetime.now(timezone.utc) + self.url_ttl
+        )
+
+    def abort(self, key: str, fileobj: BinaryIO) -> None:
+        fileobj.close()
+        try:
+            (self.directory / f"{key}.part").unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3ExportStorage(ExportStorage):
+    """
+    S3 兼容对象存储
+
+    先写本地临时文件，完成后 upload_file 上传 (boto3 自动分片，内存占用与文件
+    大小无关)，再删除临时文件。
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "exports/",
+        client: Any = None,
+        url_ttl: timedelta = timedelta(hours=24),
+        tmp_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            bucket: 存储桶
+            prefix: 对象键前缀
+            client: boto3 S3 client (为空时按默认凭证创建)
+            url_ttl: 预签名链接有效期
+            tmp_dir: 本地临时目录
+        """
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("S3ExportStorage requires boto3")
+            client = boto3.client("s3")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = client
+        self.url_ttl = url_ttl
+        self.tmp_dir = tmp_dir
+
+    def open(self, key: str) -> BinaryIO:
+        return tempfile.NamedTemporaryFile(
+            prefix="linkc-export-", suffix=f"-{key}", dir=self.tmp_dir, delete=False
+        )
+
+    async def commit(self, key: str, fileobj: BinaryIO) -> StoredExport:
+        fileobj.close()
+        object_key = f"{self.prefix}{key}"
+        try:
+            size = os.path.getsize(fileobj.name)
+            await asyncio.to_thread(self.client.upload_file, fileobj.name, self.bucket, object_key)
+            url = await asyncio.to_thread(
+                self.client.generate_presigned_url,
+                "get_object",
+                Params={"Bucket": self.bucket, "Key": object_key},
+                ExpiresIn=int(self.url_ttl.total_seconds()),
+            )
+        finally:
+            os.unlink(fileobj.name)
+        return StoredExport(
+            key=object_key,
+            url=url,
+            size=size,
+            expires_at=datetime.now(timezone.utc) + self.url_ttl
+        )
+
+    def abort(self, key: str, fileobj: BinaryIO) -> None:
+        fileobj.close()
+        try:
+            os.unlink(fileobj.name)
+        except FileNotFoundError:
+            pass
@@ -33,6 +33,7 @@ class ExportFormat(str, Enum):
     XLSX = "xlsx"
     CSV = "csv"
     PDF = "pdf"
+    PARQUET = "parquet"
 
 
 class ReportType(str, Enum):
@@ -339,6 +340,8 @@ class ExportStatusResponse(BaseModel):
     expires_at: Optional[datetime] = None
     file_size: Optional[int] = None
     error: Optional[str] = None
+    progress: float = 0.0
+    rows_exported: int = 0
 
 
 # ============================================================
@@ -6,6 +6,7 @@ G6: 数据查询API - 路由层
 from typing import Optional
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
 
 from .models import (
     Granularity, ComparisonRequest, ExportRequest,
@@ -30,6 +31,12 @@ def get_data_service() -> DataService:
     return _data_service
 
 
+def set_data_service(service: DataService):
+    """设置数据服务实例 (应用启动时注入配置好的时序服务)"""
+    global _data_service
+    _data_service = service
+
+
 def get_tenant_id() -> str:
     """获取租户ID"""
     return "tenant_001"
@@ -193,9 +200,32 @@ async def create_export(
     """
     导出数据报表
 
-    支持Excel、CSV、PDF格式
+    支持Excel、CSV、Parquet格式，后台流式导出，通过状态接口查询进度
+    """
+    try:
+        return await service.create_export(request)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/export/files/{filename}")
+async def download_export_file(
+    filename: str,
+    service: DataService = Depends(get_data_service)
+):
+    """
+    下载已完成的导出文件 (本地存储)
     """
-    return await service.create_export(request)
+    path = service.get_export_file(filename)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Export file {filename} not found"
+        )
+    return FileResponse(path, filename=filename)
 
 
 @router.get("/export/{export_id}", response_model=ExportStatusResponse)
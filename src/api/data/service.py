@@ -23,16 +23,27 @@ from .models import (
     RealtimeRobots, RealtimeTasks, DashboardRealtimeResponse
 )
 
+from .export import ExportEngine, ExportJob, resolve_sections
+from .export_storage import ExportStorage, LocalExportStorage
+
 logger = logging.getLogger(__name__)
 
 
 class DataService:
     """数据查询服务"""
 
-    def __init__(self, query_service=None, cache=None):
+    def __init__(
+        self,
+        query_service=None,
+        cache=None,
+        timeseries=None,
+        export_storage: Optional[ExportStorage] = None
+    ):
         self.query_service = query_service
         self.cache = cache
-        self._exports: Dict[str, Dict[str, Any]] = {}
+        self.export_storage = export_storage or LocalExportStorage()
+        self.exporter = ExportEngine(timeseries, self.export_storage)
+        self._exports: Dict[str, ExportJob] = {}
 
     # ========== KPI概览 ==========
 
@@ -435,19 +446,30 @@ class DataService:
         self,
         request: ExportRequest
     ) -> ExportCreateResponse:
-        """创建导出任务"""
+        """
+        创建导出任务 (后台流式导出，立即返回)
+
+        Raises:
+            ValueError: include_sections 含不支持的数据段
+        """
+        resolve_sections(request.include_sections)
         export_id = f"export_{uuid.uuid4().hex[:8]}"
 
-        self._exports[export_id] = {
-            "export_id": export_id,
-            "request": request,
-            "status": ExportStatus.PROCESSING.value,
-            "created_at": datetime.now(timezone.utc)
-        }
+        job = ExportJob(
+            export_id=export_id,
+            tenant_id=request.tenant_id,
+            format=request.format,
+            sections=request.include_sections,
+            start_date=request.date_range.start,
+            end_date=request.date_range.end,
+            filters=request.filters or {}
+        )
+        self._exports[export_id] = job
+        self.exporter.submit(job)
 
         return ExportCreateResponse(
             export_id=export_id,
-            status=ExportStatus.PROCESSING,
+            status=job.status,
             estimated_time=30
         )
 
@@ -456,26 +478,28 @@ class DataService:
         export_id: str
     ) -> Optional[ExportStatusResponse]:
         """获取导出状态"""
-        if export_id not in self._exports:
+        job = self._exports.get(export_id)
+        if job is None:
             return None
 
-        export = self._exports[export_id]
-
-        # 模拟完成
-        if export["status"] == ExportStatus.PROCESSING.value:
-            export["status"] = ExportStatus.COMPLETED.value
-            export["download_url"] = f"https://storage.ecis-robot.local/exports/{export_id}.xlsx"
-            export["expires_at"] = datetime.now(timezone.utc) + timedelta(hours=24)
-            export["file_size"] = 256000
-
+        result = job.result
         return ExportStatusResponse(
             export_id=export_id,
-            status=ExportStatus(export["status"]),
-            download_url=export.get("download_url"),
-            expires_at=export.get("expires_at"),
-            file_size=export.get("file_size")
+            status=job.status,
+            download_url=result.url if result else None,
+            expires_at=result.expires_at if result else None,
+            file_size=result.size if result else None,
+            error=job.error,
+            progress=job.progress,
+            rows_exported=job.rows_exported
         )
 
+    def get_export_file(self, filename: str):
+        """本地存储的导出文件路径 (对象存储走预签名链接，返回 None)"""
+        if not isinstance(self.export_storage, LocalExportStorage):
+            return None
+        return self.export_storage.path_for(filename)
+
     # ========== 实时仪表板 ==========
 
     async def get_realtime_dashboard(
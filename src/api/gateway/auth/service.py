@@ -11,6 +11,8 @@ import hashlib
 import secrets
 import logging
 
+from src.shared.auth.token_cache import RevocationStore
+
 from .models import (
     UserStatus, UserCreate, UserUpdate, UserInDB, UserResponse,
     RoleInDB, RoleCreate, RoleUpdate, RoleResponse,
@@ -135,7 +137,8 @@ class InMemoryAuthStorage:
     def __init__(self):
         self.users: Dict[str, UserInDB] = {}
         self.roles: Dict[str, RoleInDB] = {}
-        self.token_blacklist: set = set()
+        # 按过期时间分桶，token 过期后自动清理
+        self.token_blacklist = RevocationStore()
         self._init_default_data()
 
     def _init_default_data(self):
@@ -264,9 +267,15 @@ class AuthService:
             user=self._user_to_response(user)
         )
 
+    def _revoke(self, token: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        """吊销到 token 过期为止 (已过期或无法解码的 token 本身就会被拒绝)"""
+        payload = payload or self.jwt_helper.decode_token(token)
+        if payload:
+            self.storage.token_blacklist.revoke(token, payload["exp"])
+
     async def logout(self, token: str) -> bool:
         """用户登出"""
-        self.storage.token_blacklist.add(token)
+        self._revoke(token)
         return True
 
     async def refresh_token(self, refresh_token: str) -> Optional[Dict[str, Any]]:
@@ -295,7 +304,7 @@ class AuthService:
         new_refresh_token = self.jwt_helper.create_refresh_token(user)
 
         # 将旧刷新Token加入黑名单
-        self.storage.token_blacklist.add(refresh_token)
+        self._revoke(refresh_token, payload)
 
         return {
             "access_token": new_access_token,
@@ -16,6 +16,9 @@ from .models import (
     ZoneCreate, ZoneUpdate, ZoneInDB, ZoneResponse, ZoneDetailResponse, ZoneSummary,
     PointCreate, PointUpdate, PointInDB, PointResponse
 )
+from src.data.query.coverage import CoverageEngine
+from src.shared.spatial import ZoneSpatialIndex, polygon_centroid, polygon_points
+from src.shared.travel import PLACE_CHARGING, PLACE_ELEVATOR, PLACE_ZONE, Place, TravelCostService
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +114,12 @@ class SpaceService:
 
     def __init__(self, storage: Optional[InMemorySpaceStorage] = None):
         self.storage = storage or InMemorySpaceStorage()
+        # 位置 → 区域 的空间索引，区域增删改时按楼层失效
+        self.zone_index = ZoneSpatialIndex(self._floor_zone_boundaries)
+        # 区域 / 充电点间的行程代价矩阵，空间数据变化时按楼宇增量更新
+        self.travel_costs = TravelCostService(self._building_places, self._building_of)
+        # 按位置轨迹计算的区域覆盖率，楼层栅格按需由区域边界构建
+        self.coverage = CoverageEngine(zone_loader=self._coverage_zones)
 
     # ==================== 楼宇管理 ====================
 
@@ -297,6 +306,7 @@ class SpaceService:
         )
 
         self.storage.floors[floor_id] = floor
+        self.travel_costs.invalidate(floor.building_id)
         return self._floor_to_response(floor)
 
     async def get_floor(self, floor_id: str, tenant_id: str) -> Optional[FloorDetailResponse]:
@@ -361,6 +371,7 @@ class SpaceService:
             floor.status = data.status
 
         floor.updated_at = datetime.now(timezone.utc)
+        self.travel_costs.invalidate(floor.building_id)
         return self._floor_to_response(floor)
 
     async def delete_floor(self, floor_id: str, tenant_id: str) -> bool:
@@ -371,6 +382,7 @@ class SpaceService:
 
         floor.status = EntityStatus.DELETED
         floor.updated_at = datetime.now(timezone.utc)
+        self.travel_costs.invalidate(floor.building_id)
         return True
 
     async def get_floor_map(self, floor_id: str, tenant_id: str) -> Optional[FloorMapResponse]:
@@ -473,6 +485,9 @@ class SpaceService:
         )
 
         self.storage.zones[zone_id] = zone
+        self.zone_index.invalidate(zone.floor_id)
+        self.coverage.invalidate(zone.floor_id)
+        self.travel_costs.invalidate(self._building_of(zone.floor_id))
         return self._zone_to_response(zone)
 
     async def get_zone(self, zone_id: str, tenant_id: str) -> Optional[ZoneDetailResponse]:
@@ -486,6 +501,19 @@ class SpaceService:
 
         # 获取点位列表
         points = [p for p in self.storage.points.values() if p.zone_id == zone_id]
+        # 覆盖率只在楼层当天有位置数据时给出，未接入位置采集时不展示
+        today = datetime.now(timezone.utc).date()
+        coverage = next(
+            (c for c in self.coverage.zone_coverage(tenant_id, zone.floor_id, today)
+             if c.zone_id == zone_id),
+            None
+        ) if self.coverage.has_data(tenant_id, zone.floor_id, today) else None
+        statistics = {
+            "total_cleanings": 0,
+            "avg_cleaning_time_minutes": 0,
+        }
+        if coverage is not None:
+            statistics["coverage_rate"] = coverage.coverage_rate
         point_responses = [PointResponse(
             id=p.id,
             zone_id=p.zone_id,
@@ -512,11 +540,7 @@ class SpaceService:
             metadata=zone.metadata,
             points=point_responses,
             last_cleaned_at=zone.last_cleaned_at,
-            statistics={
-                "total_cleanings": 0,
-                "avg_cleaning_time_minutes": 0,
-                "coverage_rate": 0
-            },
+            statistics=statistics,
             status=zone.status,
             created_at=zone.created_at
         )
@@ -550,6 +574,10 @@ class SpaceService:
             zone.status = data.status
 
         zone.updated_at = datetime.now(timezone.utc)
+        if data.boundary is not None or data.status is not None:
+            self.zone_index.invalidate(zone.floor_id)
+            self.coverage.invalidate(zone.floor_id)
+        self.travel_costs.invalidate(self._building_of(zone.floor_id))
         return self._zone_to_response(zone)
 
     async def delete_zone(self, zone_id: str, tenant_id: str) -> bool:
@@ -560,8 +588,23 @@ class SpaceService:
 
         zone.status = EntityStatus.DELETED
         zone.updated_at = datetime.now(timezone.utc)
+        self.zone_index.invalidate(zone.floor_id)
+        self.coverage.invalidate(zone.floor_id)
+        self.travel_costs.invalidate(self._building_of(zone.floor_id))
         return True
 
+    def locate_zone(self, floor_id: str, x: float, y: float) -> Optional[str]:
+        """位置所在的区域ID"""
+        return self.zone_index.locate(floor_id, x, y)
+
+    def locate_zones(self, floor_id: str, xs: List[float], ys: List[float]) -> List[Optional[str]]:
+        """批量定位同一楼层的多个位置"""
+        return self.zone_index.locate_many(floor_id, xs, ys)
+
+    def travel_cost(self, zone_a: str, zone_b: str) -> Optional[float]:
+        """两个区域 (或充电点) 间的最短行程秒数；未知为 None，不可达为 inf"""
+        return self.travel_costs.cost(zone_a, zone_b)
+
     # ==================== 点位管理 ====================
 
     async def list_points(self, zone_id: str, tenant_id: str) -> Dict[str, Any]:
@@ -615,6 +658,8 @@ class SpaceService:
         )
 
         self.storage.points[point_id] = point
+        if point.point_type == PointType.CHARGING:
+            self.travel_costs.invalidate(self._building_of(zone_id))
         return PointResponse(
             id=point.id,
             zone_id=point.zone_id,
@@ -632,10 +677,79 @@ class SpaceService:
             return False
 
         del self.storage.points[point_id]
+        if point.point_type == PointType.CHARGING:
+            self.travel_costs.invalidate(self._building_of(point.zone_id))
         return True
 
     # ==================== 辅助方法 ====================
 
+    def _floor_zone_boundaries(self, floor_id: str) -> List[tuple]:
+        """楼层内未删除区域的 (ID, 边界)，按创建时间排序 (重叠时先创建的优先)"""
+        zones = [z for z in self.storage.zones.values()
+                 if z.floor_id == floor_id and z.status != EntityStatus.DELETED and z.boundary]
+        zones.sort(key=lambda z: z.created_at)
+        return [(z.id, z.boundary) for z in zones]
+
+    def _coverage_zones(self, tenant_id: str, floor_id: str) -> Optional[tuple]:
+        """覆盖率栅格的楼层区域与格子边长 (floor.metadata.map_resolution，默认 0.05 米)"""
+        floor = self.storage.floors.get(floor_id)
+        if floor is None or floor.tenant_id != tenant_id or floor.status == EntityStatus.DELETED:
+            return None
+        zones = [z for z in self.storage.zones.values()
+                 if z.floor_id == floor_id and z.status != EntityStatus.DELETED and z.boundary]
+        if not zones:
+            return None
+        return zones, float(floor.metadata.get("map_resolution", 0.05))
+
+    def _building_places(self, building_id: str) -> List[Place]:
+        """
+        楼宇内的行程地点: 有边界的区域 (取形心)、电梯区域、充电点
+
+        没有电梯区域的楼层以 metadata.elevator_position (默认地图原点) 作为虚拟电梯口，
+        保证跨楼层可达。
+        """
+        floors = {f.id: f for f in self.storage.floors.values()
+                  if f.building_id == building_id and f.status != EntityStatus.DELETED}
+        places: List[Place] = []
+        zones: Dict[str, ZoneInDB] = {}
+        for zone in self.storage.zones.values():
+            floor = floors.get(zone.floor_id)
+            points = polygon_points(zone.boundary) if zone.boundary else []
+            if floor is None or zone.status == EntityStatus.DELETED or not points:
+                continue
+            zones[zone.id] = zone
+            x, y = polygon_centroid(points)
+            if zone.zone_type == ZoneType.ELEVATOR:
+                places.append(Place(zone.id, floor.id, floor.floor_number, x, y, PLACE_ELEVATOR,
+                                    str(zone.metadata.get("elevator_group", "default"))))
+            else:
+                places.append(Place(zone.id, floor.id, floor.floor_number, x, y, PLACE_ZONE))
+
+        for point in self.storage.points.values():
+            zone = zones.get(point.zone_id)
+            if zone is not None and point.point_type == PointType.CHARGING:
+                floor = floors[zone.floor_id]
+                places.append(Place(point.id, floor.id, floor.floor_number, point.x, point.y, PLACE_CHARGING))
+
+        served = {p.floor_id for p in places if p.kind == PLACE_ELEVATOR}
+        for floor in floors.values():
+            if floor.id not in served:
+                position = floor.metadata.get("elevator_position") or {"x": 0, "y": 0}
+                places.append(Place(f"{floor.id}#elevator", floor.id, floor.floor_number,
+                                    float(position["x"]), float(position["y"]), PLACE_ELEVATOR))
+        return places
+
+    def _building_of(self, ref: str) -> Optional[str]:
+        """区域、点位或楼层ID → 楼宇ID"""
+        point = self.storage.points.get(ref)
+        if point is not None:
+            ref = point.zone_id
+        zone = self.storage.zones.get(ref)
+        if zone is not None:
+            ref = zone.floor_id
+        floor = self.storage.floors.get(ref)
+        return floor.building_id if floor is not None else None
+
     def _building_to_response(self, building: BuildingInDB) -> BuildingResponse:
         """转换楼宇为响应"""
         floor_count = sum(1 for f in self.storage.floors.values()
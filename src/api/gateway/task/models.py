@@ -314,6 +314,7 @@ class ExecutionListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 # ============================================================
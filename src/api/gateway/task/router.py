@@ -17,6 +17,7 @@ from .models import (
     MessageResponse
 )
 from .service import TaskService
+from src.shared.pagination import InvalidCursorError
 
 # 导入认证依赖
 import sys
@@ -214,23 +215,30 @@ async def list_executions(
     date_to: Optional[datetime] = None,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = Query(None, description="分页游标 (上一页的 next_cursor)"),
     current_user: CurrentUser = Depends(require_permission("tasks:read")),
     task_service: TaskService = Depends(get_task_service)
 ):
     """
     获取执行记录列表
+
+    深分页请使用 cursor 续页，避免按页码跳过前面的记录
     """
-    result = await task_service.list_executions(
-        tenant_id=current_user.tenant_id,
-        schedule_id=schedule_id,
-        zone_id=zone_id,
-        robot_id=robot_id,
-        status=status,
-        date_from=date_from,
-        date_to=date_to,
-        page=page,
-        page_size=page_size
-    )
+    try:
+        result = await task_service.list_executions(
+            tenant_id=current_user.tenant_id,
+            schedule_id=schedule_id,
+            zone_id=zone_id,
+            robot_id=robot_id,
+            status=status,
+            date_from=date_from,
+            date_to=date_to,
+            page=page,
+            page_size=page_size,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return ExecutionListResponse(**result)
 
 
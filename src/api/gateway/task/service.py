@@ -8,6 +8,8 @@ from datetime import datetime, timezone, timedelta
 import uuid
 import logging
 
+from src.shared.schedule import next_occurrence, parse_hhmm
+from src.shared.pagination import keyset_page
 from .models import (
     ScheduleType, CleaningMode, TaskStatus, ScheduleStatus, TaskPriority,
     RepeatConfig, ScheduleCreate, ScheduleUpdate, ScheduleInDB, ScheduleResponse,
@@ -563,9 +565,10 @@ class TaskService:
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
-        """获取执行记录列表"""
+        """获取执行记录列表 (传入 cursor 时按令牌续页，忽略 page)"""
         executions = [e for e in self.storage.executions.values()
                       if e.tenant_id == tenant_id]
 
@@ -583,19 +586,25 @@ class TaskService:
         if date_to:
             executions = [e for e in executions if e.started_at <= date_to]
 
-        # 按开始时间倒序
-        executions.sort(key=lambda e: e.started_at, reverse=True)
+        # 按 (开始时间, ID) 倒序
+        def key(e: ExecutionInDB) -> tuple:
+            return e.started_at, e.id
+
+        executions.sort(key=key, reverse=True)
 
         # 分页
         total = len(executions)
-        start = (page - 1) * page_size
-        executions = executions[start:start + page_size]
+        executions, next_cursor = keyset_page(
+            executions, key, page_size, cursor,
+            descending=True, scope="started_at:desc,id:desc", offset=(page - 1) * page_size
+        )
 
         return {
             "items": [self._execution_to_response(e) for e in executions],
             "total": total,
             "page": page,
-            "page_size": page_size
+            "page_size": page_size,
+            "next_cursor": next_cursor
         }
 
     # ==================== 辅助方法 ====================
@@ -604,18 +613,31 @@ class TaskService:
         self,
         schedule_type: ScheduleType,
         start_time: str,
-        repeat_config: Optional[RepeatConfig]
-    ) -> datetime:
-        """计算下次运行时间"""
-        now = datetime.now(timezone.utc)
-        hour, minute = map(int, start_time.split(":"))
-
-        # 简化实现：返回明天的指定时间
-        next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-        if next_run <= now:
-            next_run += timedelta(days=1)
-
-        return next_run
+        repeat_config: Optional[RepeatConfig],
+        now: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """计算下次运行时间 (严格晚于 now)"""
+        now = now or datetime.now(timezone.utc)
+        minutes = parse_hhmm(start_time)
+        if minutes is None:
+            raise ValueError(f"Invalid start_time: {start_time}")
+
+        # RepeatConfig.days_of_week 0=周一，转为 isoweekday
+        weekdays = list(range(1, 8))
+        days_of_month = None
+        if repeat_config:
+            if repeat_config.days_of_week:
+                weekdays = [d + 1 for d in repeat_config.days_of_week if 0 <= d <= 6]
+            if repeat_config.type == "monthly" and repeat_config.days_of_month:
+                days_of_month = repeat_config.days_of_month
+        elif schedule_type == ScheduleType.WEEKLY:
+            weekdays = [now.isoweekday()]
+
+        return next_occurrence(
+            now,
+            {weekday: [minutes] for weekday in weekdays},
+            days_of_month=days_of_month
+        )
 
     def _schedule_to_response(self, schedule: ScheduleInDB) -> ScheduleResponse:
         """转换排程为响应"""
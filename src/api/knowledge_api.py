@@ -230,7 +230,12 @@ class KnowledgeManagementAPI:
         """Assemble a prompt from a template, variables, and knowledge.
 
         Expected *data* keys:
-          template_id, variables (dict), scenario_category, context (dict)
+          template_id, variables (dict), scenario_category, context (dict),
+          stable_prefix (bool, default False)
+
+        Callers opting in to the stable-prefix layout also get the cacheable
+        prefix, the volatile suffix and the LLM messages with the cache
+        breakpoint set.
         """
         try:
             template_id: str = data.get("template_id", "")
@@ -238,14 +243,30 @@ class KnowledgeManagementAPI:
             scenario_category: str = data.get("scenario_category", "")
             context: Dict[str, Any] = data.get("context", {})
 
-            prompt = await self._kb.assemble_prompt(
+            if not data.get("stable_prefix", False):
+                prompt = await self._kb.assemble_prompt(
+                    template_id=template_id,
+                    variables=variables,
+                    scenario_category=scenario_category,
+                    context=context,
+                )
+                estimated_tokens = _estimate_tokens(prompt)
+                return {"prompt": prompt, "estimated_tokens": estimated_tokens}
+
+            parts = await self._kb.assemble_prompt_parts(
                 template_id=template_id,
                 variables=variables,
                 scenario_category=scenario_category,
                 context=context,
             )
-            estimated_tokens = _estimate_tokens(prompt)
-            return {"prompt": prompt, "estimated_tokens": estimated_tokens}
+            return {
+                "prompt": parts.prompt,
+                "estimated_tokens": _estimate_tokens(parts.prompt),
+                "static_prefix": parts.static_prefix,
+                "volatile_suffix": parts.volatile_suffix,
+                "prefix_tokens": parts.prefix_tokens,
+                "messages": parts.to_messages(),
+            }
         except Exception as exc:
             logger.exception("API assemble_prompt failed")
             return {"error": str(exc)}
@@ -269,6 +290,7 @@ class KnowledgeManagementAPI:
                 max_total_tokens=data.get("max_total_tokens", 4000),
                 version=data.get("version", "1.0"),
                 is_active=data.get("is_active", True),
+                static_variables=data.get("static_variables", []),
             )
             tid = await self._kb.create_template(template)
             logger.info("API create_template: %s", tid)
@@ -7,19 +7,34 @@ MCP Server HTTP API - 主入口
     uvicorn src.api.mcp_gateway.main:app --reload --port 8000
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
 from src.shared.auth import get_current_user, TokenPayload
 from src.shared.config import get_settings
+from src.shared.logging import set_request_context
+from src.shared.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    TRACE_HEADER,
+    histogram,
+    render_prometheus,
+    span,
+    trace,
+)
 
 from .routers import space, task, robot
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+HTTP_REQUEST_SECONDS = histogram(
+    "linkc_http_request_seconds",
+    "Gateway HTTP request latency",
+    ["method", "route", "status_code", "status"],
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -50,6 +65,34 @@ app.add_middleware(
 )
 
 
+# ============================================================
+# 追踪与指标
+# ============================================================
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """为每个请求开启 trace (沿用 X-Trace-Id 请求头)，记录请求耗时"""
+    with trace(trace_id=request.headers.get(TRACE_HEADER), new=True) as ctx:
+        set_request_context(request_id=ctx.trace_id)
+        with span(HTTP_REQUEST_SECONDS, method=request.method) as request_span:
+            response = await call_next(request)
+            route = request.scope.get("route")
+            request_span.label(
+                route=getattr(route, "path", "unmatched"),
+                status_code=response.status_code,
+            )
+            if response.status_code >= 500:
+                request_span.status = "error"
+        response.headers[TRACE_HEADER] = ctx.trace_id
+        return response
+
+
+@app.get("/metrics", tags=["System"], include_in_schema=False)
+async def metrics():
+    """Prometheus 指标"""
+    return Response(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # ============================================================
 # 健康检查
 # ============================================================
@@ -11,12 +11,13 @@ from src.shared.auth import get_current_user, require_permission, TokenPayload,
 from src.mcp_servers.robot_gaoxian.storage import InMemoryRobotStorage
 from src.mcp_servers.robot_gaoxian.mock_client import MockGaoxianClient
 from src.mcp_servers.robot_gaoxian.tools import RobotTools
+from src.mcp_servers.space_manager.travel import get_travel_costs
 
 router = APIRouter()
 
 # 共享存储实例
 _storage = InMemoryRobotStorage()
-_client = MockGaoxianClient(_storage)
+_client = MockGaoxianClient(_storage, travel_costs=get_travel_costs())
 _tools = RobotTools(_client, _storage)
 
 
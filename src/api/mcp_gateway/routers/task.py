@@ -81,6 +81,25 @@ async def list_schedules(
     return result.model_dump() if hasattr(result, 'model_dump') else result.__dict__
 
 
+@router.get("/schedules/upcoming")
+async def get_upcoming_schedules(
+    tenant_id: str = Query(..., description="租户ID"),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: TokenPayload = Depends(require_permission("task:read"))
+):
+    """
+    按下次执行时间获取即将执行的排班
+
+    权限: task:read
+    """
+    await check_tenant_access(current_user, tenant_id)
+    result = await _tools.handle("task_get_upcoming_schedules", {
+        "tenant_id": tenant_id,
+        "limit": limit
+    })
+    return result.model_dump() if hasattr(result, 'model_dump') else result.__dict__
+
+
 @router.get("/schedules/{schedule_id}")
 async def get_schedule(
     schedule_id: str,
@@ -237,6 +256,7 @@ async def update_task_status(
 async def generate_daily_tasks(
     tenant_id: str = Query(..., description="租户ID"),
     target_date: Optional[str] = Query(None, description="目标日期 YYYY-MM-DD"),
+    days: int = Query(1, ge=1, le=31, description="展开天数"),
     current_user: TokenPayload = Depends(require_permission("task:write"))
 ):
     """
@@ -247,6 +267,7 @@ async def generate_daily_tasks(
     await check_tenant_access(current_user, tenant_id)
     result = await _tools.handle("task_generate_daily_tasks", {
         "tenant_id": tenant_id,
-        "target_date": target_date
+        "date": target_date or date.today().isoformat(),
+        "days": days
     })
     return result.model_dump() if hasattr(result, 'model_dump') else result.__dict__
@@ -6,6 +6,8 @@ G4: 机器人管理API - 路由层
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from src.shared.downsample import DEFAULT_POINTS, MAX_POINTS
+
 from .models import (
     RobotCreate, RobotUpdate, RobotControlRequest,
     RobotListResponse, RobotDetail, RobotStatus2,
@@ -199,10 +201,11 @@ async def get_position_history(
     robot_id: str,
     start_time: str = Query(..., description="开始时间 ISO格式"),
     end_time: str = Query(..., description="结束时间 ISO格式"),
+    max_points: int = Query(DEFAULT_POINTS, ge=3, le=MAX_POINTS, description="返回的最大点数"),
     tenant_id: str = Depends(get_tenant_id),
     service: RobotService = Depends(get_robot_service)
 ):
-    """获取位置历史"""
+    """获取位置历史（降采样到固定点数）"""
     from datetime import datetime
 
     robot = await service.get_robot(robot_id, tenant_id)
@@ -221,7 +224,7 @@ async def get_position_history(
             detail="Invalid datetime format"
         )
 
-    return await service.get_position_history(robot_id, tenant_id, start, end)
+    return await service.get_position_history(robot_id, tenant_id, start, end, max_points)
 
 
 @router.get("/{robot_id}/status-history", response_model=list[StatusHistory])
@@ -229,10 +232,11 @@ async def get_status_history(
     robot_id: str,
     start_time: str = Query(..., description="开始时间 ISO格式"),
     end_time: str = Query(..., description="结束时间 ISO格式"),
+    max_points: int = Query(DEFAULT_POINTS, ge=3, le=MAX_POINTS, description="返回的最大点数"),
     tenant_id: str = Depends(get_tenant_id),
     service: RobotService = Depends(get_robot_service)
 ):
-    """获取状态历史"""
+    """获取状态历史（降采样到固定点数）"""
     from datetime import datetime
 
     robot = await service.get_robot(robot_id, tenant_id)
@@ -251,4 +255,4 @@ async def get_status_history(
             detail="Invalid datetime format"
         )
 
-    return await service.get_status_history(robot_id, tenant_id, start, end)
+    return await service.get_status_history(robot_id, tenant_id, start, end, max_points)
@@ -8,6 +8,8 @@ from datetime import datetime, timezone
 import logging
 import uuid
 
+from src.shared.downsample import DEFAULT_POINTS, clamp_points
+
 from .models import (
     RobotCreate, RobotUpdate, RobotControlRequest,
     RobotListItem, RobotDetail, RobotStatus2, RobotListResponse,
@@ -418,9 +420,15 @@ class RobotService:
         robot_id: str,
         tenant_id: str,
         start_time: datetime,
-        end_time: datetime
+        end_time: datetime,
+        max_points: Optional[int] = DEFAULT_POINTS
     ) -> List[PositionHistory]:
-        """获取位置历史"""
+        """
+        获取位置历史
+
+        降采样在数据查询层完成 (时间桶抽稀 + 以时间为横轴的 LTTB)，
+        最多返回 max_points 个点并保留楼层切换点；max_points 为 None 时返回原始轨迹。
+        """
         robot = self._robots.get(robot_id)
         if not robot or robot.get("tenant_id") != tenant_id:
             return []
@@ -428,7 +436,8 @@ class RobotService:
         if self.data_query:
             try:
                 track = await self.data_query.get_position_track(
-                    tenant_id, robot_id, start_time, end_time
+                    tenant_id, robot_id, start_time, end_time,
+                    max_points=clamp_points(max_points) if max_points is not None else None
                 )
                 return [
                     PositionHistory(
@@ -449,9 +458,15 @@ class RobotService:
         robot_id: str,
         tenant_id: str,
         start_time: datetime,
-        end_time: datetime
+        end_time: datetime,
+        max_points: Optional[int] = DEFAULT_POINTS
     ) -> List[StatusHistory]:
-        """获取状态历史"""
+        """
+        获取状态历史
+
+        降采样在数据查询层完成 (时间桶抽稀 + 按电量曲线 LTTB)，
+        最多返回 max_points 个点并保留状态切换点；max_points 为 None 时返回全部记录。
+        """
         robot = self._robots.get(robot_id)
         if not robot or robot.get("tenant_id") != tenant_id:
             return []
@@ -459,7 +474,8 @@ class RobotService:
         if self.data_query:
             try:
                 history = await self.data_query.get_status_history(
-                    tenant_id, robot_id, start_time, end_time
+                    tenant_id, robot_id, start_time, end_time,
+                    max_points=clamp_points(max_points) if max_points is not None else None
                 )
                 return [
                     StatusHistory(
@@ -3,6 +3,7 @@ Capabilities Module - 能力定义和注册
 """
 
 from .models import Capability, AgentCapabilityInfo, CapabilityMatch
+from .index import CapabilityIndex
 from .registry import (
     CapabilityRegistry,
     CLEANING_CAPABILITIES,
@@ -28,6 +29,7 @@ __all__ = [
     "CapabilityMatch",
     # Registry
     "CapabilityRegistry",
+    "CapabilityIndex",
     "CLEANING_CAPABILITIES",
     "DELIVERY_CAPABILITIES",
     "PATROL_CAPABILITIES",
@@ -0,0 +1,101 @@
+"""
+Capabilities Index - 能力前缀树索引
+
+按 "." 分段的前缀树，每个能力节点按 Agent 状态 (ready / busy / ...) 分桶保存 Agent ID。
+精确查询是一次路径查找，通配查询 ("cleaning.*") 只遍历该前缀下的能力节点，
+开销与能力种类和结果数有关，与注册的 Agent 总数无关。
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+
+class _Node:
+    """前缀树节点"""
+
+    __slots__ = ("children", "buckets")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # 状态 → 拥有该能力的 Agent ID
+        self.buckets: Dict[str, Set[str]] = {}
+
+    def walk(self) -> Iterator["_Node"]:
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.children.values())
+
+
+class CapabilityIndex:
+    """能力 ID → Agent ID 的分段前缀树 (按状态分桶)"""
+
+    def __init__(self):
+        self._root = _Node()
+
+    def add(self, agent_id: str, capability_ids: Iterable[str], status: str) -> None:
+        for capability_id in set(capability_ids):
+            node = self._root
+            for segment in capability_id.split("."):
+                node = node.children.setdefault(segment, _Node())
+            node.buckets.setdefault(status, set()).add(agent_id)
+
+    def remove(self, agent_id: str, capability_ids: Iterable[str], status: str) -> None:
+        for capability_id in set(capability_ids):
+            path = [self._root]
+            for segment in capability_id.split("."):
+                child = path[-1].children.get(segment)
+                if child is None:
+                    break
+                path.append(child)
+            else:
+                bucket = path[-1].buckets.get(status)
+                if bucket is not None:
+                    bucket.discard(agent_id)
+                    if not bucket:
+                        del path[-1].buckets[status]
+                self._prune(path, capability_id.split("."))
+
+    def move(self, agent_id: str, capability_ids: Iterable[str], old_status: str, new_status: str) -> None:
+        """Agent 状态变化时在各能力节点间换桶"""
+        if old_status != new_status:
+            self.remove(agent_id, capability_ids, old_status)
+            self.add(agent_id, capability_ids, new_status)
+
+    def find(self, pattern: str, status: Optional[str] = None) -> Set[str]:
+        """
+        查找拥有能力的 Agent ID
+
+        Args:
+            pattern: 能力 ID；以 ".*" 结尾时匹配该前缀自身及其下所有能力
+            status: 只返回该状态的 Agent (为空时不过滤)
+        """
+        wildcard = pattern.endswith(".*")
+        node = self._lookup(pattern[:-2] if wildcard else pattern)
+        if node is None:
+            return set()
+
+        result: Set[str] = set()
+        for matched in node.walk() if wildcard else (node,):
+            if status:
+                result.update(matched.buckets.get(status, ()))
+            else:
+                for bucket in matched.buckets.values():
+                    result.update(bucket)
+        return result
+
+    def _lookup(self, capability_id: str) -> Optional[_Node]:
+        node = self._root
+        for segment in capability_id.split("."):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def _prune(self, path: List[_Node], segments: List[str]) -> None:
+        """自下而上删除空节点"""
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.buckets or node.children:
+                return
+            del path[depth - 1].children[segments[depth - 1]]
@@ -6,6 +6,7 @@ import logging
 from typing import List, Optional, Dict
 from datetime import datetime
 
+from .index import CapabilityIndex
 from .models import Capability, AgentCapabilityInfo
 
 logger = logging.getLogger("ecis_robot.capabilities")
@@ -81,13 +82,18 @@ class CapabilityRegistry:
     """
     能力注册表
 
-    管理系统中所有能力定义和 Agent 能力映射
+    管理系统中所有能力定义和 Agent 能力映射。
+    Agent 状态变化须经 update_agent_status，以维护按状态分桶的能力索引。
     """
 
     def __init__(self, federation_client=None):
         self._federation_client = federation_client
         self._capabilities: Dict[str, Capability] = {}
         self._agent_capabilities: Dict[str, AgentCapabilityInfo] = {}
+        self._index = CapabilityIndex()
+        # Agent 注册顺序，查询结果按此排序
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
 
     def register_capability(self, capability: Capability) -> None:
         """注册能力定义"""
@@ -101,19 +107,30 @@ class CapabilityRegistry:
         capability_ids: List[str]
     ) -> None:
         """注册 Agent 的能力"""
-        self._agent_capabilities[agent_id] = AgentCapabilityInfo(
+        previous = self._agent_capabilities.get(agent_id)
+        if previous is not None:
+            self._index.remove(agent_id, previous.capabilities, previous.status)
+        else:
+            self._order[agent_id] = self._next_order
+            self._next_order += 1
+
+        info = AgentCapabilityInfo(
             agent_id=agent_id,
             agent_type=agent_type,
             capabilities=capability_ids,
             status="ready",
             last_updated=datetime.utcnow()
         )
+        self._agent_capabilities[agent_id] = info
+        self._index.add(agent_id, info.capabilities, info.status)
         logger.info(f"Registered agent capabilities: {agent_id} -> {capability_ids}")
 
     def unregister_agent(self, agent_id: str) -> None:
         """注销 Agent"""
         if agent_id in self._agent_capabilities:
-            del self._agent_capabilities[agent_id]
+            info = self._agent_capabilities.pop(agent_id)
+            self._index.remove(agent_id, info.capabilities, info.status)
+            del self._order[agent_id]
             logger.info(f"Unregistered agent: {agent_id}")
 
     def update_agent_status(
@@ -125,6 +142,7 @@ class CapabilityRegistry:
         """更新 Agent 状态"""
         if agent_id in self._agent_capabilities:
             info = self._agent_capabilities[agent_id]
+            self._index.move(agent_id, info.capabilities, info.status, status)
             info.status = status
             info.current_task = current_task
             info.last_updated = datetime.utcnow()
@@ -146,31 +164,14 @@ class CapabilityRegistry:
         按能力查找 Agent
 
         Args:
-            capability_id: 能力 ID，支持通配符如 "cleaning.*"
+            capability_id: 能力 ID，支持通配符如 "cleaning.*" (按 "." 分段匹配前缀)
             status: Agent 状态过滤
 
         Returns:
-            匹配的 Agent 列表
+            匹配的 Agent 列表 (按注册顺序)
         """
-        result = []
-
-        for agent_info in self._agent_capabilities.values():
-            if status and agent_info.status != status:
-                continue
-
-            for cap_id in agent_info.capabilities:
-                if self._match_capability(capability_id, cap_id):
-                    result.append(agent_info)
-                    break
-
-        return result
-
-    def _match_capability(self, pattern: str, capability_id: str) -> bool:
-        """匹配能力 ID"""
-        if pattern.endswith(".*"):
-            prefix = pattern[:-2]
-            return capability_id.startswith(prefix)
-        return pattern == capability_id
+        agent_ids = self._index.find(capability_id, status)
+        return [self._agent_capabilities[a] for a in sorted(agent_ids, key=self._order.__getitem__)]
 
     def list_all_capabilities(self) -> List[Capability]:
         """列出所有能力"""
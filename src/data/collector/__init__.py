@@ -11,8 +11,9 @@ D1: 数据采集引擎
 用法示例:
     from src.data.collector import DataCollectorEngine, CollectorConfig, CollectorType
 
-    # 创建引擎
-    engine = DataCollectorEngine()
+    # 创建引擎 (空间索引与覆盖率引擎由空间服务提供)
+    space = get_space_service()   # src.api.gateway.space
+    engine = DataCollectorEngine(zone_index=space.zone_index, coverage=space.coverage)
 
     # 添加采集器
     config = CollectorConfig(
@@ -5,7 +5,8 @@ D1: 数据采集引擎 - 核心引擎
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Callable, Any
+from collections import defaultdict
+from typing import Dict, List, Optional, Callable, Any, Union
 from datetime import datetime
 
 from .models import (
@@ -15,6 +16,7 @@ from .models import (
     CollectorType,
     CollectedData,
     RobotStatusData,
+    RobotPositionData,
     MCPTarget,
 )
 from .normalizer import DataNormalizer
@@ -26,12 +28,20 @@ logger = logging.getLogger(__name__)
 class DataCollectorEngine:
     """数据采集引擎"""
 
-    def __init__(self, storage: Optional[CollectorDataStorage] = None):
+    def __init__(self, storage: Optional[CollectorDataStorage] = None, zone_index=None, coverage=None):
+        """
+        Args:
+            storage: 采集数据存储
+            zone_index: 区域空间索引 (ZoneSpatialIndex)，用于给未上报 zone_id 的位置补全区域
+            coverage: 覆盖率引擎 (CoverageEngine)，采集到的位置增量写入
+        """
         self.collectors: Dict[str, CollectorConfig] = {}
         self.states: Dict[str, CollectorState] = {}
         self.tasks: Dict[str, asyncio.Task] = {}
         self.storage = storage or CollectorDataStorage()
         self.normalizer = DataNormalizer()
+        self.zone_index = zone_index
+        self.coverage = coverage
         self._running = False
         self._mcp_clients: Dict[str, Any] = {}
 
@@ -80,9 +90,10 @@ class DataCollectorEngine:
             from src.mcp_servers.robot_gaoxian.storage import InMemoryRobotStorage
             from src.mcp_servers.robot_gaoxian.mock_client import MockGaoxianClient
             from src.mcp_servers.robot_gaoxian.tools import RobotTools
+            from src.mcp_servers.space_manager.travel import get_travel_costs
 
             gaoxian_storage = InMemoryRobotStorage()
-            gaoxian_client = MockGaoxianClient(gaoxian_storage)
+            gaoxian_client = MockGaoxianClient(gaoxian_storage, travel_costs=get_travel_costs())
             self._mcp_clients[MCPTarget.GAOXIAN] = RobotTools(gaoxian_client, gaoxian_storage)
             logger.info("Gaoxian MCP client initialized")
         except Exception as e:
@@ -236,30 +247,33 @@ class DataCollectorEngine:
         if not result.success:
             raise RuntimeError(f"MCP call failed: {result.error}")
 
-        collected = []
+        records = []
         for robot in result.data.get("robots", []):
             # 获取详细状态
             status_result = await mcp.handle("robot_get_status", {"robot_id": robot["robot_id"]})
             if status_result.success:
                 # 标准化数据
-                normalized = self.normalizer.normalize_robot_status(
+                records.append(self.normalizer.normalize_robot_status(
                     status_result.data,
                     config.target_mcp.value,
                     config.tenant_id
-                )
-
-                # 创建采集记录
-                data = CollectedData(
-                    collector_id=config.collector_id,
-                    tenant_id=config.tenant_id,
-                    data_type=CollectorType.ROBOT_STATUS,
-                    source=config.target_mcp.value,
-                    data=normalized.model_dump()
-                )
-                collected.append(data)
+                ))
+        self._assign_zones(records)
 
-                # 存储数据
-                await self.storage.save(data)
+        collected = []
+        for normalized in records:
+            # 创建采集记录 (数据由标准化器生成，跳过重复校验)
+            data = CollectedData.model_construct(
+                collector_id=config.collector_id,
+                tenant_id=config.tenant_id,
+                data_type=CollectorType.ROBOT_STATUS,
+                source=config.target_mcp.value,
+                data=normalized.model_dump()
+            )
+            collected.append(data)
+
+            # 存储数据
+            await self.storage.save(data)
 
         logger.debug(f"Collected {len(collected)} robot status records")
         return collected
@@ -270,28 +284,53 @@ class DataCollectorEngine:
         if not result.success:
             raise RuntimeError(f"MCP call failed: {result.error}")
 
-        collected = []
+        records = []
         for robot in result.data.get("robots", []):
             status_result = await mcp.handle("robot_get_status", {"robot_id": robot["robot_id"]})
             if status_result.success and "location" in status_result.data:
-                normalized = self.normalizer.normalize_robot_position(
+                records.append(self.normalizer.normalize_robot_position(
                     status_result.data,
                     config.target_mcp.value,
                     config.tenant_id
-                )
-
-                data = CollectedData(
-                    collector_id=config.collector_id,
-                    tenant_id=config.tenant_id,
-                    data_type=CollectorType.ROBOT_POSITION,
-                    source=config.target_mcp.value,
-                    data=normalized.model_dump() if normalized else {}
-                )
-                collected.append(data)
-                await self.storage.save(data)
+                ))
+        self._assign_zones([r for r in records if r is not None])
+        if self.coverage is not None:
+            self.coverage.ingest_positions(r.model_dump() for r in records if r is not None)
+
+        collected = []
+        for normalized in records:
+            data = CollectedData.model_construct(
+                collector_id=config.collector_id,
+                tenant_id=config.tenant_id,
+                data_type=CollectorType.ROBOT_POSITION,
+                source=config.target_mcp.value,
+                data=normalized.model_dump() if normalized else {}
+            )
+            collected.append(data)
+            await self.storage.save(data)
 
         return collected
 
+    def _assign_zones(self, records: List[Union[RobotStatusData, RobotPositionData]]) -> None:
+        """按楼层批量查空间索引，补全未上报的 zone_id"""
+        if self.zone_index is None:
+            return
+        by_floor: Dict[str, list] = defaultdict(list)
+        for record in records:
+            if isinstance(record, RobotPositionData):
+                x, y = record.x, record.y
+            else:
+                x, y = record.position_x, record.position_y
+            if record.zone_id is None and record.floor_id and x is not None and y is not None:
+                by_floor[record.floor_id].append((record, x, y))
+
+        for floor_id, items in by_floor.items():
+            zone_ids = self.zone_index.locate_many(
+                floor_id, [x for _, x, _ in items], [y for _, _, y in items]
+            )
+            for (record, _, _), zone_id in zip(items, zone_ids):
+                record.zone_id = zone_id
+
     async def _collect_task_progress(self, config: CollectorConfig, mcp) -> List[CollectedData]:
         """采集任务进度"""
         # MVP简化：从M2获取任务状态
@@ -92,6 +92,7 @@ class RobotPositionData(BaseModel):
     x: float
     y: float
     floor_id: Optional[str] = None
+    zone_id: Optional[str] = None
     heading: Optional[float] = None  # 朝向角度
     speed: Optional[float] = None  # 移动速度
 
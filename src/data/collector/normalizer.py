@@ -119,6 +119,7 @@ class DataNormalizer:
             x=float(x),
             y=float(y),
             floor_id=location.get("floor_id"),
+            zone_id=raw_data.get("zone_id"),
             heading=location.get("heading"),
             speed=raw_data.get("speed"),
         )
@@ -10,6 +10,7 @@ from collections import defaultdict
 import logging
 
 from .models import CollectedData, CollectorType
+from src.shared.segments import TimeSegments
 
 logger = logging.getLogger(__name__)
 
@@ -18,25 +19,33 @@ class CollectorDataStorage:
     """
     采集数据存储
 
-    MVP阶段使用内存存储，后续接入D2数据存储服务
+    MVP阶段使用内存存储，后续接入D2数据存储服务。
+    数据按时间分段存储，过期按整段丢弃 (粒度为段宽)。
     """
 
-    def __init__(self, max_records_per_type: int = 10000, retention_hours: int = 24):
+    def __init__(
+        self,
+        max_records_per_type: int = 10000,
+        retention_hours: int = 24,
+        segment_seconds: Optional[float] = None
+    ):
         """
         初始化存储
 
         Args:
             max_records_per_type: 每种类型最大记录数
             retention_hours: 数据保留时间（小时）
+            segment_seconds: 分段宽度（秒），默认为保留时间的 1/24
         """
         self.max_records = max_records_per_type
         self.retention_hours = retention_hours
+        self.segment_seconds = segment_seconds or retention_hours * 3600 / 24
 
         # 按数据类型分组存储
-        self._data: Dict[CollectorType, List[CollectedData]] = defaultdict(list)
+        self._data: Dict[CollectorType, TimeSegments[CollectedData]] = defaultdict(self._segments)
 
         # 按robot_id索引（用于快速查询）
-        self._robot_index: Dict[str, List[CollectedData]] = defaultdict(list)
+        self._robot_index: Dict[str, TimeSegments[CollectedData]] = defaultdict(self._segments)
 
         # 统计信息
         self._stats = {
@@ -44,6 +53,9 @@ class CollectorDataStorage:
             "total_cleaned": 0,
         }
 
+    def _segments(self) -> TimeSegments[CollectedData]:
+        return TimeSegments(self.segment_seconds, lambda d: d.timestamp)
+
     async def save(self, data: CollectedData) -> str:
         """
         保存采集数据
@@ -55,18 +67,17 @@ class CollectorDataStorage:
             data_id
         """
         # 添加到类型存储
-        self._data[data.data_type].append(data)
+        self._data[data.data_type].add(data)
 
         # 更新robot索引
         robot_id = data.data.get("robot_id")
         if robot_id:
-            self._robot_index[robot_id].append(data)
+            self._robot_index[robot_id].add(data)
 
         self._stats["total_saved"] += 1
 
-        # 检查是否需要清理
-        if len(self._data[data.data_type]) > self.max_records:
-            await self._cleanup(data.data_type)
+        # 丢弃过期分段 (没有过期分段时只比较一次)
+        await self._cleanup(data.data_type, robot_id)
 
         logger.debug(f"Saved data: {data.data_id} ({data.data_type})")
         return data.data_id
@@ -90,7 +101,7 @@ class CollectorDataStorage:
         Returns:
             数据列表（按时间倒序）
         """
-        records = self._data.get(data_type, [])
+        records = list(self._data.get(data_type, ()))
 
         # 筛选
         if tenant_id:
@@ -123,7 +134,8 @@ class CollectorDataStorage:
         Returns:
             数据列表
         """
-        records = self._robot_index.get(robot_id, [])
+        segments = self._robot_index.get(robot_id)
+        records = list(segments.iter_range(start_time, end_time)) if segments else []
 
         # 筛选
         if data_type:
@@ -190,34 +202,32 @@ class CollectorDataStorage:
             "indexed_robots": len(self._robot_index),
         }
 
-    async def _cleanup(self, data_type: CollectorType) -> int:
+    async def _cleanup(self, data_type: CollectorType, robot_id: Optional[str] = None) -> int:
         """
         清理过期数据
 
         Args:
             data_type: 数据类型
+            robot_id: 同时清理该机器人的索引
 
         Returns:
             清理的记录数
         """
         cutoff_time = datetime.utcnow() - timedelta(hours=self.retention_hours)
-        original_count = len(self._data[data_type])
-
-        # 保留未过期的数据
-        self._data[data_type] = [
-            r for r in self._data[data_type]
-            if r.timestamp > cutoff_time
-        ]
-
-        # 如果仍然超过限制，删除最老的
-        if len(self._data[data_type]) > self.max_records:
-            self._data[data_type] = sorted(
-                self._data[data_type],
-                key=lambda x: x.timestamp,
-                reverse=True
-            )[:self.max_records]
-
-        cleaned_count = original_count - len(self._data[data_type])
+        segments = self._data[data_type]
+
+        # 整段丢弃过期数据，仍然超过限制时从最老的开始删除
+        expired = segments.drop_before(cutoff_time)
+        cleaned_count = expired + segments.trim_oldest(self.max_records)
+
+        # 有分段过期时清理全部机器人索引，否则只清理本次写入的机器人
+        robot_ids = list(self._robot_index) if expired else [robot_id] if robot_id else []
+        for rid in robot_ids:
+            index = self._robot_index[rid]
+            index.drop_before(cutoff_time)
+            if not index:
+                del self._robot_index[rid]
+
         self._stats["total_cleaned"] += cleaned_count
 
         if cleaned_count > 0:
@@ -236,8 +246,8 @@ class CollectorDataStorage:
             清空的记录数
         """
         if data_type:
-            count = len(self._data.get(data_type, []))
-            self._data[data_type] = []
+            count = len(self._data.get(data_type, ()))
+            self._data[data_type] = self._segments()
         else:
             count = sum(len(records) for records in self._data.values())
             self._data.clear()
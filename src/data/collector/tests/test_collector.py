@@ -17,6 +17,8 @@ from src.data.collector.models import (
 from src.data.collector.engine import DataCollectorEngine
 from src.data.collector.normalizer import DataNormalizer
 from src.data.collector.storage import CollectorDataStorage
+from src.data.query.coverage import CoverageEngine
+from src.shared.spatial import ZoneSpatialIndex
 
 
 # ============================================================
@@ -123,6 +125,52 @@ class TestCollectorDataStorage:
         records = await storage.get_latest(CollectorType.ROBOT_STATUS)
         assert len(records) == 0
 
+    @pytest.mark.asyncio
+    async def test_expired_segments_dropped(self, storage):
+        """测试过期分段整段丢弃，机器人索引同步清理"""
+        old = CollectedData(
+            collector_id="col_001",
+            tenant_id="tenant_001",
+            data_type=CollectorType.ROBOT_STATUS,
+            source="gaoxian",
+            data={"robot_id": "robot_old"},
+            timestamp=datetime.utcnow() - timedelta(hours=3)
+        )
+        await storage.save(old)
+        fresh = CollectedData(
+            collector_id="col_001",
+            tenant_id="tenant_001",
+            data_type=CollectorType.ROBOT_STATUS,
+            source="gaoxian",
+            data={"robot_id": "robot_new"}
+        )
+        await storage.save(fresh)
+
+        records = await storage.get_latest(CollectorType.ROBOT_STATUS)
+        assert [r.data_id for r in records] == [fresh.data_id]
+        assert await storage.get_by_robot("robot_old") == []
+        stats = await storage.get_stats()
+        assert stats["total_cleaned"] == 1 and stats["indexed_robots"] == 1
+
+    @pytest.mark.asyncio
+    async def test_max_records_trims_oldest(self):
+        """测试超过上限时删除最旧记录"""
+        storage = CollectorDataStorage(max_records_per_type=3, retention_hours=1)
+        saved = []
+        for i in range(5):
+            data = CollectedData(
+                collector_id="col_001",
+                tenant_id="tenant_001",
+                data_type=CollectorType.ROBOT_STATUS,
+                source="gaoxian",
+                data={"robot_id": "robot_001"},
+                timestamp=datetime.utcnow() - timedelta(minutes=5 - i)
+            )
+            saved.append(await storage.save(data))
+
+        records = await storage.get_latest(CollectorType.ROBOT_STATUS)
+        assert [r.data_id for r in records] == saved[:1:-1]
+
 
 # ============================================================
 # Normalizer Tests
@@ -293,6 +341,47 @@ class TestDataCollectorEngine:
         assert len(collectors) == 1
         assert collectors[0]["config"]["tenant_id"] == "tenant_001"
 
+    @pytest.mark.asyncio
+    async def test_position_zone_enrichment(self):
+        """测试位置采集时按空间索引补全 zone_id"""
+        class Result:
+            def __init__(self, data):
+                self.success, self.data, self.error = True, data, None
+
+        locations = {
+            "robot_001": {"x": 5, "y": 5, "floor_id": "floor_001"},
+            "robot_002": {"x": 50, "y": 5, "floor_id": "floor_001"},
+            "robot_003": {"x": 5, "y": 5, "floor_id": "floor_001"},
+        }
+
+        class FakeMCP:
+            async def handle(self, tool, args):
+                if tool == "robot_list_robots":
+                    return Result({"robots": [{"robot_id": r} for r in locations]})
+                data = {"robot_id": args["robot_id"], "location": locations[args["robot_id"]]}
+                if args["robot_id"] == "robot_003":
+                    data["zone_id"] = "reported"
+                return Result(data)
+
+        square = {"type": "polygon", "coordinates": [[0, 0], [10, 0], [10, 10], [0, 10]]}
+        index = ZoneSpatialIndex(lambda floor_id: [("zone_a", square)])
+        coverage = CoverageEngine(
+            zone_loader=lambda tenant_id, floor_id: ([{"id": "zone_a", "name": "A", "boundary": square}], 0.1)
+        )
+        engine = DataCollectorEngine(zone_index=index, coverage=coverage)
+        config = CollectorConfig(
+            name="Positions", collector_type=CollectorType.ROBOT_POSITION, tenant_id="tenant_001"
+        )
+
+        collected = await engine._collect_robot_position(config, FakeMCP())
+        zones = {c.data["robot_id"]: c.data["zone_id"] for c in collected}
+        assert zones == {"robot_001": "zone_a", "robot_002": None, "robot_003": "reported"}
+
+        # 采集到的位置同时写入覆盖率引擎
+        day = collected[0].data["timestamp"].date()
+        assert coverage.has_floor("tenant_001", "floor_001")
+        assert coverage.zone_coverage("tenant_001", "floor_001", day)[0].coverage_rate > 0
+
 
 # ============================================================
 # Integration Tests
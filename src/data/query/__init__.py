@@ -38,6 +38,8 @@ from .service import (
     DataQueryService,
 )
 
+from .coverage import CoverageEngine, FloorRaster
+
 __all__ = [
     # 通用模型
     "PagedResult",
@@ -64,4 +66,7 @@ __all__ = [
     "CacheService",
     "InMemoryCacheService",
     "DataQueryService",
+    # 覆盖率
+    "CoverageEngine",
+    "FloorRaster",
 ]
@@ -0,0 +1,417 @@
+"""
+D3: 数据查询API - 覆盖率栅格引擎
+================================
+由机器人位置轨迹计算区域的真实覆盖率:
+- 楼层按 map_resolution 栅格化；区域多边形预先栅格化为按外接矩形裁剪的位图
+- 轨迹按清洁宽度 (footprint_width) 以胶囊形状盖章，随位置到达增量更新
+- 每个楼层每天一组 levels 层位打包位图 (饱和计数): 第 k 层为被清扫超过 k 次的格子，
+  内存为 levels × 格子数 / 8 字节
+- 覆盖率与重复清扫次数由按位与 + popcount 在打包位图上直接计算
+
+清扫次数按"进入"计: 每段轨迹只为上一段足迹之外的格子加一次，原地停留或沿线前进
+不会重复计数，离开后再回来才算重扫。上一段保存在引擎中，逐点写入与整批写入结果一致。
+"""
+
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+import logging
+import math
+
+import numpy as np
+
+from .models import ZoneCoverage
+from src.shared.segments import to_epoch
+from src.shared.spatial import points_in_polygon, polygon_area, polygon_points
+
+logger = logging.getLogger(__name__)
+
+if hasattr(np, "bitwise_count"):
+    _popcount = np.bitwise_count
+else:  # pragma: no cover - numpy < 2.0
+    _POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(packed: np.ndarray) -> np.ndarray:
+        return _POPCOUNT[packed]
+
+
+Segment = Tuple[float, float, float, float]
+
+
+def _capsule(xs: np.ndarray, ys: np.ndarray, segment: Segment, r2: float) -> np.ndarray:
+    """格子中心到线段的距离是否不超过半径 (胶囊形足迹)"""
+    x0, y0, x1, y1 = segment
+    dx = xs[None, :] - x0
+    dy = ys[:, None] - y0
+    vx, vy = x1 - x0, y1 - y0
+    length2 = vx * vx + vy * vy
+    if length2 > 0:
+        t = np.clip((dx * vx + dy * vy) / length2, 0.0, 1.0)
+        dx = dx - t * vx
+        dy = dy - t * vy
+    return dx * dx + dy * dy <= r2
+
+
+@dataclass
+class _ZoneRaster:
+    """区域位图 (外接矩形内，列按字节对齐后打包)"""
+    zone_id: str
+    name: str
+    area_sqm: float
+    rows: slice
+    cols: slice        # 打包后的字节列
+    mask: np.ndarray   # uint8 (h, w/8)
+    cells: int
+
+
+class FloorRaster:
+    """单个楼层的栅格: 区域位图 + 按天的清扫计数位图"""
+
+    def __init__(
+        self,
+        floor_id: str,
+        zones: Iterable[Any],
+        resolution: float = 0.05,
+        origin: Optional[Tuple[float, float]] = None,
+        levels: int = 4
+    ):
+        """
+        Args:
+            floor_id: 楼层ID
+            zones: 区域 (ZoneInDB 或含 id/zone_id、name、boundary 的字典)
+            resolution: 格子边长 (米)，即楼层元数据中的 map_resolution
+            origin: 栅格原点 (默认取区域坐标最小值)
+            levels: 计数位图层数，重复清扫次数在此饱和
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        self.floor_id = floor_id
+        self.resolution = resolution
+        self.levels = levels
+
+        polygons = []
+        for zone in zones:
+            get = zone.get if isinstance(zone, Mapping) else lambda k, d=None: getattr(zone, k, d)
+            points = polygon_points(get("boundary"))
+            if len(points) < 3:
+                continue
+            polygons.append((get("zone_id") or get("id"), get("name") or "", points))
+
+        all_points = [p for _, _, points in polygons for p in points] or [(0.0, 0.0)]
+        min_x = min(x for x, _ in all_points)
+        min_y = min(y for _, y in all_points)
+        self.origin_x, self.origin_y = origin if origin is not None else (min_x, min_y)
+        max_x = max(x for x, _ in all_points)
+        max_y = max(y for _, y in all_points)
+        self.height = max(1, math.ceil((max_y - self.origin_y) / resolution))
+        # 列数按 8 对齐，打包后每行整字节
+        self.width = max(8, math.ceil((max_x - self.origin_x) / resolution / 8) * 8)
+
+        self.zones: List[_ZoneRaster] = [self._rasterize(*polygon) for polygon in polygons]
+        self.days: "OrderedDict[date, np.ndarray]" = OrderedDict()
+        # 日期 → {区域序号: (已清扫格子数, 清扫次数和)}，盖章时使相交区域失效
+        self._counts: Dict[date, Dict[int, Tuple[int, int]]] = {}
+
+    # ============================================================
+    # 栅格坐标
+    # ============================================================
+
+    def _window(
+        self, min_x: float, min_y: float, max_x: float, max_y: float
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """世界坐标矩形 → 格子窗口 (行 r0:r1，列 c0:c1，列按 8 对齐)；与栅格不相交时为 None"""
+        res = self.resolution
+        c0 = max(0, math.floor((min_x - self.origin_x) / res) // 8 * 8)
+        c1 = min(self.width, math.ceil((max_x - self.origin_x) / res / 8) * 8)
+        r0 = max(0, math.floor((min_y - self.origin_y) / res))
+        r1 = min(self.height, math.ceil((max_y - self.origin_y) / res))
+        if c0 >= c1 or r0 >= r1:
+            return None
+        return r0, r1, c0, c1
+
+    def _centers(self, r0: int, r1: int, c0: int, c1: int) -> Tuple[np.ndarray, np.ndarray]:
+        xs = self.origin_x + (np.arange(c0, c1) + 0.5) * self.resolution
+        ys = self.origin_y + (np.arange(r0, r1) + 0.5) * self.resolution
+        return xs, ys
+
+    def _rasterize(self, zone_id: str, name: str, points: List[Tuple[float, float]]) -> _ZoneRaster:
+        window = self._window(
+            min(x for x, _ in points), min(y for _, y in points),
+            max(x for x, _ in points), max(y for _, y in points),
+        ) or (0, 0, 0, 0)
+        r0, r1, c0, c1 = window
+        xs, ys = self._centers(r0, r1, c0, c1)
+        mask = points_in_polygon(points, xs[None, :], ys[:, None])
+        return _ZoneRaster(
+            zone_id=zone_id,
+            name=name,
+            area_sqm=round(polygon_area(points), 2),
+            rows=slice(r0, r1),
+            cols=slice(c0 // 8, c1 // 8),
+            mask=np.packbits(mask, axis=1),
+            cells=int(mask.sum()),
+        )
+
+    # ============================================================
+    # 盖章
+    # ============================================================
+
+    def stamp(self, day: date, segments: List[Tuple[Segment, Optional[Segment]]], radius: float) -> None:
+        """
+        把一批轨迹计入当天位图
+
+        Args:
+            day: 日期
+            segments: (线段, 上一段) 列表，线段为 (x0, y0, x1, y1)，起终点相同时为单点圆；
+                      只为不在上一段足迹内的格子计一次清扫
+            radius: 清洁半径 (米)
+        """
+        window = self._window(
+            min(min(s[0], s[2]) for s, _ in segments) - radius,
+            min(min(s[1], s[3]) for s, _ in segments) - radius,
+            max(max(s[0], s[2]) for s, _ in segments) + radius,
+            max(max(s[1], s[3]) for s, _ in segments) + radius,
+        )
+        if window is None:
+            return
+        r0, r1, c0, c1 = window
+        xs, ys = self._centers(r0, r1, c0, c1)
+        counts = np.zeros((r1 - r0, c1 - c0), dtype=np.uint16)
+        r2 = radius * radius
+
+        for segment, previous in segments:
+            x0, y0, x1, y1 = segment
+            # 线段外接矩形在本批窗口内的切片
+            a = np.searchsorted(xs, min(x0, x1) - radius)
+            b = np.searchsorted(xs, max(x0, x1) + radius, side="right")
+            c = np.searchsorted(ys, min(y0, y1) - radius)
+            d = np.searchsorted(ys, max(y0, y1) + radius, side="right")
+            if a >= b or c >= d:
+                continue
+            hit = _capsule(xs[a:b], ys[c:d], segment, r2)
+            if previous is not None:
+                hit &= ~_capsule(xs[a:b], ys[c:d], previous, r2)
+            counts[c:d, a:b] += hit
+
+        layers = self.days.get(day)
+        if layers is None:
+            layers = self.days[day] = np.zeros(
+                (self.levels, self.height, self.width // 8), dtype=np.uint8
+            )
+        view = layers[:, r0:r1, c0 // 8:c1 // 8]
+        old = view.copy()
+        # 本批清扫 n 次的格子 (最高层饱和)
+        added = [
+            np.packbits(counts == n if n < self.levels else counts >= n, axis=1)
+            for n in range(1, self.levels + 1)
+        ]
+        # 饱和计数: 第 k 层 (次数 > k) 在 n > k 时直接置位，否则要求原次数 > k - n
+        for k in range(self.levels):
+            for n, packed in enumerate(added, start=1):
+                view[k] |= packed if n > k else old[k - n] & packed
+
+        cached = self._counts.get(day)
+        if cached:
+            for i, zone in enumerate(self.zones):
+                if (zone.rows.start < r1 and zone.rows.stop > r0
+                        and zone.cols.start < c1 // 8 and zone.cols.stop > c0 // 8):
+                    cached.pop(i, None)
+
+    def retain(self, days: int) -> None:
+        """只保留最近 days 天的位图"""
+        while len(self.days) > days:
+            day, _ = self.days.popitem(last=False)
+            self._counts.pop(day, None)
+
+    # ============================================================
+    # 查询
+    # ============================================================
+
+    def coverage(self, day: date) -> List[ZoneCoverage]:
+        layers = self.days.get(day)
+        cached = self._counts.setdefault(day, {}) if layers is not None else {}
+        cell_area = self.resolution * self.resolution
+        result = []
+        for i, zone in enumerate(self.zones):
+            covered = passes = 0
+            if layers is not None and zone.cells:
+                if i not in cached:
+                    hits = layers[:, zone.rows, zone.cols] & zone.mask
+                    counts = _popcount(hits).reshape(self.levels, -1).sum(axis=1, dtype=np.int64)
+                    cached[i] = (int(counts[0]), int(counts.sum()))
+                covered, passes = cached[i]
+            result.append(ZoneCoverage(
+                zone_id=zone.zone_id,
+                zone_name=zone.name,
+                area_sqm=zone.area_sqm,
+                cleaned_area=round(min(covered * cell_area, zone.area_sqm), 2),
+                coverage_rate=round(covered / zone.cells * 100, 2) if zone.cells else 0.0,
+                # 已清扫格子的平均清扫次数
+                clean_count=round(passes / covered) if covered else 0,
+            ))
+        return result
+
+    def nbytes(self) -> int:
+        return sum(layers.nbytes for layers in self.days.values()) + sum(z.mask.nbytes for z in self.zones)
+
+
+class CoverageEngine:
+    """
+    覆盖率引擎
+
+    用法:
+        engine = CoverageEngine(footprint_width=0.6)
+        engine.register_floor("tenant_001", "floor_001", zones, resolution=0.05)
+        engine.ingest_positions(position_records)      # 位置到达时增量写入
+        engine.zone_coverage("tenant_001", "floor_001", date.today())
+
+    指定 zone_loader 时，未注册的楼层在首次写入或查询时按需注册；
+    区域变化后调用 invalidate 使楼层失效 (已有计数丢弃)。
+    """
+
+    def __init__(
+        self,
+        footprint_width: float = 0.6,
+        levels: int = 4,
+        max_gap_seconds: float = 30.0,
+        max_jump: float = 5.0,
+        retention_days: int = 31,
+        zone_loader: Optional[Callable[[str, str], Optional[Tuple[Iterable[Any], float]]]] = None
+    ):
+        """
+        Args:
+            footprint_width: 清洁宽度 (米)
+            levels: 重复清扫次数的计数上限
+            max_gap_seconds: 相邻位置超过该间隔不连线 (离线 / 暂停)
+            max_jump: 相邻位置超过该距离不连线 (重定位)
+            retention_days: 每个楼层保留的天数
+            zone_loader: (租户ID, 楼层ID) → (区域列表, 格子边长)；返回 None 表示该楼层不参与计算
+        """
+        self.radius = footprint_width / 2
+        self.levels = levels
+        self.max_gap_seconds = max_gap_seconds
+        self.max_jump = max_jump
+        self.retention_days = retention_days
+        self._floors: Dict[Tuple[str, str], FloorRaster] = {}
+        self._zone_loader = zone_loader
+        # loader 返回 None 的楼层，失效前不再重复加载
+        self._unknown: set = set()
+        # (租户, 机器人) → (楼层, 时间, 最后一段)，用于衔接下一批
+        self._last: Dict[Tuple[str, str], Tuple[str, float, Segment]] = {}
+
+    def register_floor(
+        self,
+        tenant_id: str,
+        floor_id: str,
+        zones: Iterable[Any],
+        resolution: float = 0.05,
+        origin: Optional[Tuple[float, float]] = None
+    ) -> FloorRaster:
+        """注册 (或重建) 楼层栅格；区域变化时重新注册，已有计数丢弃"""
+        floor = FloorRaster(floor_id, zones, resolution, origin, self.levels)
+        self._floors[(tenant_id, floor_id)] = floor
+        self._unknown.discard((tenant_id, floor_id))
+        return floor
+
+    def _floor(self, tenant_id: str, floor_id: str) -> Optional[FloorRaster]:
+        key = (tenant_id, floor_id)
+        floor = self._floors.get(key)
+        if floor is None and self._zone_loader is not None and floor_id and key not in self._unknown:
+            loaded = self._zone_loader(tenant_id, floor_id)
+            if loaded is None:
+                self._unknown.add(key)
+            else:
+                zones, resolution = loaded
+                floor = self.register_floor(tenant_id, floor_id, zones, resolution)
+        return floor
+
+    def invalidate(self, floor_id: Optional[str] = None) -> None:
+        """使某楼层 (默认全部) 失效，下次访问时经 zone_loader 重新注册"""
+        if floor_id is None:
+            self._floors.clear()
+            self._unknown.clear()
+            return
+        for key in [key for key in self._floors if key[1] == floor_id]:
+            del self._floors[key]
+        self._unknown = {key for key in self._unknown if key[1] != floor_id}
+
+    def has_floor(self, tenant_id: str, floor_id: str) -> bool:
+        return self._floor(tenant_id, floor_id) is not None
+
+    def has_data(self, tenant_id: str, floor_id: str, day: date) -> bool:
+        """楼层当天是否已写入过位置 (不触发 zone_loader)"""
+        floor = self._floors.get((tenant_id, floor_id))
+        return floor is not None and day in floor.days
+
+    def ingest_positions(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """
+        写入位置记录 (robot_position 表格式或模拟器 cleaning_trail)
+
+        每条记录需含 tenant_id、robot_id、floor_id、x/y (或 position_x/position_y)
+        与 timestamp/time；未注册楼层的记录忽略。
+
+        Returns:
+            计入的位置数
+        """
+        tracks: Dict[Tuple[str, str], List[Tuple[float, str, float, float]]] = defaultdict(list)
+        for record in records:
+            floor_id = record.get("floor_id")
+            tenant_id = record.get("tenant_id")
+            if self._floor(tenant_id, floor_id) is None:
+                continue
+            x = record.get("x", record.get("position_x"))
+            y = record.get("y", record.get("position_y"))
+            ts = record.get("timestamp", record.get("time"))
+            if x is None or y is None or ts is None:
+                continue
+            epoch = float(ts) if isinstance(ts, (int, float)) else to_epoch(ts)
+            tracks[(tenant_id, record.get("robot_id"))].append((epoch, floor_id, float(x), float(y)))
+
+        # (租户, 楼层, 日期) → 本批 (线段, 上一段)
+        strokes: Dict[Tuple[str, str, date], List[Tuple[Segment, Optional[Segment]]]] = defaultdict(list)
+        count = 0
+        for key, points in tracks.items():
+            points.sort(key=lambda p: p[0])
+            last = self._last.get(key)
+            for epoch, floor_id, x, y in points:
+                day = datetime.fromtimestamp(epoch, tz=timezone.utc).date()
+                segment, previous = (x, y, x, y), None
+                if last is not None:
+                    last_floor, last_epoch, last_segment = last
+                    lx, ly = last_segment[2], last_segment[3]
+                    if (
+                        last_floor == floor_id
+                        and 0 <= epoch - last_epoch <= self.max_gap_seconds
+                        and math.hypot(x - lx, y - ly) <= self.max_jump
+                    ):
+                        segment, previous = (lx, ly, x, y), last_segment
+                strokes[(key[0], floor_id, day)].append((segment, previous))
+                last = (floor_id, epoch, segment)
+                count += 1
+            self._last[key] = last
+
+        for (tenant_id, floor_id, day), segments in strokes.items():
+            floor = self._floors[(tenant_id, floor_id)]
+            floor.stamp(day, segments, self.radius)
+            floor.retain(self.retention_days)
+        return count
+
+    def zone_coverage(self, tenant_id: str, floor_id: str, day: date) -> List[ZoneCoverage]:
+        """楼层各区域在某天的覆盖率 (未注册楼层返回空列表)"""
+        floor = self._floor(tenant_id, floor_id)
+        return floor.coverage(day) if floor else []
+
+    def building_coverage(
+        self, tenant_id: str, floor_ids: Iterable[str], day: date
+    ) -> Dict[str, List[ZoneCoverage]]:
+        """多个楼层的覆盖率"""
+        return {floor_id: self.zone_coverage(tenant_id, floor_id, day) for floor_id in floor_ids}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "floors": len(self._floors),
+            "zones": sum(len(f.zones) for f in self._floors.values()),
+            "floor_days": sum(len(f.days) for f in self._floors.values()),
+            "bitmap_bytes": sum(f.nbytes() for f in self._floors.values()),
+        }
@@ -17,17 +17,28 @@ T = TypeVar('T')
 # ============================================================
 
 class PagedResult(BaseModel, Generic[T]):
-    """分页结果"""
+    """分页结果 (next_cursor: 下一页续页令牌，没有更多数据时为 None)"""
     items: List[T]
     total: int
     page: int
     size: int
     pages: int
+    next_cursor: Optional[str] = None
 
     @classmethod
-    def create(cls, items: List[T], total: int, page: int, size: int):
+    def create(
+        cls,
+        items: List[T],
+        total: int,
+        page: int,
+        size: int,
+        next_cursor: Optional[str] = None
+    ):
         pages = (total + size - 1) // size if size > 0 else 0
-        return cls(items=items, total=total, page=page, size=size, pages=pages)
+        return cls(
+            items=items, total=total, page=page, size=size, pages=pages,
+            next_cursor=next_cursor
+        )
 
 
 class TimeRange(BaseModel):
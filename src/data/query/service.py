@@ -27,8 +27,21 @@ from .models import (
     AnomalyType,
 )
 
+from .coverage import CoverageEngine
+from src.shared.downsample import choose_bucket_seconds, clamp_points, downsample_records, latest_per_bucket
+from src.shared.metrics import histogram, instrument
+from src.shared.pagination import keyset_page
+
 logger = logging.getLogger(__name__)
 
+TASK_HISTORY_CURSOR_SCOPE = "created_at:desc,task_id:desc"
+
+DATA_QUERY_SECONDS = histogram(
+    "linkc_data_query_seconds",
+    "DataQueryService query latency",
+    ["tenant", "query", "status"],
+)
+
 
 # ============================================================
 # 缓存接口
@@ -100,7 +113,8 @@ class DataQueryService:
         timeseries_service=None,
         task_repository=None,
         robot_repository=None,
-        cache: Optional[CacheService] = None
+        cache: Optional[CacheService] = None,
+        coverage: Optional[CoverageEngine] = None
     ):
         """
         初始化查询服务
@@ -110,14 +124,17 @@ class DataQueryService:
             task_repository: 任务仓储 (D2)
             robot_repository: 机器人仓储 (D2)
             cache: 缓存服务
+            coverage: 覆盖率栅格引擎 (已注册的楼层按轨迹实时计算)
         """
         self.timeseries = timeseries_service
         self.task_repo = task_repository
         self.robot_repo = robot_repository
         self.cache = cache or InMemoryCacheService()
+        self.coverage = coverage
 
     # ========== 机器人数据查询 ==========
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_current_status(
         self,
         tenant_id: str,
@@ -188,18 +205,28 @@ class DataQueryService:
 
         return []
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_status_history(
         self,
         tenant_id: str,
         robot_id: str,
         start_time: datetime,
         end_time: datetime,
-        interval: str = "5m"
+        interval: str = "5m",
+        max_points: Optional[int] = None
     ) -> List[RobotStatusPoint]:
-        """获取机器人状态历史"""
+        """
+        获取机器人状态历史
+
+        指定 max_points 时在查询侧降采样：先按时间桶抽稀 (每桶最新一条)，
+        再按电量曲线做 LTTB 整形到 max_points 个点，保留状态切换点。
+        """
         if not self.timeseries:
             return []
 
+        points = clamp_points(max_points) if max_points is not None else None
+        bucket_seconds = choose_bucket_seconds(start_time, end_time, points) if points else None
+
         # 从时序服务查询
         if hasattr(self.timeseries, '_data'):
             status_table = self.timeseries._data.get("robot_status", [])
@@ -220,22 +247,59 @@ class DataQueryService:
                         battery_level=record.get("battery_level", 0)
                     ))
 
-            return sorted(result, key=lambda x: x.timestamp)
-
-        return []
+            result.sort(key=lambda x: x.timestamp)
+            if bucket_seconds:
+                result = latest_per_bucket(result, bucket_seconds, timestamp=lambda p: p.timestamp)
+        else:
+            filters = {"tenant_id": tenant_id, "robot_id": robot_id}
+            columns = ["time", "status", "battery_level"]
+            if bucket_seconds:
+                rows = await self.timeseries.query_sampled(
+                    "robot_status", start_time, end_time, bucket_seconds, filters, columns
+                )
+            else:
+                rows = await self.timeseries.query_range(
+                    "robot_status", start_time, end_time, filters, columns, limit=None, order_desc=False
+                )
+            result = [
+                RobotStatusPoint(
+                    timestamp=row["time"],
+                    status=row.get("status") or "unknown",
+                    battery_level=row.get("battery_level") or 0
+                )
+                for row in rows
+            ]
+
+        if points:
+            result = downsample_records(
+                result, points,
+                x=lambda h: h.timestamp.timestamp(), y=lambda h: h.battery_level,
+                keep=lambda prev, cur: prev.status != cur.status
+            )
+        return result
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_position_track(
         self,
         tenant_id: str,
         robot_id: str,
         start_time: datetime,
         end_time: datetime,
-        sample_interval: str = "1m"
+        sample_interval: str = "1m",
+        max_points: Optional[int] = None
     ) -> List[PositionPoint]:
-        """获取机器人位置轨迹"""
+        """
+        获取机器人位置轨迹
+
+        指定 max_points 时在查询侧降采样：先按时间桶抽稀 (每桶最新一条)，
+        再以时间为横轴、(x, y) 为纵坐标做 LTTB 整形，保留楼层切换点。
+        """
         if not self.timeseries:
             return []
 
+        points = clamp_points(max_points) if max_points is not None else None
+        bucket_seconds = choose_bucket_seconds(start_time, end_time, points) if points else None
+
         if hasattr(self.timeseries, '_data'):
             position_table = self.timeseries._data.get("robot_position", [])
             result = []
@@ -256,10 +320,39 @@ class DataQueryService:
                         floor_id=record.get("floor_id", "")
                     ))
 
-            return sorted(result, key=lambda x: x.timestamp)
-
-        return []
+            result.sort(key=lambda x: x.timestamp)
+            if bucket_seconds:
+                result = latest_per_bucket(result, bucket_seconds, timestamp=lambda p: p.timestamp)
+        else:
+            filters = {"tenant_id": tenant_id, "robot_id": robot_id}
+            columns = ["time", "x", "y", "floor_id"]
+            if bucket_seconds:
+                rows = await self.timeseries.query_sampled(
+                    "robot_position", start_time, end_time, bucket_seconds, filters, columns
+                )
+            else:
+                rows = await self.timeseries.query_range(
+                    "robot_position", start_time, end_time, filters, columns, limit=None, order_desc=False
+                )
+            result = [
+                PositionPoint(
+                    timestamp=row["time"],
+                    x=row.get("x") or 0,
+                    y=row.get("y") or 0,
+                    floor_id=row.get("floor_id") or ""
+                )
+                for row in rows
+            ]
+
+        if points:
+            result = downsample_records(
+                result, points,
+                x=lambda p: p.timestamp.timestamp(), y=lambda p: (p.x, p.y),
+                keep=lambda prev, cur: prev.floor_id != cur.floor_id
+            )
+        return result
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_utilization(
         self,
         tenant_id: str,
@@ -318,6 +411,7 @@ class DataQueryService:
 
     # ========== 任务数据查询 ==========
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_task_summary(
         self,
         tenant_id: str,
@@ -403,6 +497,7 @@ class DataQueryService:
             total_area_cleaned=total_area
         )
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_task_history(
         self,
         tenant_id: str,
@@ -412,9 +507,10 @@ class DataQueryService:
         start_date: date = None,
         end_date: date = None,
         page: int = 1,
-        size: int = 20
+        size: int = 20,
+        cursor: str = None
     ) -> PagedResult[TaskRecord]:
-        """获取任务历史记录"""
+        """获取任务历史记录 (按创建时间倒序；传入 cursor 时按令牌续页)"""
         records = []
 
         if self.task_repo and hasattr(self.task_repo, '_tasks'):
@@ -455,14 +551,19 @@ class DataQueryService:
                 ))
 
         # 排序和分页
-        records = sorted(records, key=lambda x: x.created_at, reverse=True)
+        def key(record: TaskRecord) -> tuple:
+            return record.created_at, record.task_id
+
+        records = sorted(records, key=key, reverse=True)
         total = len(records)
-        start_idx = (page - 1) * size
-        end_idx = start_idx + size
-        page_records = records[start_idx:end_idx]
+        page_records, next_cursor = keyset_page(
+            records, key, size, cursor,
+            descending=True, scope=TASK_HISTORY_CURSOR_SCOPE, offset=(page - 1) * size
+        )
 
-        return PagedResult.create(page_records, total, page, size)
+        return PagedResult.create(page_records, total, page, size, next_cursor)
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_task_trend(
         self,
         tenant_id: str,
@@ -503,6 +604,7 @@ class DataQueryService:
 
     # ========== 统计分析查询 ==========
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_efficiency_metrics(
         self,
         tenant_id: str,
@@ -545,6 +647,7 @@ class DataQueryService:
 
         return result
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_comparison(
         self,
         tenant_id: str,
@@ -590,6 +693,7 @@ class DataQueryService:
             trend=trend
         )
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_anomalies(
         self,
         tenant_id: str,
@@ -644,6 +748,7 @@ class DataQueryService:
 
     # ========== 空间数据查询 ==========
 
+    @instrument(DATA_QUERY_SECONDS, name_label="query", tenant_arg="tenant_id")
     async def get_zone_coverage(
         self,
         tenant_id: str,
@@ -654,6 +759,10 @@ class DataQueryService:
         if target_date is None:
             target_date = date.today()
 
+        # 位图增量维护，直接计算无需缓存
+        if self.coverage and self.coverage.has_floor(tenant_id, floor_id):
+            return self.coverage.zone_coverage(tenant_id, floor_id, target_date)
+
         cache_key = f"zone:coverage:{floor_id}:{target_date}"
 
         cached = await self.cache.get(cache_key)
@@ -9,6 +9,7 @@ D2: 数据存储服务
 - TimeSeriesService: 时序数据服务
 - EventLogService: 事件日志服务
 - Repositories: 业务数据仓储
+- RetentionManager: 按租户档位的保留与压缩策略
 """
 
 from .base import (
@@ -45,6 +46,14 @@ from .events import (
     InMemoryEventLogService,
 )
 
+from .event_writer import EventWriter
+
+from .retention import (
+    RetentionManager,
+    TablePolicy,
+    TIER_RETENTION,
+)
+
 from .repositories import (
     # 实体模型
     Tenant,
@@ -89,6 +98,11 @@ __all__ = [
     # 事件服务
     "PostgresEventLogService",
     "InMemoryEventLogService",
+    "EventWriter",
+    # 保留策略
+    "RetentionManager",
+    "TablePolicy",
+    "TIER_RETENTION",
     # 实体模型
     "Tenant",
     "Robot",
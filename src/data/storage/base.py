@@ -5,12 +5,14 @@ D2: 数据存储服务 - 基础类
 """
 
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, List, Optional, Dict, Any
-from datetime import datetime
+from typing import TypeVar, Generic, List, Optional, Dict, Any, AsyncIterator, Iterable
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
 from enum import Enum
 import uuid
 
+from src.shared.downsample import bucket_start, latest_per_bucket
+
 T = TypeVar('T')
 
 
@@ -20,11 +22,20 @@ T = TypeVar('T')
 
 @dataclass
 class PagedResult(Generic[T]):
-    """分页结果"""
+    """
+    分页结果
+
+    next_cursor 为下一页的续页令牌 (没有更多数据时为 None)；keyset 为 True
+    表示本页由游标定位，page 不代表位置。total_estimated 为 True 时 total
+    为估算值。
+    """
     items: List[T]
     total: int
     page: int
     size: int
+    next_cursor: Optional[str] = None
+    keyset: bool = False
+    total_estimated: bool = False
 
     @property
     def pages(self) -> int:
@@ -34,7 +45,9 @@ class PagedResult(Generic[T]):
     @property
     def has_next(self) -> bool:
         """是否有下一页"""
-        return self.page < self.pages
+        if self.next_cursor is not None:
+            return True
+        return not self.keyset and self.page < self.pages
 
     @property
     def has_prev(self) -> bool:
@@ -49,7 +62,9 @@ class PagedResult(Generic[T]):
             "size": self.size,
             "pages": self.pages,
             "has_next": self.has_next,
-            "has_prev": self.has_prev
+            "has_prev": self.has_prev,
+            "next_cursor": self.next_cursor,
+            "total_estimated": self.total_estimated
         }
 
 
@@ -100,12 +115,15 @@ class StorageService(ABC, Generic[T]):
         pass
 
     @abstractmethod
-    async def save_many(self, entities: List[T]) -> List[T]:
+    async def save_many(self, entities: List[T], chunk_size: Optional[int] = None) -> List[T]:
         """
-        批量保存实体
+        批量保存实体 (UPSERT)
+
+        同一批内重复 ID 以最后一个为准，返回顺序与输入一致
 
         Args:
             entities: 实体列表
+            chunk_size: 每次写入的行数，为空时使用实现的默认值
 
         Returns:
             保存后的实体列表
@@ -131,16 +149,23 @@ class StorageService(ABC, Generic[T]):
         filters: List[QueryFilter] = None,
         sort: List[SortOrder] = None,
         page: int = 1,
-        size: int = 20
+        size: int = 20,
+        cursor: Optional[str] = None,
+        count_mode: str = "exact"
     ) -> PagedResult[T]:
         """
         条件查询
 
+        排序键末尾总是追加 ID 保证顺序稳定；传入 cursor 时按 keyset 续页，
+        忽略 page (要求各排序方向一致)。
+
         Args:
             filters: 过滤条件列表
             sort: 排序选项列表
             page: 页码（从1开始）
             size: 每页大小
+            cursor: 上一页返回的 next_cursor
+            count_mode: 总数计算方式 (exact / cached / estimate)
 
         Returns:
             分页结果
@@ -221,6 +246,14 @@ class AggregationSpec:
     alias: Optional[str] = None
 
 
+def _row_time(row: Dict[str, Any]) -> datetime:
+    """时序记录的时间列 (内存实现中可能为 ISO 字符串)"""
+    time = row.get("time")
+    if isinstance(time, str):
+        time = datetime.fromisoformat(time.replace('Z', '+00:00'))
+    return time
+
+
 class TimeSeriesService(ABC):
     """
     时序数据服务抽象基类
@@ -276,6 +309,69 @@ class TimeSeriesService(ABC):
         """
         pass
 
+    async def stream_range(
+        self,
+        table: str,
+        start_time: datetime,
+        end_time: datetime,
+        filters: Dict[str, Any] = None,
+        columns: List[str] = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        按时间升序分批读取范围内的全部记录 (导出等大结果集使用)
+
+        默认一次 query_range 后切批；支持游标的实现逐批取数，内存只与 batch_size 相关。
+
+        Args:
+            table: 表名
+            start_time: 开始时间
+            end_time: 结束时间
+            filters: 筛选条件
+            columns: 返回的列（默认全部）
+            batch_size: 每批记录数
+
+        Yields:
+            记录批次
+        """
+        rows = await self.query_range(
+            table, start_time, end_time, filters, columns, limit=None, order_desc=False
+        )
+        for start in range(0, len(rows), batch_size):
+            yield rows[start:start + batch_size]
+
+    async def query_sampled(
+        self,
+        table: str,
+        start_time: datetime,
+        end_time: datetime,
+        bucket_seconds: int,
+        filters: Dict[str, Any] = None,
+        columns: List[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按时间桶抽稀查询：每个 bucket_seconds 宽的桶只返回最新一条记录 (时间升序)
+
+        图表类查询使用，返回行数上限为窗口/桶宽。默认基于 stream_range 逐批
+        抽稀，内存只与桶数相关；数据库实现在查询中完成抽稀。
+
+        Args:
+            table: 表名
+            start_time: 开始时间
+            end_time: 结束时间
+            bucket_seconds: 桶宽 (秒)
+            filters: 筛选条件
+            columns: 返回的列（默认全部，需包含 time）
+
+        Returns:
+            记录列表
+        """
+        latest: Dict[datetime, Dict[str, Any]] = {}
+        async for batch in self.stream_range(table, start_time, end_time, filters, columns):
+            for row in latest_per_bucket(batch, bucket_seconds, timestamp=_row_time):
+                latest[bucket_start(_row_time(row), bucket_seconds)] = row
+        return [latest[key] for key in sorted(latest)]
+
     @abstractmethod
     async def query_latest(
         self,
@@ -334,7 +430,8 @@ class TimeSeriesService(ABC):
         table: str,
         start_time: datetime,
         end_time: datetime,
-        filters: Dict[str, Any] = None
+        filters: Dict[str, Any] = None,
+        exclude: Dict[str, Iterable[Any]] = None
     ) -> int:
         """
         删除时间范围内的数据
@@ -344,12 +441,42 @@ class TimeSeriesService(ABC):
             start_time: 开始时间
             end_time: 结束时间
             filters: 额外筛选条件
+            exclude: 字段 → 不删除的取值 (如保留已登记档位的租户)
 
         Returns:
             删除的记录数
         """
         pass
 
+    async def drop_chunks(self, table: str, older_than: datetime) -> int:
+        """
+        按分块丢弃早于 older_than 的数据 (保留策略使用)
+
+        默认退化为 delete_range；分块存储的实现整块丢弃，粒度为块宽。
+
+        Returns:
+            丢弃的记录数 (PostgreSQL 实现为基于统计信息的近似值)
+        """
+        return await self.delete_range(table, datetime.min.replace(tzinfo=timezone.utc), older_than)
+
+    async def enable_compression(
+        self,
+        table: str,
+        compress_after: timedelta,
+        segment_by: List[str] = None,
+        order_by: str = "time DESC"
+    ) -> bool:
+        """
+        为表启用压缩策略 (不支持压缩的实现返回 False)
+
+        Args:
+            table: 表名
+            compress_after: 数据写入多久后压缩
+            segment_by: 压缩分段列 (常用查询过滤列)
+            order_by: 段内排序
+        """
+        return False
+
 
 # ============================================================
 # 事件日志服务接口
@@ -433,11 +560,15 @@ class EventLogService(ABC):
         source: str = None,
         tags: List[str] = None,
         page: int = 1,
-        size: int = 50
+        size: int = 50,
+        cursor: str = None,
+        count_mode: str = "exact"
     ) -> PagedResult[EventLog]:
         """
         查询事件日志
 
+        按 (时间, 事件ID) 倒序；传入 cursor 时从令牌位置续页，忽略 page。
+
         Args:
             tenant_id: 租户ID
             event_types: 事件类型列表
@@ -448,6 +579,8 @@ class EventLogService(ABC):
             tags: 标签
             page: 页码
             size: 每页大小
+            cursor: 上一页返回的 next_cursor
+            count_mode: 总数计算方式 (exact / cached / estimate)
 
         Returns:
             分页结果
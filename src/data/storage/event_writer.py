@@ -0,0 +1,275 @@
+"""
+D2: 数据存储服务 - 事件日志写后缓冲
+====================================
+PostgresEventLogService 的 write-behind 写入器:
+- 有界队列: log_event 入队后立即返回 event_id，队列满时等待刷新 (背压)
+- 按条数 (batch_size) 或时间 (flush_interval) 触发，COPY 批量写入
+- 至少一次投递: 写入失败的批次追加到本地溢写文件 (JSONL)，
+  数据库恢复后的下一次刷新先重放溢写文件；重放中途失败可能产生重复行
+- flush() / close(): 关闭前写出队列中的全部事件
+"""
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence
+import asyncio
+import json
+import logging
+import os
+
+from .database import DatabaseManager
+from src.shared.metrics import counter, gauge, histogram, span
+
+logger = logging.getLogger(__name__)
+
+EVENT_COLUMNS = ("time", "event_id", "tenant_id", "event_type", "level", "source", "data", "tags")
+
+EVENT_QUEUE_DEPTH = gauge(
+    "linkc_event_writer_queue_depth",
+    "Events waiting in the write-behind queue",
+    ["table"],
+)
+EVENT_FLUSH_SECONDS = histogram(
+    "linkc_event_writer_flush_seconds",
+    "Event writer COPY batch latency",
+    ["table", "status"],
+)
+EVENT_WRITER_EVENTS = counter(
+    "linkc_event_writer_events_total",
+    "Events handled by the write-behind writer (written / spilled / replayed / dropped)",
+    ["table", "outcome"],
+)
+
+
+class EventWriter:
+    """事件日志写后缓冲 (COPY 批量写入 + 本地溢写)"""
+
+    def __init__(
+        self,
+        db: DatabaseManager,
+        table: str = "event_logs",
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        max_queue: int = 10_000,
+        spill_path: Optional[str] = None
+    ):
+        """
+        初始化写入器
+
+        Args:
+            db: 数据库管理器
+            table: 目标表
+            batch_size: 单次 COPY 的行数，队列达到时立即刷新
+            flush_interval: 定时刷新间隔 (秒)
+            max_queue: 队列上限，满时 put() 等待刷新
+            spill_path: 溢写文件路径；为空时写入失败的事件留在队列，
+                        超出上限的最旧事件丢弃
+        """
+        self.db = db
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.spill_path = Path(spill_path) if spill_path else None
+
+        self._queue: Deque[tuple] = deque()
+        self._has_spill = bool(self.spill_path and self.spill_path.exists())
+        self._lock = asyncio.Lock()
+        self._pending_flush: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._written = 0
+        self._spilled = 0
+        self._replayed = 0
+        self._dropped = 0
+        self._flush_failures = 0
+
+    # ============================================================
+    # 入队
+    # ============================================================
+
+    async def put(self, record: Sequence[Any]) -> None:
+        """
+        入队一条事件 (字段顺序同 EVENT_COLUMNS)
+
+        队列未满时不等待数据库；队列满时等待一次刷新。
+        """
+        self._ensure_running()
+        while len(self._queue) >= self.max_queue:
+            self._schedule_flush()
+            await asyncio.shield(self._pending_flush)
+            if len(self._queue) >= self.max_queue:
+                # 数据库不可用且没有溢写文件，丢弃最旧事件
+                self._queue.popleft()
+                self._count("dropped", 1)
+                break
+
+        self._queue.append(tuple(record))
+        EVENT_QUEUE_DEPTH.set(len(self._queue), table=self.table)
+        if len(self._queue) >= self.batch_size:
+            self._schedule_flush()
+
+    def _ensure_running(self) -> None:
+        """首次入队时启动定时刷新任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._periodic_flush())
+
+    def _schedule_flush(self) -> None:
+        """触发后台刷新 (同一时间最多一个)"""
+        if self._pending_flush and not self._pending_flush.done():
+            return
+        self._pending_flush = asyncio.get_running_loop().create_task(self._flush())
+
+    # ============================================================
+    # 刷新
+    # ============================================================
+
+    async def flush(self) -> None:
+        """写出队列中的全部事件，并尝试重放溢写文件"""
+        if self._pending_flush:
+            await asyncio.gather(self._pending_flush, return_exceptions=True)
+        await self._flush()
+
+    async def close(self) -> None:
+        """停止定时刷新并写出剩余事件"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _periodic_flush(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                if self._queue or self._has_spill:
+                    await self._flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Event writer periodic flush error: {e}")
+
+    async def _flush(self) -> None:
+        async with self._lock:
+            while self._queue:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self.batch_size, len(self._queue)))
+                ]
+                EVENT_QUEUE_DEPTH.set(len(self._queue), table=self.table)
+                if not await self._write(batch, "written"):
+                    await self._handle_failure(batch)
+                    return
+
+            if self._has_spill:
+                await self._replay_spill()
+
+    async def _write(self, batch: List[tuple], outcome: str) -> bool:
+        """COPY 一批事件，返回是否成功"""
+        try:
+            with span(EVENT_FLUSH_SECONDS, table=self.table):
+                async with self.db.connection() as conn:
+                    await conn.copy_records_to_table(
+                        self.table,
+                        records=batch,
+                        columns=EVENT_COLUMNS
+                    )
+        except Exception as e:
+            self._flush_failures += 1
+            logger.error(f"Failed to write {len(batch)} events to {self.table}: {e}")
+            return False
+        self._count(outcome, len(batch))
+        return True
+
+    async def _handle_failure(self, batch: List[tuple]) -> None:
+        """写入失败: 溢写到本地文件，否则放回队列头部"""
+        if self.spill_path:
+            try:
+                await asyncio.to_thread(self._append_spill, batch)
+                self._has_spill = True
+                self._count("spilled", len(batch))
+                return
+            except OSError as e:
+                logger.error(f"Failed to spill events to {self.spill_path}: {e}")
+
+        self._queue.extendleft(reversed(batch))
+        while len(self._queue) > self.max_queue:
+            self._queue.popleft()
+            self._count("dropped", 1)
+        EVENT_QUEUE_DEPTH.set(len(self._queue), table=self.table)
+
+    # ============================================================
+    # 溢写文件
+    # ============================================================
+
+    async def _replay_spill(self) -> None:
+        """按批重放溢写文件，全部成功后删除；失败时只保留未写入的部分"""
+        records = await asyncio.to_thread(self._read_spill)
+        for start in range(0, len(records), self.batch_size):
+            if not await self._write(records[start:start + self.batch_size], "replayed"):
+                await asyncio.to_thread(self._rewrite_spill, records[start:])
+                return
+        await asyncio.to_thread(self._remove_spill)
+        self._has_spill = False
+        logger.info(f"Replayed {len(records)} spilled events into {self.table}")
+
+    @staticmethod
+    def _encode(record: tuple) -> str:
+        values = list(record)
+        values[0] = values[0].isoformat()
+        return json.dumps(values, ensure_ascii=False) + "\n"
+
+    def _append_spill(self, batch: List[tuple]) -> None:
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.spill_path, "a", encoding="utf-8") as f:
+            f.write("".join(self._encode(r) for r in batch))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_spill(self) -> List[tuple]:
+        records = []
+        with open(self.spill_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                values = json.loads(line)
+                values[0] = datetime.fromisoformat(values[0])
+                records.append(tuple(values))
+        return records
+
+    def _rewrite_spill(self, records: List[tuple]) -> None:
+        tmp = self.spill_path.with_name(self.spill_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(self._encode(r) for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.spill_path)
+
+    def _remove_spill(self) -> None:
+        try:
+            self.spill_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    # ============================================================
+    # 统计
+    # ============================================================
+
+    def _count(self, outcome: str, n: int) -> None:
+        setattr(self, f"_{outcome}", getattr(self, f"_{outcome}") + n)
+        EVENT_WRITER_EVENTS.inc(n, table=self.table, outcome=outcome)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "written": self._written,
+            "spilled": self._spilled,
+            "replayed": self._replayed,
+            "dropped": self._dropped,
+            "flush_failures": self._flush_failures,
+            "spill_pending": self._has_spill,
+        }
@@ -7,14 +7,22 @@ D2: 数据存储服务 - 事件日志服务
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 from dataclasses import dataclass, field
+import json
 import uuid
 import logging
 
 from .base import EventLogService, EventLog, EventLevel, PagedResult
 from .database import DatabaseManager
+from .event_writer import EventWriter
+from .pagination import count_rows, keyset_clause, order_by, sort_scope
+from src.shared.pagination import COUNT_EXACT, CountCache, decode_cursor, encode_cursor, keyset_page
 
 logger = logging.getLogger(__name__)
 
+# 事件按 (时间, 事件ID) 倒序分页
+EVENT_KEYSET_COLUMNS = ("time", "event_id")
+EVENT_CURSOR_SCOPE = sort_scope(EVENT_KEYSET_COLUMNS, descending=True)
+
 
 # ============================================================
 # PostgreSQL/TimescaleDB 事件日志服务
@@ -24,17 +32,29 @@ class PostgresEventLogService(EventLogService):
     """
     PostgreSQL/TimescaleDB 事件日志服务
 
-    将事件存储在 TimescaleDB 的 event_logs 表中
+    将事件存储在 TimescaleDB 的 event_logs 表中。分页使用 (time, event_id)
+    keyset，需要 (tenant_id, time DESC, event_id DESC) 索引。
+    配置 EventWriter 时 log_event 不在调用方路径上等待数据库。
     """
 
-    def __init__(self, db: DatabaseManager):
+    def __init__(
+        self,
+        db: DatabaseManager,
+        count_cache_ttl: float = 30.0,
+        writer: Optional[EventWriter] = None
+    ):
         """
         初始化事件日志服务
 
         Args:
             db: 数据库管理器
+            count_cache_ttl: count_mode="cached" 时总数的缓存秒数
+            writer: 写后缓冲；设置后 log_event 只入队，由 writer 批量 COPY
+                    (刷新前 query_events 查不到这些事件)
         """
         self.db = db
+        self.writer = writer
+        self._count_cache = CountCache(ttl_seconds=count_cache_ttl)
 
     async def log_event(
         self,
@@ -60,32 +80,40 @@ class PostgresEventLogService(EventLogService):
             事件ID
         """
         event_id = f"evt_{uuid.uuid4().hex[:12]}"
-        now = datetime.now(timezone.utc)
-
-        query = """
-            INSERT INTO event_logs (time, event_id, tenant_id, event_type, level, source, data, tags)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-        """
-
-        import json
-        data_json = json.dumps(data) if data else "{}"
+        record = (
+            datetime.now(timezone.utc),
+            event_id,
+            tenant_id,
+            event_type,
+            level.value if isinstance(level, EventLevel) else level,
+            source,
+            json.dumps(data) if data else "{}",
+            tags or []
+        )
 
-        async with self.db.connection() as conn:
-            await conn.execute(
-                query,
-                now,
-                event_id,
-                tenant_id,
-                event_type,
-                level.value if isinstance(level, EventLevel) else level,
-                source,
-                data_json,
-                tags or []
-            )
+        if self.writer is not None:
+            await self.writer.put(record)
+        else:
+            query = """
+                INSERT INTO event_logs (time, event_id, tenant_id, event_type, level, source, data, tags)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            """
+            async with self.db.connection() as conn:
+                await conn.execute(query, *record)
 
         logger.debug(f"Event logged: {event_type} from {source}")
         return event_id
 
+    async def flush(self) -> None:
+        """写出写后缓冲中的事件 (关闭前调用)"""
+        if self.writer is not None:
+            await self.writer.flush()
+
+    async def close(self) -> None:
+        """停止写后缓冲并写出剩余事件"""
+        if self.writer is not None:
+            await self.writer.close()
+
     async def query_events(
         self,
         tenant_id: str,
@@ -96,11 +124,15 @@ class PostgresEventLogService(EventLogService):
         source: str = None,
         tags: List[str] = None,
         page: int = 1,
-        size: int = 50
+        size: int = 50,
+        cursor: str = None,
+        count_mode: str = COUNT_EXACT
     ) -> PagedResult[EventLog]:
         """
         查询事件日志
 
+        传入 cursor 时按 (time, event_id) keyset 续页，不再 OFFSET 扫描前面的页。
+
         Args:
             tenant_id: 租户ID
             event_types: 事件类型列表
@@ -111,6 +143,8 @@ class PostgresEventLogService(EventLogService):
             tags: 标签
             page: 页码
             size: 每页大小
+            cursor: 上一页返回的 next_cursor
+            count_mode: 总数计算方式 (exact / cached / estimate)
 
         Returns:
             分页结果
@@ -153,22 +187,35 @@ class PostgresEventLogService(EventLogService):
 
         where_clause = " AND ".join(conditions)
 
-        # 计算总数
-        count_query = f"SELECT COUNT(*) FROM event_logs WHERE {where_clause}"
-
-        # 数据查询
+        # keyset 条件
+        page_where = where_clause
+        page_params = params
         offset = (page - 1) * size
+        if cursor:
+            page_where = f"{where_clause} AND {keyset_clause(EVENT_KEYSET_COLUMNS, True, param_idx)}"
+            page_params = params + decode_cursor(cursor, EVENT_CURSOR_SCOPE)
+            offset = 0
+
+        # 数据查询 (多取一行判断是否还有下一页)
         data_query = f"""
             SELECT event_id, time, tenant_id, event_type, level, source, data, tags
             FROM event_logs
-            WHERE {where_clause}
-            ORDER BY time DESC
-            LIMIT {size} OFFSET {offset}
+            WHERE {page_where}
+            {order_by(EVENT_KEYSET_COLUMNS, descending=True)}
+            LIMIT {size + 1} OFFSET {offset}
         """
 
         async with self.db.connection() as conn:
-            total = await conn.fetchval(count_query, *params)
-            rows = await conn.fetch(data_query, *params)
+            total, estimated = await count_rows(
+                conn, "event_logs", where_clause, params, count_mode, self._count_cache
+            )
+            rows = await conn.fetch(data_query, *page_params)
+
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last = rows[-1]
+            next_cursor = encode_cursor([last["time"], last["event_id"]], EVENT_CURSOR_SCOPE)
 
         # 转换为 EventLog 对象
         import json
@@ -191,9 +238,12 @@ class PostgresEventLogService(EventLogService):
 
         return PagedResult(
             items=events,
-            total=total or 0,
+            total=total,
             page=page,
-            size=size
+            size=size,
+            next_cursor=next_cursor,
+            keyset=bool(cursor),
+            total_estimated=estimated
         )
 
     async def get_event(self, event_id: str) -> Optional[EventLog]:
@@ -280,7 +330,9 @@ class InMemoryEventLogService(EventLogService):
         source: str = None,
         tags: List[str] = None,
         page: int = 1,
-        size: int = 50
+        size: int = 50,
+        cursor: str = None,
+        count_mode: str = COUNT_EXACT
     ) -> PagedResult[EventLog]:
         """查询事件日志"""
         results = []
@@ -315,19 +367,26 @@ class InMemoryEventLogService(EventLogService):
 
             results.append(event)
 
-        # 按时间倒序
-        results.sort(key=lambda x: x.timestamp, reverse=True)
+        # 按 (时间, 事件ID) 倒序，与 PostgresEventLogService 一致
+        def key(event: EventLog) -> tuple:
+            return event.timestamp, event.event_id
+
+        results.sort(key=key, reverse=True)
 
         # 分页
         total = len(results)
-        offset = (page - 1) * size
-        results = results[offset:offset + size]
+        items, next_cursor = keyset_page(
+            results, key, size, cursor,
+            descending=True, scope=EVENT_CURSOR_SCOPE, offset=(page - 1) * size
+        )
 
         return PagedResult(
-            items=results,
+            items=items,
             total=total,
             page=page,
-            size=size
+            size=size,
+            next_cursor=next_cursor,
+            keyset=bool(cursor)
         )
 
     async def get_event(self, event_id: str) -> Optional[EventLog]:
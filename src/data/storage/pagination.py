@@ -0,0 +1,85 @@
+"""
+D2: 数据存储服务 - 分页
+=======================
+PostgreSQL 的 keyset 分页与总数计算:
+- keyset_clause: (排序列..., ID) 行比较条件，配合复合索引避免 OFFSET 扫描
+- count_rows: 精确 / TTL 缓存 / 规划器估算三种总数计算方式
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+import json
+
+from src.shared.pagination import (
+    COUNT_CACHED,
+    COUNT_ESTIMATE,
+    COUNT_EXACT,
+    COUNT_MODES,
+    CountCache,
+    count_key,
+)
+
+# 估算值低于该阈值时改用精确计数 (小结果集 COUNT 很便宜，估算误差相对更大)
+ESTIMATE_EXACT_THRESHOLD = 10_000
+
+
+def sort_scope(columns: Sequence[str], descending: bool) -> str:
+    """排序方式指纹，写入续页令牌"""
+    direction = "desc" if descending else "asc"
+    return ",".join(f"{c}:{direction}" for c in columns)
+
+
+def order_by(columns: Sequence[str], descending: bool) -> str:
+    direction = "DESC" if descending else "ASC"
+    return "ORDER BY " + ", ".join(f"{c} {direction}" for c in columns)
+
+
+def keyset_clause(columns: Sequence[str], descending: bool, param_idx: int) -> str:
+    """(c1, c2, ...) < ($n, $n+1, ...)；升序时为 >"""
+    placeholders = ", ".join(f"${param_idx + i}" for i in range(len(columns)))
+    op = "<" if descending else ">"
+    return f"({', '.join(columns)}) {op} ({placeholders})"
+
+
+async def count_rows(
+    conn: Any,
+    table: str,
+    where_clause: str,
+    params: List[Any],
+    mode: str = COUNT_EXACT,
+    cache: Optional[CountCache] = None
+) -> Tuple[int, bool]:
+    """
+    计算满足条件的行数
+
+    Args:
+        mode: exact / cached / estimate
+        cache: cached 模式使用的缓存
+
+    Returns:
+        (总数, 是否为估算值)
+    """
+    if mode not in COUNT_MODES:
+        raise ValueError(f"Unknown count mode: {mode}")
+
+    count_query = f"SELECT COUNT(*) FROM {table} WHERE {where_clause}"
+
+    if mode == COUNT_ESTIMATE:
+        plan = await conn.fetchval(
+            f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} WHERE {where_clause}", *params
+        )
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= ESTIMATE_EXACT_THRESHOLD:
+            return estimate, True
+        return (await conn.fetchval(count_query, *params)) or 0, False
+
+    if mode == COUNT_CACHED and cache is not None:
+        key = count_key(count_query, *params)
+        total = cache.get(key)
+        if total is None:
+            total = (await conn.fetchval(count_query, *params)) or 0
+            cache.set(key, total)
+        return total, False
+
+    return (await conn.fetchval(count_query, *params)) or 0, False
@@ -4,20 +4,35 @@ D2: 数据存储服务 - 业务数据仓储
 机器人、任务、空间等业务实体的数据访问层
 """
 
-from typing import List, Dict, Any, Optional, TypeVar, Generic
+from typing import List, Dict, Any, Optional, Tuple, TypeVar, Generic
 from datetime import datetime, timezone
 from dataclasses import dataclass, field, asdict
 from enum import Enum
+from contextlib import asynccontextmanager
+import json
 import uuid
 import logging
 
 from .base import StorageService, QueryFilter, SortOrder, PagedResult
 from .database import DatabaseManager
+from .pagination import count_rows, keyset_clause, order_by, sort_scope
+from src.shared.metrics import histogram, span
+from src.shared.pagination import COUNT_EXACT, CountCache, decode_cursor, encode_cursor, keyset_page
+from src.shared.serialization import dumps
 
 logger = logging.getLogger(__name__)
 
+DB_QUERY_SECONDS = histogram(
+    "linkc_db_query_seconds",
+    "PostgresRepository query latency (including connection acquire)",
+    ["tenant", "agent", "table", "operation", "status"],
+)
+
 T = TypeVar('T')
 
+# save_many 默认分块行数 (单条语句的 JSON 参数大小与锁持有时间的折中)
+DEFAULT_BULK_CHUNK_SIZE = 1000
+
 
 # ============================================================
 # 业务实体模型
@@ -166,7 +181,14 @@ class PostgresRepository(StorageService[T], Generic[T]):
     提供通用的 CRUD 操作实现
     """
 
-    def __init__(self, db: DatabaseManager, table_name: str, id_field: str):
+    def __init__(
+        self,
+        db: DatabaseManager,
+        table_name: str,
+        id_field: str,
+        count_cache_ttl: float = 30.0,
+        bulk_chunk_size: int = DEFAULT_BULK_CHUNK_SIZE
+    ):
         """
         初始化仓储
 
@@ -174,33 +196,70 @@ class PostgresRepository(StorageService[T], Generic[T]):
             db: 数据库管理器
             table_name: 表名
             id_field: ID字段名
+            count_cache_ttl: count_mode="cached" 时总数的缓存秒数
+            bulk_chunk_size: save_many 每条语句写入的行数
         """
         self.db = db
         self.table_name = table_name
         self.id_field = id_field
+        self.bulk_chunk_size = bulk_chunk_size
+        self._count_cache = CountCache(ttl_seconds=count_cache_ttl)
+        # (语句类型, 列集合) → SQL；文本不变时 asyncpg 按连接复用已准备的语句
+        self._statements: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
+    @asynccontextmanager
+    async def _connection(self, operation: str):
+        """获取连接并记录查询耗时"""
+        with span(DB_QUERY_SECONDS, table=self.table_name, operation=operation):
+            async with self.db.connection() as conn:
+                yield conn
+
+    def _upsert_sql(self, columns: Tuple[str, ...]) -> str:
+        """单行 UPSERT"""
+        key = ("upsert", columns)
+        query = self._statements.get(key)
+        if query is None:
+            placeholders = ", ".join([f"${i+1}" for i in range(len(columns))])
+            query = f"""
+            INSERT INTO {self.table_name} ({", ".join(columns)})
+            VALUES ({placeholders})
+            ON CONFLICT ({self.id_field}) DO UPDATE SET {self._upsert_updates(columns)}
+            RETURNING *
+        """
+            self._statements[key] = query
+        return query
+
+    def _bulk_upsert_sql(self, columns: Tuple[str, ...]) -> str:
+        """多行 UPSERT: 整块数据作为一个 JSON 数组参数，按表的行类型展开"""
+        key = ("bulk_upsert", columns)
+        query = self._statements.get(key)
+        if query is None:
+            column_names = ", ".join(columns)
+            query = f"""
+            INSERT INTO {self.table_name} ({column_names})
+            SELECT {column_names}
+            FROM jsonb_populate_recordset(NULL::{self.table_name}, $1::jsonb)
+            ON CONFLICT ({self.id_field}) DO UPDATE SET {self._upsert_updates(columns)}
+            RETURNING *
+        """
+            self._statements[key] = query
+        return query
+
+    def _upsert_updates(self, columns: Tuple[str, ...]) -> str:
+        return ", ".join([f"{c} = EXCLUDED.{c}" for c in columns if c != self.id_field])
+
+    @staticmethod
+    def _entity_data(entity: T) -> Dict[str, Any]:
+        return entity.to_dict() if hasattr(entity, 'to_dict') else asdict(entity)
 
     async def save(self, entity: T) -> T:
         """保存实体"""
-        data = entity.to_dict() if hasattr(entity, 'to_dict') else asdict(entity)
+        data = self._entity_data(entity)
 
         # 更新时间
         data["updated_at"] = datetime.now(timezone.utc)
 
-        columns = list(data.keys())
-        placeholders = ", ".join([f"${i+1}" for i in range(len(columns))])
-        column_names = ", ".join(columns)
-
-        # UPSERT
-        updates = ", ".join([f"{c} = EXCLUDED.{c}" for c in columns if c != self.id_field])
-
-        query = f"""
-            INSERT INTO {self.table_name} ({column_names})
-            VALUES ({placeholders})
-            ON CONFLICT ({self.id_field}) DO UPDATE SET {updates}
-            RETURNING *
-        """
-
-        import json
+        columns = tuple(data.keys())
         values = []
         for col in columns:
             val = data[col]
@@ -208,24 +267,53 @@ class PostgresRepository(StorageService[T], Generic[T]):
                 val = json.dumps(val)
             values.append(val)
 
-        async with self.db.connection() as conn:
-            row = await conn.fetchrow(query, *values)
+        async with self._connection("save") as conn:
+            row = await conn.fetchrow(self._upsert_sql(columns), *values)
 
         return self._row_to_entity(row)
 
-    async def save_many(self, entities: List[T]) -> List[T]:
-        """批量保存"""
-        results = []
-        for entity in entities:
-            saved = await self.save(entity)
-            results.append(saved)
-        return results
+    async def save_many(self, entities: List[T], chunk_size: Optional[int] = None) -> List[T]:
+        """
+        批量保存
+
+        每个分块一条 INSERT ... SELECT ... ON CONFLICT DO UPDATE，一次往返完成；
+        分块内重复 ID 以最后一个为准 (与逐条 save 的结果一致)
+        """
+        chunk_size = chunk_size or self.bulk_chunk_size
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not entities:
+            return []
+
+        now = datetime.now(timezone.utc)
+        ids: List[str] = []
+        saved: Dict[str, T] = {}
+
+        async with self._connection("save_many") as conn:
+            for start in range(0, len(entities), chunk_size):
+                # 列集合相同的行共用一条语句
+                groups: Dict[Tuple[str, ...], Dict[str, Dict[str, Any]]] = {}
+                for entity in entities[start:start + chunk_size]:
+                    data = self._entity_data(entity)
+                    data["updated_at"] = now
+                    entity_id = str(data[self.id_field])
+                    ids.append(entity_id)
+                    groups.setdefault(tuple(data.keys()), {})[entity_id] = data
+
+                for columns, rows in groups.items():
+                    records = await conn.fetch(
+                        self._bulk_upsert_sql(columns), dumps(list(rows.values()))
+                    )
+                    for row in records:
+                        saved[str(row[self.id_field])] = self._row_to_entity(row)
+
+        return [saved[entity_id] for entity_id in ids]
 
     async def get(self, id: str) -> Optional[T]:
         """根据ID获取"""
         query = f"SELECT * FROM {self.table_name} WHERE {self.id_field} = $1"
 
-        async with self.db.connection() as conn:
+        async with self._connection("get") as conn:
             row = await conn.fetchrow(query, id)
 
         if not row:
@@ -238,9 +326,11 @@ class PostgresRepository(StorageService[T], Generic[T]):
         filters: List[QueryFilter] = None,
         sort: List[SortOrder] = None,
         page: int = 1,
-        size: int = 20
+        size: int = 20,
+        cursor: Optional[str] = None,
+        count_mode: str = COUNT_EXACT
     ) -> PagedResult[T]:
-        """条件查询"""
+        """条件查询 (OFFSET 分页，或传入 cursor 时 keyset 分页)"""
         # 构建 WHERE 子句
         conditions = []
         params = []
@@ -265,37 +355,72 @@ class PostgresRepository(StorageService[T], Generic[T]):
 
         where_clause = " AND ".join(conditions) if conditions else "1=1"
 
-        # 构建 ORDER BY
-        order_clause = ""
-        if sort:
+        # 构建 ORDER BY (末尾追加 ID 保证顺序稳定)
+        columns, descending = self._keyset_columns(sort)
+        if descending is None:
             order_parts = [f"{s.field} {s.direction.upper()}" for s in sort]
-            order_clause = "ORDER BY " + ", ".join(order_parts)
-
-        # 计算总数
-        count_query = f"SELECT COUNT(*) FROM {self.table_name} WHERE {where_clause}"
-
-        # 数据查询
+            order_clause = "ORDER BY " + ", ".join(order_parts + [f"{self.id_field} ASC"])
+        else:
+            order_clause = order_by(columns, descending)
+
+        # keyset 条件: 从上一页最后一条记录之后开始，不再 OFFSET
+        scope = sort_scope(columns, bool(descending))
+        page_where = where_clause
+        page_params = params
         offset = (page - 1) * size
+        if cursor:
+            if descending is None:
+                raise ValueError("Cursor pagination requires a uniform sort direction")
+            page_where = f"{where_clause} AND {keyset_clause(columns, descending, param_idx)}"
+            page_params = params + decode_cursor(cursor, scope)
+            offset = 0
+
+        # 多取一行判断是否还有下一页
         data_query = f"""
             SELECT * FROM {self.table_name}
-            WHERE {where_clause}
+            WHERE {page_where}
             {order_clause}
-            LIMIT {size} OFFSET {offset}
+            LIMIT {size + 1} OFFSET {offset}
         """
 
-        async with self.db.connection() as conn:
-            total = await conn.fetchval(count_query, *params)
-            rows = await conn.fetch(data_query, *params)
+        async with self._connection("query") as conn:
+            total, estimated = await count_rows(
+                conn, self.table_name, where_clause, params, count_mode, self._count_cache
+            )
+            rows = await conn.fetch(data_query, *page_params)
 
-        items = [self._row_to_entity(row) for row in rows]
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            if descending is not None:
+                next_cursor = encode_cursor([rows[-1][c] for c in columns], scope)
 
         return PagedResult(
-            items=items,
-            total=total or 0,
+            items=[self._row_to_entity(row) for row in rows],
+            total=total,
             page=page,
-            size=size
+            size=size,
+            next_cursor=next_cursor,
+            keyset=bool(cursor),
+            total_estimated=estimated
         )
 
+    def _keyset_columns(self, sort: Optional[List[SortOrder]]) -> Tuple[List[str], Optional[bool]]:
+        """
+        keyset 排序列 (排序字段 + ID) 与方向
+
+        Returns:
+            (列名列表, 是否倒序)；排序方向不一致时方向为 None (不支持游标)
+        """
+        sort = sort or []
+        directions = {s.direction.lower() == "desc" for s in sort}
+        columns = [s.field for s in sort]
+        if self.id_field not in columns:
+            columns.append(self.id_field)
+        if len(directions) > 1:
+            return columns, None
+        return columns, directions.pop() if directions else False
+
     async def update(self, id: str, updates: Dict[str, Any]) -> Optional[T]:
         """更新实体"""
         if not updates:
@@ -324,7 +449,7 @@ class PostgresRepository(StorageService[T], Generic[T]):
             RETURNING *
         """
 
-        async with self.db.connection() as conn:
+        async with self._connection("update") as conn:
             row = await conn.fetchrow(query, *params)
 
         if not row:
@@ -336,7 +461,7 @@ class PostgresRepository(StorageService[T], Generic[T]):
         """删除实体"""
         query = f"DELETE FROM {self.table_name} WHERE {self.id_field} = $1"
 
-        async with self.db.connection() as conn:
+        async with self._connection("delete") as conn:
             result = await conn.execute(query, id)
 
         return "DELETE 1" in result
@@ -345,7 +470,7 @@ class PostgresRepository(StorageService[T], Generic[T]):
         """检查是否存在"""
         query = f"SELECT 1 FROM {self.table_name} WHERE {self.id_field} = $1"
 
-        async with self.db.connection() as conn:
+        async with self._connection("exists") as conn:
             result = await conn.fetchval(query, id)
 
         return result is not None
@@ -366,7 +491,7 @@ class PostgresRepository(StorageService[T], Generic[T]):
         where_clause = " AND ".join(conditions) if conditions else "1=1"
         query = f"SELECT COUNT(*) FROM {self.table_name} WHERE {where_clause}"
 
-        async with self.db.connection() as conn:
+        async with self._connection("count") as conn:
             return await conn.fetchval(query, *params)
 
     def _get_operator(self, op: str) -> str:
@@ -518,12 +643,16 @@ class InMemoryRepository(StorageService[T], Generic[T]):
         self._data[entity_id] = entity
         return entity
 
-    async def save_many(self, entities: List[T]) -> List[T]:
-        results = []
+    async def save_many(self, entities: List[T], chunk_size: Optional[int] = None) -> List[T]:
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        now = datetime.now(timezone.utc)
         for entity in entities:
-            saved = await self.save(entity)
-            results.append(saved)
-        return results
+            if hasattr(entity, 'updated_at'):
+                entity.updated_at = now
+            self._data[getattr(entity, self.id_field)] = entity
+        # 与 PostgresRepository 一致: 重复 ID 返回最后保存的实体
+        return [self._data[getattr(entity, self.id_field)] for entity in entities]
 
     async def get(self, id: str) -> Optional[T]:
         return self._data.get(id)
@@ -533,7 +662,9 @@ class InMemoryRepository(StorageService[T], Generic[T]):
         filters: List[QueryFilter] = None,
         sort: List[SortOrder] = None,
         page: int = 1,
-        size: int = 20
+        size: int = 20,
+        cursor: Optional[str] = None,
+        count_mode: str = COUNT_EXACT
     ) -> PagedResult[T]:
         results = list(self._data.values())
 
@@ -545,24 +676,45 @@ class InMemoryRepository(StorageService[T], Generic[T]):
                     if self._match_filter(r, f)
                 ]
 
-        # 排序
-        if sort:
-            for s in reversed(sort):
-                results.sort(
-                    key=lambda x: getattr(x, s.field, None) or "",
-                    reverse=(s.direction == "desc")
-                )
+        # 排序 (与 PostgresRepository 一致，末尾追加 ID)
+        sort = sort or []
+        directions = {s.direction.lower() == "desc" for s in sort}
+        descending = directions.pop() if len(directions) == 1 else (None if directions else False)
+        results.sort(key=lambda x: getattr(x, self.id_field), reverse=bool(descending))
+        for s in reversed(sort):
+            results.sort(
+                key=lambda x: getattr(x, s.field, None) or "",
+                reverse=(s.direction == "desc")
+            )
+
+        columns = [s.field for s in sort]
+        if self.id_field not in columns:
+            columns.append(self.id_field)
+        scope = sort_scope(columns, bool(descending))
+
+        def key(entity: T) -> tuple:
+            return tuple(getattr(entity, c, None) for c in columns)
 
         # 分页
         total = len(results)
         offset = (page - 1) * size
-        results = results[offset:offset + size]
+        if descending is None:
+            if cursor:
+                raise ValueError("Cursor pagination requires a uniform sort direction")
+            items, next_cursor = results[offset:offset + size], None
+        else:
+            items, next_cursor = keyset_page(
+                results, key, size, cursor,
+                descending=descending, scope=scope, offset=offset
+            )
 
         return PagedResult(
-            items=results,
+            items=items,
             total=total,
             page=page,
-            size=size
+            size=size,
+            next_cursor=next_cursor,
+            keyset=bool(cursor)
         )
 
     async def update(self, id: str, updates: Dict[str, Any]) -> Optional[T]:
@@ -0,0 +1,173 @@
+"""
+D2: 数据存储服务 - 数据保留
+===========================
+时序表的保留与压缩策略:
+- 保留期按租户档位 (basic / professional / enterprise) 声明，未登记的租户属于默认档位
+- 整表按在用档位中最长的保留期 drop_chunks，不做大范围 DELETE
+- 保留期更短的档位: 只删除这些租户在 (最长保留期, 本档保留期) 窗口内的数据，
+  定期执行时每次只涉及上次之后新过期的部分
+- 压缩: TimescaleDB 原生压缩策略，按表配置 segmentby
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+import logging
+
+from .base import TimeSeriesService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TablePolicy:
+    """单表压缩配置"""
+    table: str
+    compress_after: Optional[timedelta] = None
+    segment_by: List[str] = field(default_factory=lambda: ["tenant_id"])
+    order_by: str = "time DESC"
+
+
+# 时序表 (表名与 CollectorType / 时序服务一致)
+DEFAULT_TABLE_POLICIES: Dict[str, TablePolicy] = {
+    "robot_status": TablePolicy("robot_status", timedelta(days=7), ["tenant_id", "robot_id"]),
+    "robot_position": TablePolicy("robot_position", timedelta(days=1), ["tenant_id", "robot_id"]),
+    "task_execution": TablePolicy("task_execution", timedelta(days=7), ["tenant_id", "task_id"]),
+    "event_logs": TablePolicy("event_logs", timedelta(days=7), ["tenant_id", "event_type"]),
+}
+
+# 租户档位 → 表 → 保留期 (档位名与租户 plan 一致)
+TIER_RETENTION: Dict[str, Dict[str, timedelta]] = {
+    "basic": {
+        "robot_position": timedelta(days=7),
+        "robot_status": timedelta(days=30),
+        "task_execution": timedelta(days=90),
+        "event_logs": timedelta(days=90),
+    },
+    "professional": {
+        "robot_position": timedelta(days=30),
+        "robot_status": timedelta(days=90),
+        "task_execution": timedelta(days=365),
+        "event_logs": timedelta(days=365),
+    },
+    "enterprise": {
+        "robot_position": timedelta(days=90),
+        "robot_status": timedelta(days=365),
+        "task_execution": timedelta(days=730),
+        "event_logs": timedelta(days=730),
+    },
+}
+
+DEFAULT_TIER = "professional"
+
+
+class RetentionManager:
+    """
+    保留与压缩策略管理
+
+    适用于任何 TimeSeriesService: PostgreSQL 实现丢弃 hypertable chunk，
+    内存实现丢弃时间段。
+    """
+
+    def __init__(
+        self,
+        timeseries: TimeSeriesService,
+        tiers: Dict[str, Dict[str, timedelta]] = None,
+        tables: Dict[str, TablePolicy] = None,
+        tenant_tiers: Dict[str, str] = None,
+        default_tier: str = DEFAULT_TIER,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)
+    ):
+        """
+        Args:
+            timeseries: 时序服务
+            tiers: 档位保留期
+            tables: 表压缩配置
+            tenant_tiers: 租户ID → 档位
+            default_tier: 未登记租户的档位
+            clock: 当前时间
+        """
+        self.timeseries = timeseries
+        self.tiers = tiers or TIER_RETENTION
+        self.tables = tables or DEFAULT_TABLE_POLICIES
+        self.tenant_tiers: Dict[str, str] = dict(tenant_tiers or {})
+        self.default_tier = default_tier
+        self._clock = clock
+
+        unknown = set(self.tenant_tiers.values()) - set(self.tiers)
+        if default_tier not in self.tiers or unknown:
+            raise ValueError(f"Unknown retention tier: {sorted(unknown) or default_tier}")
+
+    def set_tenant_tier(self, tenant_id: str, tier: str) -> None:
+        if tier not in self.tiers:
+            raise ValueError(f"Unknown retention tier: {tier}")
+        self.tenant_tiers[tenant_id] = tier
+
+    def tier_for(self, tenant_id: str) -> str:
+        """租户档位 (未登记为默认档位)"""
+        return self.tenant_tiers.get(tenant_id, self.default_tier)
+
+    def retention_for(self, table: str, tier: str) -> Optional[timedelta]:
+        """档位在表上的保留期 (None 表示不过期)"""
+        return self.tiers[tier].get(table)
+
+    def table_retention(self, table: str) -> Optional[timedelta]:
+        """表级保留期: 在用档位中最长的 (任一档位不过期则为 None)"""
+        in_use = set(self.tenant_tiers.values()) | {self.default_tier}
+        retentions = [self.retention_for(table, tier) for tier in in_use]
+        if any(r is None for r in retentions):
+            return None
+        return max(retentions)
+
+    async def ensure_policies(self) -> Dict[str, bool]:
+        """为各表开启压缩策略，返回 表 → 是否开启"""
+        enabled = {}
+        for name, policy in self.tables.items():
+            if policy.compress_after is None:
+                enabled[name] = False
+                continue
+            enabled[name] = await self.timeseries.enable_compression(
+                policy.table, policy.compress_after, policy.segment_by, policy.order_by
+            )
+        return enabled
+
+    async def enforce(self) -> Dict[str, Dict[str, int]]:
+        """
+        执行保留策略
+
+        Returns:
+            表 → {"dropped": 整块丢弃的记录数, "trimmed": 短档位租户删除的记录数}
+        """
+        now = self._clock()
+        report = {}
+        for name, policy in self.tables.items():
+            table_retention = self.table_retention(name)
+            if table_retention is None:
+                continue
+            horizon = now - table_retention
+            dropped = await self.timeseries.drop_chunks(policy.table, horizon)
+
+            trimmed = 0
+            for tenant_id, tier in self.tenant_tiers.items():
+                retention = self.retention_for(name, tier)
+                if retention is None or retention >= table_retention:
+                    continue
+                trimmed += await self.timeseries.delete_range(
+                    policy.table, horizon, now - retention, {"tenant_id": tenant_id}
+                )
+
+            # 未登记的租户按默认档位删除
+            retention = self.retention_for(name, self.default_tier)
+            if retention is not None and retention < table_retention:
+                trimmed += await self.timeseries.delete_range(
+                    policy.table, horizon, now - retention,
+                    exclude={"tenant_id": list(self.tenant_tiers)}
+                )
+
+            report[name] = {"dropped": dropped, "trimmed": trimmed}
+            if dropped or trimmed:
+                logger.info(
+                    f"Retention on {policy.table}: dropped ~{dropped}, trimmed {trimmed} "
+                    f"(horizon {table_retention})"
+                )
+        return report
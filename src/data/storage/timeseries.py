@@ -4,13 +4,14 @@ D2: 数据存储服务 - 时序数据服务
 处理机器人状态、位置轨迹等时序数据
 """
 
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterable
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 import logging
 
 from .base import TimeSeriesService, AggregationSpec
 from .database import DatabaseManager
+from src.shared.segments import TimeSegments
 
 logger = logging.getLogger(__name__)
 
@@ -69,17 +70,21 @@ class PostgresTimeSeriesService(TimeSeriesService):
     """
     PostgreSQL/TimescaleDB 时序数据服务
 
-    使用 TimescaleDB 扩展处理时序数据
+    使用 TimescaleDB 扩展处理时序数据。过期数据按 chunk 整块丢弃，
+    避免大范围 DELETE 造成表膨胀和写入停顿。
     """
 
-    def __init__(self, db: DatabaseManager):
+    def __init__(self, db: DatabaseManager, hypertables: bool = False):
         """
         初始化时序服务
 
         Args:
             db: 数据库管理器
+            hypertables: 表已建为 TimescaleDB hypertable 时设为 True，启用
+                         drop_chunks 和原生压缩；默认按普通表处理 (DELETE，不压缩)
         """
         self.db = db
+        self.hypertables = hypertables
 
     async def insert(
         self,
@@ -186,6 +191,72 @@ class PostgresTimeSeriesService(TimeSeriesService):
 
         return [dict(row) for row in rows]
 
+    async def stream_range(
+        self,
+        table: str,
+        start_time: datetime,
+        end_time: datetime,
+        filters: Dict[str, Any] = None,
+        columns: List[str] = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        服务端游标分批读取 (时间升序)
+
+        在只读事务内打开游标，每次预取 batch_size 行；连接在迭代结束
+        (或调用方提前关闭生成器) 前一直占用。
+        """
+        select_columns = ", ".join(columns) if columns else "*"
+        query = f"SELECT {select_columns} FROM {table} WHERE time >= $1 AND time <= $2"
+        params = [start_time, end_time]
+        for idx, (key, value) in enumerate((filters or {}).items(), start=3):
+            query += f" AND {key} = ${idx}"
+            params.append(value)
+        query += " ORDER BY time ASC"
+
+        async with self.db.connection() as conn:
+            async with conn.transaction(readonly=True):
+                batch: List[Dict[str, Any]] = []
+                async for row in conn.cursor(query, *params, prefetch=batch_size):
+                    batch.append(dict(row))
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+
+    async def query_sampled(
+        self,
+        table: str,
+        start_time: datetime,
+        end_time: datetime,
+        bucket_seconds: int,
+        filters: Dict[str, Any] = None,
+        columns: List[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        按时间桶抽稀 (每桶最新一条)
+
+        date_bin 为 PostgreSQL 14+ 内置函数，不依赖 TimescaleDB；配合
+        DISTINCT ON 在数据库侧完成抽稀，只回传每桶一行。
+        """
+        select_columns = ", ".join(columns) if columns else "*"
+        bucket = f"date_bin(interval '{int(bucket_seconds)} seconds', time, timestamptz 'epoch')"
+        query = (
+            f"SELECT DISTINCT ON ({bucket}) {select_columns} FROM {table}"
+            f" WHERE time >= $1 AND time <= $2"
+        )
+        params = [start_time, end_time]
+        for idx, (key, value) in enumerate((filters or {}).items(), start=3):
+            query += f" AND {key} = ${idx}"
+            params.append(value)
+        query += f" ORDER BY {bucket}, time DESC"
+
+        async with self.db.connection() as conn:
+            rows = await conn.fetch(query, *params)
+
+        return [dict(row) for row in rows]
+
     async def query_latest(
         self,
         table: str,
@@ -307,7 +378,8 @@ class PostgresTimeSeriesService(TimeSeriesService):
         table: str,
         start_time: datetime,
         end_time: datetime,
-        filters: Dict[str, Any] = None
+        filters: Dict[str, Any] = None,
+        exclude: Dict[str, Iterable[Any]] = None
     ) -> int:
         """
         删除时间范围内的数据
@@ -317,6 +389,7 @@ class PostgresTimeSeriesService(TimeSeriesService):
             start_time: 开始时间
             end_time: 结束时间
             filters: 额外筛选条件
+            exclude: 字段 → 不删除的取值
 
         Returns:
             删除的记录数
@@ -330,15 +403,81 @@ class PostgresTimeSeriesService(TimeSeriesService):
                 query += f" AND {key} = ${param_idx}"
                 params.append(value)
                 param_idx += 1
+        if exclude:
+            for key, values in exclude.items():
+                query += f" AND NOT ({key} = ANY(${param_idx}))"
+                params.append(list(values))
+                param_idx += 1
 
         async with self.db.connection() as conn:
-            result = await conn.execute(query, *params)
-            # 解析 DELETE count
-            count = int(result.split()[-1]) if result else 0
+            async with conn.transaction():
+                dropped = 0
+                if self.hypertables and not filters and not exclude:
+                    # 完全落在范围内的 chunk 整块丢弃，DELETE 只处理两端的部分 chunk
+                    dropped = await self._drop_chunks(conn, table, end_time, start_time)
+                result = await conn.execute(query, *params)
+                # 解析 DELETE count
+                count = dropped + (int(result.split()[-1]) if result else 0)
 
         logger.info(f"Deleted {count} records from {table}")
         return count
 
+    async def drop_chunks(self, table: str, older_than: datetime) -> int:
+        """丢弃早于 older_than 的整个 chunk，返回近似记录数"""
+        if not self.hypertables:
+            return await super().drop_chunks(table, older_than)
+
+        async with self.db.connection() as conn:
+            async with conn.transaction():
+                count = await self._drop_chunks(conn, table, older_than)
+
+        logger.info(f"Dropped chunks older than {older_than} from {table} (~{count} records)")
+        return count
+
+    @staticmethod
+    async def _drop_chunks(
+        conn,
+        table: str,
+        older_than: datetime,
+        newer_than: Optional[datetime] = None
+    ) -> int:
+        """drop_chunks，先按统计信息估算将丢弃的记录数"""
+        bounds = "older_than => $2" + (", newer_than => $3" if newer_than else "")
+        params = [table, older_than] + ([newer_than] if newer_than else [])
+        count = await conn.fetchval(
+            f"SELECT COALESCE(SUM(approximate_row_count(c)), 0) "
+            f"FROM show_chunks($1::regclass, {bounds}) AS c",
+            *params
+        )
+        await conn.execute(f"SELECT drop_chunks($1::regclass, {bounds})", *params)
+        return int(count or 0)
+
+    async def enable_compression(
+        self,
+        table: str,
+        compress_after: timedelta,
+        segment_by: List[str] = None,
+        order_by: str = "time DESC"
+    ) -> bool:
+        """开启 hypertable 原生压缩并添加压缩策略 (可重复调用)"""
+        if not self.hypertables:
+            return False
+
+        options = ["timescaledb.compress", f"timescaledb.compress_orderby = '{order_by}'"]
+        if segment_by:
+            options.append(f"timescaledb.compress_segmentby = '{', '.join(segment_by)}'")
+
+        async with self.db.connection() as conn:
+            await conn.execute(f"ALTER TABLE {table} SET ({', '.join(options)})")
+            await conn.execute(
+                "SELECT add_compression_policy($1::regclass, $2::interval, if_not_exists => true)",
+                table,
+                compress_after
+            )
+
+        logger.info(f"Compression enabled on {table} after {compress_after}")
+        return True
+
     def _convert_interval(self, interval: str) -> str:
         """转换时间间隔格式"""
         mapping = {
@@ -361,11 +500,25 @@ class InMemoryTimeSeriesService(TimeSeriesService):
     """
     内存时序数据服务
 
-    用于单元测试
+    用于单元测试。每张表按时间分段存储 (对应 hypertable chunk)，
+    drop_chunks / 无过滤条件的 delete_range 整段丢弃。
     """
 
-    def __init__(self):
-        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+    def __init__(self, segment_seconds: float = 3600.0):
+        """
+        Args:
+            segment_seconds: 分段宽度 (秒)
+        """
+        self.segment_seconds = segment_seconds
+        self._tables: Dict[str, TimeSegments[Dict[str, Any]]] = {}
+
+    def _table(self, table: str) -> TimeSegments[Dict[str, Any]]:
+        segments = self._tables.get(table)
+        if segments is None:
+            segments = self._tables[table] = TimeSegments(
+                self.segment_seconds, lambda record: record["time"]
+            )
+        return segments
 
     async def insert(
         self,
@@ -373,15 +526,14 @@ class InMemoryTimeSeriesService(TimeSeriesService):
         data: List[Dict[str, Any]],
         timestamp_field: str = "timestamp"
     ) -> int:
-        if table not in self._tables:
-            self._tables[table] = []
+        segments = self._table(table)
 
         # 标准化时间戳字段
         for record in data:
             if timestamp_field in record:
                 record["time"] = record.pop(timestamp_field)
 
-        self._tables[table].extend(data)
+        segments.extend(data)
         return len(data)
 
     async def query_range(
@@ -398,7 +550,7 @@ class InMemoryTimeSeriesService(TimeSeriesService):
             return []
 
         results = []
-        for record in self._tables[table]:
+        for record in self._tables[table].iter_range(start_time, end_time):
             time = record.get("time")
             if isinstance(time, str):
                 time = datetime.fromisoformat(time.replace('Z', '+00:00'))
@@ -425,6 +577,41 @@ class InMemoryTimeSeriesService(TimeSeriesService):
 
         return results
 
+    async def stream_range(
+        self,
+        table: str,
+        start_time: datetime,
+        end_time: datetime,
+        filters: Dict[str, Any] = None,
+        columns: List[str] = None,
+        batch_size: int = 5000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """逐段读取，段内排序后分批 (段之间本身有序)"""
+        if table not in self._tables:
+            return
+
+        batch: List[Dict[str, Any]] = []
+        for segment in self._tables[table].iter_segments(start_time, end_time):
+            rows = []
+            for record in segment:
+                time = record.get("time")
+                if isinstance(time, str):
+                    time = datetime.fromisoformat(time.replace('Z', '+00:00'))
+                if not (start_time <= time <= end_time):
+                    continue
+                if filters and not all(record.get(k) == v for k, v in filters.items()):
+                    continue
+                rows.append((time, record))
+
+            rows.sort(key=lambda item: item[0])
+            batch.extend({k: r.get(k) for k in columns} if columns else r.copy() for _, r in rows)
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                del batch[:batch_size]
+
+        if batch:
+            yield batch
+
     async def query_latest(
         self,
         table: str,
@@ -509,29 +696,29 @@ class InMemoryTimeSeriesService(TimeSeriesService):
         table: str,
         start_time: datetime,
         end_time: datetime,
-        filters: Dict[str, Any] = None
+        filters: Dict[str, Any] = None,
+        exclude: Dict[str, Iterable[Any]] = None
     ) -> int:
         if table not in self._tables:
             return 0
 
-        original_count = len(self._tables[table])
+        predicate = None
+        if filters or exclude:
+            excluded = {k: set(v) for k, v in (exclude or {}).items()}
 
-        def should_keep(record):
-            time = record.get("time")
-            if isinstance(time, str):
-                time = datetime.fromisoformat(time.replace('Z', '+00:00'))
+            def predicate(record):
+                return (
+                    all(record.get(k) == v for k, v in (filters or {}).items())
+                    and not any(record.get(k) in v for k, v in excluded.items())
+                )
 
-            # 在范围内则删除
-            if start_time <= time <= end_time:
-                # 检查过滤条件
-                if filters:
-                    match = all(record.get(k) == v for k, v in filters.items())
-                    return not match  # 匹配则删除
-                return False  # 在范围内，删除
-            return True  # 不在范围内，保留
+        return self._tables[table].remove(start_time, end_time, predicate)
 
-        self._tables[table] = [r for r in self._tables[table] if should_keep(r)]
-        return original_count - len(self._tables[table])
+    async def drop_chunks(self, table: str, older_than: datetime) -> int:
+        """丢弃早于 older_than 的整段，返回丢弃的记录数"""
+        if table not in self._tables:
+            return 0
+        return self._tables[table].drop_before(older_than)
 
     def clear(self):
         """清空所有数据"""
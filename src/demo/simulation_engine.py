@@ -56,6 +56,7 @@ class RobotSimState:
     task_id: Optional[str] = None
     movement_pattern: RobotMovementPattern = RobotMovementPattern.IDLE
     speed: float = 5.0  # 单位/秒
+    zone_id: Optional[str] = None
     cleaning_trail: List[Dict[str, float]] = field(default_factory=list)
     last_update: datetime = field(default_factory=datetime.now)
 
@@ -64,6 +65,7 @@ class RobotSimState:
             "robot_id": self.robot_id,
             "name": self.name,
             "position": self.position.to_dict(),
+            "zone_id": self.zone_id,
             "status": self.status,
             "battery": round(self.battery, 1),
             "task_progress": round(self.task_progress, 1),
@@ -115,6 +117,10 @@ class SimulationEngine:
         self._robots: Dict[str, RobotSimState] = {}
         self._broadcast_callback: Optional[Callable] = None
         self._event_callbacks: List[Callable] = []
+        # 区域空间索引 (ZoneSpatialIndex)，设置后位置更新时补全 zone_id
+        self._zone_index = None
+        # 行程代价服务 (TravelCostService)，设置后返回充电时选行程最短的充电点
+        self._travel_costs = None
 
         # 充电站位置 (每个楼层)
         self._charging_stations: Dict[str, Position] = {}
@@ -159,7 +165,7 @@ class SimulationEngine:
                 state.target_position = self._generate_cleaning_target(state.position)
             elif state.status == "returning":
                 state.movement_pattern = RobotMovementPattern.RETURNING
-                state.target_position = self._get_charging_station(floor_id)
+                state.target_position = self._get_charging_station(state.position)
             elif state.status == "charging":
                 state.movement_pattern = RobotMovementPattern.IDLE
                 state.position = Position(x=10, y=10, floor_id=floor_id)  # 充电站位置
@@ -176,6 +182,22 @@ class SimulationEngine:
         """设置广播回调函数"""
         self._broadcast_callback = callback
 
+    def set_zone_index(self, zone_index) -> None:
+        """
+        设置区域空间索引 (通常为 SpaceService.zone_index)
+
+        可选：演示数据的楼层没有区域边界，未设置时位置更新不补全 zone_id。
+        """
+        self._zone_index = zone_index
+
+    def set_travel_costs(self, travel_costs) -> None:
+        """
+        设置行程代价服务 (通常为 SpaceService.travel_costs)
+
+        可选：未设置时返回充电固定去楼层默认充电站。
+        """
+        self._travel_costs = travel_costs
+
     def register_event_callback(self, callback: Callable) -> None:
         """注册事件回调"""
         self._event_callbacks.append(callback)
@@ -271,7 +293,7 @@ class SimulationEngine:
 
     async def _tick(self) -> None:
         """单次更新"""
-        updates = []
+        changed_states = []
 
         for robot_id, state in self._robots.items():
             changed = False
@@ -292,12 +314,31 @@ class SimulationEngine:
             state.last_update = datetime.now()
 
             if changed:
-                updates.append(state.to_dict())
+                changed_states.append(state)
+
+        self._assign_zones(changed_states)
+        updates = [state.to_dict() for state in changed_states]
 
         # 广播更新
         if updates and self._broadcast_callback:
             await self._broadcast_updates(updates)
 
+    def _assign_zones(self, states: List[RobotSimState]) -> None:
+        """按楼层批量定位机器人所在区域"""
+        if self._zone_index is None:
+            return
+        by_floor: Dict[str, List[RobotSimState]] = {}
+        for state in states:
+            by_floor.setdefault(state.position.floor_id, []).append(state)
+        for floor_id, floor_states in by_floor.items():
+            zone_ids = self._zone_index.locate_many(
+                floor_id,
+                [s.position.x for s in floor_states],
+                [s.position.y for s in floor_states],
+            )
+            for state, zone_id in zip(floor_states, zone_ids):
+                state.zone_id = zone_id
+
     def _update_working_robot(self, state: RobotSimState) -> bool:
         """更新工作中的机器人"""
         changed = False
@@ -331,7 +372,7 @@ class SimulationEngine:
             if state.battery < 20:
                 state.status = "returning"
                 state.movement_pattern = RobotMovementPattern.RETURNING
-                state.target_position = self._get_charging_station(state.position.floor_id)
+                state.target_position = self._get_charging_station(state.position)
                 asyncio.create_task(self._notify_event("low_battery", state))
 
         # 更新任务进度
@@ -443,8 +484,14 @@ class SimulationEngine:
 
         return Position(x=new_x, y=new_y, floor_id=current.floor_id)
 
-    def _get_charging_station(self, floor_id: str) -> Position:
-        """获取充电站位置"""
+    def _get_charging_station(self, position: Position) -> Position:
+        """获取充电站位置 (设置了行程代价服务时取行程最短的充电点)"""
+        floor_id = position.floor_id
+        if self._travel_costs is not None and floor_id:
+            nearest = self._travel_costs.nearest(floor_id, position.x, position.y)
+            if nearest is not None:
+                place, _ = nearest
+                return Position(x=place.x, y=place.y, floor_id=place.floor_id)
         if floor_id in self._charging_stations:
             return self._charging_stations[floor_id]
         return Position(x=10, y=10, floor_id=floor_id)
@@ -531,7 +578,7 @@ class SimulationEngine:
         state = self._robots[robot_id]
         state.status = "returning"
         state.movement_pattern = RobotMovementPattern.RETURNING
-        state.target_position = self._get_charging_station(state.position.floor_id)
+        state.target_position = self._get_charging_station(state.position)
         state.task_id = None
         state.task_progress = 0
 
@@ -561,7 +608,7 @@ class SimulationEngine:
             state.target_position = self._generate_cleaning_target(state.position)
         elif status == "returning":
             state.movement_pattern = RobotMovementPattern.RETURNING
-            state.target_position = self._get_charging_station(state.position.floor_id)
+            state.target_position = self._get_charging_station(state.position)
         else:
             state.movement_pattern = RobotMovementPattern.IDLE
 
@@ -24,7 +24,7 @@ from typing import Any, Dict, List, Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 
 # ── K1/K2/K3 知识层 ──────────────────────────────────────────────
 from knowledge.scenario_kb import (
@@ -46,6 +46,14 @@ from knowledge.decision_logger import (
 )
 from knowledge.seed_data import load_tower_c_seed_data
 
+# ── 指标 ─────────────────────────────────────────────────────────
+from shared.metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    histogram,
+    is_enabled as metrics_enabled,
+    render_prometheus,
+)
+
 # ── A5 决策校验 ──────────────────────────────────────────────────
 from validation.decision_validator import DecisionValidator
 
@@ -91,6 +99,18 @@ log_api = DecisionLogAPI(decision_logger)
 # WebSocket connections
 ws_connections: List[WebSocket] = []
 
+PIPELINE_STAGE_SECONDS = histogram(
+    "linkc_demo_pipeline_stage_seconds",
+    "Demo scheduling pipeline stage latency",
+    ["stage"],
+)
+
+# 调度演示使用的区域 (bench.pipeline 会按规模替换)
+DEMO_ZONES: List[str] = [
+    "1F-lobby", "B1-parking", "3F-dining", "10F-office", "25F-office",
+    "45F-executive", "2F-commercial", "15F-office",
+]
+
 
 # ====================================================================
 # Lifespan — 启动时加载种子数据
@@ -288,13 +308,20 @@ async def simulate_scheduling(
     """
     pipeline_start = time.monotonic()
     report = {"pipeline_steps": []}
+    step_start = time.perf_counter()
 
     def step(name, data):
+        nonlocal step_start
+        now = time.perf_counter()
+        if metrics_enabled():
+            PIPELINE_STAGE_SECONDS.observe(now - step_start, stage=name)
         report["pipeline_steps"].append({
             "step": name,
             "elapsed_ms": round((time.monotonic() - pipeline_start) * 1000, 1),
+            "duration_ms": round((now - step_start) * 1000, 3),
             "data": data,
         })
+        step_start = time.perf_counter()
 
     # ── Step 1: Load knowledge ──
     knowledge = await kb.query_applicable_knowledge(
@@ -317,6 +344,7 @@ async def simulate_scheduling(
         },
         scenario_category="cleaning",
         context={"building_type": "office_tower"},
+        stable_prefix=True,
     )
     step("2_assemble_prompt", {
         "prompt_length": len(prompt),
@@ -325,8 +353,7 @@ async def simulate_scheduling(
     })
 
     # ── Step 3: Simulate agent decision ──
-    zones = ["1F-lobby", "B1-parking", "3F-dining", "10F-office", "25F-office",
-             "45F-executive", "2F-commercial", "15F-office"]
+    zones = DEMO_ZONES
     robots = []
     for i in range(robot_count):
         battery = 15 if (include_low_battery and i == 0) else (60 + i * 5)
@@ -588,6 +615,7 @@ async def assemble_prompt_demo(
         },
         scenario_category="cleaning",
         context={"building_type": "office_tower"},
+        stable_prefix=True,
     )
 
     return {
@@ -1030,3 +1058,9 @@ async def list_modules():
         "total_tests": 361,
         "total_source_files": 16,
     }
+
+
+@app.get("/metrics", tags=["System"], include_in_schema=False)
+async def metrics():
+    """Prometheus 指标"""
+    return Response(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
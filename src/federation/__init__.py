@@ -7,10 +7,12 @@ Federation 集成模块
 from .client import FederationClient
 from .events import EventPublisher, EventTypes
 from .handlers import EventHandler
+from .patterns import PatternMatcher
 
 __all__ = [
     "FederationClient",
     "EventPublisher",
     "EventTypes",
-    "EventHandler"
+    "EventHandler",
+    "PatternMatcher"
 ]
@@ -3,10 +3,11 @@ Federation Event Handlers - 事件处理器
 """
 
 import logging
-import re
 from typing import Callable, Dict, Any, Optional, List
 from dataclasses import dataclass
 
+from .patterns import PatternMatcher
+
 logger = logging.getLogger("ecis_robot.federation.handlers")
 
 
@@ -31,7 +32,7 @@ class EventHandler:
     def __init__(self, capability_registry=None, agent_manager=None):
         self._capability_registry = capability_registry
         self._agent_manager = agent_manager
-        self._handlers: Dict[str, Callable] = {}
+        self._handlers: PatternMatcher[Callable] = PatternMatcher()
 
         # 注册默认处理器
         self._register_default_handlers()
@@ -49,7 +50,7 @@ class EventHandler:
             pattern: 事件类型模式，支持通配符
             handler: 处理函数
         """
-        self._handlers[pattern] = handler
+        self._handlers.add(pattern, handler)
         logger.info(f"Registered handler for pattern: {pattern}")
 
     async def handle(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -64,23 +65,16 @@ class EventHandler:
         """
         event_type = event.get("type", "")
 
-        for pattern, handler in self._handlers.items():
-            if self._match_pattern(pattern, event_type):
-                try:
-                    return await handler(event)
-                except Exception as e:
-                    logger.error(f"Handler error for {event_type}: {e}")
-                    return {"status": "error", "message": str(e)}
-
-        logger.warning(f"No handler found for event type: {event_type}")
-        return None
-
-    def _match_pattern(self, pattern: str, event_type: str) -> bool:
-        """匹配事件类型模式"""
-        if "*" in pattern:
-            regex = pattern.replace(".", r"\.").replace("*", ".*")
-            return bool(re.match(f"^{regex}$", event_type))
-        return pattern == event_type
+        handler = self._handlers.match(event_type)
+        if handler is None:
+            logger.warning(f"No handler found for event type: {event_type}")
+            return None
+
+        try:
+            return await handler(event)
+        except Exception as e:
+            logger.error(f"Handler error for {event_type}: {e}")
+            return {"status": "error", "message": str(e)}
 
     async def _handle_task_assign(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """处理任务分配事件"""
@@ -0,0 +1,120 @@
+"""
+Federation Patterns - 事件类型模式匹配
+
+注册时预编译事件类型模式，路由时不再为每个事件逐个构造正则:
+- 精确模式和 "a.b.*" 形式的前缀模式放入按 "." 分段的前缀树，匹配只沿事件类型走一遍
+- 其他通配形式 (如 "ecis.*.assign"、"ecis.robot*") 注册时编译为正则，挂在通配符之前的
+  完整字面分段对应的节点上，只有事件类型经过该节点时才尝试
+多个模式同时匹配时取最先注册的，与按注册顺序逐个匹配的结果一致。
+"""
+
+import re
+from typing import Dict, Generic, List, Optional, Pattern, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Node:
+    """前缀树节点"""
+
+    __slots__ = ("children", "exact", "prefix", "regexes")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.exact: Optional[str] = None    # 恰好到此结束的模式
+        self.prefix: Optional[str] = None   # "<此路径>.*" 模式
+        # 以此路径为字面前缀的其他通配模式 (按注册顺序)
+        self.regexes: List[Tuple[int, str, Pattern]] = []
+
+
+class PatternMatcher(Generic[T]):
+    """事件类型模式 → 值 (处理器) 的预编译匹配器"""
+
+    def __init__(self):
+        # 模式 → (注册序号, 值)；重复注册替换值并保留序号
+        self._patterns: Dict[str, Tuple[int, T]] = {}
+        self._next_order = 0
+        self._root = _Node()
+
+    def add(self, pattern: str, value: T) -> None:
+        existing = self._patterns.get(pattern)
+        if existing is not None:
+            self._patterns[pattern] = (existing[0], value)
+            return
+
+        order = self._next_order
+        self._next_order += 1
+        self._patterns[pattern] = (order, value)
+
+        if "*" not in pattern:
+            self._node(pattern).exact = pattern
+        elif pattern.endswith(".*") and "*" not in pattern[:-2]:
+            self._node(pattern[:-2]).prefix = pattern
+        else:
+            regex = re.compile(re.escape(pattern).replace(r"\*", ".*") + r"\Z")
+            self._literal_node(pattern).regexes.append((order, pattern, regex))
+
+    def remove(self, pattern: str) -> bool:
+        if self._patterns.pop(pattern, None) is None:
+            return False
+        if "*" not in pattern:
+            self._node(pattern).exact = None
+        elif pattern.endswith(".*") and "*" not in pattern[:-2]:
+            self._node(pattern[:-2]).prefix = None
+        else:
+            node = self._literal_node(pattern)
+            node.regexes = [entry for entry in node.regexes if entry[1] != pattern]
+        return True
+
+    def match(self, event_type: str) -> Optional[T]:
+        """最先注册的匹配模式对应的值"""
+        best: Optional[Tuple[int, T]] = None
+
+        node = self._root
+        for segment in event_type.split("."):
+            best = self._match_regexes(best, node, event_type)
+            if node.prefix is not None:
+                best = self._better(best, node.prefix)
+            node = node.children.get(segment)
+            if node is None:
+                break
+        else:
+            best = self._match_regexes(best, node, event_type)
+            if node.exact is not None:
+                best = self._better(best, node.exact)
+        return best[1] if best is not None else None
+
+    def _match_regexes(
+        self, best: Optional[Tuple[int, T]], node: _Node, event_type: str
+    ) -> Optional[Tuple[int, T]]:
+        for order, pattern, regex in node.regexes:
+            if best is not None and order > best[0]:
+                break
+            if regex.match(event_type):
+                return self._patterns[pattern]
+        return best
+
+    def _better(self, best: Optional[Tuple[int, T]], pattern: str) -> Tuple[int, T]:
+        candidate = self._patterns[pattern]
+        return candidate if best is None or candidate[0] < best[0] else best
+
+    def _literal_node(self, pattern: str) -> _Node:
+        """通配符之前的完整字面分段对应的节点"""
+        segments = pattern.split(".")
+        literal = next(i for i, segment in enumerate(segments) if "*" in segment)
+        node = self._root
+        for segment in segments[:literal]:
+            node = node.children.setdefault(segment, _Node())
+        return node
+
+    def _node(self, path: str) -> _Node:
+        node = self._root
+        for segment in path.split("."):
+            node = node.children.setdefault(segment, _Node())
+        return node
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._patterns
+
+    def __len__(self) -> int:
+        return len(self._patterns)
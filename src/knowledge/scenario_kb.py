@@ -5,10 +5,12 @@ Phase 1 内存实现，提供:
 - CRUD: 知识条目的增删改查（软删除）
 - 查询: 6维条件匹配，按优先级排序
 - Prompt组装: 模板变量填充 + 知识槽注入 + Token限制
+  (可选稳定前缀布局: 静态前缀 + 易变后缀，配合 LLM Prompt 缓存)
 - 效果跟踪: 使用计数与效果评分
 """
 
 import logging
+import math
 import re
 import uuid
 from copy import deepcopy
@@ -62,20 +64,87 @@ class PromptTemplate:
     max_total_tokens: int = 4000
     version: str = "1.0"
     is_active: bool = True
+    # 稳定前缀布局下可直接填入前缀的变量（如楼宇名称）；其余变量放入易变后缀
+    static_variables: List[str] = field(default_factory=list)
+
+
+@dataclass
+class AssembledPrompt:
+    """
+    稳定前缀布局的组装结果
+
+    static_prefix 只包含模板和与时间/条件无关的知识，同一楼宇的连续请求逐字节相同，
+    可作为 Prompt 缓存断点；volatile_suffix 包含变量值、时段/条件相关知识和实时上下文。
+    """
+    static_prefix: str
+    volatile_suffix: str = ""
+    knowledge_ids: List[str] = field(default_factory=list)
+
+    @property
+    def prompt(self) -> str:
+        """完整 prompt（前缀 + 后缀）"""
+        if not self.volatile_suffix:
+            return self.static_prefix
+        return f"{self.static_prefix}{PREFIX_SEPARATOR}{self.volatile_suffix}"
+
+    @property
+    def prefix_tokens(self) -> int:
+        return _estimate_tokens(self.static_prefix)
+
+    @property
+    def suffix_tokens(self) -> int:
+        return _estimate_tokens(self.volatile_suffix) if self.volatile_suffix else 0
+
+    def to_messages(self) -> List[Dict[str, Any]]:
+        """
+        拆分为 LLM 消息: 前缀作为 system 消息并标记缓存断点，后缀作为首条 user 消息。
+
+        可直接构造 shared.llm.Message(**msg)；LLM 客户端只取第一条 system 消息，
+        ClaudeLLMClient 会把 cache_control 转换为 ephemeral 缓存断点。
+        """
+        messages = [{"role": "system", "content": self.static_prefix, "cache_control": True}]
+        if self.volatile_suffix:
+            messages.append({"role": "user", "content": self.volatile_suffix})
+        return messages
 
 
 # ---------------------------------------------------------------------------
 # Token estimation helper
 # ---------------------------------------------------------------------------
 
+# 中日韩文字及全角标点: 约 1 token/字；其余字符（英文、数字、半角符号）约 4 字符/token
+_CJK_RE = re.compile(
+    "[\u2e80-\u2fdf\u3000-\u303f\u3040-\u30ff\u3100-\u31bf"
+    "\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+    "\ufe30-\ufe4f\uff00-\uffef]"
+)
+CJK_TOKENS_PER_CHAR = 1.0
+ASCII_CHARS_PER_TOKEN = 4
+
+
 def _estimate_tokens(text: str) -> int:
     """
-    粗略估算文本的token数。
+    估算文本的token数（区分中日韩文字）。
 
-    使用 1 token ~= 4 字符的经验法则（对英文合理，中文偏保守）。
-    Phase 2 可替换为 tiktoken 精确计算。
+    中文按每字约 1 token 计，其余字符按 4 字符/token 计。
+    原先统一按 len // 4 估算，纯中文会被低估约 4 倍。
     """
-    return max(1, len(text) // 4)
+    if not text:
+        return 1
+    other = len(_CJK_RE.sub("", text))
+    cjk = len(text) - other
+    return max(1, math.ceil(cjk * CJK_TOKENS_PER_CHAR + other / ASCII_CHARS_PER_TOKEN))
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """按估算的token数截断文本（与 _estimate_tokens 使用相同的计费规则）"""
+    budget = float(max_tokens)
+    ascii_cost = 1.0 / ASCII_CHARS_PER_TOKEN
+    for index, char in enumerate(text):
+        budget -= CJK_TOKENS_PER_CHAR if _CJK_RE.match(char) else ascii_cost
+        if budget < 0:
+            return text[:index]
+    return text
 
 
 # ---------------------------------------------------------------------------
@@ -84,6 +153,9 @@ def _estimate_tokens(text: str) -> int:
 
 _PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
 
+# 稳定前缀与易变后缀之间的分隔
+PREFIX_SEPARATOR = "\n\n"
+
 
 # ---------------------------------------------------------------------------
 # ScenarioKnowledgeBase
@@ -308,6 +380,7 @@ class ScenarioKnowledgeBase:
         variables: Dict[str, str],
         scenario_category: str,
         context: Dict[str, Any],
+        stable_prefix: bool = False,
     ) -> str:
         """
         组装完整的 Agent Prompt。
@@ -319,7 +392,16 @@ class ScenarioKnowledgeBase:
         4. 将知识注入 prompt 的对应位置
         5. 检查总 token 数不超过 max_total_tokens
         6. 返回组装后的完整 prompt
+
+        stable_prefix=True 时使用稳定前缀布局（见 assemble_prompt_parts），
+        返回 前缀 + 后缀 拼接后的文本。
         """
+        if stable_prefix:
+            parts = await self.assemble_prompt_parts(
+                template_id, variables, scenario_category, context
+            )
+            return parts.prompt
+
         template = self._templates.get(template_id)
         if template is None:
             raise ValueError(f"Template not found: {template_id}")
@@ -335,44 +417,14 @@ class ScenarioKnowledgeBase:
 
         for slot in template.knowledge_slots:
             slot_name: str = slot.get("slot_name", "knowledge")
-            slot_category: str = slot.get("category", scenario_category)
-            slot_max_items: int = slot.get("max_items", 5)
-
-            # Build query context from slot config and caller context
-            building_type = context.get("building_type", "all")
-            zone_id = context.get("zone_id", "all")
-            current_time = context.get("current_time")
-            query_conditions = context.get("conditions")
-            slot_knowledge_types = slot.get("knowledge_types")
-
-            applicable = await self.query_applicable_knowledge(
-                scenario_category=slot_category,
-                building_type=building_type,
-                zone_id=zone_id,
-                current_time=current_time,
-                conditions=query_conditions,
-                knowledge_types=slot_knowledge_types,
-                max_items=slot_max_items,
+            applicable = await self._query_slot_knowledge(
+                slot, scenario_category, context, slot.get("max_items", 5)
             )
 
             # Build knowledge text, respecting remaining token budget
-            knowledge_lines: List[str] = []
-            for item in applicable:
-                content_text = self._knowledge_to_text(item)
-                content_tokens = _estimate_tokens(content_text)
-
-                if content_tokens > remaining_knowledge_tokens:
-                    logger.debug(
-                        "Token budget exhausted for slot '%s', "
-                        "skipping knowledge %s",
-                        slot_name,
-                        item.knowledge_id,
-                    )
-                    break
-
-                knowledge_lines.append(content_text)
-                remaining_knowledge_tokens -= content_tokens
-
+            knowledge_lines, remaining_knowledge_tokens = self._take_within_budget(
+                applicable, remaining_knowledge_tokens, slot_name
+            )
             knowledge_block = "\n".join(knowledge_lines)
 
             # Inject: replace {{slot_name}} placeholder or append
@@ -387,8 +439,7 @@ class ScenarioKnowledgeBase:
         # Step 5: enforce max_total_tokens
         total_tokens = _estimate_tokens(prompt)
         if total_tokens > template.max_total_tokens:
-            max_chars = template.max_total_tokens * 4
-            prompt = prompt[:max_chars]
+            prompt = _truncate_to_tokens(prompt, template.max_total_tokens)
             logger.warning(
                 "Prompt truncated from ~%d to ~%d tokens for template %s",
                 total_tokens,
@@ -398,6 +449,172 @@ class ScenarioKnowledgeBase:
 
         return prompt
 
+    async def assemble_prompt_parts(
+        self,
+        template_id: str,
+        variables: Dict[str, str],
+        scenario_category: str,
+        context: Dict[str, Any],
+    ) -> AssembledPrompt:
+        """
+        按稳定前缀布局组装 Prompt。
+
+        静态前缀: 模板 + static_variables + 不受时段/条件影响的知识（按优先级、ID排序），
+        易变变量在前缀中以 [变量名] 引用；
+        易变后缀: 变量取值 + 时段/条件相关知识 + context["live_context"]。
+
+        同一模板、同一楼宇类型/区域的连续请求得到逐字节相同的前缀，
+        可在前缀末尾设置 LLM Prompt 缓存断点。
+        """
+        template = self._templates.get(template_id)
+        if template is None:
+            raise ValueError(f"Template not found: {template_id}")
+
+        static_values = {
+            name: variables[name]
+            for name in template.static_variables
+            if name in variables
+        }
+        volatile_names = [
+            name for name in dict.fromkeys([*template.variables, *variables])
+            if name not in static_values
+        ]
+        volatile_set = set(volatile_names)
+
+        def _reference(match: re.Match) -> str:
+            name = match.group(1)
+            if name in static_values:
+                return static_values[name]
+            if name in volatile_set:
+                return f"[{name}]"
+            return match.group(0)
+
+        prefix = _PLACEHOLDER_RE.sub(_reference, template.system_prompt)
+
+        suffix_sections: List[str] = []
+        runtime_lines = [
+            f"- {name}: {variables[name]}" for name in volatile_names if name in variables
+        ]
+        if runtime_lines:
+            suffix_sections.append("## 运行时上下文\n" + "\n".join(runtime_lines))
+
+        knowledge_ids: List[str] = []
+        remaining = template.max_knowledge_tokens
+        volatile_blocks: List[tuple] = []
+
+        # 先放稳定知识，保证前缀不受时段知识挤占预算的影响
+        slot_items = []
+        for slot in template.knowledge_slots:
+            max_items = slot.get("max_items", 5)
+            applicable = await self._query_slot_knowledge(
+                slot, scenario_category, context, max_items=len(self._knowledge)
+            )
+            stable = sorted(
+                (k for k in applicable if self._is_stable_knowledge(k)),
+                key=lambda k: (-k.priority, k.knowledge_id),
+            )[:max_items]
+            volatile = [k for k in applicable if not self._is_stable_knowledge(k)]
+            slot_items.append((slot, stable, volatile[:max_items - len(stable)]))
+
+        for slot, stable, _ in slot_items:
+            slot_name = slot.get("slot_name", "knowledge")
+            lines, remaining = self._take_within_budget(stable, remaining, slot_name)
+            knowledge_ids.extend(k.knowledge_id for k in stable[:len(lines)])
+            block = "\n".join(lines)
+            placeholder = "{{" + slot_name + "}}"
+            if placeholder in prefix:
+                prefix = prefix.replace(placeholder, block)
+            elif block:
+                prefix += f"\n\n### {slot_name}\n{block}"
+
+        for slot, _, volatile in slot_items:
+            slot_name = slot.get("slot_name", "knowledge")
+            lines, remaining = self._take_within_budget(volatile, remaining, slot_name)
+            knowledge_ids.extend(k.knowledge_id for k in volatile[:len(lines)])
+            if lines:
+                volatile_blocks.append((slot_name, "\n".join(lines)))
+
+        for slot_name, block in volatile_blocks:
+            suffix_sections.append(f"### {slot_name}（当前适用）\n{block}")
+
+        live_context = context.get("live_context")
+        if isinstance(live_context, dict):
+            live_context = "\n".join(f"- {k}: {v}" for k, v in live_context.items())
+        if live_context:
+            suffix_sections.append(f"## 实时状态\n{live_context}")
+
+        parts = AssembledPrompt(
+            static_prefix=prefix,
+            volatile_suffix="\n\n".join(suffix_sections),
+            knowledge_ids=knowledge_ids,
+        )
+
+        # 超出总 token 限制时先截断后缀，前缀尽量保持不变
+        total_tokens = _estimate_tokens(parts.prompt)
+        if total_tokens > template.max_total_tokens:
+            prefix_budget = template.max_total_tokens - parts.prefix_tokens
+            if prefix_budget > 0:
+                parts.volatile_suffix = _truncate_to_tokens(parts.volatile_suffix, prefix_budget)
+            else:
+                parts.static_prefix = _truncate_to_tokens(prefix, template.max_total_tokens)
+                parts.volatile_suffix = ""
+            logger.warning(
+                "Prompt truncated from ~%d to ~%d tokens for template %s",
+                total_tokens,
+                template.max_total_tokens,
+                template_id,
+            )
+
+        return parts
+
+    async def _query_slot_knowledge(
+        self,
+        slot: Dict[str, Any],
+        scenario_category: str,
+        context: Dict[str, Any],
+        max_items: int,
+    ) -> List[ScenarioKnowledge]:
+        """按知识槽配置和调用方上下文查询知识"""
+        return await self.query_applicable_knowledge(
+            scenario_category=slot.get("category", scenario_category),
+            building_type=context.get("building_type", "all"),
+            zone_id=context.get("zone_id", "all"),
+            current_time=context.get("current_time"),
+            conditions=context.get("conditions"),
+            knowledge_types=slot.get("knowledge_types"),
+            max_items=max_items,
+        )
+
+    def _take_within_budget(
+        self,
+        items: List[ScenarioKnowledge],
+        remaining_tokens: int,
+        slot_name: str,
+    ) -> tuple:
+        """按 token 预算依次取知识文本，返回 (文本列表, 剩余预算)"""
+        lines: List[str] = []
+        for item in items:
+            content_text = self._knowledge_to_text(item)
+            content_tokens = _estimate_tokens(content_text)
+
+            if content_tokens > remaining_tokens:
+                logger.debug(
+                    "Token budget exhausted for slot '%s', "
+                    "skipping knowledge %s",
+                    slot_name,
+                    item.knowledge_id,
+                )
+                break
+
+            lines.append(content_text)
+            remaining_tokens -= content_tokens
+        return lines, remaining_tokens
+
+    @staticmethod
+    def _is_stable_knowledge(knowledge: ScenarioKnowledge) -> bool:
+        """不随时段/运行条件变化的知识，可放入静态前缀"""
+        return not knowledge.applicable_time_ranges and not knowledge.applicable_conditions
+
     # ------------------------------------------------------------------
     # 效果跟踪
     # ------------------------------------------------------------------
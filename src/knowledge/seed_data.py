@@ -350,6 +350,7 @@ TOWER_C_PROMPT_TEMPLATES: List[PromptTemplate] = [
             '3. "reasoning": 简要说明调度决策的理由\n'
         ),
         variables=["building_name", "current_time", "robot_count"],
+        static_variables=["building_name"],
         knowledge_slots=[
             {
                 "slot_name": "domain_knowledge",
@@ -0,0 +1,177 @@
+"""
+LinkC Platform - MCP Server JSON-RPC over HTTP
+==============================================
+把 Tool handler (提供 async handle(name, arguments)) 暴露为 HTTP 端点，
+供 MCPClient 的远程传输 (src/agents/runtime/remote_transport.py) 调用:
+
+- POST /rpc: JSON-RPC 2.0，支持单个请求和 batch 数组；batch 内的调用并发执行
+- GET /health: 健康检查
+
+独立于 mcp SDK 运行 (stdio 入口仍在各 Server 的 server.py):
+    python -m src.mcp_servers.jsonrpc_http --server gaoxian --port 8001
+    python -m src.mcp_servers.jsonrpc_http --server task --port 8003
+"""
+
+from contextlib import asynccontextmanager
+from dataclasses import asdict, is_dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import asyncio
+import logging
+import os
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from src.shared.metrics import trace
+from src.shared.serialization import dumps_bytes, loads
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC 2.0 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def _to_payload(result: Any) -> Any:
+    """handler 返回值 → 可编码的结果 (ToolResult 使用 model_dump)"""
+    if hasattr(result, "model_dump"):
+        return result.model_dump()
+    if is_dataclass(result) and not isinstance(result, type):
+        return asdict(result)
+    return result
+
+
+async def _dispatch(handler: Any, message: Any) -> Optional[Dict[str, Any]]:
+    """处理单个 JSON-RPC 请求；通知 (无 id) 返回 None"""
+    if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or "method" not in message:
+        return _error(None, INVALID_REQUEST, "Invalid Request")
+
+    request_id = message.get("id")
+    if message["method"] != "tools/call":
+        return _error(request_id, METHOD_NOT_FOUND, f"Method not found: {message['method']}")
+
+    params = message.get("params") or {}
+    name = params.get("name")
+    if not isinstance(name, str):
+        return _error(request_id, INVALID_REQUEST, "params.name is required")
+    meta = params.get("_meta") or {}
+
+    try:
+        with trace(trace_id=meta.get("trace_id")):
+            result = await handler.handle(name, params.get("arguments") or {})
+    except Exception as e:
+        logger.error(f"Tool call error: {name} - {e}")
+        return _error(request_id, INTERNAL_ERROR, str(e))
+
+    if "id" not in message:
+        return None
+    return {"jsonrpc": "2.0", "id": request_id, "result": _to_payload(result)}
+
+
+def create_jsonrpc_app(
+    handler: Any,
+    on_startup: Sequence[Callable[[], Awaitable[None]]] = (),
+    on_shutdown: Sequence[Callable[[], Awaitable[None]]] = ()
+) -> Starlette:
+    """
+    创建 JSON-RPC ASGI 应用
+
+    Args:
+        handler: Tool handler，需提供 async handle(name, arguments)
+        on_startup / on_shutdown: 生命周期回调 (如启动 Mock 模拟循环)
+    """
+
+    async def rpc(request: Request) -> Response:
+        try:
+            body = loads(await request.body())
+        except ValueError:
+            return JSONResponse(_error(None, PARSE_ERROR, "Parse error"))
+
+        if isinstance(body, list):
+            if not body:
+                return JSONResponse(_error(None, INVALID_REQUEST, "Empty batch"))
+            replies: List[Any] = await asyncio.gather(*(_dispatch(handler, m) for m in body))
+            content: Any = [r for r in replies if r is not None]
+        else:
+            content = await _dispatch(handler, body)
+
+        if not content:
+            return Response(status_code=204)
+        return Response(dumps_bytes(content), media_type="application/json")
+
+    async def health(request: Request) -> Response:
+        return JSONResponse({"status": "ok"})
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        for callback in on_startup:
+            await callback()
+        try:
+            yield
+        finally:
+            for callback in on_shutdown:
+                await callback()
+
+    return Starlette(
+        routes=[
+            Route("/rpc", rpc, methods=["POST"]),
+            Route("/health", health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def _gaoxian_handler() -> Tuple[Any, list, list]:
+    from src.mcp_servers.robot_gaoxian.mock_client import MockGaoxianClient
+    from src.mcp_servers.robot_gaoxian.storage import InMemoryRobotStorage
+    from src.mcp_servers.robot_gaoxian.tools import RobotTools
+    from src.mcp_servers.space_manager.travel import get_travel_costs
+
+    storage = InMemoryRobotStorage()
+    client = MockGaoxianClient(storage, travel_costs=get_travel_costs())
+    tools = RobotTools(client, storage)
+    if os.getenv("GAOXIAN_USE_MOCK", "true").lower() == "true":
+        return tools, [client.start_simulation], [client.stop_simulation]
+    return tools, [], []
+
+
+def _task_handler() -> Tuple[Any, list, list]:
+    from src.mcp_servers.task_manager.storage import InMemoryTaskStorage
+    from src.mcp_servers.task_manager.tools import TaskTools
+
+    return TaskTools(InMemoryTaskStorage()), [], []
+
+
+# Server 名称 (与 MCPClient 的 servers 键一致) → handler 工厂
+HANDLER_FACTORIES: Dict[str, Callable[[], Tuple[Any, list, list]]] = {
+    "gaoxian": _gaoxian_handler,
+    "task": _task_handler,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="MCP server over JSON-RPC/HTTP")
+    parser.add_argument("--server", choices=sorted(HANDLER_FACTORIES), required=True)
+    parser.add_argument("--host", default=os.getenv("MCP_HTTP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_HTTP_PORT", "8001")))
+    args = parser.parse_args(argv)
+
+    handler, on_startup, on_shutdown = HANDLER_FACTORIES[args.server]()
+    app = create_jsonrpc_app(handler, on_startup, on_shutdown)
+    logger.info(f"Serving MCP {args.server} JSON-RPC on {args.host}:{args.port}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ M3: 高仙机器人 MCP Server - Mock 模拟器
 """
 
 import asyncio
+import math
 import random
 import logging
 from datetime import datetime, timedelta
@@ -32,6 +33,9 @@ from .storage import (
 
 logger = logging.getLogger(__name__)
 
+# 模拟器需要推进的状态 (其余状态每个 tick 无变化)
+_SIMULATED_STATUSES = (RobotStatus.WORKING, RobotStatus.CHARGING)
+
 
 class MockGaoxianClient:
     """
@@ -44,8 +48,15 @@ class MockGaoxianClient:
     - 随机故障
     """
 
-    def __init__(self, storage: InMemoryRobotStorage):
+    def __init__(self, storage: InMemoryRobotStorage, travel_costs=None):
+        """
+        Args:
+            storage: 机器人存储
+            travel_costs: 区域间行程代价服务 (TravelCostService)，设置后时长估算计入
+                前往区域的行程，返回充电时选择行程最短的充电点
+        """
         self.storage = storage
+        self.travel_costs = travel_costs
         self._simulation_task: Optional[asyncio.Task] = None
         self._running = False
 
@@ -81,11 +92,12 @@ class MockGaoxianClient:
 
     async def _simulate_tick(self):
         """单次模拟更新"""
-        for robot_id in list(self.storage._status_snapshots.keys()):
-            snapshot = await self.storage.get_status_snapshot(robot_id)
-            if not snapshot:
+        for snapshot in list(self.storage._status_snapshots.values()):
+            # 只有工作中 / 充电中的机器人会产生变化
+            if snapshot.status not in _SIMULATED_STATUSES:
                 continue
 
+            robot_id = snapshot.robot_id
             updates = {}
 
             # 1. 模拟任务进度
@@ -245,6 +257,8 @@ class MockGaoxianClient:
         robot = await self.storage.get_robot(robot_id)
         if not robot:
             return None
+        snapshot = await self.storage.get_status_snapshot(robot_id)
+        start = snapshot.current_location if snapshot else None
 
         # 创建任务
         robot_task = RobotTask(
@@ -257,7 +271,7 @@ class MockGaoxianClient:
             status="running",
             progress=0.0,
             started_at=datetime.utcnow(),
-            estimated_duration=self._estimate_duration(zone_id, cleaning_mode)
+            estimated_duration=self._estimate_duration(zone_id, cleaning_mode, start)
         )
 
         await self.storage.save_robot_task(robot_task)
@@ -371,18 +385,45 @@ class MockGaoxianClient:
         await self.storage.update_robot_status(robot_id, RobotStatus.CHARGING)
         await self.storage.update_status_snapshot(robot_id, {
             "status": RobotStatus.CHARGING,
-            "current_location": robot.home_location
+            "current_location": await self._charging_location(robot)
         })
 
         logger.info(f"Robot {robot_id} returning to charge")
         return True
 
-    def _estimate_duration(self, zone_id: str, intensity: CleaningIntensity) -> int:
-        """估算任务时长"""
+    async def _charging_location(self, robot: Robot) -> Optional[Location]:
+        """充电位置: 有行程代价时取行程最短的充电点 (不能乘梯的只在本楼层选)，否则回原位"""
+        snapshot = await self.storage.get_status_snapshot(robot.robot_id)
+        current = snapshot.current_location if snapshot else None
+        if self.travel_costs is None or current is None or not current.floor_id:
+            return robot.home_location
+
+        nearest = self.travel_costs.nearest(
+            current.floor_id, current.x, current.y,
+            same_floor=not robot.capabilities.can_elevator
+        )
+        if nearest is None:
+            return robot.home_location
+        place, _ = nearest
+        return Location(x=place.x, y=place.y, floor_id=place.floor_id)
+
+    def _estimate_duration(
+        self,
+        zone_id: str,
+        intensity: CleaningIntensity,
+        start: Optional[Location] = None
+    ) -> int:
+        """估算任务时长 (分钟)，已知起点时加上前往区域的行程"""
         base_duration = 30  # 基础30分钟
         intensity_factor = {
             CleaningIntensity.ECO: 0.8,
             CleaningIntensity.STANDARD: 1.0,
             CleaningIntensity.DEEP: 1.5
         }
-        return int(base_duration * intensity_factor.get(intensity, 1.0))
+        duration = int(base_duration * intensity_factor.get(intensity, 1.0))
+
+        if self.travel_costs is not None and start is not None and start.floor_id:
+            travel = self.travel_costs.cost_from(start.floor_id, start.x, start.y, zone_id)
+            if travel is not None and math.isfinite(travel):
+                duration += math.ceil(travel / 60)
+        return duration
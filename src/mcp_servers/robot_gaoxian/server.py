@@ -5,7 +5,6 @@ M3: 高仙机器人 MCP Server - 主入口
 """
 
 import asyncio
-import json
 import os
 import logging
 from mcp.server import Server
@@ -14,6 +13,7 @@ from mcp.types import TextContent, Tool
 from .storage import InMemoryRobotStorage
 from .mock_client import MockGaoxianClient
 from .tools import RobotTools
+from ..space_manager.travel import get_travel_costs
 
 # 配置日志
 logging.basicConfig(
@@ -35,10 +35,10 @@ storage = InMemoryRobotStorage()
 # 根据环境变量选择客户端
 USE_MOCK = os.getenv("GAOXIAN_USE_MOCK", "true").lower() == "true"
 if USE_MOCK:
-    client = MockGaoxianClient(storage)
+    client = MockGaoxianClient(storage, travel_costs=get_travel_costs())
 else:
     # TODO: 实现真实的高仙 API 客户端
-    client = MockGaoxianClient(storage)
+    client = MockGaoxianClient(storage, travel_costs=get_travel_costs())
 
 tools = RobotTools(client, storage)
 
@@ -120,6 +120,27 @@ TOOL_DEFINITIONS = [
             "required": ["robot_ids"]
         }
     ),
+    Tool(
+        name="robot_get_status_changes",
+        description="增量获取状态变更。返回 since_seq 之后状态有变化的机器人快照及下次拉取用的 next_seq。",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "since_seq": {
+                    "type": "integer",
+                    "description": "上次返回的 next_seq，默认0（全量）"
+                },
+                "tenant_id": {
+                    "type": "string",
+                    "description": "租户ID（可选）"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "最多返回条数（可选）"
+                }
+            }
+        }
+    ),
     Tool(
         name="robot_start_task",
         description="启动清洁任务。前置条件：机器人空闲或充电中，电量>=20%，无严重故障。",
@@ -322,7 +343,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
     return [TextContent(
         type="text",
-        text=json.dumps(result.model_dump(), ensure_ascii=False)
+        text=result.to_json()
     )]
 
 
@@ -4,7 +4,8 @@ M3: 高仙机器人 MCP Server - 存储层
 基于规格书 docs/specs/M3-gaoxian-mcp.md 实现
 """
 
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from uuid import uuid4
 from datetime import datetime
 from enum import Enum
@@ -107,6 +108,12 @@ class Robot(BaseModel):
     last_seen_at: Optional[datetime] = None
 
 
+def _location_to_dict(location: Optional[Location]) -> Optional[dict]:
+    if location is None:
+        return None
+    return {"x": location.x, "y": location.y, "floor_id": location.floor_id}
+
+
 class RobotStatusSnapshot(BaseModel):
     """机器人状态快照"""
     robot_id: str
@@ -131,6 +138,26 @@ class RobotStatusSnapshot(BaseModel):
 
     timestamp: datetime
 
+    def to_dict(self) -> dict:
+        """转换为 Tool 返回格式 (可直接 JSON 编码，不经过 pydantic 序列化)"""
+        return {
+            "robot_id": self.robot_id,
+            "status": self.status.value,
+            "current_location": _location_to_dict(self.current_location),
+            "battery_level": self.battery_level,
+            "water_level": self.water_level,
+            "dustbin_level": self.dustbin_level,
+            "current_task_id": self.current_task_id,
+            "current_zone_id": self.current_zone_id,
+            "task_progress": self.task_progress,
+            "speed": self.speed,
+            "cleaning_mode": self.cleaning_mode.value if self.cleaning_mode else None,
+            "cleaning_intensity": self.cleaning_intensity.value if self.cleaning_intensity else None,
+            "error_code": self.error_code,
+            "error_message": self.error_message,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
 
 class RobotError(BaseModel):
     """机器人错误"""
@@ -191,13 +218,35 @@ VALID_STATUS_TRANSITIONS = {
 # ============================================================
 
 class InMemoryRobotStorage:
-    """内存存储实现"""
+    """
+    内存存储实现
+
+    索引 (通过存储方法写入时同步维护):
+    - 租户 → 楼宇 → 状态 → robot_ids
+    - robot_id → 活跃错误、全部错误、任务
+    - 状态变更日志: 单调递增序号，可按序号增量拉取变更的状态快照
+    """
 
     def __init__(self):
         self._robots: Dict[str, Robot] = {}
         self._status_snapshots: Dict[str, RobotStatusSnapshot] = {}
         self._errors: Dict[str, RobotError] = {}
         self._tasks: Dict[str, RobotTask] = {}
+
+        # 机器人索引
+        self._robot_index: Dict[str, Dict[Optional[str], Dict[RobotStatus, Dict[str, None]]]] = {}
+        self._robot_keys: Dict[str, Tuple[str, Optional[str], RobotStatus]] = {}
+        self._robot_order: Dict[str, int] = {}
+
+        # 错误 / 任务索引
+        self._errors_by_robot: Dict[str, List[str]] = {}
+        self._active_errors: Dict[str, Dict[str, RobotError]] = {}
+        self._tasks_by_robot: Dict[str, List[str]] = {}
+
+        # 变更日志: robot_id -> 最近一次变更序号 (按序号升序排列)
+        self._change_seq = 0
+        self._journal: "OrderedDict[str, int]" = OrderedDict()
+
         self._init_sample_data()
 
     def _init_sample_data(self):
@@ -279,7 +328,7 @@ class InMemoryRobotStorage:
         ]
 
         for r in robots:
-            self._robots[r.robot_id] = r
+            self._put_robot(r)
 
         # 初始状态快照
         status_snapshots = [
@@ -320,6 +369,7 @@ class InMemoryRobotStorage:
 
         for s in status_snapshots:
             self._status_snapshots[s.robot_id] = s
+            self._record_change(s.robot_id)
 
         # 示例任务（机器人正在执行）
         task = RobotTask(
@@ -333,7 +383,7 @@ class InMemoryRobotStorage:
             started_at=now,
             estimated_duration=45
         )
-        self._tasks[task.robot_task_id] = task
+        self._put_task(task)
 
         # 示例错误
         error = RobotError(
@@ -348,10 +398,67 @@ class InMemoryRobotStorage:
             occurred_at=now,
             resolved=False
         )
+        self._put_error(error)
+
+    # ========== 索引维护 ==========
+
+    def _put_robot(self, robot: Robot) -> None:
+        """写入机器人并更新 租户/楼宇/状态 索引"""
+        robot_id = robot.robot_id
+        self._robots[robot_id] = robot
+        self._robot_order.setdefault(robot_id, len(self._robot_order))
+        self._reindex_robot(robot)
+
+    def _reindex_robot(self, robot: Robot) -> None:
+        robot_id = robot.robot_id
+        key = (robot.tenant_id, robot.building_id, robot.status)
+        old = self._robot_keys.get(robot_id)
+        if old == key:
+            return
+        if old is not None:
+            tenant_id, building_id, status = old
+            self._robot_index[tenant_id][building_id][status].pop(robot_id, None)
+
+        tenant_id, building_id, status = key
+        (
+            self._robot_index
+            .setdefault(tenant_id, {})
+            .setdefault(building_id, {})
+            .setdefault(status, {})
+        )[robot_id] = None
+        self._robot_keys[robot_id] = key
+
+    def _put_error(self, error: RobotError) -> None:
+        """写入错误并更新按机器人的错误索引"""
+        if error.error_id not in self._errors:
+            self._errors_by_robot.setdefault(error.robot_id, []).append(error.error_id)
         self._errors[error.error_id] = error
 
+        active = self._active_errors.setdefault(error.robot_id, {})
+        if error.resolved:
+            active.pop(error.error_id, None)
+        else:
+            active[error.error_id] = error
+
+    def _put_task(self, task: RobotTask) -> None:
+        if task.robot_task_id not in self._tasks:
+            self._tasks_by_robot.setdefault(task.robot_id, []).append(task.robot_task_id)
+        self._tasks[task.robot_task_id] = task
+
+    def _record_change(self, robot_id: str) -> None:
+        """记录状态变更到日志"""
+        self._change_seq += 1
+        self._journal[robot_id] = self._change_seq
+        self._journal.move_to_end(robot_id)
+
     # ========== 机器人操作 ==========
 
+    async def save_robot(self, robot: Robot) -> Robot:
+        """保存机器人"""
+        self._put_robot(robot)
+        self._record_change(robot.robot_id)
+        return robot
+
     async def get_robot(self, robot_id: str) -> Optional[Robot]:
         """获取机器人"""
         return self._robots.get(robot_id)
@@ -364,17 +471,35 @@ class InMemoryRobotStorage:
         robot_type: Optional[str] = None
     ) -> List[Robot]:
         """列出机器人"""
+        buildings = self._robot_index.get(tenant_id)
+        if not buildings:
+            return []
+
+        if building_id:
+            status_maps = [buildings[building_id]] if building_id in buildings else []
+        else:
+            status_maps = list(buildings.values())
+
+        if status:
+            try:
+                wanted = RobotStatus(status)
+            except ValueError:
+                return []
+            buckets = [m[wanted] for m in status_maps if wanted in m]
+        else:
+            buckets = [bucket for m in status_maps for bucket in m.values()]
+
         result = []
-        for robot in self._robots.values():
-            if robot.tenant_id != tenant_id:
-                continue
-            if building_id and robot.building_id != building_id:
-                continue
-            if status and robot.status.value != status:
-                continue
-            if robot_type and robot.robot_type.value != robot_type:
-                continue
-            result.append(robot)
+        for bucket in buckets:
+            for robot_id in bucket:
+                robot = self._robots[robot_id]
+                if robot_type and robot.robot_type.value != robot_type:
+                    continue
+                result.append(robot)
+
+        # 保持注册顺序
+        if len(buckets) > 1:
+            result.sort(key=lambda r: self._robot_order[r.robot_id])
         return result
 
     async def update_robot_status(
@@ -388,10 +513,18 @@ class InMemoryRobotStorage:
             return None
         robot.status = new_status
         robot.last_seen_at = datetime.utcnow()
+        self._reindex_robot(robot)
+        self._record_change(robot_id)
         return robot
 
     # ========== 状态快照操作 ==========
 
+    async def save_status_snapshot(self, snapshot: RobotStatusSnapshot) -> RobotStatusSnapshot:
+        """保存状态快照"""
+        self._status_snapshots[snapshot.robot_id] = snapshot
+        self._record_change(snapshot.robot_id)
+        return snapshot
+
     async def get_status_snapshot(self, robot_id: str) -> Optional[RobotStatusSnapshot]:
         """获取状态快照"""
         return self._status_snapshots.get(robot_id)
@@ -411,6 +544,7 @@ class InMemoryRobotStorage:
                 setattr(snapshot, key, value)
 
         snapshot.timestamp = datetime.utcnow()
+        self._record_change(robot_id)
         return snapshot
 
     async def batch_get_status(self, robot_ids: List[str]) -> List[RobotStatusSnapshot]:
@@ -421,11 +555,59 @@ class InMemoryRobotStorage:
             if rid in self._status_snapshots
         ]
 
+    @property
+    def change_seq(self) -> int:
+        """当前变更序号"""
+        return self._change_seq
+
+    async def get_changed_snapshots(
+        self,
+        since_seq: int = 0,
+        tenant_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[List[RobotStatusSnapshot], int]:
+        """
+        获取序号 since_seq 之后变更过的状态快照
+
+        从日志尾部向前扫描，复杂度与变更数成正比。
+
+        Args:
+            since_seq: 上次拉取返回的序号 (0 表示全量)
+            tenant_id: 租户筛选
+            limit: 最多返回条数 (按变更顺序取最早的)
+
+        Returns:
+            (变更的快照列表 (按变更顺序), 可用于下次拉取的序号)
+        """
+        changed = []
+        for robot_id in reversed(self._journal):
+            seq = self._journal[robot_id]
+            if seq <= since_seq:
+                break
+            changed.append((seq, robot_id))
+        changed.reverse()
+
+        result = []
+        next_seq = self._change_seq
+        for seq, robot_id in changed:
+            if tenant_id:
+                robot = self._robots.get(robot_id)
+                if not robot or robot.tenant_id != tenant_id:
+                    continue
+            snapshot = self._status_snapshots.get(robot_id)
+            if snapshot is None:
+                continue
+            if limit is not None and len(result) >= limit:
+                next_seq = seq - 1
+                break
+            result.append(snapshot)
+        return result, next_seq
+
     # ========== 任务操作 ==========
 
     async def save_robot_task(self, task: RobotTask) -> RobotTask:
         """保存机器人任务"""
-        self._tasks[task.robot_task_id] = task
+        self._put_task(task)
         return task
 
     async def get_robot_task(self, robot_task_id: str) -> Optional[RobotTask]:
@@ -434,8 +616,9 @@ class InMemoryRobotStorage:
 
     async def get_current_task(self, robot_id: str) -> Optional[RobotTask]:
         """获取机器人当前任务"""
-        for task in self._tasks.values():
-            if task.robot_id == robot_id and task.status in ["started", "running", "paused"]:
+        for task_id in self._tasks_by_robot.get(robot_id, ()):
+            task = self._tasks[task_id]
+            if task.status in ["started", "running", "paused"]:
                 return task
         return None
 
@@ -459,7 +642,7 @@ class InMemoryRobotStorage:
 
     async def save_error(self, error: RobotError) -> RobotError:
         """保存错误"""
-        self._errors[error.error_id] = error
+        self._put_error(error)
         return error
 
     async def get_error(self, error_id: str) -> Optional[RobotError]:
@@ -475,21 +658,31 @@ class InMemoryRobotStorage:
         limit: int = 50
     ) -> List[RobotError]:
         """列出错误"""
+        if resolved is False:
+            if robot_id:
+                candidates = list(self._active_errors.get(robot_id, {}).values())
+            else:
+                candidates = [e for active in self._active_errors.values() for e in active.values()]
+        elif robot_id:
+            candidates = [self._errors[eid] for eid in self._errors_by_robot.get(robot_id, ())]
+        else:
+            candidates = list(self._errors.values())
+
         result = []
-        for error in self._errors.values():
-            if robot_id and error.robot_id != robot_id:
-                continue
+        for error in candidates:
             if severity and error.severity.value != severity:
                 continue
             if resolved is not None and error.resolved != resolved:
                 continue
+            if tenant_id:
+                robot = self._robots.get(error.robot_id)
+                if robot and robot.tenant_id != tenant_id:
+                    continue
             result.append(error)
-            if len(result) >= limit:
-                break
 
-        # 按发生时间倒序
+        # 按发生时间倒序，排序后再截断
         result.sort(key=lambda e: e.occurred_at, reverse=True)
-        return result
+        return result[:limit]
 
     async def clear_error(
         self,
@@ -504,11 +697,12 @@ class InMemoryRobotStorage:
         error.resolved = True
         error.resolved_at = datetime.utcnow()
         error.resolved_by = resolved_by
+        self._active_errors.get(error.robot_id, {}).pop(error_id, None)
         return error
 
     async def get_active_errors_for_robot(self, robot_id: str) -> List[RobotError]:
         """获取机器人的活跃错误"""
         return [
-            e for e in self._errors.values()
-            if e.robot_id == robot_id and not e.resolved
+            e for e in self._active_errors.get(robot_id, {}).values()
+            if not e.resolved
         ]
@@ -19,6 +19,7 @@ def set_robot_status(storage, robot_id: str, status: RobotStatus, battery: int =
     # 更新 _robots 中的状态 (tools主要检查这里)
     if robot_id in storage._robots:
         storage._robots[robot_id].status = status
+        storage._reindex_robot(storage._robots[robot_id])
     # 更新 _status_snapshots 中的状态 (电量检查用这里)
     if robot_id in storage._status_snapshots:
         storage._status_snapshots[robot_id].status = status
@@ -38,7 +39,7 @@ def create_running_task(storage, robot_id: str, robot_task_id: str = "task_001",
         progress=50.0,
         started_at=datetime.utcnow()
     )
-    storage._tasks[robot_task_id] = task
+    storage._put_task(task)
     return task
 
 
@@ -376,7 +377,7 @@ async def test_clear_error(tools, storage):
         occurred_at=datetime.utcnow()
     )
     # _errors 使用 error_id 作为 key
-    storage._errors["err_001"] = error
+    await storage.save_error(error)
 
     result = await tools.handle("robot_clear_error", {
         "robot_id": "robot_001",
@@ -437,3 +438,111 @@ async def test_unknown_tool(tools):
     result = await tools.handle("unknown_tool", {})
     assert result.success is False
     assert "NOT_FOUND" in result.error_code  # 实际返回 NOT_FOUND
+
+
+# ============================================================
+# 存储索引 / 变更日志测试
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_list_robots_index_follows_status_updates(storage):
+    """状态索引随 update_robot_status 迁移，且保持注册顺序"""
+    all_ids = [r.robot_id for r in await storage.list_robots("tenant_001")]
+
+    await storage.update_robot_status("robot_001", RobotStatus.ERROR)
+    errored = await storage.list_robots("tenant_001", status="error")
+    assert "robot_001" in [r.robot_id for r in errored]
+    idle = await storage.list_robots("tenant_001", status="idle")
+    assert "robot_001" not in [r.robot_id for r in idle]
+
+    assert [r.robot_id for r in await storage.list_robots("tenant_001")] == all_ids
+    assert await storage.list_robots("tenant_001", status="unknown_status") == []
+
+
+@pytest.mark.asyncio
+async def test_list_errors_sorted_before_limit(storage):
+    """先按发生时间倒序再截断"""
+    from datetime import timedelta
+    from src.mcp_servers.robot_gaoxian.storage import RobotError, ErrorSeverity
+    base = datetime.utcnow()
+    for i in range(5):
+        await storage.save_error(RobotError(
+            error_id=f"err_idx_{i}",
+            robot_id="robot_002",
+            error_code="E100",
+            error_type="warning",
+            message="Test",
+            severity=ErrorSeverity.WARNING,
+            occurred_at=base + timedelta(minutes=i)
+        ))
+
+    latest = await storage.list_errors(robot_id="robot_002", limit=2)
+    assert [e.error_id for e in latest] == ["err_idx_4", "err_idx_3"]
+
+    await storage.clear_error("err_idx_4")
+    active = await storage.get_active_errors_for_robot("robot_002")
+    assert "err_idx_4" not in [e.error_id for e in active]
+    unresolved = await storage.list_errors(robot_id="robot_002", resolved=False)
+    assert [e.error_id for e in unresolved][:1] == ["err_idx_3"]
+
+
+@pytest.mark.asyncio
+async def test_get_status_changes(tools, storage):
+    """增量拉取只返回 since_seq 之后变更的快照"""
+    first = await tools.handle("robot_get_status_changes", {})
+    assert first.success is True
+    assert first.data["count"] == len(storage._status_snapshots)
+    cursor = first.data["next_seq"]
+
+    empty = await tools.handle("robot_get_status_changes", {"since_seq": cursor})
+    assert empty.data["count"] == 0
+    assert empty.data["next_seq"] == cursor
+
+    await storage.update_status_snapshot("robot_002", {"battery_level": 55})
+    await storage.update_status_snapshot("robot_001", {"battery_level": 66})
+    await storage.update_status_snapshot("robot_002", {"battery_level": 54})
+    changed = await tools.handle("robot_get_status_changes", {"since_seq": cursor})
+    assert [s["robot_id"] for s in changed.data["statuses"]] == ["robot_001", "robot_002"]
+
+    paged = await tools.handle("robot_get_status_changes", {"since_seq": cursor, "limit": 1})
+    assert [s["robot_id"] for s in paged.data["statuses"]] == ["robot_001"]
+    rest = await tools.handle("robot_get_status_changes", {"since_seq": paged.data["next_seq"]})
+    assert [s["robot_id"] for s in rest.data["statuses"]] == ["robot_002"]
+
+    invalid = await tools.handle("robot_get_status_changes", {"since_seq": -1})
+    assert invalid.error_code == "INVALID_PARAM"
+
+
+# ============================================================
+# 行程代价测试
+# ============================================================
+
+@pytest.mark.asyncio
+async def test_travel_costs_drive_duration_and_charging(storage):
+    """时长估算计入行程，返回充电选行程最短的充电点"""
+    from src.shared.travel import Place, TravelCostService
+
+    places = [
+        Place("zone_001", "floor_001", 1, 125.0, 5.0),
+        Place("dock_a", "floor_001", 1, 50.0, 5.0, "charging"),
+        Place("dock_b", "floor_002", 2, 5.0, 5.0, "charging"),
+        Place("lift_1", "floor_001", 1, 5.0, 5.0, "elevator"),
+        Place("lift_2", "floor_002", 2, 5.0, 5.0, "elevator"),
+    ]
+    owner = {p.id: "building_001" for p in places}
+    owner.update(floor_001="building_001", floor_002="building_001")
+    client = MockGaoxianClient(storage, travel_costs=TravelCostService(lambda _: places, owner.get))
+
+    # robot_001 位于 (5, 5)，到 zone_001 步行 120 米 = 4 分钟
+    task = await client.send_task("robot_001", "zone_001", CleaningMode.VACUUM)
+    assert task.estimated_duration == 30 + 4
+
+    # 可乘梯: 楼上充电点 (64 秒) 比本层 (90 秒) 近
+    await client.go_to_charge("robot_001", force=True)
+    location = (await storage.get_status_snapshot("robot_001")).current_location
+    assert (location.x, location.floor_id) == (5.0, "floor_002")
+
+    # 不能乘梯的机器人只在本层选
+    await client.go_to_charge("robot_002")
+    location = (await storage.get_status_snapshot("robot_002")).current_location
+    assert (location.x, location.floor_id) == (50.0, "floor_001")
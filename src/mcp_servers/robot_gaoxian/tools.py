@@ -16,6 +16,7 @@ M3: 高仙机器人 MCP Server - Tool 实现
 10. robot_go_to_charge     - 指挥机器人返回充电
 11. robot_get_errors       - 获取故障列表
 12. robot_clear_error      - 清除故障
+13. robot_get_status_changes - 增量获取状态变更
 """
 
 from typing import Dict, Any, Optional
@@ -34,6 +35,7 @@ from .storage import (
     VALID_STATUS_TRANSITIONS
 )
 from .mock_client import MockGaoxianClient
+from src.shared.serialization import dumps
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +69,10 @@ class ToolResult:
             result["error_code"] = self.error_code
         return result
 
+    def to_json(self) -> str:
+        """边界处一次性编码为 JSON"""
+        return dumps(self.model_dump())
+
 
 # ============================================================
 # Tool 实现
@@ -94,6 +100,7 @@ class RobotTools:
             "robot_go_to_charge": self._go_to_charge,
             "robot_get_errors": self._get_errors,
             "robot_clear_error": self._clear_error,
+            "robot_get_status_changes": self._get_status_changes,
         }
 
         handler = handlers.get(name)
@@ -223,6 +230,31 @@ class RobotTools:
             }
         )
 
+    async def _get_status_changes(self, args: Dict[str, Any]) -> ToolResult:
+        """Tool 13: 增量获取状态变更 (返回 since_seq 之后变更过的快照)"""
+        since_seq = args.get("since_seq", 0)
+        if not isinstance(since_seq, int) or since_seq < 0:
+            return ToolResult(
+                success=False,
+                error="since_seq must be a non-negative integer",
+                error_code="INVALID_PARAM"
+            )
+
+        snapshots, next_seq = await self.storage.get_changed_snapshots(
+            since_seq=since_seq,
+            tenant_id=args.get("tenant_id"),
+            limit=args.get("limit")
+        )
+
+        return ToolResult(
+            success=True,
+            data={
+                "statuses": [self._snapshot_to_dict(s) for s in snapshots],
+                "count": len(snapshots),
+                "next_seq": next_seq
+            }
+        )
+
     # ========== 任务控制类 Tools ==========
 
     async def _start_task(self, args: Dict[str, Any]) -> ToolResult:
@@ -702,27 +734,7 @@ class RobotTools:
 
     def _snapshot_to_dict(self, snapshot: RobotStatusSnapshot) -> dict:
         """转换状态快照为字典"""
-        return {
-            "robot_id": snapshot.robot_id,
-            "status": snapshot.status.value,
-            "current_location": {
-                "x": snapshot.current_location.x,
-                "y": snapshot.current_location.y,
-                "floor_id": snapshot.current_location.floor_id
-            } if snapshot.current_location else None,
-            "battery_level": snapshot.battery_level,
-            "water_level": snapshot.water_level,
-            "dustbin_level": snapshot.dustbin_level,
-            "current_task_id": snapshot.current_task_id,
-            "current_zone_id": snapshot.current_zone_id,
-            "task_progress": snapshot.task_progress,
-            "speed": snapshot.speed,
-            "cleaning_mode": snapshot.cleaning_mode.value if snapshot.cleaning_mode else None,
-            "cleaning_intensity": snapshot.cleaning_intensity.value if snapshot.cleaning_intensity else None,
-            "error_code": snapshot.error_code,
-            "error_message": snapshot.error_message,
-            "timestamp": snapshot.timestamp.isoformat()
-        }
+        return snapshot.to_dict()
 
     def _error_to_dict(self, error) -> dict:
         """转换错误为字典"""
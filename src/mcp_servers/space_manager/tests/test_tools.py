@@ -196,3 +196,24 @@ async def test_list_points_by_type(tools):
     assert result["total"] >= 1
     for point in result["points"]:
         assert point["point_type"] == "charging"
+
+
+# ============================================================
+# 行程代价测试
+# ============================================================
+
+def test_travel_costs_from_storage(storage):
+    """区域取点位平均位置，充电点可跨楼层选择"""
+    from src.mcp_servers.space_manager.travel import build_travel_costs
+
+    travel = build_travel_costs(storage)
+
+    # zone_001 的点位 (10, 5) 和 (0, 0) → (5, 2.5)
+    assert travel.cost_from("floor_001", 5.0, 5.0, "zone_001") == pytest.approx(2.5 / 0.5)
+    # zone_004 没有点位，不参与计算
+    assert travel.cost_from("floor_002", 0.0, 0.0, "zone_004") is None
+
+    place, _ = travel.nearest("floor_001", 9.0, 5.0)
+    assert place.id == "point_001"
+    place, _ = travel.nearest("floor_003", 0.0, 0.0)
+    assert place.id in ("point_001", "point_004")
@@ -0,0 +1,76 @@
+"""
+M1: 空间管理 MCP Server - 行程代价
+==================================
+由空间存储构建区域间行程代价服务 (TravelCostService)，供机器人 MCP
+估算任务行程和选择充电点。进程内共享一个实例，楼宇矩阵只在首次查询时构建。
+"""
+
+from typing import Dict, List, Optional
+
+from src.shared.travel import PLACE_CHARGING, PLACE_ELEVATOR, PLACE_ZONE, Place, TravelCostService
+
+from .storage import SpaceStorage
+
+
+def building_places(storage: SpaceStorage, building_id: str) -> List[Place]:
+    """
+    楼宇内的行程地点: 区域 (取其点位的平均位置)、充电点
+
+    存储中的区域没有边界，没有点位的区域不参与计算；每层在地图原点
+    放一个虚拟电梯口，保证跨楼层可达。
+    """
+    floors = {f["id"]: f for f in storage._floors.values() if f["building_id"] == building_id}
+    by_zone: Dict[str, List[dict]] = {}
+    for point in storage._points.values():
+        by_zone.setdefault(point["zone_id"], []).append(point)
+
+    places: List[Place] = []
+    for zone in storage._zones.values():
+        floor = floors.get(zone["floor_id"])
+        points = by_zone.get(zone["id"])
+        if floor is None or not points:
+            continue
+        x = sum(p["x"] for p in points) / len(points)
+        y = sum(p["y"] for p in points) / len(points)
+        places.append(Place(zone["id"], floor["id"], floor["floor_number"], x, y, PLACE_ZONE))
+        for point in points:
+            if point["point_type"] == "charging":
+                places.append(Place(point["id"], floor["id"], floor["floor_number"],
+                                    point["x"], point["y"], PLACE_CHARGING))
+
+    for floor in floors.values():
+        places.append(Place(f"{floor['id']}#elevator", floor["id"], floor["floor_number"],
+                            0.0, 0.0, PLACE_ELEVATOR))
+    return places
+
+
+def building_of(storage: SpaceStorage, ref: str) -> Optional[str]:
+    """区域、点位或楼层ID → 楼宇ID"""
+    item = storage._points.get(ref) or storage._zones.get(ref) or storage._floors.get(ref)
+    return item["building_id"] if item is not None else None
+
+
+def build_travel_costs(storage: SpaceStorage) -> TravelCostService:
+    """基于空间存储创建行程代价服务"""
+    return TravelCostService(
+        lambda building_id: building_places(storage, building_id),
+        lambda ref: building_of(storage, ref)
+    )
+
+
+# 进程内共享实例
+_travel_costs: Optional[TravelCostService] = None
+
+
+def get_travel_costs() -> TravelCostService:
+    """获取共享的行程代价服务 (基于示例空间数据)"""
+    global _travel_costs
+    if _travel_costs is None:
+        _travel_costs = build_travel_costs(SpaceStorage())
+    return _travel_costs
+
+
+def set_travel_costs(travel_costs: Optional[TravelCostService]) -> None:
+    """设置共享的行程代价服务（测试用）"""
+    global _travel_costs
+    _travel_costs = travel_costs
@@ -0,0 +1,190 @@
+"""
+M2: 任务管理 MCP Server - 排程展开引擎
+=====================================
+排程日历索引，供任务生成和下次执行时间计算使用:
+- (租户, 星期) → 排程 → 当天的时间段 (按开始时间排序)
+- 租户 → next_run 最小堆，版本号惰性删除
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+import heapq
+import itertools
+
+from src.shared.schedule import next_occurrence, parse_hhmm
+
+if TYPE_CHECKING:
+    from .storage import CleaningSchedule
+
+# 与 CleaningFrequency.ONCE 比较 (str 枚举)
+_ONCE = "once"
+
+# (开始分钟, 结束分钟)，时间格式无效时为 None
+SlotMinutes = Tuple[Optional[int], Optional[int]]
+
+
+class ScheduleCalendar:
+    """
+    排程日历索引
+
+    只索引活跃排程；排程保存/更新/删除时调用 add / remove 同步。
+    """
+
+    def __init__(self):
+        self._schedules: Dict[str, "CleaningSchedule"] = {}
+        self._by_weekday: Dict[Tuple[str, int], Dict[str, List[SlotMinutes]]] = {}
+        self._minutes: Dict[str, Dict[int, List[int]]] = {}
+
+        # next_run 堆: 租户 -> [(next_run, version, schedule_id)]
+        self._heaps: Dict[str, List[Tuple[datetime, int, str]]] = {}
+        self._next_run: Dict[str, Tuple[datetime, int]] = {}
+        self._version = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._schedules)
+
+    # ========== 索引维护 ==========
+
+    def add(self, schedule: "CleaningSchedule", now: Optional[datetime] = None) -> None:
+        """写入或重建排程索引"""
+        self.remove(schedule.schedule_id)
+        if not schedule.is_active:
+            return
+
+        by_weekday: Dict[int, List[SlotMinutes]] = {}
+        for slot in schedule.time_slots:
+            entry = (parse_hhmm(slot.start), parse_hhmm(slot.end))
+            for weekday in set(slot.days):
+                if 1 <= weekday <= 7:
+                    by_weekday.setdefault(weekday, []).append(entry)
+        if not by_weekday:
+            return
+
+        schedule_id = schedule.schedule_id
+        self._schedules[schedule_id] = schedule
+        minutes: Dict[int, List[int]] = {}
+        for weekday, slots in by_weekday.items():
+            slots.sort(key=lambda s: (s[0] is None, s[0] or 0))
+            self._by_weekday.setdefault((schedule.tenant_id, weekday), {})[schedule_id] = slots
+            valid = sorted({s[0] for s in slots if s[0] is not None})
+            if valid:
+                minutes[weekday] = valid
+        self._minutes[schedule_id] = minutes
+        self._push_next_run(schedule, now or datetime.utcnow())
+
+    def remove(self, schedule_id: str) -> None:
+        """移除排程索引 (堆中条目惰性删除)"""
+        schedule = self._schedules.pop(schedule_id, None)
+        if schedule is None:
+            return
+        self._minutes.pop(schedule_id, None)
+        for weekday in range(1, 8):
+            bucket = self._by_weekday.get((schedule.tenant_id, weekday))
+            if bucket:
+                bucket.pop(schedule_id, None)
+        self._next_run.pop(schedule_id, None)
+
+    # ========== 展开 ==========
+
+    def expand(
+        self,
+        tenant_id: str,
+        start: date,
+        days: int = 1
+    ) -> Iterator[Tuple[date, "CleaningSchedule", List[SlotMinutes]]]:
+        """
+        展开 [start, start + days) 内每天需要执行的排程
+
+        Yields:
+            (日期, 排程, 当天的时间段列表)
+        """
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            bucket = self._by_weekday.get((tenant_id, day.isoweekday()))
+            if not bucket:
+                continue
+            for schedule_id, slots in bucket.items():
+                schedule = self._schedules[schedule_id]
+                if not schedule.is_active:
+                    continue
+                if (
+                    schedule.frequency == _ONCE
+                    and schedule.created_at.date() != day
+                ):
+                    continue
+                yield day, schedule, slots
+
+    # ========== next_run ==========
+
+    def compute_next_run(self, schedule: "CleaningSchedule", after: datetime) -> Optional[datetime]:
+        """计算排程严格晚于 after 的下一次执行时间"""
+        only_date = (
+            schedule.created_at.date()
+            if schedule.frequency == _ONCE else None
+        )
+        return next_occurrence(
+            after,
+            self._minutes.get(schedule.schedule_id, {}),
+            only_date=only_date
+        )
+
+    def _push_next_run(self, schedule: "CleaningSchedule", after: datetime) -> None:
+        next_run = self.compute_next_run(schedule, after)
+        if next_run is None:
+            self._next_run.pop(schedule.schedule_id, None)
+            return
+        version = next(self._version)
+        self._next_run[schedule.schedule_id] = (next_run, version)
+        heapq.heappush(
+            self._heaps.setdefault(schedule.tenant_id, []),
+            (next_run, version, schedule.schedule_id)
+        )
+
+    def _is_live(self, entry: Tuple[datetime, int, str]) -> bool:
+        current = self._next_run.get(entry[2])
+        return current is not None and current[1] == entry[1]
+
+    def _advance(self, tenant_id: str, now: datetime) -> None:
+        """丢弃失效条目，并把已过期的排程推进到 now 之后"""
+        heap = self._heaps.get(tenant_id)
+        while heap and (not self._is_live(heap[0]) or heap[0][0] <= now):
+            _, _, schedule_id = heapq.heappop(heap)
+            if schedule_id in self._next_run and self._next_run[schedule_id][0] <= now:
+                self._push_next_run(self._schedules[schedule_id], now)
+
+    def get_next_run(self, schedule_id: str, now: Optional[datetime] = None) -> Optional[datetime]:
+        """单个排程的下次执行时间"""
+        schedule = self._schedules.get(schedule_id)
+        if schedule is None:
+            return None
+        now = now or datetime.utcnow()
+        current = self._next_run.get(schedule_id)
+        if current is None or current[0] <= now:
+            self._push_next_run(schedule, now)
+            current = self._next_run.get(schedule_id)
+        return current[0] if current else None
+
+    def upcoming(
+        self,
+        tenant_id: str,
+        now: Optional[datetime] = None,
+        limit: int = 10
+    ) -> List[Tuple[datetime, "CleaningSchedule"]]:
+        """按 next_run 升序返回最近要执行的排程"""
+        now = now or datetime.utcnow()
+        self._advance(tenant_id, now)
+        heap = self._heaps.get(tenant_id)
+        if not heap:
+            return []
+
+        result = []
+        popped = []
+        while heap and len(result) < limit:
+            entry = heapq.heappop(heap)
+            if not self._is_live(entry):
+                continue
+            popped.append(entry)
+            result.append((entry[0], self._schedules[entry[2]]))
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return result
@@ -5,7 +5,6 @@ M2: 任务管理 MCP Server - 主入口
 """
 
 import asyncio
-import json
 import logging
 from mcp.server import Server
 from mcp.types import TextContent, Tool
@@ -339,9 +338,27 @@ TOOL_DEFINITIONS = [
             "required": ["tenant_id"]
         }
     ),
+    Tool(
+        name="task_get_upcoming_schedules",
+        description="按下次执行时间升序获取即将执行的活跃排程，每条排程附带 next_run。",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "tenant_id": {
+                    "type": "string",
+                    "description": "租户ID（必填）"
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "最大返回数量，默认10"
+                }
+            },
+            "required": ["tenant_id"]
+        }
+    ),
     Tool(
         name="task_generate_daily_tasks",
-        description="根据排程生成指定日期的任务。幂等操作，同一排程同一天只生成一次。",
+        description="根据排程生成指定日期起若干天的任务，每个匹配的时间段生成一个任务。幂等操作，同一排程同一天只生成一次。",
         inputSchema={
             "type": "object",
             "properties": {
@@ -352,6 +369,14 @@ TOOL_DEFINITIONS = [
                 "date": {
                     "type": "string",
                     "description": "目标日期 YYYY-MM-DD（必填）"
+                },
+                "days": {
+                    "type": "integer",
+                    "description": "从目标日期起展开的天数，默认1，最多31"
+                },
+                "include_tasks": {
+                    "type": "boolean",
+                    "description": "是否在结果中返回生成的任务明细，默认true"
                 }
             },
             "required": ["tenant_id", "date"]
@@ -379,7 +404,7 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
     return [TextContent(
         type="text",
-        text=json.dumps(result.model_dump(), ensure_ascii=False)
+        text=result.to_json()
     )]
 
 
@@ -4,12 +4,17 @@ M2: 任务管理 MCP Server - 存储层
 基于规格书 docs/specs/M2-task-mcp.md 实现
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from uuid import UUID, uuid4
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
 from enum import Enum
+import bisect
+import heapq
+import itertools
 from pydantic import BaseModel, Field
 
+from .schedule_engine import ScheduleCalendar, SlotMinutes
+
 
 # ============================================================
 # 数据模型
@@ -107,13 +112,50 @@ class CleaningTask(BaseModel):
 # 存储层实现
 # ============================================================
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _ts(value: Optional[datetime], missing: float = float("inf")) -> float:
+    """datetime 转为可比较的时间戳 (naive 视为 UTC)"""
+    if value is None:
+        return missing
+    if value.tzinfo is None:
+        return (value - _EPOCH).total_seconds()
+    return value.timestamp()
+
+
+def _day_start_ts(day: date) -> float:
+    return _ts(datetime.combine(day, time.min))
+
+
 class InMemoryTaskStorage:
-    """内存存储实现（MVP阶段）"""
+    """
+    内存存储实现（MVP阶段）
+
+    任务维护二级索引，save_task / update_task 时同步更新:
+    - 租户 → task_ids，(租户, 状态) → task_ids
+    - 租户 → created_at 有序索引 (日期范围查询)
+    - 租户、(租户, 区域) → 待执行任务堆，键 (priority, scheduled_start, created_at)，惰性删除
+
+    活跃排程维护日历索引 (ScheduleCalendar)，save/update/delete_schedule 时同步。
+    """
 
     def __init__(self):
         self._schedules: Dict[str, CleaningSchedule] = {}
         self._tasks: Dict[str, CleaningTask] = {}
         self._generated_tasks: set = set()  # (schedule_id, date_str) 用于幂等检查
+        self._calendar = ScheduleCalendar()
+
+        # 任务索引
+        self._tasks_by_tenant: Dict[str, Set[str]] = {}
+        self._tasks_by_status: Dict[Tuple[str, TaskStatus], Set[str]] = {}
+        self._created_index: Dict[str, List[Tuple[float, str]]] = {}
+        self._pending_heaps: Dict[str, List[Tuple[int, float, float, int, str]]] = {}
+        self._zone_heaps: Dict[str, Dict[str, List[Tuple[int, float, float, int, str]]]] = {}
+        self._heap_seq: Dict[str, int] = {}  # task_id -> 堆中有效条目的序号
+        self._indexed: Dict[str, Tuple[str, TaskStatus, int, float, float, str]] = {}
+        self._seq = itertools.count()
+
         self._init_sample_data()
 
     def _init_sample_data(self):
@@ -155,6 +197,7 @@ class InMemoryTaskStorage:
 
         for s in schedules:
             self._schedules[s.schedule_id] = s
+            self._calendar.add(s)
 
         # 示例任务
         tasks = [
@@ -201,12 +244,14 @@ class InMemoryTaskStorage:
 
         for t in tasks:
             self._tasks[t.task_id] = t
+            self._index_task(t)
 
     # ========== 排程操作 ==========
 
     async def save_schedule(self, schedule: CleaningSchedule) -> CleaningSchedule:
         """保存排程"""
         self._schedules[schedule.schedule_id] = schedule
+        self._calendar.add(schedule)
         return schedule
 
     async def get_schedule(self, schedule_id: str) -> Optional[CleaningSchedule]:
@@ -249,12 +294,14 @@ class InMemoryTaskStorage:
                 setattr(schedule, key, value)
 
         schedule.updated_at = datetime.utcnow()
+        self._calendar.add(schedule)
         return schedule
 
     async def delete_schedule(self, schedule_id: str) -> bool:
         """删除排程"""
         if schedule_id in self._schedules:
             del self._schedules[schedule_id]
+            self._calendar.remove(schedule_id)
             return True
         return False
 
@@ -263,8 +310,21 @@ class InMemoryTaskStorage:
     async def save_task(self, task: CleaningTask) -> CleaningTask:
         """保存任务"""
         self._tasks[task.task_id] = task
+        self._index_task(task)
         return task
 
+    async def save_tasks(self, tasks: List[CleaningTask]) -> List[CleaningTask]:
+        """批量保存任务 (created_at 索引合并后统一排序)"""
+        created_batch: Dict[str, List[Tuple[float, str]]] = {}
+        for task in tasks:
+            self._tasks[task.task_id] = task
+            self._index_task(task, created_batch)
+        for tenant_id, entries in created_batch.items():
+            created = self._created_index.setdefault(tenant_id, [])
+            created.extend(entries)
+            created.sort()
+        return tasks
+
     async def get_task(self, task_id: str) -> Optional[CleaningTask]:
         """获取任务"""
         return self._tasks.get(task_id)
@@ -281,27 +341,42 @@ class InMemoryTaskStorage:
         offset: int = 0
     ) -> Tuple[List[CleaningTask], int]:
         """列出任务"""
-        result = []
-        for task in self._tasks.values():
-            if task.tenant_id != tenant_id:
-                continue
-            if zone_id and task.zone_id != zone_id:
-                continue
-            if robot_id and task.assigned_robot_id != robot_id:
-                continue
-            if status and task.status.value != status:
-                continue
-            if date_from and task.created_at.date() < date_from:
-                continue
-            if date_to and task.created_at.date() > date_to:
-                continue
-            result.append(task)
-
-        total = len(result)
-        # 按优先级和创建时间排序
-        result.sort(key=lambda t: (t.priority, t.created_at))
-        result = result[offset:offset + limit]
-        return result, total
+        if status:
+            try:
+                candidate_ids = self._tasks_by_status.get((tenant_id, TaskStatus(status)), ())
+            except ValueError:
+                return [], 0
+        elif date_from or date_to:
+            candidate_ids = self._created_range(tenant_id, date_from, date_to)
+        else:
+            candidate_ids = self._tasks_by_tenant.get(tenant_id, ())
+
+        tasks = self._tasks
+        if zone_id or robot_id or date_from or date_to:
+            matched = []
+            for task_id in candidate_ids:
+                task = tasks[task_id]
+                if zone_id and task.zone_id != zone_id:
+                    continue
+                if robot_id and task.assigned_robot_id != robot_id:
+                    continue
+                if date_from and task.created_at.date() < date_from:
+                    continue
+                if date_to and task.created_at.date() > date_to:
+                    continue
+                matched.append(task_id)
+        else:
+            matched = list(candidate_ids)
+
+        total = len(matched)
+        # 按优先级和创建时间排序 (使用索引中缓存的键)
+        indexed = self._indexed
+        page = heapq.nsmallest(
+            offset + limit,
+            matched,
+            key=lambda task_id: (indexed[task_id][2], indexed[task_id][4], task_id)
+        )[offset:]
+        return [tasks[task_id] for task_id in page], total
 
     async def update_task(
         self,
@@ -318,6 +393,7 @@ class InMemoryTaskStorage:
                 setattr(task, key, value)
 
         task.updated_at = datetime.utcnow()
+        self._index_task(task)
         return task
 
     async def get_pending_tasks(
@@ -326,27 +402,140 @@ class InMemoryTaskStorage:
         zone_ids: Optional[List[str]] = None,
         max_count: int = 20
     ) -> List[CleaningTask]:
-        """获取待执行任务"""
+        """
+        获取待执行任务
+
+        按 (优先级, 计划时间, 创建时间) 取前 K 个。指定区域时合并各区域的堆，
+        否则使用租户堆；只读遍历堆结构，不修改堆，复杂度 O(K log K)。
+        """
+        if max_count <= 0:
+            return []
+        if zone_ids:
+            zone_heaps = self._zone_heaps.get(tenant_id, {})
+            heaps = [zone_heaps[z] for z in dict.fromkeys(zone_ids) if zone_heaps.get(z)]
+        else:
+            heap = self._pending_heaps.get(tenant_id)
+            heaps = [heap] if heap else []
+
+        return [self._tasks[task_id] for task_id in self._top_pending(heaps, max_count)]
+
+    def _top_pending(
+        self,
+        heaps: List[List[Tuple[int, float, float, int, str]]],
+        max_count: int
+    ) -> List[str]:
+        """
+        从若干个堆中按序取前 max_count 个有效的 task_id
+
+        堆的下标 i 的子节点为 2i+1、2i+2，用辅助堆按条目大小展开各堆的节点，
+        过期条目跳过但继续展开其子节点。
+        """
+        frontier = [(heap[0], h, 0) for h, heap in enumerate(heaps)]
+        heapq.heapify(frontier)
         result = []
-        for task in self._tasks.values():
-            if task.tenant_id != tenant_id:
-                continue
-            if task.status != TaskStatus.PENDING:
-                continue
-            if zone_ids and task.zone_id not in zone_ids:
-                continue
-            result.append(task)
-            if len(result) >= max_count:
-                break
-
-        # 按优先级、计划时间、创建时间排序
-        result.sort(key=lambda t: (
-            t.priority,
-            t.scheduled_start or datetime.max,
-            t.created_at
-        ))
+        while frontier and len(result) < max_count:
+            entry, h, i = heapq.heappop(frontier)
+            if self._heap_seq.get(entry[4]) == entry[3]:
+                result.append(entry[4])
+            heap = heaps[h]
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], h, child))
         return result
 
+    # ========== 任务索引 ==========
+
+    def _index_task(
+        self,
+        task: CleaningTask,
+        created_batch: Optional[Dict[str, List[Tuple[float, str]]]] = None
+    ) -> None:
+        """
+        根据任务当前字段更新所有索引
+
+        created_batch 不为空时，新任务的 created_at 条目先收集到其中，由调用方批量合并。
+        """
+        task_id = task.task_id
+        key = (
+            task.tenant_id,
+            task.status,
+            task.priority,
+            _ts(task.scheduled_start),
+            _ts(task.created_at),
+            task.zone_id,
+        )
+        old = self._indexed.get(task_id)
+        if old == key:
+            return
+
+        tenant_id, status, priority, scheduled_ts, created_ts, zone_id = key
+        if old is not None:
+            old_tenant, old_status, _, _, old_created, _ = old
+            if old_tenant != tenant_id:
+                self._tasks_by_tenant[old_tenant].discard(task_id)
+            if (old_tenant, old_status) != (tenant_id, status):
+                self._tasks_by_status[(old_tenant, old_status)].discard(task_id)
+            if (old_tenant, old_created) != (tenant_id, created_ts):
+                created = self._created_index[old_tenant]
+                i = bisect.bisect_left(created, (old_created, task_id))
+                if i < len(created) and created[i] == (old_created, task_id):
+                    del created[i]
+                bisect.insort(self._created_index.setdefault(tenant_id, []), (created_ts, task_id))
+        elif created_batch is not None:
+            created_batch.setdefault(tenant_id, []).append((created_ts, task_id))
+        else:
+            bisect.insort(self._created_index.setdefault(tenant_id, []), (created_ts, task_id))
+
+        self._tasks_by_tenant.setdefault(tenant_id, set()).add(task_id)
+        self._tasks_by_status.setdefault((tenant_id, status), set()).add(task_id)
+
+        # 待执行堆: 旧条目通过序号失效，待执行时压入新条目
+        self._heap_seq.pop(task_id, None)
+        if status == TaskStatus.PENDING:
+            seq = next(self._seq)
+            self._heap_seq[task_id] = seq
+            entry = (priority, scheduled_ts, created_ts, seq, task_id)
+            heapq.heappush(self._pending_heaps.setdefault(tenant_id, []), entry)
+            heapq.heappush(self._zone_heaps.setdefault(tenant_id, {}).setdefault(zone_id, []), entry)
+            self._compact_heap(tenant_id)
+
+        self._indexed[task_id] = key
+
+    def _compact_heap(self, tenant_id: str) -> None:
+        """
+        过期条目超过有效条目时重建堆
+
+        区域堆的条目与租户堆同时压入，其过期条目数不超过租户堆，随租户堆一起重建。
+        """
+        heap = self._pending_heaps[tenant_id]
+        live = len(self._tasks_by_status.get((tenant_id, TaskStatus.PENDING), ()))
+        if len(heap) > 2 * live + 64:
+            heap[:] = [e for e in heap if self._heap_seq.get(e[4]) == e[3]]
+            heapq.heapify(heap)
+
+            zone_heaps = self._zone_heaps[tenant_id]
+            for zone_id, zone_heap in list(zone_heaps.items()):
+                zone_heap[:] = [e for e in zone_heap if self._heap_seq.get(e[4]) == e[3]]
+                if zone_heap:
+                    heapq.heapify(zone_heap)
+                else:
+                    del zone_heaps[zone_id]
+
+    def _created_range(
+        self,
+        tenant_id: str,
+        date_from: Optional[date],
+        date_to: Optional[date]
+    ) -> List[str]:
+        """按 created_at 有序索引取日期范围内的任务"""
+        created = self._created_index.get(tenant_id, [])
+        lo = bisect.bisect_left(created, (_day_start_ts(date_from), "")) if date_from else 0
+        if date_to:
+            hi = bisect.bisect_left(created, (_day_start_ts(date_to + timedelta(days=1)), ""))
+        else:
+            hi = len(created)
+        return [task_id for _, task_id in created[lo:hi]]
+
     # ========== 任务生成 ==========
 
     async def is_task_generated(self, schedule_id: str, task_date: date) -> bool:
@@ -357,6 +546,38 @@ class InMemoryTaskStorage:
         """标记任务已生成"""
         self._generated_tasks.add((schedule_id, task_date.isoformat()))
 
+    async def mark_tasks_generated(self, keys: List[Tuple[str, date]]):
+        """批量标记任务已生成"""
+        self._generated_tasks.update(
+            (schedule_id, task_date.isoformat()) for schedule_id, task_date in keys
+        )
+
+    async def expand_schedules(
+        self,
+        tenant_id: str,
+        start_date: date,
+        days: int = 1
+    ) -> List[Tuple[date, CleaningSchedule, List[SlotMinutes]]]:
+        """展开日期范围内每天需要执行的排程及其时间段"""
+        return list(self._calendar.expand(tenant_id, start_date, days))
+
+    async def get_next_runs(
+        self,
+        tenant_id: str,
+        limit: int = 10,
+        now: Optional[datetime] = None
+    ) -> List[Tuple[datetime, CleaningSchedule]]:
+        """按下次执行时间升序获取排程"""
+        return self._calendar.upcoming(tenant_id, now=now, limit=limit)
+
+    async def get_schedule_next_run(
+        self,
+        schedule_id: str,
+        now: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """获取排程的下次执行时间"""
+        return self._calendar.get_next_run(schedule_id, now=now)
+
     async def get_active_schedules(self, tenant_id: str) -> List[CleaningSchedule]:
         """获取活跃的排程"""
         return [
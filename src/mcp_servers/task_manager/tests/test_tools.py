@@ -115,6 +115,89 @@ class TestStorage:
         # 第二次检查应该返回True
         assert await storage.is_task_generated("schedule_001", today)
 
+    @staticmethod
+    def _task(task_id, priority, created_at, status=TaskStatus.PENDING, zone_id="zone_x"):
+        return CleaningTask(
+            task_id=task_id,
+            tenant_id="idx_tenant",
+            zone_id=zone_id,
+            task_type=TaskType.ROUTINE,
+            status=status,
+            priority=priority,
+            created_at=created_at,
+            updated_at=created_at
+        )
+
+    @pytest.mark.asyncio
+    async def test_pending_tasks_top_k(self, storage):
+        """测试待执行任务返回优先级最高的前 K 个，而不是任意子集"""
+        base = datetime(2024, 1, 1)
+        for i in range(30):
+            # 先插入低优先级任务，旧实现会在排序前截断到这些任务
+            await storage.save_task(self._task(f"t_{i:02d}", 10 - i % 10, base + timedelta(minutes=i)))
+
+        pending = await storage.get_pending_tasks("idx_tenant", max_count=5)
+        assert [t.priority for t in pending] == [1, 1, 1, 2, 2]
+        assert [t.task_id for t in pending[:3]] == ["t_09", "t_19", "t_29"]
+
+        # 查询不破坏堆
+        again = await storage.get_pending_tasks("idx_tenant", max_count=5)
+        assert [t.task_id for t in again] == [t.task_id for t in pending]
+
+    @pytest.mark.asyncio
+    async def test_pending_index_follows_updates(self, storage):
+        """测试状态/优先级变更后索引同步"""
+        base = datetime(2024, 1, 1)
+        await storage.save_task(self._task("a", 5, base))
+        await storage.save_task(self._task("b", 3, base, zone_id="zone_y"))
+
+        await storage.update_task("b", {"status": TaskStatus.ASSIGNED})
+        await storage.update_task("a", {"priority": 1})
+        pending = await storage.get_pending_tasks("idx_tenant")
+        assert [t.task_id for t in pending] == ["a"]
+
+        assigned, total = await storage.list_tasks("idx_tenant", status="assigned")
+        assert total == 1 and assigned[0].task_id == "b"
+
+        await storage.update_task("b", {"status": TaskStatus.PENDING})
+        pending = await storage.get_pending_tasks("idx_tenant", zone_ids=["zone_y"])
+        assert [t.task_id for t in pending] == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_pending_tasks_by_zone(self, storage):
+        """测试按区域取前 K 个: 合并区域堆，查询不修改堆"""
+        base = datetime(2024, 1, 1)
+        for i in range(40):
+            await storage.save_task(self._task(f"x_{i:02d}", 1, base + timedelta(minutes=i)))
+        for i in range(6):
+            zone_id = "zone_y" if i % 2 else "zone_z"
+            await storage.save_task(self._task(f"y_{i}", 5 - i % 3, base, zone_id=zone_id))
+        await storage.update_task("x_00", {"zone_id": "zone_z", "priority": 9})
+
+        heaps = [list(storage._pending_heaps["idx_tenant"])]
+        heaps += [list(h) for h in storage._zone_heaps["idx_tenant"].values()]
+
+        pending = await storage.get_pending_tasks("idx_tenant", zone_ids=["zone_y", "zone_z"], max_count=4)
+        assert [(t.task_id, t.priority) for t in pending] == [("y_2", 3), ("y_5", 3), ("y_1", 4), ("y_4", 4)]
+        pending = await storage.get_pending_tasks("idx_tenant", zone_ids=["zone_z"])
+        assert [t.task_id for t in pending] == ["y_2", "y_4", "y_0", "x_00"]
+
+        after = [list(storage._pending_heaps["idx_tenant"])]
+        after += [list(h) for h in storage._zone_heaps["idx_tenant"].values()]
+        assert after == heaps
+
+    @pytest.mark.asyncio
+    async def test_list_tasks_date_range(self, storage):
+        """测试按创建日期范围查询"""
+        for day in range(1, 6):
+            await storage.save_task(self._task(f"d_{day}", 5, datetime(2024, 1, day, 12)))
+
+        tasks, total = await storage.list_tasks(
+            "idx_tenant", date_from=date(2024, 1, 2), date_to=date(2024, 1, 4)
+        )
+        assert total == 3
+        assert {t.task_id for t in tasks} == {"d_2", "d_3", "d_4"}
+
 
 # ============================================================
 # Tools 测试
@@ -312,6 +395,115 @@ class TestTools:
         assert result2.success
         assert result2.data["skipped_count"] >= result.data["generated_count"]
 
+    @pytest.mark.asyncio
+    async def test_generate_tasks_multi_slot_horizon(self, tools, storage):
+        """多时间段、多天展开，每个时间段生成一个任务"""
+        now = datetime.utcnow()
+        await storage.save_schedule(CleaningSchedule(
+            schedule_id="schedule_multi",
+            tenant_id="tenant_multi",
+            zone_id="zone_multi",
+            task_type=TaskType.ROUTINE,
+            frequency=CleaningFrequency.DAILY,
+            time_slots=[
+                TimeSlot(start="14:00", end="15:00", days=[1, 3]),
+                TimeSlot(start="08:00", end="09:30", days=[1]),
+            ],
+            created_at=now,
+            updated_at=now
+        ))
+
+        # 2024-01-01 是周一
+        result = await tools.handle("task_generate_daily_tasks", {
+            "tenant_id": "tenant_multi",
+            "date": "2024-01-01",
+            "days": 7
+        })
+
+        assert result.success
+        starts = sorted(t["scheduled_start"] for t in result.data["tasks"])
+        assert starts == [
+            "2024-01-01T08:00:00",
+            "2024-01-01T14:00:00",
+            "2024-01-03T14:00:00",
+        ]
+        pending, total = await storage.list_tasks("tenant_multi")
+        assert total == 3
+
+        again = await tools.handle("task_generate_daily_tasks", {
+            "tenant_id": "tenant_multi",
+            "date": "2024-01-01",
+            "days": 7
+        })
+        assert again.data["generated_count"] == 0
+        assert again.data["skipped_count"] == 2
+
+        invalid = await tools.handle("task_generate_daily_tasks", {
+            "tenant_id": "tenant_multi",
+            "date": "2024-01-01",
+            "days": 0
+        })
+        assert invalid.error_code == "INVALID_PARAM"
+
+    def test_schedule_calendar_next_runs(self):
+        """next_run 堆按时间排序，随时间推进和排程停用同步"""
+        from src.mcp_servers.task_manager.schedule_engine import ScheduleCalendar
+
+        monday = datetime(2024, 1, 1, 9, 0)
+        calendar = ScheduleCalendar()
+        for schedule_id, slot in (
+            ("schedule_a", TimeSlot(start="08:00", end="10:00", days=[1, 2, 3, 4, 5])),
+            ("schedule_b", TimeSlot(start="14:00", end="16:00", days=[1, 4])),
+        ):
+            calendar.add(CleaningSchedule(
+                schedule_id=schedule_id,
+                tenant_id="tenant_cal",
+                zone_id="zone_cal",
+                task_type=TaskType.ROUTINE,
+                frequency=CleaningFrequency.DAILY,
+                time_slots=[slot],
+                created_at=monday,
+                updated_at=monday
+            ), now=monday)
+
+        upcoming = calendar.upcoming("tenant_cal", now=monday)
+        assert [(s.schedule_id, run) for run, s in upcoming] == [
+            ("schedule_b", datetime(2024, 1, 1, 14, 0)),
+            ("schedule_a", datetime(2024, 1, 2, 8, 0)),
+        ]
+
+        upcoming = calendar.upcoming("tenant_cal", now=datetime(2024, 1, 1, 15, 0), limit=1)
+        assert [(s.schedule_id, run) for run, s in upcoming] == [
+            ("schedule_a", datetime(2024, 1, 2, 8, 0)),
+        ]
+        assert calendar.get_next_run("schedule_b", now=datetime(2024, 1, 1, 15, 0)) == \
+            datetime(2024, 1, 4, 14, 0)
+
+        calendar.remove("schedule_b")
+        upcoming = calendar.upcoming("tenant_cal", now=datetime(2024, 1, 5, 20, 0))
+        assert [(s.schedule_id, run) for run, s in upcoming] == [
+            ("schedule_a", datetime(2024, 1, 8, 8, 0)),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_upcoming_schedules(self, tools):
+        """测试按下次执行时间获取排程，排程详情附带 next_run"""
+        result = await tools.handle("task_get_upcoming_schedules", {
+            "tenant_id": "tenant_001",
+            "limit": 5
+        })
+
+        assert result.success
+        runs = [s["next_run"] for s in result.data["schedules"]]
+        assert result.data["count"] == 2
+        assert all(runs) and runs == sorted(runs)
+
+        detail = await tools.handle("task_get_schedule", {"schedule_id": "schedule_001"})
+        assert detail.data["schedule"]["next_run"] in runs
+
+        invalid = await tools.handle("task_get_upcoming_schedules", {"tenant_id": "tenant_001", "limit": 0})
+        assert invalid.error_code == "INVALID_PARAM"
+
     @pytest.mark.asyncio
     async def test_unknown_tool(self, tools):
         """测试未知工具"""
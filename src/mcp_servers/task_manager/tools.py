@@ -3,7 +3,7 @@ M2: 任务管理 MCP Server - Tool 实现
 ===================================
 基于规格书 docs/specs/M2-task-mcp.md 实现
 
-10个Tools:
+11个Tools:
 1. task_list_schedules     - 获取排程列表
 2. task_get_schedule       - 获取排程详情
 3. task_create_schedule    - 创建排程
@@ -14,6 +14,7 @@ M2: 任务管理 MCP Server - Tool 实现
 8. task_update_status      - 更新任务状态
 9. task_get_pending_tasks  - 获取待执行任务
 10. task_generate_daily_tasks - 生成每日任务
+11. task_get_upcoming_schedules - 按下次执行时间获取排程
 """
 
 from typing import Dict, Any, List, Optional
@@ -30,9 +31,14 @@ from .storage import (
     CleaningFrequency,
     TimeSlot
 )
+from src.shared.schedule import minutes_to_datetime
+from src.shared.serialization import dumps
 
 logger = logging.getLogger(__name__)
 
+# task_generate_daily_tasks 单次最多展开的天数
+MAX_GENERATE_DAYS = 31
+
 
 # ============================================================
 # 返回结果模型
@@ -63,6 +69,10 @@ class ToolResult:
             result["error_code"] = self.error_code
         return result
 
+    def to_json(self) -> str:
+        """边界处一次性编码为 JSON"""
+        return dumps(self.model_dump())
+
 
 # ============================================================
 # 状态流转规则
@@ -101,6 +111,7 @@ class TaskTools:
             "task_update_status": self._update_status,
             "task_get_pending_tasks": self._get_pending_tasks,
             "task_generate_daily_tasks": self._generate_daily_tasks,
+            "task_get_upcoming_schedules": self._get_upcoming_schedules,
         }
 
         handler = handlers.get(name)
@@ -143,7 +154,10 @@ class TaskTools:
         return ToolResult(
             success=True,
             data={
-                "schedules": [self._schedule_to_dict(s) for s in schedules],
+                "schedules": [
+                    self._schedule_to_dict(s, await self.storage.get_schedule_next_run(s.schedule_id))
+                    for s in schedules
+                ],
                 "total": len(schedules)
             }
         )
@@ -166,9 +180,10 @@ class TaskTools:
                 error_code="NOT_FOUND"
             )
 
+        next_run = await self.storage.get_schedule_next_run(schedule_id)
         return ToolResult(
             success=True,
-            data={"schedule": self._schedule_to_dict(schedule)}
+            data={"schedule": self._schedule_to_dict(schedule, next_run)}
         )
 
     async def _create_schedule(self, args: Dict[str, Any]) -> ToolResult:
@@ -229,9 +244,10 @@ class TaskTools:
         await self.storage.save_schedule(schedule)
         logger.info(f"Schedule created: {schedule.schedule_id}")
 
+        next_run = await self.storage.get_schedule_next_run(schedule.schedule_id)
         return ToolResult(
             success=True,
-            data={"schedule": self._schedule_to_dict(schedule)}
+            data={"schedule": self._schedule_to_dict(schedule, next_run)}
         )
 
     async def _update_schedule(self, args: Dict[str, Any]) -> ToolResult:
@@ -271,9 +287,10 @@ class TaskTools:
             )
 
         logger.info(f"Schedule updated: {schedule_id}")
+        next_run = await self.storage.get_schedule_next_run(schedule_id)
         return ToolResult(
             success=True,
-            data={"schedule": self._schedule_to_dict(schedule)}
+            data={"schedule": self._schedule_to_dict(schedule, next_run)}
         )
 
     # ========== 任务相关 Tools ==========
@@ -568,84 +585,108 @@ class TaskTools:
                 error_code="INVALID_PARAM"
             )
 
-        # 获取该日期是星期几（1=周一，7=周日）
-        weekday = target_date.isoweekday()
+        days = args.get("days", 1)
+        if not isinstance(days, int) or not 1 <= days <= MAX_GENERATE_DAYS:
+            return ToolResult(
+                success=False,
+                error=f"days must be an integer between 1 and {MAX_GENERATE_DAYS}",
+                error_code="INVALID_PARAM"
+            )
 
-        # 获取活跃的排程
-        schedules = await self.storage.get_active_schedules(tenant_id)
+        # 按日历索引展开 [target_date, target_date + days) 内需执行的排程
+        expanded = await self.storage.expand_schedules(tenant_id, target_date, days)
 
         generated_tasks = []
+        generated_keys = []
         skipped_count = 0
+        now = datetime.utcnow()
 
-        for schedule in schedules:
-            # 检查频率
-            if schedule.frequency == CleaningFrequency.ONCE:
-                # 一次性排程只在创建当天生成
-                if schedule.created_at.date() != target_date:
-                    continue
-
+        for day, schedule, slots in expanded:
             # 检查是否已生成（幂等）
-            if await self.storage.is_task_generated(schedule.schedule_id, target_date):
+            if await self.storage.is_task_generated(schedule.schedule_id, day):
                 skipped_count += 1
                 continue
 
-            # 检查时间段的days是否包含今天
-            should_generate = False
-            scheduled_start = None
-
-            for slot in schedule.time_slots:
-                if weekday in slot.days:
-                    should_generate = True
-                    # 计算 scheduled_start
-                    try:
-                        hour, minute = map(int, slot.start.split(":"))
-                        scheduled_start = datetime.combine(
-                            target_date,
-                            datetime.min.time().replace(hour=hour, minute=minute)
-                        )
-                    except ValueError:
-                        pass
-                    break
-
-            if not should_generate:
-                continue
-
-            # 创建任务
-            now = datetime.utcnow()
-            task = CleaningTask(
-                task_id=f"task_{uuid4().hex[:8]}",
-                tenant_id=tenant_id,
-                zone_id=schedule.zone_id,
-                zone_name=schedule.zone_name,
-                task_type=schedule.task_type,
-                status=TaskStatus.PENDING,
-                priority=schedule.priority,
-                scheduled_start=scheduled_start,
-                schedule_id=schedule.schedule_id,
-                created_by="schedule_generator",
-                created_at=now,
-                updated_at=now
-            )
-
-            await self.storage.save_task(task)
-            await self.storage.mark_task_generated(schedule.schedule_id, target_date)
-            generated_tasks.append(task)
-
-        logger.info(f"Generated {len(generated_tasks)} tasks for {date_str}, skipped {skipped_count}")
+            # 每个时间段生成一个任务
+            for start_minutes, end_minutes in slots:
+                scheduled_start = None
+                scheduled_end = None
+                if start_minutes is not None:
+                    scheduled_start = minutes_to_datetime(day, start_minutes)
+                    if end_minutes is not None and end_minutes > start_minutes:
+                        scheduled_end = minutes_to_datetime(day, end_minutes)
+
+                generated_tasks.append(CleaningTask(
+                    task_id=f"task_{uuid4().hex[:12]}",
+                    tenant_id=tenant_id,
+                    zone_id=schedule.zone_id,
+                    zone_name=schedule.zone_name,
+                    task_type=schedule.task_type,
+                    status=TaskStatus.PENDING,
+                    priority=schedule.priority,
+                    scheduled_start=scheduled_start,
+                    scheduled_end=scheduled_end,
+                    schedule_id=schedule.schedule_id,
+                    created_by="schedule_generator",
+                    created_at=now,
+                    updated_at=now
+                ))
+            generated_keys.append((schedule.schedule_id, day))
+
+        await self.storage.save_tasks(generated_tasks)
+        await self.storage.mark_tasks_generated(generated_keys)
+
+        logger.info(
+            f"Generated {len(generated_tasks)} tasks for {date_str} (+{days - 1} days), "
+            f"skipped {skipped_count}"
+        )
 
         return ToolResult(
             success=True,
             data={
                 "generated_count": len(generated_tasks),
                 "skipped_count": skipped_count,
+                "days": days,
                 "tasks": [self._task_to_dict(t) for t in generated_tasks]
+                if args.get("include_tasks", True) else []
+            }
+        )
+
+    async def _get_upcoming_schedules(self, args: Dict[str, Any]) -> ToolResult:
+        """Tool 11: 按下次执行时间获取即将执行的排程 (排程日历 next_run 堆)"""
+        tenant_id = args.get("tenant_id")
+        if not tenant_id:
+            return ToolResult(
+                success=False,
+                error="tenant_id is required",
+                error_code="INVALID_PARAM"
+            )
+
+        limit = args.get("limit", 10)
+        if not isinstance(limit, int) or limit < 1:
+            return ToolResult(
+                success=False,
+                error="limit must be a positive integer",
+                error_code="INVALID_PARAM"
+            )
+
+        upcoming = await self.storage.get_next_runs(tenant_id, limit=limit)
+        return ToolResult(
+            success=True,
+            data={
+                "schedules": [self._schedule_to_dict(s, next_run) for next_run, s in upcoming],
+                "count": len(upcoming)
             }
         )
 
     # ========== 辅助方法 ==========
 
-    def _schedule_to_dict(self, schedule: CleaningSchedule) -> dict:
-        """转换排程为字典"""
+    def _schedule_to_dict(
+        self,
+        schedule: CleaningSchedule,
+        next_run: Optional[datetime] = None
+    ) -> dict:
+        """转换排程为字典 (next_run 来自排程日历，停用的排程为 None)"""
         return {
             "schedule_id": schedule.schedule_id,
             "tenant_id": schedule.tenant_id,
@@ -663,6 +704,7 @@ class TaskTools:
             "created_by": schedule.created_by,
             "created_at": schedule.created_at.isoformat(),
             "updated_at": schedule.updated_at.isoformat(),
+            "next_run": next_run.isoformat() if next_run else None,
         }
 
     def _task_to_dict(self, task: CleaningTask) -> dict:
@@ -27,8 +27,21 @@ from .models import (
     EVENT_BUFFER_CONFIG,
 )
 
+from src.shared.metrics import counter, histogram, span
+
 logger = logging.getLogger(__name__)
 
+REALTIME_EMIT_SECONDS = histogram(
+    "linkc_realtime_emit_seconds",
+    "RealtimeClient event fan-out latency",
+    ["brand", "event_type", "status"],
+)
+REALTIME_BUFFERED_TOTAL = counter(
+    "linkc_realtime_buffered_events_total",
+    "Events buffered while the robot is disconnected",
+    ["brand", "event_type"],
+)
+
 
 class RealtimeClient:
     """
@@ -185,24 +198,28 @@ class RealtimeClient:
         由事件源（polling/websocket/mock）调用。
         """
         robot_id = event.robot_id
+        event_type = getattr(event.event_type, "value", event.event_type)
 
         if robot_id not in self._connected_robots:
             # 机器人未连接，缓冲事件
             if robot_id in self._event_buffers:
                 self._event_buffers[robot_id].append(event)
+                REALTIME_BUFFERED_TOTAL.inc(brand=self.brand, event_type=event_type)
             return
 
-        sub_ids = self._robot_subscriptions.get(robot_id, [])
-        for sub_id in sub_ids:
-            sub = self._subscriptions.get(sub_id)
-            if sub is None:
-                continue
-
-            if event.event_type in sub["event_types"]:
-                try:
-                    await sub["callback"](event)
-                except Exception as e:
-                    logger.error(f"Callback error for sub {sub_id}: {e}")
+        with span(REALTIME_EMIT_SECONDS, brand=self.brand, event_type=event_type) as emit_span:
+            sub_ids = self._robot_subscriptions.get(robot_id, [])
+            for sub_id in sub_ids:
+                sub = self._subscriptions.get(sub_id)
+                if sub is None:
+                    continue
+
+                if event.event_type in sub["event_types"]:
+                    try:
+                        await sub["callback"](event)
+                    except Exception as e:
+                        emit_span.status = "error"
+                        logger.error(f"Callback error for sub {sub_id}: {e}")
 
     async def simulate_disconnect(self, robot_id: str) -> None:
         """模拟断连（测试用）"""
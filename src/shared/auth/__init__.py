@@ -62,6 +62,16 @@ from .permissions import (
     has_permission,
     has_any_permission,
     has_all_permissions,
+    PermissionSet,
+    PERMISSION_BITS,
+    compile_permissions,
+)
+
+# Token缓存与吊销
+from .token_cache import (
+    TokenCache,
+    RevocationStore,
+    token_digest,
 )
 
 # 密码处理
@@ -78,6 +88,9 @@ from .jwt import (
     create_refresh_token,
     decode_token,
     verify_token,
+    revoke_token,
+    token_cache,
+    revoked_tokens,
     is_token_expired,
     get_token_remaining_time,
     SECRET_KEY,
@@ -124,6 +137,13 @@ __all__ = [
     "has_permission",
     "has_any_permission",
     "has_all_permissions",
+    "PermissionSet",
+    "PERMISSION_BITS",
+    "compile_permissions",
+    # Token缓存与吊销
+    "TokenCache",
+    "RevocationStore",
+    "token_digest",
     # 密码
     "hash_password",
     "verify_password",
@@ -134,6 +154,9 @@ __all__ = [
     "create_refresh_token",
     "decode_token",
     "verify_token",
+    "revoke_token",
+    "token_cache",
+    "revoked_tokens",
     "is_token_expired",
     "get_token_remaining_time",
     "SECRET_KEY",
@@ -10,7 +10,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from .models import TokenPayload
 from .jwt import decode_token
-from .permissions import has_permission
+from .permissions import compile_permissions
 
 # Bearer token安全方案
 security = HTTPBearer(auto_error=False)
@@ -85,10 +85,12 @@ def require_permission(permission: str) -> Callable:
         ):
             pass
     """
+    required = compile_permissions([permission])
+
     async def permission_checker(
         current_user: TokenPayload = Depends(get_current_user)
     ) -> TokenPayload:
-        if not has_permission(current_user.permissions, permission):
+        if not current_user.permission_set.allows(required):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission denied: {permission} required",
@@ -108,13 +110,13 @@ def require_any_permission(*permissions: str) -> Callable:
         ):
             pass
     """
+    required = compile_permissions(permissions)
+
     async def permission_checker(
         current_user: TokenPayload = Depends(get_current_user)
     ) -> TokenPayload:
-        # 超级管理员拥有所有权限
-        if "*" in current_user.permissions:
-            return current_user
-        if not any(perm in current_user.permissions for perm in permissions):
+        # 超级管理员 (*) 拥有所有权限，由 PermissionSet 处理
+        if not current_user.permission_set.allows_any(required):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission denied: one of {permissions} required",
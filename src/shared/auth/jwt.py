@@ -11,12 +11,18 @@ import os
 
 from .models import User, TokenPayload
 from .permissions import get_user_permissions
+from .token_cache import RevocationStore, TokenCache
 
 # 配置 - 从环境变量读取
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "ecis-robot-dev-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+# 已验签载荷缓存与吊销表 (进程内)
+token_cache: TokenCache[TokenPayload] = TokenCache(TOKEN_CACHE_SIZE)
+revoked_tokens = RevocationStore()
 
 
 def create_access_token(user: User) -> str:
@@ -77,12 +83,30 @@ def decode_token(token: str) -> Optional[TokenPayload]:
     """
     解码并验证令牌
 
+    已吊销的 token 直接拒绝；验签成功的载荷缓存到 token 过期，
+    同一 token 的后续请求不再验签。返回的载荷在请求间共享，调用方不应修改。
+
     Args:
         token: JWT token字符串
 
     Returns:
         TokenPayload if valid, None otherwise
     """
+    if revoked_tokens.is_revoked(token):
+        return None
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    payload = _verify(token)
+    if payload is not None:
+        token_cache.put(token, payload, payload.exp)
+    return payload
+
+
+def _verify(token: str) -> Optional[TokenPayload]:
+    """验签并构造载荷，同时编译权限位图"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
@@ -90,7 +114,7 @@ def decode_token(token: str) -> Optional[TokenPayload]:
         exp = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
         iat = datetime.fromtimestamp(payload["iat"], tz=timezone.utc)
 
-        return TokenPayload(
+        result = TokenPayload(
             sub=payload["sub"],
             tenant_id=payload["tenant_id"],
             role=payload["role"],
@@ -99,12 +123,29 @@ def decode_token(token: str) -> Optional[TokenPayload]:
             iat=iat,
             type=payload.get("type", "access")
         )
+        result.permission_set  # 解码时编译权限位图
+        return result
     except JWTError:
         return None
     except (KeyError, ValueError):
         return None
 
 
+def revoke_token(token: str) -> bool:
+    """
+    吊销令牌 (登出 / 刷新后作废旧 token)
+
+    Returns:
+        token 有效并已吊销时返回 True
+    """
+    payload = decode_token(token)
+    if payload is None:
+        return False
+    revoked_tokens.revoke(token, payload.exp)
+    token_cache.discard(token)
+    return True
+
+
 def verify_token(token: str, token_type: str = "access") -> Optional[TokenPayload]:
     """
     验证令牌
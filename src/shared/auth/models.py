@@ -6,6 +6,7 @@ F4: 认证授权模块 - 数据模型
 
 from enum import Enum
 from typing import Optional, List
+from functools import cached_property
 from pydantic import BaseModel, Field, EmailStr
 from uuid import UUID
 from datetime import datetime
@@ -66,6 +67,12 @@ class TokenPayload(BaseModel):
     iat: datetime                 # 签发时间
     type: str = "access"          # access | refresh
 
+    @cached_property
+    def permission_set(self):
+        """编译后的权限位图 (decode_token 时生成，之后直接从实例字典读取)"""
+        from .permissions import compile_permissions
+        return compile_permissions(self.permissions)
+
 
 class APIKey(BaseModel):
     """API密钥（用于服务间认证）"""
@@ -5,7 +5,7 @@ F4: 认证授权模块 - 权限定义
 """
 
 from enum import Enum
-from typing import List
+from typing import FrozenSet, Iterable, List, Union
 from .models import UserRole
 
 
@@ -109,23 +109,94 @@ def get_user_permissions(role: UserRole, extra_permissions: List[str] = None) ->
     return permissions
 
 
-def has_permission(user_permissions: List[str], required_permission: str) -> bool:
+# ============================================================
+# 权限位图
+# ============================================================
+
+# 每个系统权限占一位，按枚举定义顺序分配
+PERMISSION_BITS: dict[str, int] = {perm.value: 1 << i for i, perm in enumerate(Permission)}
+
+
+class PermissionSet:
+    """
+    编译后的权限集合
+
+    系统权限压缩为整数位图，检查为一次按位与；不在 Permission 枚举中的
+    自定义权限保留在 frozenset 中。token 解码时编译一次，之后每次鉴权复用。
+    """
+
+    __slots__ = ("mask", "extra", "wildcard")
+
+    def __init__(self, mask: int = 0, extra: FrozenSet[str] = frozenset(), wildcard: bool = False):
+        self.mask = mask
+        self.extra = extra
+        self.wildcard = wildcard
+
+    def allows(self, required: "PermissionSet") -> bool:
+        """是否拥有 required 中的全部权限"""
+        if self.wildcard:
+            return True
+        return (required.mask & ~self.mask) == 0 and required.extra <= self.extra
+
+    def allows_any(self, required: "PermissionSet") -> bool:
+        """是否拥有 required 中的任一权限"""
+        if self.wildcard:
+            return True
+        return bool(required.mask & self.mask) or not required.extra.isdisjoint(self.extra)
+
+    def __contains__(self, permission: str) -> bool:
+        if self.wildcard:
+            return True
+        bit = PERMISSION_BITS.get(permission)
+        return bool(self.mask & bit) if bit else permission in self.extra
+
+    def __repr__(self) -> str:
+        return f"PermissionSet(mask={self.mask:#x}, extra={sorted(self.extra)}, wildcard={self.wildcard})"
+
+
+def compile_permissions(permissions: Iterable[str]) -> PermissionSet:
+    """权限字符串列表 → PermissionSet"""
+    mask = 0
+    extra = set()
+    wildcard = False
+    for perm in permissions:
+        if perm == "*":
+            wildcard = True
+            continue
+        bit = PERMISSION_BITS.get(perm)
+        if bit:
+            mask |= bit
+        else:
+            extra.add(perm)
+    return PermissionSet(mask, frozenset(extra), wildcard)
+
+
+PermissionsLike = Union[List[str], PermissionSet]
+
+
+def has_permission(user_permissions: PermissionsLike, required_permission: str) -> bool:
     """检查用户是否有指定权限"""
+    if isinstance(user_permissions, PermissionSet):
+        return required_permission in user_permissions
     # 超级管理员拥有所有权限
     if "*" in user_permissions:
         return True
     return required_permission in user_permissions
 
 
-def has_any_permission(user_permissions: List[str], required_permissions: List[str]) -> bool:
+def has_any_permission(user_permissions: PermissionsLike, required_permissions: List[str]) -> bool:
     """检查用户是否有任一指定权限"""
+    if isinstance(user_permissions, PermissionSet):
+        return user_permissions.allows_any(compile_permissions(required_permissions))
     if "*" in user_permissions:
         return True
     return any(perm in user_permissions for perm in required_permissions)
 
 
-def has_all_permissions(user_permissions: List[str], required_permissions: List[str]) -> bool:
+def has_all_permissions(user_permissions: PermissionsLike, required_permissions: List[str]) -> bool:
     """检查用户是否有所有指定权限"""
+    if isinstance(user_permissions, PermissionSet):
+        return user_permissions.allows(compile_permissions(required_permissions))
     if "*" in user_permissions:
         return True
     return all(perm in user_permissions for perm in required_permissions)
@@ -15,28 +15,46 @@ from src.shared.auth.password import (
     validate_password,
     validate_password_strength,
 )
+from src.shared.auth import jwt as auth_jwt
 from src.shared.auth.jwt import (
     create_access_token,
     create_refresh_token,
     decode_token,
     verify_token,
+    revoke_token,
     is_token_expired,
     get_token_remaining_time,
 )
 from src.shared.auth.permissions import (
     Permission,
+    PermissionSet,
+    compile_permissions,
     get_role_permissions,
     get_user_permissions,
     has_permission,
     has_any_permission,
     has_all_permissions,
 )
+from src.shared.auth.token_cache import RevocationStore, TokenCache
 
 
 # ============================================================
 # 测试数据
 # ============================================================
 
+def encode_test_token(permissions: list, expires_in: timedelta = timedelta(minutes=5)) -> str:
+    """直接签发 access token (不经过用户 / 密码哈希)"""
+    now = datetime.now(timezone.utc)
+    return auth_jwt.jwt.encode(
+        {
+            "sub": str(uuid4()), "tenant_id": "tenant_001", "role": "operator",
+            "permissions": permissions, "exp": now + expires_in, "iat": now, "type": "access",
+        },
+        auth_jwt.SECRET_KEY,
+        algorithm=auth_jwt.ALGORITHM,
+    )
+
+
 def create_test_user(
     role: UserRole = UserRole.OPERATOR,
     permissions: list = None
@@ -275,6 +293,92 @@ class TestPermissions:
         assert has_all_permissions(permissions, ["space:read", "user:write"]) is False
 
 
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestPermissionSet:
+    """权限位图测试"""
+
+    def test_compile_and_check(self):
+        """测试系统权限位图与自定义权限"""
+        perms = compile_permissions(["space:read", "robot:control", "custom:thing"])
+        assert "space:read" in perms and "custom:thing" in perms
+        assert "user:write" not in perms
+        assert perms.allows(compile_permissions(["space:read", "custom:thing"]))
+        assert not perms.allows(compile_permissions(["space:read", "user:write"]))
+        assert perms.allows_any(compile_permissions(["user:write", "robot:control"]))
+        assert not perms.allows_any(compile_permissions(["user:write", "other:x"]))
+
+    def test_wildcard_and_list_compat(self):
+        """测试超级管理员通配与列表接口一致"""
+        admin = compile_permissions(["*"])
+        assert admin.allows(compile_permissions(["anything:at_all"]))
+        operator = get_role_permissions(UserRole.OPERATOR)
+        compiled = compile_permissions(operator)
+        for perm in Permission:
+            assert has_permission(compiled, perm.value) == has_permission(operator, perm.value)
+        assert has_all_permissions(compiled, ["space:read", "task:read"])
+        assert not has_any_permission(PermissionSet(), ["space:read"])
+
+
+class TestTokenCache:
+    """验签缓存与吊销表测试"""
+
+    def test_lru_and_expiry(self):
+        """测试按过期时间失效与 LRU 淘汰"""
+        clock = FakeClock()
+        cache = TokenCache(max_size=2, clock=clock)
+        cache.put("a", "A", clock.now + 10)
+        cache.put("b", "B", clock.now + 100)
+        assert cache.get("a") == "A"
+        cache.put("c", "C", clock.now + 100)   # 淘汰最久未用的 b
+        assert cache.get("b") is None and cache.get("c") == "C"
+
+        clock.now += 10
+        assert cache.get("a") is None
+        cache.put("expired", "X", clock.now - 1)
+        assert len(cache) == 1
+        assert cache.get_stats()["hits"] == 2
+
+    def test_revocation_buckets_expire(self):
+        """测试吊销条目按桶在 token 过期后清理"""
+        clock = FakeClock(1000.0)
+        store = RevocationStore(bucket_seconds=60, clock=clock)
+        store.revoke("t1", 1030.0)
+        store.revoke("t2", 1500.0)
+        store.revoke("t3", 999.0)   # 已过期，不记录
+        assert "t1" in store and "t2" in store and "t3" not in store
+        assert len(store) == 2
+
+        clock.now = 1031.0          # t1 已过期但桶 [1020, 1080) 未结束
+        assert "t1" in store
+        clock.now = 1080.0
+        assert "t1" not in store and "t2" in store
+        clock.now = 1560.0
+        assert len(store) == 0
+
+    def test_decode_token_cached_and_revocable(self, monkeypatch):
+        """测试 decode_token 命中缓存不再验签，吊销后拒绝"""
+        token = encode_test_token(["space:read"])
+        payload = decode_token(token)
+        assert "space:read" in payload.permission_set
+
+        calls = []
+        original = auth_jwt.jwt.decode
+        monkeypatch.setattr(auth_jwt.jwt, "decode", lambda *a, **k: calls.append(1) or original(*a, **k))
+        assert decode_token(token) is payload
+        assert calls == []
+
+        assert revoke_token(token) is True
+        assert decode_token(token) is None
+        assert revoke_token("invalid.token.here") is False
+
+
 # ============================================================
 # 集成测试
 # ============================================================
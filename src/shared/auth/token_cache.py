@@ -0,0 +1,153 @@
+"""
+F4: 认证授权模块 - Token缓存与吊销
+====================================
+- TokenCache: 已验签 token 载荷的 LRU 缓存，条目在 token 过期时失效，
+  命中时跳过 JWT 签名验证
+- RevocationStore: 按过期时间分桶的吊销表，token 自身过期后整桶清理
+
+两者都以 token 的 SHA-256 摘要为键，不保存原始 token。
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar, Union
+import hashlib
+import heapq
+import math
+import time
+
+T = TypeVar("T")
+
+Expiry = Union[datetime, float]
+
+
+def token_digest(token: str) -> bytes:
+    """token 摘要 (缓存 / 吊销表的键)"""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _epoch(value: Expiry) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+
+class TokenCache(Generic[T]):
+    """已验证 token 载荷的 LRU 缓存"""
+
+    def __init__(self, max_size: int = 10_000, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            max_size: 最大条目数，超出时淘汰最久未用的
+            clock: 当前 Unix 时间
+        """
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[T, float]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, token: str) -> Optional[T]:
+        """命中且未过期时返回载荷"""
+        key = token_digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        payload, expires_at = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return payload
+
+    def put(self, token: str, payload: T, expires_at: Expiry) -> None:
+        """缓存载荷直到 token 过期"""
+        expires = _epoch(expires_at)
+        if expires <= self._clock():
+            return
+        key = token_digest(token)
+        self._entries[key] = (payload, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        self._entries.pop(token_digest(token), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+
+class RevocationStore:
+    """
+    按过期时间分桶的吊销表
+
+    条目按 token 过期时间落入宽 bucket_seconds 的桶；桶结束后整桶删除
+    (此时桶内 token 都已过期，签名验证本身就会拒绝)，表的大小只与
+    有效期内被吊销的 token 数有关。
+    """
+
+    def __init__(self, bucket_seconds: float = 60.0, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            bucket_seconds: 桶宽 (秒)，条目最多在过期后多保留一个桶宽
+            clock: 当前 Unix 时间
+        """
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        self.bucket_seconds = bucket_seconds
+        self._clock = clock
+        self._expiry: Dict[bytes, int] = {}     # 摘要 → 桶编号
+        self._buckets: Dict[int, Set[bytes]] = {}
+        self._heap: List[int] = []              # 桶编号小顶堆
+
+    def revoke(self, token: str, expires_at: Expiry) -> None:
+        """吊销 token，保留到其过期时间 (已过期的 token 无需记录)"""
+        now = self._clock()
+        self._prune(now)
+        expires = _epoch(expires_at)
+        if expires <= now:
+            return
+
+        key = token_digest(token)
+        bucket = math.ceil(expires / self.bucket_seconds)
+        previous = self._expiry.get(key)
+        if previous is not None:
+            if previous >= bucket:
+                return
+            self._buckets[previous].discard(key)
+
+        self._expiry[key] = bucket
+        members = self._buckets.get(bucket)
+        if members is None:
+            members = self._buckets[bucket] = set()
+            heapq.heappush(self._heap, bucket)
+        members.add(key)
+
+    def is_revoked(self, token: str) -> bool:
+        self._prune(self._clock())
+        return token_digest(token) in self._expiry
+
+    __contains__ = is_revoked
+
+    def _prune(self, now: float) -> None:
+        """删除已结束的桶"""
+        while self._heap and self._heap[0] * self.bucket_seconds <= now:
+            for key in self._buckets.pop(heapq.heappop(self._heap)):
+                del self._expiry[key]
+
+    def __len__(self) -> int:
+        self._prune(self._clock())
+        return len(self._expiry)
+
+    def clear(self) -> None:
+        self._expiry.clear()
+        self._buckets.clear()
+        self._heap.clear()
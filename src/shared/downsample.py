@@ -0,0 +1,239 @@
+"""
+LinkC Platform - 时序降采样
+===========================
+图表查询共用的降采样引擎，返回点数与时间窗口长度无关:
+- choose_bucket_seconds: 按窗口和目标点数选择聚合粒度 (服务端 time_bucket 使用)
+- bucketize: 内存数据的 time_bucket 等价实现 (avg/min/max/count)
+- latest_per_bucket: 每个时间桶保留最新一条记录 (轨迹等非数值序列的服务端抽稀)
+- lttb / lttb_indices: Largest-Triangle-Three-Buckets，最终整形到目标点数
+- downsample_records: 对记录序列做 LTTB，并保留状态切换等关键点
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
+import math
+
+T = TypeVar("T")
+# LTTB 纵坐标: 单值，或多维 (如轨迹的 (x, y))，多维时三角形面积按各维相加
+YValue = Union[float, Tuple[float, ...]]
+
+DEFAULT_POINTS = 200
+MAX_POINTS = 2000
+# 服务端聚合的桶数 = 目标点数 × OVERSAMPLE，再由 LTTB 整形
+OVERSAMPLE = 4
+
+# 可选的聚合粒度 (秒)
+BUCKET_LADDER = (
+    1, 5, 10, 15, 30,
+    60, 120, 300, 600, 900, 1800,
+    3600, 7200, 10800, 21600, 43200,
+    86400, 2 * 86400, 7 * 86400,
+)
+
+
+@dataclass
+class SeriesPoint:
+    """聚合后的序列点"""
+    timestamp: datetime
+    value: float
+    min: float
+    max: float
+    count: int = 1
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": self.timestamp.isoformat(),
+            "avg": self.value,
+            "min": self.min,
+            "max": self.max,
+            "count": self.count,
+        }
+
+
+def clamp_points(points: Optional[int]) -> int:
+    """把请求的点数限制在 [3, MAX_POINTS]"""
+    if not points:
+        return DEFAULT_POINTS
+    return max(3, min(int(points), MAX_POINTS))
+
+
+def choose_bucket_seconds(
+    start: datetime,
+    end: datetime,
+    points: int = DEFAULT_POINTS,
+    oversample: int = OVERSAMPLE
+) -> int:
+    """
+    选择聚合粒度，使窗口内的桶数不超过 points × oversample
+
+    Returns:
+        BUCKET_LADDER 中满足条件的最小粒度 (超出阶梯时按天取整)
+    """
+    window = max((end - start).total_seconds(), 1.0)
+    target = window / max(points * oversample, 1)
+    for seconds in BUCKET_LADDER:
+        if seconds >= target:
+            return seconds
+    return int(math.ceil(target / 86400)) * 86400
+
+
+def bucket_start(ts: datetime, bucket_seconds: int) -> datetime:
+    """时间戳所在桶的起点 (按 Unix 纪元对齐，与 time_bucket 一致)"""
+    tz = ts.tzinfo or timezone.utc
+    epoch = ts.replace(tzinfo=tz).timestamp()
+    aligned = epoch - (epoch % bucket_seconds)
+    result = datetime.fromtimestamp(aligned, tz)
+    return result if ts.tzinfo else result.replace(tzinfo=None)
+
+
+def bucketize(
+    records: Iterable[T],
+    bucket_seconds: int,
+    timestamp: Callable[[T], datetime],
+    value: Callable[[T], float]
+) -> List[SeriesPoint]:
+    """按时间桶聚合 avg/min/max/count，结果按时间升序"""
+    buckets = {}
+    for record in records:
+        v = value(record)
+        if v is None:
+            continue
+        key = bucket_start(timestamp(record), bucket_seconds)
+        entry = buckets.get(key)
+        if entry is None:
+            buckets[key] = [v, v, v, 1]
+        else:
+            entry[0] += v
+            if v < entry[1]:
+                entry[1] = v
+            if v > entry[2]:
+                entry[2] = v
+            entry[3] += 1
+    return [
+        SeriesPoint(timestamp=key, value=total / count, min=low, max=high, count=count)
+        for key, (total, low, high, count) in sorted(buckets.items())
+    ]
+
+
+def latest_per_bucket(
+    records: Iterable[T],
+    bucket_seconds: int,
+    timestamp: Callable[[T], datetime]
+) -> List[T]:
+    """每个时间桶保留最新一条记录，结果按时间升序"""
+    latest = {}
+    for record in records:
+        ts = timestamp(record)
+        key = bucket_start(ts, bucket_seconds)
+        current = latest.get(key)
+        if current is None or timestamp(current) <= ts:
+            latest[key] = record
+    return [latest[key] for key in sorted(latest)]
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[YValue], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets 降采样
+
+    Args:
+        xs: 横坐标 (必须单调递增，通常为时间戳秒数)
+        ys: 纵坐标；可为多维元组，此时三角形面积按各维相加
+        threshold: 目标点数
+
+    Returns:
+        选中点的下标 (升序，包含首尾)
+    """
+    n = len(xs)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][:max(threshold, 0)]
+
+    if isinstance(ys[0], tuple):
+        dims = [[float(y[d]) for y in ys] for d in range(len(ys[0]))]
+    else:
+        dims = [[float(y) for y in ys]]
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # 下一个桶的平均点
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        span = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / span
+        avg_ys = [sum(dim[avg_start:avg_end]) / span for dim in dims]
+
+        # 当前桶中与 a、平均点构成最大三角形的点
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax = xs[a]
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = 0.0
+            for dim, avg_y in zip(dims, avg_ys):
+                ay = dim[a]
+                area += abs((ax - avg_x) * (dim[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                next_a = j
+        selected.append(next_a)
+        a = next_a
+
+    selected.append(n - 1)
+    return selected
+
+
+def lttb(
+    records: Sequence[T],
+    threshold: int,
+    x: Callable[[T], float],
+    y: Callable[[T], YValue]
+) -> List[T]:
+    """对记录序列做 LTTB，返回选中的记录"""
+    if len(records) <= threshold:
+        return list(records)
+    xs = [x(r) for r in records]
+    ys = [y(r) for r in records]
+    return [records[i] for i in lttb_indices(xs, ys, threshold)]
+
+
+def shape_series(points: Sequence[SeriesPoint], threshold: int) -> List[SeriesPoint]:
+    """把聚合序列整形到目标点数 (按 avg 做 LTTB)"""
+    return lttb(points, threshold, x=lambda p: p.timestamp.timestamp(), y=lambda p: p.value)
+
+
+def downsample_records(
+    records: Sequence[T],
+    threshold: int,
+    x: Callable[[T], float],
+    y: Callable[[T], YValue],
+    keep: Optional[Callable[[T, T], bool]] = None
+) -> List[T]:
+    """
+    LTTB 降采样，额外保留 keep(前一条, 当前条) 为真的关键点 (如状态切换)
+
+    关键点优先；剩余名额分给 LTTB，总数不超过 threshold。
+    """
+    n = len(records)
+    if n <= threshold:
+        return list(records)
+
+    pinned = set()
+    if keep is not None:
+        for i in range(1, n):
+            if keep(records[i - 1], records[i]):
+                pinned.add(i)
+        if len(pinned) > threshold - 2:
+            step = len(pinned) / (threshold - 2)
+            ordered = sorted(pinned)
+            pinned = {ordered[int(k * step)] for k in range(threshold - 2)}
+
+    xs = [x(r) for r in records]
+    ys = [y(r) for r in records]
+    budget = max(threshold - len(pinned), 2)
+    chosen = set(lttb_indices(xs, ys, budget)) | pinned
+    return [records[i] for i in sorted(chosen)]
+
@@ -34,6 +34,7 @@ class Message(BaseModel):
     content: str
     name: Optional[str] = None  # for tool messages
     tool_call_id: Optional[str] = None  # for tool results
+    cache_control: bool = False  # 在该消息末尾设置 Prompt 缓存断点 (Claude)
 
 
 class Tool(BaseModel):
@@ -5,7 +5,7 @@ Claude LLM 客户端实现
 import httpx
 import json
 import logging
-from typing import List, Optional, Any, AsyncIterator
+from typing import List, Optional, Any, AsyncIterator, Union
 from .base import LLMClient, LLMConfig, Message, Tool, ToolCall, LLMResponse
 
 logger = logging.getLogger(__name__)
@@ -109,12 +109,26 @@ class ClaudeLLMClient(LLMClient):
                             if "text" in delta:
                                 yield delta["text"]
     
-    def _extract_system(self, messages: List[Message]) -> Optional[str]:
-        """提取system消息"""
+    def _extract_system(self, messages: List[Message]) -> Optional[Union[str, List[dict]]]:
+        """
+        提取system消息
+
+        只取第一条；标记 cache_control 时返回带 ephemeral 缓存断点的 text block 列表。
+        """
         for msg in messages:
             if msg.role == "system":
+                if msg.cache_control:
+                    return [self._text_block(msg)]
                 return msg.content
         return None
+
+    @staticmethod
+    def _text_block(msg: Message) -> dict:
+        """转换为text block，按需附带缓存断点"""
+        block = {"type": "text", "text": msg.content}
+        if msg.cache_control:
+            block["cache_control"] = {"type": "ephemeral"}
+        return block
     
     def _convert_messages(self, messages: List[Message]) -> List[dict]:
         """转换消息格式为Claude格式"""
@@ -147,6 +161,11 @@ class ClaudeLLMClient(LLMClient):
                         "input": tc.arguments,
                     })
                 claude_messages.append({"role": "assistant", "content": content})
+            elif msg.cache_control:
+                claude_messages.append({
+                    "role": msg.role,
+                    "content": [self._text_block(msg)],
+                })
             else:
                 claude_messages.append({
                     "role": msg.role,
@@ -204,5 +223,7 @@ class ClaudeLLMClient(LLMClient):
             usage={
                 "prompt_tokens": usage.get("input_tokens", 0),
                 "completion_tokens": usage.get("output_tokens", 0),
+                "cache_creation_input_tokens": usage.get("cache_creation_input_tokens") or 0,
+                "cache_read_input_tokens": usage.get("cache_read_input_tokens") or 0,
             }
         )
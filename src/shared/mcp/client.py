@@ -38,9 +38,10 @@ class MCPClientAdapter:
         from src.mcp_servers.robot_gaoxian.storage import InMemoryRobotStorage
         from src.mcp_servers.robot_gaoxian.mock_client import MockGaoxianClient
         from src.mcp_servers.robot_gaoxian.tools import RobotTools
+        from src.mcp_servers.space_manager.travel import get_travel_costs
 
         robot_storage = InMemoryRobotStorage()
-        robot_client = MockGaoxianClient(robot_storage)
+        robot_client = MockGaoxianClient(robot_storage, travel_costs=get_travel_costs())
         self._robot_tools = RobotTools(robot_client, robot_storage)
 
         # 初始化任务工具 (已包含示例数据)
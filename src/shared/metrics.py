@@ -0,0 +1,477 @@
+"""
+LinkC Platform - 指标与追踪
+===========================
+进程内聚合的轻量埋点层:
+- Counter / Gauge / Histogram: 按标签聚合，histogram 使用固定桶 (秒)
+- trace(): 在 contextvar 中传播 trace_id / tenant / agent，
+  API 请求 → Agent 周期 → MCP 工具 → DB 查询 共享同一 trace_id
+- span(): 计时上下文管理器，记录直方图并写入最近 span 环形缓冲
+- instrument(): 异步函数装饰器
+- render_prometheus(): Prometheus 文本格式输出 (/metrics)
+
+热路径开关: METRICS_ENABLED=false 时 instrument() 在装饰时直接返回原函数，
+span() 返回共享的空上下文，埋点退化为 no-op。
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+import bisect
+import inspect
+import math
+import os
+import time
+import uuid
+
+
+ENABLED = os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+
+# 默认直方图桶上界 (秒)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+# 自动从追踪上下文补齐的标签
+CONTEXT_LABELS = ("tenant", "agent")
+
+RECENT_SPANS = 2048
+
+TRACE_HEADER = "X-Trace-Id"
+
+
+def is_enabled() -> bool:
+    return ENABLED
+
+
+def set_enabled(enabled: bool) -> None:
+    """
+    切换埋点开关
+
+    只影响之后装饰的函数和 span() 调用；已装饰的函数在导入时已确定。
+    """
+    global ENABLED
+    ENABLED = enabled
+
+
+# ============================================================
+# 指标
+# ============================================================
+
+class _Metric:
+    """带标签指标基类"""
+
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        parts = [
+            f'{name}="{_escape(value)}"'
+            for name, value in zip(self.labelnames, key)
+        ]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> List[str]:
+        return [
+            f"{self.name}{self._format_labels(key)} {_format_number(value)}"
+            for key, value in self._values.items()
+        ]
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值 (队列深度等)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> List[str]:
+        return [
+            f"{self.name}{self._format_labels(key)} {_format_number(value)}"
+            for key, value in self._values.items()
+        ]
+
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class Histogram(_Metric):
+    """固定桶直方图 (秒)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [各桶计数..., +Inf 计数, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        self._observe_key(self._key(labels), value)
+
+    def _observe_key(self, key: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def sum(self, **labels: Any) -> float:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def collect(self) -> List[str]:
+        lines = []
+        bounds = [_format_number(b) for b in self.buckets] + ["+Inf"]
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, n in zip(bounds, series[:-1]):
+                cumulative += n
+                labels = self._format_labels(key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {int(cumulative)}")
+            labels = self._format_labels(key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {int(cumulative)}")
+        return lines
+
+    def reset(self) -> None:
+        self._series.clear()
+
+
+class MetricsRegistry:
+    """指标注册表 (按名称去重)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def _get_or_create(self, cls, name, help, labelnames, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+        elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus 文本格式 (0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """清空所有样本 (保留指标定义)"""
+        for metric in self._metrics.values():
+            metric.reset()
+        _recent_spans.clear()
+
+
+registry = MetricsRegistry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return registry.counter(name, help, labelnames)
+
+
+def gauge(name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return registry.gauge(name, help, labelnames)
+
+
+def histogram(
+    name: str,
+    help: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    return registry.histogram(name, help, labelnames, buckets)
+
+
+def render_prometheus() -> str:
+    return registry.render()
+
+
+# ============================================================
+# 追踪
+# ============================================================
+
+@dataclass(frozen=True)
+class TraceContext:
+    """当前调用链的追踪上下文"""
+    trace_id: str
+    tenant: str = ""
+    agent: str = ""
+
+
+_trace_ctx: ContextVar[Optional[TraceContext]] = ContextVar("linkc_trace", default=None)
+_recent_spans: Deque[dict] = deque(maxlen=RECENT_SPANS)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def current_trace() -> Optional[TraceContext]:
+    return _trace_ctx.get()
+
+
+def current_trace_id() -> Optional[str]:
+    ctx = _trace_ctx.get()
+    return ctx.trace_id if ctx else None
+
+
+@contextmanager
+def trace(
+    trace_id: Optional[str] = None,
+    tenant: Optional[str] = None,
+    agent: Optional[str] = None,
+    new: bool = False
+) -> Iterator[TraceContext]:
+    """
+    进入追踪上下文
+
+    已处于追踪中且未指定 trace_id / new 时沿用外层 trace_id，
+    只覆盖 tenant / agent；否则开启新的 trace。
+    """
+    parent = _trace_ctx.get()
+    if parent is not None and trace_id is None and not new:
+        ctx = replace(
+            parent,
+            tenant=tenant if tenant is not None else parent.tenant,
+            agent=agent if agent is not None else parent.agent,
+        )
+    else:
+        ctx = TraceContext(
+            trace_id=trace_id or new_trace_id(),
+            tenant=tenant or "",
+            agent=agent or "",
+        )
+    token = _trace_ctx.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _trace_ctx.reset(token)
+
+
+def recent_spans(trace_id: Optional[str] = None) -> List[dict]:
+    """最近记录的 span，可按 trace_id 过滤"""
+    if trace_id is None:
+        return list(_recent_spans)
+    return [s for s in _recent_spans if s["trace_id"] == trace_id]
+
+
+class _Span:
+    """计时 span，退出时记录直方图"""
+
+    __slots__ = ("metric", "labels", "status", "_start")
+
+    def __init__(self, metric: Histogram, labels: Dict[str, Any]):
+        self.metric = metric
+        self.labels = labels
+        self.status = "ok"
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def label(self, **labels: Any) -> None:
+        """补充退出时才确定的标签"""
+        self.labels.update(labels)
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.status = "error"
+        labels = self.labels
+        ctx = _trace_ctx.get()
+        if ctx is not None:
+            for name in CONTEXT_LABELS:
+                if name not in labels:
+                    labels[name] = getattr(ctx, name)
+        labels["status"] = self.status
+        self.metric.observe(elapsed, **labels)
+        _recent_spans.append({
+            "trace_id": ctx.trace_id if ctx else None,
+            "name": self.metric.name,
+            "labels": labels,
+            "duration_ms": round(elapsed * 1000, 3),
+            "ended_at": time.time(),
+        })
+        return False
+
+
+class _NoopSpan:
+    """关闭埋点时的共享空 span"""
+
+    __slots__ = ()
+    status = "ok"
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def label(self, **labels: Any) -> None:
+        pass
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def __setattr__(self, name, value) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(metric: Histogram, **labels: Any):
+    """
+    计时上下文管理器
+
+    用法:
+        with span(MCP_TOOL_SECONDS, server="task", tool=name) as s:
+            result = await handler(...)
+            if not result.success:
+                s.status = "error"
+
+    tenant / agent 标签缺省时取自当前追踪上下文，status 标签按异常或 s.status 填充。
+    """
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Span(metric, labels)
+
+
+def instrument(
+    metric: Histogram,
+    name_label: Optional[str] = None,
+    tenant_arg: Optional[str] = None,
+    **static_labels: Any
+) -> Callable:
+    """
+    异步函数计时装饰器
+
+    Args:
+        metric: 目标直方图
+        name_label: 以函数名填充的标签名 (如 "query")
+        tenant_arg: 从该参数读取 tenant 标签 (如 "tenant_id")
+        static_labels: 固定标签
+
+    METRICS_ENABLED 关闭时直接返回原函数。
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        labels = dict(static_labels)
+        if name_label:
+            labels[name_label] = func.__name__
+
+        tenant_index = None
+        if tenant_arg:
+            params = list(inspect.signature(func).parameters)
+            tenant_index = params.index(tenant_arg) if tenant_arg in params else None
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            call_labels = dict(labels)
+            if tenant_arg:
+                if tenant_arg in kwargs:
+                    call_labels["tenant"] = kwargs[tenant_arg]
+                elif tenant_index is not None and tenant_index < len(args):
+                    call_labels["tenant"] = args[tenant_index]
+            with _Span(metric, call_labels):
+                return await func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    # Prometheus 文本格式用 +Inf / -Inf / NaN 表示非有限值
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
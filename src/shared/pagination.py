@@ -0,0 +1,142 @@
+"""
+LinkC Platform - 游标分页
+=========================
+Keyset 分页的公共部分，存储层 (SQL) 与 API 层 (内存数据) 共用:
+- encode_cursor / decode_cursor: 不透明续页令牌 (base64url JSON)，携带上一页
+  最后一条记录的排序键和排序方式指纹，指纹不一致的令牌视为无效
+- keyset_page: 内存数据的 keyset 分页，语义与 SQL 的行比较一致
+- CountCache: 带 TTL 的总数缓存，避免每页都 COUNT(*)
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple, TypeVar
+import base64
+import json
+import time
+
+T = TypeVar("T")
+
+# 总数计算方式
+COUNT_EXACT = "exact"        # 每次 COUNT(*)
+COUNT_CACHED = "cached"      # 精确计数，按查询条件缓存 TTL 秒
+COUNT_ESTIMATE = "estimate"  # 规划器估算 (小结果集回退为精确计数)
+COUNT_MODES = (COUNT_EXACT, COUNT_CACHED, COUNT_ESTIMATE)
+
+
+class InvalidCursorError(ValueError):
+    """续页令牌无法解析或与当前查询的排序方式不匹配"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any], scope: str = "") -> str:
+    """
+    编码续页令牌
+
+    Args:
+        values: 上一页最后一条记录的排序键 (按排序列顺序)
+        scope: 排序方式指纹 (如 "time:desc,event_id:desc")
+    """
+    payload = {"k": [_encode_value(v) for v in values], "s": scope}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, scope: str = "") -> List[Any]:
+    """解码续页令牌，返回排序键；无效时抛出 InvalidCursorError"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(v) for v in payload["k"]]
+        token_scope = payload.get("s", "")
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from e
+    if token_scope != scope:
+        raise InvalidCursorError("Cursor does not match the query ordering")
+    return values
+
+
+def keyset_page(
+    items: Sequence[T],
+    key: Callable[[T], Tuple],
+    size: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    scope: str = "",
+    offset: int = 0
+) -> Tuple[List[T], Optional[str]]:
+    """
+    对已按 key 排序的内存数据做 keyset 分页
+
+    Args:
+        cursor: 续页令牌；为空时从 offset 开始 (兼容页码分页)
+
+    Returns:
+        (本页数据, 下一页令牌)；没有更多数据时令牌为 None
+    """
+    start = max(offset, 0)
+    if cursor:
+        after = tuple(decode_cursor(cursor, scope))
+        if descending:
+            start = next((i for i, item in enumerate(items) if key(item) < after), len(items))
+        else:
+            start = next((i for i, item in enumerate(items) if key(item) > after), len(items))
+
+    page = list(items[start:start + size])
+    next_cursor = None
+    if page and start + size < len(items):
+        next_cursor = encode_cursor(key(page[-1]), scope)
+    return page, next_cursor
+
+
+class CountCache:
+    """按查询条件缓存总数 (TTL + 有界 LRU)"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: int) -> None:
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def count_key(*parts: Any) -> Tuple[str, ...]:
+    """CountCache 的键: 查询语句 + 参数 (统一转为字符串)"""
+    return tuple(str(p) for p in parts)
@@ -0,0 +1,71 @@
+"""
+LinkC Platform - 排程时间计算
+=============================
+任务管理 MCP 的排程日历和 API 网关的任务服务共用:
+- parse_hhmm: HH:MM → 当天分钟数
+- next_occurrence: 按星期/每月几号的执行时刻计算下一次执行时间
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional
+import bisect
+
+
+def parse_hhmm(value: Optional[str]) -> Optional[int]:
+    """HH:MM 转为当天分钟数，格式无效返回 None"""
+    try:
+        hour, minute = map(int, value.split(":"))
+    except (AttributeError, ValueError):
+        return None
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return None
+    return hour * 60 + minute
+
+
+def minutes_to_datetime(day: date, minutes: int, tzinfo=None) -> datetime:
+    return datetime.combine(day, time(minutes // 60, minutes % 60), tzinfo=tzinfo)
+
+
+def next_occurrence(
+    after: datetime,
+    minutes_by_weekday: Dict[int, List[int]],
+    days_of_month: Optional[Iterable[int]] = None,
+    only_date: Optional[date] = None,
+    horizon_days: int = 366
+) -> Optional[datetime]:
+    """
+    计算严格晚于 after 的下一次执行时间
+
+    Args:
+        after: 基准时间 (保留其时区)
+        minutes_by_weekday: 星期(1=周一，7=周日) → 当天执行时刻 (分钟，升序)
+        days_of_month: 限定每月几号执行
+        only_date: 只在该日期执行 (一次性排程)
+        horizon_days: 最多向后查找的天数
+
+    Returns:
+        下一次执行时间，找不到返回 None
+    """
+    if not minutes_by_weekday:
+        return None
+    month_days = set(days_of_month) if days_of_month else None
+    start = after.date()
+    cutoff = after.hour * 60 + after.minute
+
+    if only_date is not None:
+        if only_date < start:
+            return None
+        candidates = [only_date]
+    else:
+        candidates = (start + timedelta(days=i) for i in range(horizon_days + 1))
+
+    for day in candidates:
+        if month_days and day.day not in month_days:
+            continue
+        minutes = minutes_by_weekday.get(day.isoweekday())
+        if not minutes:
+            continue
+        idx = bisect.bisect_right(minutes, cutoff) if day == start else 0
+        if idx < len(minutes):
+            return minutes_to_datetime(day, minutes[idx], after.tzinfo)
+    return None
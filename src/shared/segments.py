@@ -0,0 +1,168 @@
+"""
+LinkC Platform - 时间分段存储
+=============================
+内存后端的按时间分段追加存储，对应 TimescaleDB hypertable 的 chunk:
+- 写入按时间落入固定宽度的段，段内保持写入顺序
+- drop_before: 过期按整段丢弃，每段 O(1)，不重建列表
+- iter_range / remove: 只访问与时间范围重叠的段
+"""
+
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Generic, Iterator, List, Optional, TypeVar
+import math
+
+T = TypeVar("T")
+
+
+def to_epoch(value: Any) -> float:
+    """datetime / ISO 字符串 → Unix 秒 (无时区按 UTC)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class TimeSegments(Generic[T]):
+    """按时间分段的追加存储"""
+
+    def __init__(self, segment_seconds: float, time_of: Callable[[T], Any]):
+        """
+        Args:
+            segment_seconds: 段宽 (秒)，即过期的最小粒度
+            time_of: 取记录时间 (datetime 或 ISO 字符串)
+        """
+        if segment_seconds <= 0:
+            raise ValueError("segment_seconds must be positive")
+        self.segment_seconds = segment_seconds
+        self._time_of = time_of
+        self._keys: List[int] = []  # 段编号，升序
+        self._segments: Dict[int, Deque[T]] = {}
+        self._size = 0
+
+    def _key(self, value: Any) -> int:
+        return math.floor(to_epoch(value) / self.segment_seconds)
+
+    def add(self, item: T) -> None:
+        key = self._key(self._time_of(item))
+        segment = self._segments.get(key)
+        if segment is None:
+            segment = self._segments[key] = deque()
+            if not self._keys or key > self._keys[-1]:
+                self._keys.append(key)
+            else:
+                # 乱序写入较旧的时间段
+                insort(self._keys, key)
+        segment.append(item)
+        self._size += 1
+
+    def extend(self, items) -> None:
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[T]:
+        """按段从旧到新，段内按写入顺序"""
+        for key in self._keys:
+            yield from self._segments[key]
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._keys)
+
+    def iter_segments(self, start: Any = None, end: Any = None) -> Iterator[Deque[T]]:
+        """与 [start, end] 重叠的段，从旧到新"""
+        first = bisect_left(self._keys, self._key(start)) if start is not None else 0
+        last = self._key(end) if end is not None else None
+        for key in self._keys[first:]:
+            if last is not None and key > last:
+                break
+            yield self._segments[key]
+
+    def iter_range(self, start: Any = None, end: Any = None) -> Iterator[T]:
+        """与 [start, end] 重叠的段中的记录 (调用方仍需按精确时间过滤)"""
+        for segment in self.iter_segments(start, end):
+            yield from segment
+
+    def drop_before(self, cutoff: Any) -> int:
+        """丢弃结束时间不晚于 cutoff 的整段，返回丢弃的记录数"""
+        limit = to_epoch(cutoff)
+        count = 0
+        while count < len(self._keys) and (self._keys[count] + 1) * self.segment_seconds <= limit:
+            count += 1
+        if not count:
+            return 0
+        removed = 0
+        for key in self._keys[:count]:
+            removed += len(self._segments.pop(key))
+        del self._keys[:count]
+        self._size -= removed
+        return removed
+
+    def trim_oldest(self, max_items: int) -> int:
+        """记录数超过 max_items 时从最旧处丢弃 (整段优先)，返回丢弃数"""
+        removed = 0
+        while self._size > max_items:
+            key = self._keys[0]
+            segment = self._segments[key]
+            excess = self._size - max_items
+            if len(segment) <= excess:
+                del self._segments[key]
+                self._keys.pop(0)
+                removed += len(segment)
+                self._size -= len(segment)
+            else:
+                for _ in range(excess):
+                    segment.popleft()
+                removed += excess
+                self._size -= excess
+        return removed
+
+    def remove(
+        self,
+        start: Any,
+        end: Any,
+        predicate: Optional[Callable[[T], bool]] = None
+    ) -> int:
+        """
+        删除时间在 [start, end] 内 (且满足 predicate) 的记录
+
+        完全落在范围内且无 predicate 的段整段删除，只有两端的段逐条过滤。
+        """
+        start_epoch, end_epoch = to_epoch(start), to_epoch(end)
+        removed = 0
+        for key in list(self._keys[bisect_left(self._keys, self._key(start)):]):
+            if key > self._key(end):
+                break
+            segment = self._segments[key]
+            covered = (
+                key * self.segment_seconds >= start_epoch
+                and (key + 1) * self.segment_seconds <= end_epoch
+            )
+            if covered and predicate is None:
+                kept: Deque[T] = deque()
+            else:
+                kept = deque(
+                    item for item in segment
+                    if not (
+                        start_epoch <= to_epoch(self._time_of(item)) <= end_epoch
+                        and (predicate is None or predicate(item))
+                    )
+                )
+            removed += len(segment) - len(kept)
+            if kept:
+                self._segments[key] = kept
+            else:
+                del self._segments[key]
+                self._keys.remove(key)
+        self._size -= removed
+        return removed
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._segments.clear()
+        self._size = 0
@@ -0,0 +1,57 @@
+"""
+LinkC Platform - JSON 序列化
+============================
+MCP / API 边界统一的 JSON 编码。可用时使用 orjson，否则回退到标准库 json。
+"""
+
+from datetime import date, datetime
+from enum import Enum
+from typing import Any
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 依赖可选
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """标准库 json / orjson 都无法直接编码的类型"""
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps_bytes(obj: Any) -> bytes:
+        """编码为 UTF-8 JSON 字节"""
+        return orjson.dumps(obj, default=_default)
+
+    def dumps(obj: Any) -> str:
+        """编码为 JSON 字符串 (非 ASCII 字符不转义)"""
+        return orjson.dumps(obj, default=_default).decode("utf-8")
+
+    def loads(data: Any) -> Any:
+        return orjson.loads(data)
+
+else:
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """编码为 UTF-8 JSON 字节"""
+        return dumps(obj).encode("utf-8")
+
+    def dumps(obj: Any) -> str:
+        """编码为 JSON 字符串 (非 ASCII 字符不转义)"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+    def loads(data: Any) -> Any:
+        return json.loads(data)
+
+
+__all__ = ["dumps", "dumps_bytes", "loads"]
@@ -0,0 +1,326 @@
+"""
+LinkC Platform - 区域空间索引
+=============================
+按楼层把 (x, y) 位置映射到所在区域 (均匀网格):
+- 格子完全落在某区域内部时直接记录区域序号，查询只是一次数组取值
+- 区域边界穿过的格子保存候选区域，落入其中的点再做精确的点在多边形内判断
+- locate_many 对一批位置全程向量化；区域重叠时按注册顺序取第一个
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import math
+
+import numpy as np
+
+Point = Tuple[float, float]
+
+
+# ============================================================
+# 多边形工具
+# ============================================================
+
+def polygon_points(boundary: Any) -> List[Point]:
+    """区域边界 ({"type": "polygon", "coordinates": [...]} 或点列表) → [(x, y)]"""
+    if isinstance(boundary, Mapping):
+        boundary = boundary.get("coordinates") or []
+    points = []
+    for point in boundary or []:
+        if isinstance(point, Mapping):
+            points.append((float(point["x"]), float(point["y"])))
+        else:
+            points.append((float(point[0]), float(point[1])))
+    return points
+
+
+def polygon_area(points: Sequence[Point]) -> float:
+    """鞋带公式"""
+    area = 0.0
+    for (x0, y0), (x1, y1) in zip(points, list(points[1:]) + list(points[:1])):
+        area += x0 * y1 - x1 * y0
+    return abs(area) / 2
+
+
+def polygon_centroid(points: Sequence[Point]) -> Point:
+    """多边形形心 (面积为 0 时退化为顶点均值)"""
+    cross_sum = cx = cy = 0.0
+    for (x0, y0), (x1, y1) in zip(points, list(points[1:]) + list(points[:1])):
+        cross = x0 * y1 - x1 * y0
+        cross_sum += cross
+        cx += (x0 + x1) * cross
+        cy += (y0 + y1) * cross
+    if abs(cross_sum) < 1e-12:
+        return (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+    return (cx / (3 * cross_sum), cy / (3 * cross_sum))
+
+
+def points_in_polygon(points: Sequence[Point], xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """各点是否在多边形内 (奇偶规则，按边向量化；xs、ys 可广播)"""
+    xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+    inside = np.zeros(xs.shape, dtype=bool)
+    points = list(points)
+    for (xi, yi), (xj, yj) in zip(points, points[-1:] + points[:-1]):
+        if yi == yj:
+            continue
+        crosses = (yi > ys) != (yj > ys)
+        x_cross = (xj - xi) * (ys - yi) / (yj - yi) + xi
+        inside ^= crosses & (xs < x_cross)
+    return inside
+
+
+# ============================================================
+# 单楼层索引
+# ============================================================
+
+class FloorZoneIndex:
+    """单个楼层的区域网格索引 (构建后只读)"""
+
+    def __init__(
+        self,
+        zones: Iterable[Tuple[str, Any]],
+        cell_size: float = 0.5,
+        max_cells: int = 4_000_000
+    ):
+        """
+        Args:
+            zones: (区域ID, 边界) 列表，顺序即重叠时的优先级
+            cell_size: 网格边长 (米)，格子数超过 max_cells 时自动放大
+            max_cells: 网格格子数上限
+        """
+        self.zone_ids: List[str] = []
+        polygons: List[np.ndarray] = []
+        for zone_id, boundary in zones:
+            points = polygon_points(boundary)
+            if len(points) >= 3 and polygon_area(points) > 0:
+                self.zone_ids.append(zone_id)
+                polygons.append(np.asarray(points, dtype=float))
+        # 序号 → ID，末尾 None 对应 -1 (不在任何区域)
+        self._ids = np.array(self.zone_ids + [None], dtype=object)
+
+        if not polygons:
+            self.origin = (0.0, 0.0)
+            self.cell_size = cell_size
+            self.label = np.full((1, 1), -1, dtype=np.int32)
+            self._max = (0.0, 0.0)
+            self._build_edges([])
+            self._build_candidates([], [])
+            return
+
+        stacked = np.concatenate(polygons)
+        min_x, min_y = stacked.min(axis=0)
+        max_x, max_y = stacked.max(axis=0)
+        span_x, span_y = max(max_x - min_x, cell_size), max(max_y - min_y, cell_size)
+        if (span_x / cell_size) * (span_y / cell_size) > max_cells:
+            cell_size = math.sqrt(span_x * span_y / max_cells) * 1.01
+        self.origin = (float(min_x), float(min_y))
+        self.cell_size = cell_size
+        self._max = (float(max_x), float(max_y))
+        nx = max(1, math.ceil(span_x / cell_size))
+        ny = max(1, math.ceil(span_y / cell_size))
+
+        # 标签: >= 0 区域序号；-1 空；<= -2 需精确判断 (候选表下标 -2 - label)
+        self.label = np.full((ny, nx), -1, dtype=np.int32)
+        done = np.zeros((ny, nx), dtype=bool)   # 已被更靠前的区域内部占据
+        pair_cells: List[np.ndarray] = []
+        pair_zones: List[np.ndarray] = []
+
+        for z, points in enumerate(polygons):
+            # 外扩一格，容纳边界膨胀
+            c0 = max(0, int((points[:, 0].min() - min_x) // cell_size) - 1)
+            c1 = min(nx, int((points[:, 0].max() - min_x) // cell_size) + 2)
+            r0 = max(0, int((points[:, 1].min() - min_y) // cell_size) - 1)
+            r1 = min(ny, int((points[:, 1].max() - min_y) // cell_size) + 2)
+            xs = min_x + (np.arange(c0, c1) + 0.5) * cell_size
+            ys = min_y + (np.arange(r0, r1) + 0.5) * cell_size
+
+            inside = points_in_polygon(points, xs[None, :], ys[:, None])
+            edge = self._edge_cells(points, r0, r1, c0, c1)
+            window_done = done[r0:r1, c0:c1]
+
+            rows, cols = np.nonzero(edge & ~window_done)
+            pair_cells.append((rows + r0) * nx + cols + c0)
+            pair_zones.append(np.full(rows.size, z, dtype=np.int32))
+
+            # 边界不穿过的格子，中心在内即整格在内
+            interior = inside & ~edge & ~window_done
+            self.label[r0:r1, c0:c1][interior] = z
+            window_done |= interior
+
+        self._build_edges(polygons)
+        self._build_candidates(pair_cells, pair_zones)
+
+    def _edge_cells(self, points: np.ndarray, r0: int, r1: int, c0: int, c1: int) -> np.ndarray:
+        """多边形边经过的格子 (沿边半格采样后做 3×3 膨胀，保守覆盖)"""
+        ox, oy = self.origin
+        cell = self.cell_size
+        ends = np.roll(points, -1, axis=0)
+        lengths = np.hypot(*(ends - points).T)
+        counts = np.ceil(lengths / (cell / 2)).astype(np.int64) + 1
+        edge_of = np.repeat(np.arange(len(points)), counts)
+        t = (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)) / np.repeat(counts - 1, counts)
+        samples = points[edge_of] + (ends - points)[edge_of] * t[:, None]
+
+        marked = np.zeros((r1 - r0, c1 - c0), dtype=bool)
+        cols = np.clip(((samples[:, 0] - ox) // cell).astype(np.int64) - c0, 0, c1 - c0 - 1)
+        rows = np.clip(((samples[:, 1] - oy) // cell).astype(np.int64) - r0, 0, r1 - r0 - 1)
+        marked[rows, cols] = True
+
+        grown = marked.copy()
+        grown[1:] |= marked[:-1]
+        grown[:-1] |= marked[1:]
+        dilated = grown.copy()
+        dilated[:, 1:] |= grown[:, :-1]
+        dilated[:, :-1] |= grown[:, 1:]
+        return dilated
+
+    def _build_edges(self, polygons: List[np.ndarray]) -> None:
+        """所有区域的非水平边 (精确判断用)，按区域连续存放"""
+        edges = []
+        counts = []
+        for points in polygons:
+            ends = np.roll(points, -1, axis=0)
+            keep = points[:, 1] != ends[:, 1]
+            edges.append(np.hstack([points[keep], ends[keep]]))
+            counts.append(int(keep.sum()))
+        self._edges = np.vstack(edges) if edges else np.zeros((0, 4))
+        self._edge_count = np.asarray(counts, dtype=np.int64)
+        self._edge_start = np.cumsum(self._edge_count) - self._edge_count
+
+    def _build_candidates(self, pair_cells: List[np.ndarray], pair_zones: List[np.ndarray]) -> None:
+        """边界格子 → 候选区域表 (按注册顺序)，末尾追加之后占据该格内部的区域"""
+        cells = np.concatenate(pair_cells) if pair_cells else np.zeros(0, dtype=np.int64)
+        zones = np.concatenate(pair_zones) if pair_zones else np.zeros(0, dtype=np.int32)
+        flat = self.label.reshape(-1)
+        boundary_cells = np.unique(cells)
+        tail = flat[boundary_cells]
+        # 内部占据者一定晚于该格所有已记录的边界区域，排序后位于末尾
+        cells = np.concatenate([cells, boundary_cells[tail >= 0]])
+        zones = np.concatenate([zones, tail[tail >= 0]])
+        order = np.lexsort((zones, cells))
+        cells, self._candidates = cells[order], zones[order]
+
+        unique_cells, starts = np.unique(cells, return_index=True)
+        self._candidate_start = starts
+        self._candidate_count = np.diff(np.append(starts, cells.size))
+        flat[unique_cells] = -2 - np.arange(unique_cells.size, dtype=np.int32)
+
+    # ============================================================
+    # 查询
+    # ============================================================
+
+    def locate_many(self, xs: Any, ys: Any) -> np.ndarray:
+        """
+        批量定位
+
+        Returns:
+            区域序号数组 (int32)，不在任何区域为 -1；序号对应 zone_ids
+        """
+        xs = np.asarray(xs, dtype=float).reshape(-1)
+        ys = np.asarray(ys, dtype=float).reshape(-1)
+        ox, oy = self.origin
+        ny, nx = self.label.shape
+        ok = (xs >= ox) & (xs <= self._max[0]) & (ys >= oy) & (ys <= self._max[1])
+        cols = np.minimum(((xs[ok] - ox) // self.cell_size).astype(np.int64), nx - 1)
+        rows = np.minimum(((ys[ok] - oy) // self.cell_size).astype(np.int64), ny - 1)
+
+        result = np.full(xs.size, -1, dtype=np.int32)
+        result[ok] = self.label[rows, cols]
+
+        pending = np.nonzero(result <= -2)[0]
+        if pending.size:
+            result[pending] = self._resolve(-2 - result[pending], xs[pending], ys[pending])
+        return result
+
+    def _resolve(self, slots: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """边界格子内的点: 依次对候选区域做点在多边形内判断，取第一个命中"""
+        counts = self._candidate_count[slots]
+        pair_point = np.repeat(np.arange(slots.size), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_zone = self._candidates[np.repeat(self._candidate_start[slots], counts) + offsets]
+
+        # 候选 × 边 展开后统计射线穿越次数
+        edge_counts = self._edge_count[pair_zone]
+        edge_pair = np.repeat(np.arange(pair_zone.size), edge_counts)
+        edge_offsets = np.arange(edge_counts.sum()) - np.repeat(np.cumsum(edge_counts) - edge_counts, edge_counts)
+        x0, y0, x1, y1 = self._edges[np.repeat(self._edge_start[pair_zone], edge_counts) + edge_offsets].T
+        px = xs[pair_point][edge_pair]
+        py = ys[pair_point][edge_pair]
+        crosses = ((y0 > py) != (y1 > py)) & (px < (x1 - x0) * (py - y0) / (y1 - y0) + x0)
+        inside = np.bincount(edge_pair, weights=crosses, minlength=pair_zone.size).astype(np.int64) % 2 == 1
+
+        resolved = np.full(slots.size, -1, dtype=np.int32)
+        hits = np.nonzero(inside)[0]
+        points, first = np.unique(pair_point[hits], return_index=True)
+        resolved[points] = pair_zone[hits[first]]
+        return resolved
+
+    def locate_ids(self, xs: Any, ys: Any) -> List[Optional[str]]:
+        """批量定位，返回区域ID (不在任何区域为 None)"""
+        return self._ids[self.locate_many(xs, ys)].tolist()
+
+    def locate(self, x: float, y: float) -> Optional[str]:
+        return self.locate_ids([x], [y])[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        ny, nx = self.label.shape
+        return {
+            "zones": len(self.zone_ids),
+            "cell_size": round(self.cell_size, 4),
+            "cells": nx * ny,
+            "boundary_cells": int(self._candidate_start.size),
+        }
+
+
+# ============================================================
+# 多楼层索引
+# ============================================================
+
+class ZoneSpatialIndex:
+    """
+    多楼层区域索引
+
+    楼层索引在首次查询时由 loader 构建；区域增删改后调用 invalidate 使其失效。
+
+    用法:
+        index = ZoneSpatialIndex(lambda floor_id: [(zone.id, zone.boundary), ...])
+        index.locate("floor_001", 3.2, 4.5)
+        index.locate_many("floor_001", xs, ys)
+    """
+
+    def __init__(self, loader: Callable[[str], Iterable[Tuple[str, Any]]], cell_size: float = 0.5):
+        """
+        Args:
+            loader: 楼层ID → (区域ID, 边界) 列表
+            cell_size: 网格边长 (米)
+        """
+        self._loader = loader
+        self.cell_size = cell_size
+        self._floors: Dict[str, FloorZoneIndex] = {}
+
+    def floor(self, floor_id: str) -> FloorZoneIndex:
+        index = self._floors.get(floor_id)
+        if index is None:
+            index = self._floors[floor_id] = FloorZoneIndex(self._loader(floor_id), self.cell_size)
+        return index
+
+    def invalidate(self, floor_id: Optional[str] = None) -> None:
+        """使某楼层 (默认全部) 的索引失效，下次查询时重建"""
+        if floor_id is None:
+            self._floors.clear()
+        else:
+            self._floors.pop(floor_id, None)
+
+    def locate(self, floor_id: Optional[str], x: float, y: float) -> Optional[str]:
+        if not floor_id:
+            return None
+        return self.floor(floor_id).locate(x, y)
+
+    def locate_many(self, floor_id: Optional[str], xs: Any, ys: Any) -> List[Optional[str]]:
+        if not floor_id:
+            return [None] * len(xs)
+        return self.floor(floor_id).locate_ids(xs, ys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "floors": len(self._floors),
+            "zones": sum(len(f.zone_ids) for f in self._floors.values()),
+        }
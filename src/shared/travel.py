@@ -0,0 +1,394 @@
+"""
+LinkC Platform - 区域间行程代价
+===============================
+按楼宇预计算地点 (区域、电梯口、充电点) 两两之间的最短行程时间 (秒)，
+调度、充电选站和时长估算直接查表，不再每次决策做路径搜索:
+- 同楼层: 直线距离 / 行走速度
+- 跨楼层: 必须经过电梯口；电梯口之间 (同楼层步行、同组电梯换层) 先做 Floyd–Warshall，
+  再以 "地点 → 电梯口 → ... → 电梯口 → 地点" 的 min-plus 乘积得到整张矩阵
+- 增删改普通地点只重算对应的行和列 (O(N·K))；电梯口变化时整栋楼重建
+"""
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import math
+
+import numpy as np
+
+PLACE_ZONE = "zone"
+PLACE_ELEVATOR = "elevator"
+PLACE_CHARGING = "charging"
+
+# min-plus 分块时单块中间数组的元素上限
+_CHUNK_ELEMENTS = 4_000_000
+
+
+class Place(NamedTuple):
+    """行程图中的地点"""
+    id: str
+    floor_id: str
+    floor_number: int
+    x: float
+    y: float
+    kind: str = PLACE_ZONE      # zone / elevator / charging
+    group: str = "default"      # 电梯分组: 同组电梯口之间可以换层
+
+
+def _minplus(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """min-plus 矩阵乘积: out[i, j] = min_k a[i, k] + b[k, j] (按行分块)"""
+    n, k = a.shape
+    m = b.shape[1]
+    if k == 0:
+        return np.full((n, m), np.inf)
+    out = np.empty((n, m))
+    rows = max(1, _CHUNK_ELEMENTS // max(1, k * m))
+    for start in range(0, n, rows):
+        out[start:start + rows] = (a[start:start + rows, :, None] + b[None, :, :]).min(axis=1)
+    return out
+
+
+# ============================================================
+# 单楼宇行程矩阵
+# ============================================================
+
+class TravelCostMatrix:
+    """单个楼宇的全源最短行程时间矩阵 (float32，秒；不可达为 inf)"""
+
+    def __init__(
+        self,
+        places: Iterable[Place],
+        speed: float = 0.5,
+        elevator_wait: float = 60.0,
+        seconds_per_floor: float = 4.0
+    ):
+        """
+        Args:
+            places: 楼宇内的地点；kind 为 elevator 的地点同时是换层的电梯口
+            speed: 行走速度 (米/秒)
+            elevator_wait: 每次乘梯的等待与进出时间 (秒)
+            seconds_per_floor: 电梯每层运行时间 (秒)
+        """
+        self.speed = speed
+        self.elevator_wait = elevator_wait
+        self.seconds_per_floor = seconds_per_floor
+        self._stats = {"rebuilds": 0, "incremental_updates": 0}
+        self._build(list(places))
+
+    # ============================================================
+    # 构建
+    # ============================================================
+
+    def _build(self, places: List[Place]) -> None:
+        capacity = max(8, len(places))
+        self._places: Dict[str, Place] = {}
+        self._slot: Dict[str, int] = {}
+        self._by_kind: Dict[str, Set[str]] = {}
+        self._floor_keys: Dict[str, int] = {}
+        self._pos = np.zeros((capacity, 2))
+        self._floor = np.full(capacity, -1, dtype=np.int64)   # 楼层内部编号，-1 为空槽
+        self._free = list(range(capacity - 1, len(places) - 1, -1))
+
+        self._build_transit([p for p in places if p.kind == PLACE_ELEVATOR])
+        for slot, place in enumerate(places):
+            self._put(slot, place)
+        self._entry = self._entry_costs(self._pos, self._floor)
+
+        self._matrix = np.empty((capacity, capacity), dtype=np.float32)
+        rows = max(1, _CHUNK_ELEMENTS // max(1, capacity * max(1, len(self._landing_ids))))
+        for start in range(0, capacity, rows):
+            slots = np.arange(start, min(capacity, start + rows))
+            self._matrix[slots] = self._costs_from(self._pos[slots], self._floor[slots])
+        self._stats["rebuilds"] += 1
+
+    def _build_transit(self, landings: List[Place]) -> None:
+        """电梯口之间的最短行程 (Floyd–Warshall)"""
+        landings = sorted(landings, key=lambda p: p.id)
+        self._landing_ids = [p.id for p in landings]
+        self._landing_key = self._landing_signature(landings)
+        self._landing_pos = np.array([(p.x, p.y) for p in landings], dtype=float).reshape(-1, 2)
+        self._landing_floor = np.array([self._floor_key(p.floor_id) for p in landings], dtype=np.int64)
+        numbers = np.array([p.floor_number for p in landings], dtype=float)
+        groups = np.array([p.group for p in landings], dtype=object)
+
+        diff = self._landing_pos[:, None, :] - self._landing_pos[None, :, :]
+        walk = np.hypot(diff[..., 0], diff[..., 1]) / self.speed
+        same_floor = self._landing_floor[:, None] == self._landing_floor[None, :]
+        ride = self.elevator_wait + self.seconds_per_floor * np.abs(numbers[:, None] - numbers[None, :])
+        same_group = groups[:, None] == groups[None, :]
+        transit = np.where(same_floor, walk, np.where(same_group, ride, np.inf))
+        for k in range(len(landings)):
+            np.minimum(transit, transit[:, k, None] + transit[None, k, :], out=transit)
+        self._transit = transit
+        # 楼层 → 该层电梯口下标 (到达某地点只能经由其所在楼层的电梯口)
+        self._floor_landings = {
+            int(key): np.nonzero(self._landing_floor == key)[0] for key in np.unique(self._landing_floor)
+        }
+
+    @staticmethod
+    def _landing_signature(landings: Iterable[Place]) -> Tuple:
+        return tuple(sorted((p.id, p.floor_id, p.floor_number, p.x, p.y, p.group) for p in landings))
+
+    def _floor_key(self, floor_id: str) -> int:
+        return self._floor_keys.setdefault(floor_id, len(self._floor_keys))
+
+    def _put(self, slot: int, place: Place) -> None:
+        previous = self._places.get(place.id)
+        if previous is not None:
+            self._by_kind[previous.kind].discard(place.id)
+        self._places[place.id] = place
+        self._slot[place.id] = slot
+        self._by_kind.setdefault(place.kind, set()).add(place.id)
+        self._pos[slot] = (place.x, place.y)
+        self._floor[slot] = self._floor_key(place.floor_id)
+
+    def _entry_costs(self, pos: np.ndarray, floor: np.ndarray) -> np.ndarray:
+        """各位置步行到同楼层各电梯口的时间 (n, K)"""
+        diff = pos[:, None, :] - self._landing_pos[None, :, :]
+        walk = np.hypot(diff[..., 0], diff[..., 1]) / self.speed
+        return np.where(floor[:, None] == self._landing_floor[None, :], walk, np.inf)
+
+    def _costs_from(self, pos: np.ndarray, floor: np.ndarray, targets: Optional[np.ndarray] = None) -> np.ndarray:
+        """若干位置到目标槽位 (默认全部) 的最短行程 (n, m)"""
+        if targets is None:
+            targets = np.arange(self._floor.size)
+        target_floor = self._floor[targets]
+        reach = _minplus(self._entry_costs(pos, floor), self._transit)
+
+        # 跨楼层: 按目标楼层分组，只在该层的电梯口上做 min-plus
+        costs = np.full((pos.shape[0], targets.size), np.inf)
+        for key in np.unique(target_floor):
+            landings = self._floor_landings.get(int(key))
+            if landings is None:
+                continue
+            columns = np.nonzero(target_floor == key)[0]
+            costs[:, columns] = _minplus(reach[:, landings], self._entry[targets[columns]][:, landings].T)
+
+        diff = pos[:, None, :] - self._pos[targets][None, :, :]
+        walk = np.hypot(diff[..., 0], diff[..., 1]) / self.speed
+        same_floor = floor[:, None] == target_floor[None, :]
+        costs[same_floor] = walk[same_floor]
+        costs[:, target_floor < 0] = np.inf
+        costs[floor < 0] = np.inf
+        return costs
+
+    # ============================================================
+    # 增量更新
+    # ============================================================
+
+    def sync(self, places: Iterable[Place]) -> None:
+        """
+        与最新地点列表对齐
+
+        电梯口集合不变时只重算新增 / 变化地点的行和列，删除的地点释放槽位；
+        电梯口变化或变化量超过四分之一时整体重建。
+        """
+        places = list(places)
+        incoming = {p.id: p for p in places}
+        landing_key = self._landing_signature(p for p in places if p.kind == PLACE_ELEVATOR)
+        removed = [pid for pid in self._places if pid not in incoming]
+        changed = [p for p in places if self._places.get(p.id) != p]
+        if not removed and not changed:
+            return
+        if landing_key != self._landing_key or len(removed) + len(changed) > max(8, len(places) // 4):
+            self._build(places)
+            return
+
+        for place_id in removed:
+            place = self._places.pop(place_id)
+            self._by_kind[place.kind].discard(place_id)
+            slot = self._slot.pop(place_id)
+            self._floor[slot] = -1
+            self._entry[slot] = np.inf
+            self._matrix[slot, :] = np.inf
+            self._matrix[:, slot] = np.inf
+            self._free.append(slot)
+
+        slots = []
+        for place in changed:
+            slot = self._slot.get(place.id)
+            if slot is None:
+                slot = self._take_slot()
+            self._put(slot, place)
+            slots.append(slot)
+        slots = np.asarray(slots, dtype=np.int64)
+        self._entry[slots] = self._entry_costs(self._pos[slots], self._floor[slots])
+        rows = self._costs_from(self._pos[slots], self._floor[slots])
+        self._matrix[slots, :] = rows
+        self._matrix[:, slots] = rows.T
+        self._stats["incremental_updates"] += 1
+
+    def _take_slot(self) -> int:
+        if not self._free:
+            old = self._floor.size
+            capacity = old * 2
+            self._pos = np.vstack([self._pos, np.zeros((old, 2))])
+            self._floor = np.concatenate([self._floor, np.full(old, -1, dtype=np.int64)])
+            self._entry = np.vstack([self._entry, np.full((old, self._entry.shape[1]), np.inf)])
+            matrix = np.full((capacity, capacity), np.inf, dtype=np.float32)
+            matrix[:old, :old] = self._matrix
+            self._matrix = matrix
+            self._free = list(range(capacity - 1, old - 1, -1))
+        return self._free.pop()
+
+    # ============================================================
+    # 查询
+    # ============================================================
+
+    def __contains__(self, place_id: str) -> bool:
+        return place_id in self._slot
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def place(self, place_id: str) -> Optional[Place]:
+        return self._places.get(place_id)
+
+    def cost(self, place_a: str, place_b: str) -> Optional[float]:
+        """两地点间最短行程 (秒)；地点未知为 None，不可达为 inf"""
+        slot_a = self._slot.get(place_a)
+        slot_b = self._slot.get(place_b)
+        if slot_a is None or slot_b is None:
+            return None
+        return float(self._matrix[slot_a, slot_b])
+
+    def cost_from(self, floor_id: str, x: float, y: float, place_id: str) -> Optional[float]:
+        """任意位置到地点的最短行程 (秒)"""
+        slot = self._slot.get(place_id)
+        if slot is None:
+            return None
+        return float(self._costs_from(*self._position(floor_id, x, y), np.array([slot]))[0, 0])
+
+    def nearest(
+        self,
+        floor_id: str,
+        x: float,
+        y: float,
+        kind: str = PLACE_CHARGING,
+        same_floor: bool = False
+    ) -> Optional[Tuple[Place, float]]:
+        """
+        行程最短的某类地点
+
+        Args:
+            kind: 地点类型 (默认充电点)
+            same_floor: 只在当前楼层内选择 (不能乘梯的机器人)
+
+        Returns:
+            (地点, 行程秒数)；没有可达的地点时为 None
+        """
+        candidates = sorted(
+            place_id for place_id in self._by_kind.get(kind, ())
+            if not same_floor or self._places[place_id].floor_id == floor_id
+        )
+        if not candidates:
+            return None
+        slots = np.array([self._slot[place_id] for place_id in candidates])
+        costs = self._costs_from(*self._position(floor_id, x, y), slots)[0]
+        best = int(np.argmin(costs))
+        if not math.isfinite(costs[best]):
+            return None
+        return self._places[candidates[best]], float(costs[best])
+
+    def _position(self, floor_id: str, x: float, y: float) -> Tuple[np.ndarray, np.ndarray]:
+        # 未知楼层不与任何地点或电梯口同层，结果全部不可达
+        return np.array([[x, y]], dtype=float), np.array([self._floor_keys.get(floor_id, -2)])
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "places": len(self._places),
+            "landings": len(self._landing_ids),
+            "floors": len(self._floor_keys),
+            "capacity": int(self._floor.size),
+            "matrix_bytes": int(self._matrix.nbytes),
+            **self._stats,
+        }
+
+
+# ============================================================
+# 多楼宇服务
+# ============================================================
+
+class TravelCostService:
+    """
+    多楼宇行程代价服务
+
+    楼宇矩阵在首次查询时由 loader 构建；空间数据变化后调用 invalidate，
+    下次查询时与 loader 的最新结果增量对齐。
+
+    用法:
+        travel = TravelCostService(loader, resolver)
+        travel.cost("zone-001", "zone-002")
+        travel.nearest("floor-001", 3.2, 4.5, kind="charging")
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Iterable[Place]],
+        resolver: Callable[[str], Optional[str]],
+        speed: float = 0.5,
+        elevator_wait: float = 60.0,
+        seconds_per_floor: float = 4.0
+    ):
+        """
+        Args:
+            loader: 楼宇ID → 地点列表
+            resolver: 地点ID 或楼层ID → 所属楼宇ID (未知为 None)
+            speed / elevator_wait / seconds_per_floor: 见 TravelCostMatrix
+        """
+        self._loader = loader
+        self._resolver = resolver
+        self._options = {"speed": speed, "elevator_wait": elevator_wait, "seconds_per_floor": seconds_per_floor}
+        self._buildings: Dict[str, TravelCostMatrix] = {}
+        self._stale: Set[str] = set()
+
+    def building(self, building_id: str) -> TravelCostMatrix:
+        matrix = self._buildings.get(building_id)
+        if matrix is None:
+            matrix = self._buildings[building_id] = TravelCostMatrix(self._loader(building_id), **self._options)
+            self._stale.discard(building_id)
+        elif building_id in self._stale:
+            matrix.sync(self._loader(building_id))
+            self._stale.discard(building_id)
+        return matrix
+
+    def invalidate(self, building_id: Optional[str] = None) -> None:
+        """标记某楼宇 (默认全部) 的矩阵过期"""
+        if building_id is None:
+            self._stale.update(self._buildings)
+        elif building_id in self._buildings:
+            self._stale.add(building_id)
+
+    def cost(self, place_a: str, place_b: str) -> Optional[float]:
+        """两地点间最短行程 (秒)；未知为 None，不在同一楼宇或不可达为 inf"""
+        building_a = self._resolver(place_a) if place_a else None
+        building_b = self._resolver(place_b) if place_b else None
+        if building_a is None or building_b is None:
+            return None
+        if building_a != building_b:
+            return math.inf
+        return self.building(building_a).cost(place_a, place_b)
+
+    def cost_from(self, floor_id: str, x: float, y: float, place_id: str) -> Optional[float]:
+        building_id = self._resolver(floor_id) if floor_id else None
+        if building_id is None or building_id != self._resolver(place_id):
+            return None
+        return self.building(building_id).cost_from(floor_id, x, y, place_id)
+
+    def nearest(
+        self,
+        floor_id: str,
+        x: float,
+        y: float,
+        kind: str = PLACE_CHARGING,
+        same_floor: bool = False
+    ) -> Optional[Tuple[Place, float]]:
+        building_id = self._resolver(floor_id) if floor_id else None
+        if building_id is None:
+            return None
+        return self.building(building_id).nearest(floor_id, x, y, kind, same_floor)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "buildings": len(self._buildings),
+            "places": sum(len(m) for m in self._buildings.values()),
+            "stale": len(self._stale),
+        }
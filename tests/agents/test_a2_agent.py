@@ -216,6 +216,26 @@ class TestPriorityBasedStrategy:
         assert assignment.robot_id == "robot_001"  # 同楼层
         assert "同楼层" in assignment.reason
 
+    def test_match_uses_travel_costs(self, context):
+        """测试有行程代价时按到达时间选择机器人"""
+        travel = {("zone_002", "zone_001"): 300.0, ("zone_003", "zone_001"): 90.0}
+
+        class TravelCosts:
+            def cost(self, zone_a, zone_b):
+                return travel.get((zone_a, zone_b))
+
+        strategy = PriorityBasedStrategy(travel_costs=TravelCosts())
+        task = {"task_id": "task_001", "zone_id": "zone_001", "priority": 5}
+        robots = [
+            {"robot_id": "robot_001", "battery_level": 80, "current_zone_id": "zone_002"},  # 同楼层但绕远
+            {"robot_id": "robot_002", "battery_level": 80, "current_zone_id": "zone_003"},  # 跨楼层但近电梯
+        ]
+
+        assignment = strategy.match(task, robots, context)
+
+        assert assignment.robot_id == "robot_002"
+        assert "行程约1.5分钟" in assignment.reason
+
     def test_match_no_robots(self, strategy, context):
         """测试没有可用机器人"""
         task = {"task_id": "task_001", "zone_id": "zone_001", "priority": 5}
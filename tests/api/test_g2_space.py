@@ -4,10 +4,11 @@ G2: 空间管理API - 单元测试
 """
 
 import pytest
+from datetime import datetime, timedelta, timezone
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from src.api.gateway.space.models import ZoneType, Priority, PointType
+from src.api.gateway.space.models import ZoneType, Priority, PointType, PointCreate, ZoneCreate, ZoneUpdate
 from src.api.gateway.space.service import SpaceService, InMemorySpaceStorage
 from src.api.gateway.space.router import router, set_space_service
 from src.api.gateway.auth.service import AuthService, InMemoryAuthStorage
@@ -404,6 +405,78 @@ class TestZoneEndpoints:
         assert response.status_code == 200
 
 
+class TestZoneLocation:
+    """位置 → 区域 定位测试"""
+
+    @pytest.mark.asyncio
+    async def test_locate_zone_follows_updates(self, space_service):
+        """测试区域增删改后空间索引失效重建"""
+        assert space_service.locate_zone("floor-001", 5, 5) == "zone-001"
+        assert space_service.locate_zone("floor-001", 15, 5) is None
+
+        created = await space_service.create_zone("tenant_001", ZoneCreate(
+            floor_id="floor-001", name="走廊", zone_type=ZoneType.CORRIDOR,
+            boundary={"type": "polygon", "coordinates": [[10, 0], [20, 0], [20, 10], [10, 10]]},
+        ))
+        assert space_service.locate_zones("floor-001", [5, 15], [5, 5]) == ["zone-001", created.id]
+
+        await space_service.update_zone("zone-001", "tenant_001", ZoneUpdate(
+            boundary={"type": "polygon", "coordinates": [[0, 0], [5, 0], [5, 10], [0, 10]]},
+        ))
+        assert space_service.locate_zone("floor-001", 7, 5) is None
+
+        await space_service.delete_zone(created.id, "tenant_001")
+        assert space_service.locate_zone("floor-001", 15, 5) is None
+
+    @pytest.mark.asyncio
+    async def test_travel_cost_follows_updates(self, space_service):
+        """测试行程代价矩阵随区域和充电点变化更新"""
+        corridor = await space_service.create_zone("tenant_001", ZoneCreate(
+            floor_id="floor-001", name="走廊", zone_type=ZoneType.CORRIDOR,
+            boundary={"type": "polygon", "coordinates": [[20, 0], [30, 0], [30, 10], [20, 10]]},
+        ))
+        # 形心 (5, 5) → (25, 5)，步行 0.5 m/s
+        assert space_service.travel_cost("zone-001", corridor.id) == pytest.approx(40)
+
+        await space_service.update_zone(corridor.id, "tenant_001", ZoneUpdate(
+            boundary={"type": "polygon", "coordinates": [[10, 0], [20, 0], [20, 10], [10, 10]]},
+        ))
+        assert space_service.travel_cost("zone-001", corridor.id) == pytest.approx(20)
+
+        await space_service.create_point(corridor.id, "tenant_001", PointCreate(
+            name="充电桩", x=19, y=5, point_type=PointType.CHARGING,
+        ))
+        place, seconds = space_service.travel_costs.nearest("floor-001", 5, 5)
+        assert (place.x, place.y) == (19, 5)
+        assert seconds == pytest.approx(28)
+
+        await space_service.delete_zone(corridor.id, "tenant_001")
+        assert space_service.travel_cost("zone-001", corridor.id) is None
+        assert space_service.travel_costs.nearest("floor-001", 5, 5) is None
+
+    @pytest.mark.asyncio
+    async def test_zone_coverage_from_positions(self, space_service):
+        """测试区域详情的覆盖率来自位置轨迹，区域变化后重建栅格"""
+        zone = await space_service.get_zone("zone-001", "tenant_001")
+        assert "coverage_rate" not in zone.statistics
+
+        now = datetime.now(timezone.utc)
+        space_service.coverage.ingest_positions(
+            {"tenant_id": "tenant_001", "robot_id": "r1", "floor_id": "floor-001",
+             "x": float(x), "y": 5.0, "timestamp": now + timedelta(seconds=x)}
+            for x in range(11)
+        )
+
+        zone = await space_service.get_zone("zone-001", "tenant_001")
+        assert zone.statistics["coverage_rate"] > 0
+
+        await space_service.update_zone("zone-001", "tenant_001", ZoneUpdate(
+            boundary={"type": "polygon", "coordinates": [[0, 0], [5, 0], [5, 10], [0, 10]]},
+        ))
+        zone = await space_service.get_zone("zone-001", "tenant_001")
+        assert "coverage_rate" not in zone.statistics
+
+
 # ============================================================
 # 点位管理测试
 # ============================================================
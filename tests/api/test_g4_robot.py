@@ -227,6 +227,39 @@ class TestRobotService:
 
         assert isinstance(result, list)
 
+    @pytest.mark.asyncio
+    async def test_history_downsampled(self):
+        """测试历史数据在查询层降采样到固定点数"""
+        from datetime import timedelta
+        from src.data.query.service import DataQueryService
+        from src.data.storage.timeseries import InMemoryTimeSeriesService
+
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        timeseries = InMemoryTimeSeriesService()
+        await timeseries.insert("robot_position", [
+            {"timestamp": start + timedelta(seconds=i), "tenant_id": "tenant_001", "robot_id": "robot_001",
+             "x": float(i % 50), "y": float(i % 13), "floor_id": "F1" if i < 5000 else "F2"}
+            for i in range(10000)
+        ])
+        await timeseries.insert("robot_status", [
+            {"timestamp": start + timedelta(seconds=i), "tenant_id": "tenant_001", "robot_id": "robot_001",
+             "battery_level": 100 - i // 100, "status": "charging" if i >= 7000 else "working"}
+            for i in range(10000)
+        ])
+        service = RobotService(data_query=DataQueryService(timeseries_service=timeseries))
+        end = start + timedelta(hours=3)
+
+        positions = await service.get_position_history("robot_001", "tenant_001", start, end, max_points=100)
+        statuses = await service.get_status_history("robot_001", "tenant_001", start, end, max_points=100)
+        raw = await service.get_status_history("robot_001", "tenant_001", start, end, max_points=None)
+
+        assert len(positions) <= 100
+        assert {p.floor_id for p in positions} == {"F1", "F2"}
+        assert [p.timestamp for p in positions] == sorted(p.timestamp for p in positions)
+        assert len(statuses) <= 100
+        assert any(s.status == "charging" for s in statuses)
+        assert len(raw) == 10000
+
 
 class TestRobotRouter:
     """机器人路由测试"""
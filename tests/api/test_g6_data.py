@@ -3,16 +3,23 @@ G6: 数据查询API 测试
 ======================
 """
 
+import csv
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+
 import pytest
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta, timezone
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 
 from src.api.data import (
     router, DataService,
     ComparisonRequest, ExportRequest, DateRange,
-    Granularity, ComparisonType, ReportType, ExportFormat
+    Granularity, ComparisonType, ReportType, ExportFormat, ExportStatus,
+    LocalExportStorage
 )
+from src.data.storage.timeseries import InMemoryTimeSeriesService
 
 
 @pytest.fixture
@@ -159,7 +166,7 @@ class TestDataService:
                 start=date.today() - timedelta(days=7),
                 end=date.today()
             ),
-            include_sections=["kpi", "efficiency"]
+            include_sections=["status", "tasks"]
         )
 
         result = await service.create_export(request)
@@ -179,7 +186,7 @@ class TestDataService:
                 start=date.today() - timedelta(days=7),
                 end=date.today()
             ),
-            include_sections=["kpi"]
+            include_sections=["status"]
         )
         create_result = await service.create_export(request)
 
@@ -336,7 +343,7 @@ class TestDataRouter:
                 "report_type": "daily_summary",
                 "format": "xlsx",
                 "date_range": {"start": start, "end": end},
-                "include_sections": ["kpi", "efficiency"]
+                "include_sections": ["status", "tasks"]
             }
         )
 
@@ -357,7 +364,7 @@ class TestDataRouter:
                 "report_type": "daily_summary",
                 "format": "xlsx",
                 "date_range": {"start": start, "end": end},
-                "include_sections": ["kpi"]
+                "include_sections": ["status"]
             }
         )
         export_id = create_response.json()["export_id"]
@@ -373,6 +380,20 @@ class TestDataRouter:
         response = client.get("/api/v1/data/export/nonexistent")
         assert response.status_code == 404
 
+    def test_create_export_unknown_section(self, client):
+        """测试未知数据段返回 400"""
+        response = client.post(
+            "/api/v1/data/export",
+            json={
+                "tenant_id": "tenant_001",
+                "report_type": "daily_summary",
+                "format": "csv",
+                "date_range": {"start": date.today().isoformat(), "end": date.today().isoformat()},
+                "include_sections": ["kpi"]
+            }
+        )
+        assert response.status_code == 400
+
     def test_get_realtime_dashboard(self, client):
         """测试实时仪表板接口"""
         response = client.get("/api/v1/data/dashboard/realtime")
@@ -382,3 +403,134 @@ class TestDataRouter:
         assert "robots" in data
         assert "current_tasks" in data
         assert "efficiency_now" in data
+
+
+class TestStreamingExport:
+    """流式导出测试"""
+
+    @staticmethod
+    async def _service(tmp_path, rows=25):
+        timeseries = InMemoryTimeSeriesService()
+        start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+        await timeseries.insert("robot_status", [
+            {
+                "timestamp": start + timedelta(minutes=7 * i),
+                "tenant_id": "tenant_001" if i % 5 else "tenant_002",
+                "robot_id": f"robot_{i % 3}",
+                "battery_level": 100 - i,
+                "meta": {"floor": 1},
+            }
+            for i in range(rows)
+        ])
+        await timeseries.insert("task_execution", [
+            {"timestamp": start + timedelta(hours=i), "tenant_id": "tenant_001", "task_id": f"task_{i}"}
+            for i in range(3)
+        ])
+        service = DataService(timeseries=timeseries, export_storage=LocalExportStorage(str(tmp_path)))
+        service.exporter.batch_size = 4
+        return service
+
+    @staticmethod
+    def _request(fmt, sections, **kwargs):
+        return ExportRequest(
+            tenant_id="tenant_001",
+            report_type=ReportType.CUSTOM,
+            format=fmt,
+            date_range=DateRange(start=date(2024, 3, 1), end=date(2024, 3, 1)),
+            include_sections=sections,
+            **kwargs
+        )
+
+    @pytest.mark.asyncio
+    async def test_csv_export(self, tmp_path):
+        """测试 CSV 导出: 租户隔离、时间升序、进度与下载路径"""
+        service = await self._service(tmp_path)
+        created = await service.create_export(self._request(ExportFormat.CSV, ["status"]))
+        await service.exporter.wait(created.export_id)
+
+        status = await service.get_export_status(created.export_id)
+        assert status.status == ExportStatus.COMPLETED
+        assert status.rows_exported == 20
+        assert status.progress == 1.0
+        assert status.download_url.endswith(f"{created.export_id}.csv")
+
+        path = service.get_export_file(f"{created.export_id}.csv")
+        assert path.stat().st_size == status.file_size
+        rows = list(csv.DictReader(io.StringIO(path.read_text(encoding="utf-8"))))
+        assert len(rows) == 20
+        assert {row["tenant_id"] for row in rows} == {"tenant_001"}
+        assert rows[0]["meta"] == '{"floor": 1}'
+        assert [row["time"] for row in rows] == sorted(row["time"] for row in rows)
+        assert not list(tmp_path.glob("*.part"))
+
+    @pytest.mark.asyncio
+    async def test_xlsx_export_sheet_per_section(self, tmp_path):
+        """测试 XLSX 导出: 每段一个工作表，数值与字符串单元格"""
+        service = await self._service(tmp_path)
+        created = await service.create_export(
+            self._request(ExportFormat.XLSX, ["status", "tasks"], filters={"robot_id": "robot_1"})
+        )
+        await service.exporter.wait(created.export_id)
+
+        status = await service.get_export_status(created.export_id)
+        assert status.status == ExportStatus.COMPLETED
+        ns = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        with zipfile.ZipFile(service.get_export_file(f"{created.export_id}.xlsx")) as book:
+            workbook = ET.fromstring(book.read("xl/workbook.xml"))
+            names = [sheet.get("name") for sheet in workbook.iter(f"{{{ns['m']}}}sheet")]
+            assert names == ["robot_status", "task_execution"]
+            sheet = ET.fromstring(book.read("xl/worksheets/sheet1.xml"))
+            rows = sheet.findall(".//m:row", ns)
+            # robot_1 且 tenant_001: i = 1, 4, 7, 13, 16, 19, 22
+            assert len(rows) == 1 + 7
+            assert rows[1].findall("m:c", ns)[2].find("m:v", ns).text == "99"
+            # task_execution 没有 robot_id 列，过滤后为空表
+            assert ET.fromstring(book.read("xl/worksheets/sheet2.xml")).findall(".//m:row", ns) == []
+
+    @pytest.mark.asyncio
+    async def test_export_failures(self, tmp_path):
+        """测试未知数据段 / 非法过滤条件 / 不支持的格式 / 未配置时序服务"""
+        service = await self._service(tmp_path)
+        for sections in (["kpi"], ["status", "kpi"], []):
+            with pytest.raises(ValueError):
+                await service.create_export(self._request(ExportFormat.CSV, sections))
+
+        unconfigured = DataService(export_storage=LocalExportStorage(str(tmp_path)))
+        for svc, request in (
+            (service, self._request(ExportFormat.CSV, ["status"], filters={"1=1; DROP TABLE x; --": 1})),
+            (service, self._request(ExportFormat.PDF, ["status"])),
+            (unconfigured, self._request(ExportFormat.CSV, ["status"])),
+        ):
+            created = await svc.create_export(request)
+            await svc.exporter.wait(created.export_id)
+            status = await svc.get_export_status(created.export_id)
+            assert status.status == ExportStatus.FAILED
+            assert status.error and status.download_url is None
+        assert not list(tmp_path.iterdir())
+
+    @pytest.mark.asyncio
+    async def test_multi_section_csv_archive(self, tmp_path):
+        """测试多段 CSV 打包为 zip"""
+        service = await self._service(tmp_path)
+        created = await service.create_export(self._request(ExportFormat.CSV, ["status", "tasks"]))
+        await service.exporter.wait(created.export_id)
+
+        with zipfile.ZipFile(service.get_export_file(f"{created.export_id}.zip")) as archive:
+            assert archive.namelist() == ["robot_status.csv", "task_execution.csv"]
+            tasks = archive.read("task_execution.csv").decode().splitlines()
+            assert len(tasks) == 1 + 3
+
+    def test_download_route(self, app, client, tmp_path):
+        """测试下载接口只提供已完成文件"""
+        (tmp_path / "export_x.csv").write_text("a,b\n1,2\n")
+        (tmp_path / "export_y.csv.part").write_text("partial")
+        from src.api.data.router import get_data_service
+        app.dependency_overrides[get_data_service] = lambda: DataService(
+            export_storage=LocalExportStorage(str(tmp_path))
+        )
+
+        response = client.get("/api/v1/data/export/files/export_x.csv")
+        assert response.status_code == 200
+        assert response.text == "a,b\n1,2\n"
+        assert client.get("/api/v1/data/export/files/export_y.csv.part").status_code == 404
+        assert client.get("/api/v1/data/export/files/..%2Fsecret").status_code == 404
@@ -5,6 +5,8 @@ D2: 数据存储服务 - 单元测试
 
 import pytest
 import asyncio
+import json
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
 
 from src.data.storage.base import (
@@ -21,9 +23,13 @@ from src.data.storage.repositories import (
     InMemoryRobotRepository,
     InMemoryTaskRepository,
     InMemoryScheduleRepository,
+    RobotRepository,
 )
-from src.data.storage.timeseries import InMemoryTimeSeriesService
-from src.data.storage.events import InMemoryEventLogService
+from src.data.storage.retention import RetentionManager
+from src.data.storage.timeseries import InMemoryTimeSeriesService, PostgresTimeSeriesService
+from src.data.storage.event_writer import EventWriter
+from src.data.storage.events import InMemoryEventLogService, PostgresEventLogService
+from src.shared.pagination import InvalidCursorError, encode_cursor
 
 
 # ============================================================
@@ -71,6 +77,21 @@ class TestRobotRepository:
         count = await repo.count()
         assert count == 5
 
+    @pytest.mark.asyncio
+    async def test_save_many_duplicate_ids(self, repo):
+        """测试批量保存中重复 ID 以最后一个为准"""
+        robots = [
+            Robot(robot_id="robot_1", tenant_id="tenant_001", name="first"),
+            Robot(robot_id="robot_2", tenant_id="tenant_001", name="other"),
+            Robot(robot_id="robot_1", tenant_id="tenant_001", name="last"),
+        ]
+        saved = await repo.save_many(robots, chunk_size=2)
+        assert [r.name for r in saved] == ["last", "other", "last"]
+        assert await repo.count() == 2
+
+        with pytest.raises(ValueError):
+            await repo.save_many(robots, chunk_size=0)
+
     @pytest.mark.asyncio
     async def test_query_with_filters(self, repo):
         """测试条件查询"""
@@ -114,6 +135,24 @@ class TestRobotRepository:
         assert len(page3.items) == 5
         assert not page3.has_next
 
+    @pytest.mark.asyncio
+    async def test_query_with_cursor(self, repo):
+        """测试游标续页与页码分页结果一致"""
+        for i in range(25):
+            await repo.save(Robot(robot_id=f"robot_{i:02d}", tenant_id="t1", brand="gaoxian"))
+
+        seen = []
+        result = await repo.query(size=10)
+        while True:
+            seen.extend(r.robot_id for r in result.items)
+            if not result.has_next:
+                break
+            result = await repo.query(size=10, cursor=result.next_cursor)
+            assert result.keyset
+
+        assert seen == [f"robot_{i:02d}" for i in range(25)]
+        assert result.next_cursor is None
+
     @pytest.mark.asyncio
     async def test_query_with_sort(self, repo):
         """测试排序"""
@@ -405,6 +444,112 @@ class TestTimeSeriesService:
         )
         assert len(remaining) == 7
 
+    @pytest.mark.asyncio
+    async def test_drop_chunks(self, service):
+        """测试整段丢弃过期数据"""
+        now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        await service.insert("robot_status", [
+            {"timestamp": now - timedelta(hours=i), "robot_id": "robot_001", "battery_level": 80}
+            for i in range(48)
+        ])
+
+        # 段宽 1 小时: 恰好 24 小时前的段已结束
+        dropped = await service.drop_chunks("robot_status", now - timedelta(hours=23))
+        assert dropped == 24
+        assert await service.drop_chunks("missing", now) == 0
+
+    @pytest.mark.asyncio
+    async def test_stream_range(self, service):
+        """测试按时间升序分批读取"""
+        now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        # 从新到旧写入，跨多个段
+        await service.insert("robot_status", [
+            {"timestamp": now - timedelta(minutes=i * 17), "robot_id": f"robot_{i % 2}", "battery_level": i}
+            for i in range(20)
+        ])
+
+        batches = [
+            batch async for batch in service.stream_range(
+                "robot_status", now - timedelta(hours=3), now, {"robot_id": "robot_0"}, batch_size=4
+            )
+        ]
+
+        rows = [row for batch in batches for row in batch]
+        assert [len(batch) for batch in batches] == [4, 2]
+        assert [row["battery_level"] for row in rows] == [10, 8, 6, 4, 2, 0]
+        assert [batch async for batch in service.stream_range("missing", now, now)] == []
+
+
+class TestRetentionManager:
+    """保留策略测试"""
+
+    @pytest.mark.asyncio
+    async def test_enforce_by_tier(self):
+        """测试按最长档位丢弃分段，短档位租户单独删除"""
+        now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        service = InMemoryTimeSeriesService(segment_seconds=86400)
+        for days in (5, 20, 60, 120):
+            await service.insert("robot_position", [
+                {"timestamp": now - timedelta(days=days), "tenant_id": tenant, "x": 1.0}
+                for tenant in ("t_basic", "t_pro")
+            ])
+        manager = RetentionManager(
+            service,
+            tenant_tiers={"t_basic": "basic", "t_pro": "professional"},
+            clock=lambda: now
+        )
+
+        report = await manager.enforce()
+
+        # 表级保留 30 天 (professional)，basic 7 天
+        assert report["robot_position"] == {"dropped": 4, "trimmed": 1}
+        remaining = await service.query_range(
+            "robot_position", now - timedelta(days=365), now
+        )
+        assert sorted((r["tenant_id"], (now - r["time"]).days) for r in remaining) == [
+            ("t_basic", 5), ("t_pro", 5), ("t_pro", 20)
+        ]
+        assert "event_logs" in report
+
+    @pytest.mark.asyncio
+    async def test_untiered_tenants_use_default_tier(self):
+        """测试未登记租户按默认档位删除，不沿用最长档位"""
+        now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+        service = InMemoryTimeSeriesService(segment_seconds=86400)
+        for days in (5, 20, 60, 120):
+            await service.insert("robot_position", [
+                {"timestamp": now - timedelta(days=days), "tenant_id": tenant, "x": 1.0}
+                for tenant in ("t_basic", "t_ent", "t_other")
+            ])
+        manager = RetentionManager(
+            service,
+            tenant_tiers={"t_basic": "basic", "t_ent": "enterprise"},
+            clock=lambda: now
+        )
+        assert manager.tier_for("t_other") == "professional"
+
+        report = await manager.enforce()
+
+        # 表级保留 90 天 (enterprise)；basic 7 天，未登记按 professional 30 天
+        assert report["robot_position"] == {"dropped": 3, "trimmed": 3}
+        remaining = await service.query_range(
+            "robot_position", now - timedelta(days=365), now
+        )
+        assert sorted((r["tenant_id"], (now - r["time"]).days) for r in remaining) == [
+            ("t_basic", 5), ("t_ent", 5), ("t_ent", 20), ("t_ent", 60), ("t_other", 5), ("t_other", 20)
+        ]
+
+    def test_unknown_tier_rejected(self):
+        """测试未知档位"""
+        with pytest.raises(ValueError):
+            RetentionManager(InMemoryTimeSeriesService(), tenant_tiers={"t1": "gold"})
+
+    @pytest.mark.asyncio
+    async def test_in_memory_compression_unsupported(self):
+        """测试内存后端不支持压缩"""
+        manager = RetentionManager(InMemoryTimeSeriesService())
+        assert not any((await manager.ensure_policies()).values())
+
 
 # ============================================================
 # Event Log Tests
@@ -523,6 +668,361 @@ class TestEventLogService:
         page3 = await service.query_events(tenant_id="tenant_001", page=3, size=10)
         assert len(page3.items) == 5
 
+    @pytest.mark.asyncio
+    async def test_cursor_pagination(self, service):
+        """测试游标续页 (时间相同时按事件ID稳定排序)"""
+        for i in range(25):
+            await service.log_event(f"event_{i}", "tenant_001", "source", {})
+        for event in service.get_all()[:10]:
+            event.timestamp = service.get_all()[0].timestamp
+
+        by_offset = []
+        for page in (1, 2, 3):
+            result = await service.query_events(tenant_id="tenant_001", page=page, size=10)
+            by_offset.extend(e.event_id for e in result.items)
+
+        by_cursor = []
+        cursor = None
+        while True:
+            result = await service.query_events(tenant_id="tenant_001", size=10, cursor=cursor)
+            by_cursor.extend(e.event_id for e in result.items)
+            cursor = result.next_cursor
+            if cursor is None:
+                break
+
+        assert by_cursor == by_offset
+        assert len(set(by_cursor)) == 25
+
+    @pytest.mark.asyncio
+    async def test_cursor_from_other_query_rejected(self, service):
+        """测试排序方式不同的令牌被拒绝"""
+        with pytest.raises(InvalidCursorError):
+            await service.query_events(tenant_id="tenant_001", cursor=encode_cursor([1], "id:asc"))
+
+
+class _RecordingConnection:
+    """记录 SQL 的 asyncpg 连接替身"""
+
+    def __init__(self, rows=None, plan_rows=0, count=0):
+        self.queries = []
+        self.rows = rows or []
+        self.plan_rows = plan_rows
+        self.count = count
+
+    async def fetchval(self, query, *params):
+        self.queries.append((query, params))
+        if query.startswith("EXPLAIN"):
+            return [{"Plan": {"Plan Rows": self.plan_rows}}]
+        return self.count
+
+    async def fetch(self, query, *params):
+        self.queries.append((query, params))
+        return self.rows
+
+
+class _RecordingDatabase:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self.conn
+
+
+class _TimescaleConnection(_RecordingConnection):
+    """记录 drop_chunks / 压缩 SQL 的连接替身"""
+
+    def __init__(self, count=0):
+        super().__init__(count=count)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, query, *params):
+        self.queries.append((query, params))
+        return "DELETE 2"
+
+
+class TestPostgresRetentionSql:
+    """PostgresTimeSeriesService 保留与压缩 SQL 测试"""
+
+    @pytest.mark.asyncio
+    async def test_delete_range_drops_covered_chunks(self):
+        """测试无过滤条件的范围删除先整块丢弃 chunk"""
+        conn = _TimescaleConnection(count=1000)
+        service = PostgresTimeSeriesService(_RecordingDatabase(conn), hypertables=True)
+        start, end = datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+        deleted = await service.delete_range("robot_status", start, end)
+
+        assert deleted == 1002
+        queries = [q for q, _ in conn.queries]
+        assert "show_chunks($1::regclass, older_than => $2, newer_than => $3)" in queries[0]
+        assert queries[1].startswith("SELECT drop_chunks($1::regclass")
+        assert queries[2].startswith("DELETE FROM robot_status")
+
+        conn.queries.clear()
+        await service.delete_range("robot_status", start, end, {"tenant_id": "t1"})
+        assert len(conn.queries) == 1
+
+        conn.queries.clear()
+        await service.delete_range("robot_status", start, end, exclude={"tenant_id": ["t1", "t2"]})
+        (query, params), = conn.queries
+        assert query.endswith("AND NOT (tenant_id = ANY($3))") and params[2] == ["t1", "t2"]
+
+    @pytest.mark.asyncio
+    async def test_plain_tables_by_default(self):
+        """测试默认按普通表处理: drop_chunks 退化为 DELETE"""
+        conn = _TimescaleConnection()
+        service = PostgresTimeSeriesService(_RecordingDatabase(conn))
+
+        assert await service.drop_chunks("robot_status", datetime(2024, 1, 1, tzinfo=timezone.utc)) == 2
+        (query, _), = conn.queries
+        assert query.startswith("DELETE FROM robot_status")
+
+    @pytest.mark.asyncio
+    async def test_enable_compression(self):
+        """测试压缩设置与策略"""
+        conn = _TimescaleConnection()
+        service = PostgresTimeSeriesService(_RecordingDatabase(conn), hypertables=True)
+
+        assert await service.enable_compression(
+            "robot_status", timedelta(days=7), ["tenant_id", "robot_id"]
+        )
+        alter, policy = conn.queries
+        assert "timescaledb.compress_segmentby = 'tenant_id, robot_id'" in alter[0]
+        assert "add_compression_policy" in policy[0] and policy[1] == ("robot_status", timedelta(days=7))
+
+        plain = PostgresTimeSeriesService(_RecordingDatabase(conn))
+        assert not await plain.enable_compression("robot_status", timedelta(days=7))
+
+
+class _CursorConnection(_TimescaleConnection):
+    """服务端游标替身: 记录事务参数与预取大小"""
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+        self.transactions = []
+
+    @asynccontextmanager
+    async def transaction(self, **kwargs):
+        self.transactions.append(kwargs)
+        yield
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+    def cursor(self, query, *params, prefetch=None):
+        self.queries.append((query, params, prefetch))
+        return self._iterate()
+
+
+class TestPostgresStreamRange:
+    """PostgresTimeSeriesService.stream_range 测试"""
+
+    @pytest.mark.asyncio
+    async def test_server_side_cursor(self):
+        """测试只读事务内的游标读取与分批"""
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        conn = _CursorConnection([{"time": start + timedelta(seconds=i), "v": i} for i in range(5)])
+        service = PostgresTimeSeriesService(_RecordingDatabase(conn))
+
+        batches = [
+            batch async for batch in service.stream_range(
+                "robot_status", start, start + timedelta(days=1), {"tenant_id": "t1"}, batch_size=2
+            )
+        ]
+
+        assert [[row["v"] for row in batch] for batch in batches] == [[0, 1], [2, 3], [4]]
+        assert conn.transactions == [{"readonly": True}]
+        query, params, prefetch = conn.queries[0]
+        assert query.endswith("AND tenant_id = $3 ORDER BY time ASC")
+        assert params[2] == "t1" and prefetch == 2
+
+
+class _UpsertConnection(_RecordingConnection):
+    """把批量 UPSERT 的 JSON 参数原样作为 RETURNING 行返回"""
+
+    async def fetch(self, query, *params):
+        self.queries.append((query, params))
+        return json.loads(params[0])
+
+
+class TestPostgresBulkUpsert:
+    """PostgresRepository.save_many SQL 测试"""
+
+    @pytest.mark.asyncio
+    async def test_chunked_single_statement(self):
+        """测试每个分块一条 UPSERT，语句按列集合缓存"""
+        conn = _UpsertConnection()
+        repo = RobotRepository(_RecordingDatabase(conn))
+        repo.bulk_chunk_size = 2
+        robots = [
+            Robot(robot_id=f"robot_{i}", tenant_id="tenant_001", name=f"Robot {i}")
+            for i in range(5)
+        ]
+
+        saved = await repo.save_many(robots)
+
+        assert [r.robot_id for r in saved] == [r.robot_id for r in robots]
+        assert len(conn.queries) == 3
+        query, params = conn.queries[0]
+        assert "jsonb_populate_recordset(NULL::robots, $1::jsonb)" in query
+        assert "ON CONFLICT (robot_id) DO UPDATE" in query
+        assert len(params) == 1 and len(json.loads(params[0])) == 2
+        assert len({q for q, _ in conn.queries}) == 1
+        assert len(repo._statements) == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicate_ids_in_chunk(self):
+        """测试分块内重复 ID 去重，返回顺序与输入一致"""
+        conn = _UpsertConnection()
+        repo = RobotRepository(_RecordingDatabase(conn))
+        robots = [
+            Robot(robot_id="robot_1", tenant_id="tenant_001", name="first"),
+            Robot(robot_id="robot_2", tenant_id="tenant_001", name="other"),
+            Robot(robot_id="robot_1", tenant_id="tenant_001", name="last"),
+        ]
+
+        saved = await repo.save_many(robots)
+
+        rows = json.loads(conn.queries[0][1][0])
+        assert [row["name"] for row in rows] == ["last", "other"]
+        assert [r.name for r in saved] == ["last", "other", "last"]
+
+
+class TestPostgresEventLogPagination:
+    """PostgresEventLogService 分页 SQL 测试"""
+
+    @staticmethod
+    def _row(i):
+        return {
+            "event_id": f"evt_{i:03d}",
+            "time": datetime(2024, 1, 1, tzinfo=timezone.utc) - timedelta(seconds=i),
+            "tenant_id": "t1",
+            "event_type": "e",
+            "level": "info",
+            "source": "s",
+            "data": "{}",
+            "tags": [],
+        }
+
+    @pytest.mark.asyncio
+    async def test_keyset_query(self):
+        """测试游标页使用行比较而非 OFFSET"""
+        conn = _RecordingConnection(rows=[self._row(i) for i in range(11)], count=1000)
+        service = PostgresEventLogService(_RecordingDatabase(conn))
+
+        first = await service.query_events(tenant_id="t1", size=10)
+        assert len(first.items) == 10 and first.next_cursor
+
+        conn.queries.clear()
+        await service.query_events(tenant_id="t1", size=10, cursor=first.next_cursor)
+        data_query, params = conn.queries[-1]
+        assert "(time, event_id) < ($2, $3)" in data_query
+        assert "OFFSET 0" in data_query
+        assert params == ("t1", first.items[-1].timestamp, "evt_009")
+
+    @pytest.mark.asyncio
+    async def test_count_modes(self):
+        """测试缓存计数与规划器估算"""
+        conn = _RecordingConnection(count=42, plan_rows=5_000_000)
+        service = PostgresEventLogService(_RecordingDatabase(conn))
+
+        await service.query_events(tenant_id="t1", count_mode="cached")
+        result = await service.query_events(tenant_id="t1", count_mode="cached")
+        counts = [q for q, _ in conn.queries if q.startswith("SELECT COUNT")]
+        assert len(counts) == 1 and result.total == 42
+
+        result = await service.query_events(tenant_id="t1", count_mode="estimate")
+        assert result.total == 5_000_000 and result.total_estimated
+
+
+class _CopyConnection:
+    """记录 COPY 批次的连接替身，available=False 时模拟数据库不可用"""
+
+    def __init__(self):
+        self.available = True
+        self.batches = []
+        self.executed = []
+
+    async def copy_records_to_table(self, table, records, columns):
+        if not self.available:
+            raise ConnectionError("database unavailable")
+        self.batches.append(list(records))
+
+    async def execute(self, query, *params):
+        self.executed.append(params)
+
+
+class TestEventWriter:
+    """事件日志写后缓冲测试"""
+
+    @pytest.mark.asyncio
+    async def test_log_event_batches_copy(self):
+        """测试 log_event 立即返回，按批 COPY"""
+        conn = _CopyConnection()
+        writer = EventWriter(_RecordingDatabase(conn), batch_size=3, flush_interval=60)
+        service = PostgresEventLogService(_RecordingDatabase(conn), writer=writer)
+
+        ids = [
+            await service.log_event("robot.status", "t1", "collector", {"i": i})
+            for i in range(7)
+        ]
+        await service.close()
+
+        assert conn.executed == []
+        assert [len(b) for b in conn.batches] == [3, 3, 1]
+        assert [r[1] for b in conn.batches for r in b] == ids
+        assert writer.get_stats()["written"] == 7
+
+    @pytest.mark.asyncio
+    async def test_spill_and_replay(self, tmp_path):
+        """测试数据库不可用时溢写，恢复后重放"""
+        conn = _CopyConnection()
+        spill = tmp_path / "events.spill"
+        writer = EventWriter(
+            _RecordingDatabase(conn), batch_size=10, flush_interval=60, spill_path=str(spill)
+        )
+        service = PostgresEventLogService(_RecordingDatabase(conn), writer=writer)
+
+        conn.available = False
+        first = await service.log_event("alarm", "t1", "escalation", {"a": 1}, tags=["x"])
+        await service.flush()
+        assert spill.exists() and writer.get_stats()["spilled"] == 1
+
+        conn.available = True
+        second = await service.log_event("alarm", "t1", "escalation", {"a": 2})
+        await service.close()
+
+        rows = [r for b in conn.batches for r in b]
+        assert [r[1] for r in rows] == [second, first]
+        assert rows[1][0].tzinfo is not None and rows[1][7] == ["x"]
+        assert not spill.exists()
+        assert writer.get_stats()["replayed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_without_spill(self):
+        """测试无溢写文件时队列有界，丢弃最旧事件"""
+        conn = _CopyConnection()
+        conn.available = False
+        writer = EventWriter(
+            _RecordingDatabase(conn), batch_size=2, flush_interval=60, max_queue=4
+        )
+
+        for i in range(6):
+            await writer.put((datetime.now(timezone.utc), f"evt_{i}", "t1", "e", "info", "s", "{}", []))
+        await writer.flush()
+        stats = writer.get_stats()
+        assert stats["queued"] == 4 and stats["dropped"] == 2
+
+        conn.available = True
+        await writer.close()
+        assert [r[1] for b in conn.batches for r in b] == ["evt_2", "evt_3", "evt_4", "evt_5"]
+
 
 # ============================================================
 # Integration Tests
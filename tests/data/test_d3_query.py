@@ -8,6 +8,7 @@ from datetime import datetime, date, timedelta, timezone
 from unittest.mock import AsyncMock, MagicMock
 
 from src.data.query import (
+    CoverageEngine,
     DataQueryService,
     InMemoryCacheService,
     PagedResult,
@@ -226,6 +227,17 @@ class TestDataQueryService:
         assert result.total == 3
         assert len(result.items) == 3
 
+    @pytest.mark.asyncio
+    async def test_get_task_history_cursor(self, service):
+        """测试任务历史游标续页"""
+        first = await service.get_task_history("tenant_001", size=2)
+        assert len(first.items) == 2 and first.next_cursor
+
+        rest = await service.get_task_history("tenant_001", size=2, cursor=first.next_cursor)
+        assert len(rest.items) == 1 and rest.next_cursor is None
+        ids = [r.task_id for r in first.items + rest.items]
+        assert len(set(ids)) == 3
+
     @pytest.mark.asyncio
     async def test_get_task_history_with_filter(self, service):
         """测试带过滤的任务历史"""
@@ -300,6 +312,94 @@ class TestDataQueryService:
             assert 0 <= item.coverage_rate <= 100
 
 
+class TestCoverageEngine:
+    """覆盖率栅格引擎测试"""
+
+    DAY = date(2024, 1, 15)
+    START = datetime(2024, 1, 15, 8, 0, tzinfo=timezone.utc).timestamp()
+    ZONES = [
+        {"id": "zone_a", "name": "大堂",
+         "boundary": {"type": "polygon", "coordinates": [[0, 0], [10, 0], [10, 10], [0, 10]]}},
+        {"id": "zone_b", "name": "走廊",
+         "boundary": {"type": "polygon", "coordinates": [[10, 0], [20, 0], [20, 4], [10, 4]]}},
+    ]
+
+    @pytest.fixture
+    def engine(self):
+        engine = CoverageEngine(footprint_width=1.0)
+        engine.register_floor("tenant_001", "floor_001", self.ZONES, resolution=0.1)
+        return engine
+
+    def _sweep(self, robot_id="robot_001", start=None):
+        """以 1 米行距往返清扫 zone_a，每 0.5 米一个点"""
+        t = self.START if start is None else start
+        points = []
+        for lane in range(10):
+            y = lane + 0.5
+            xs = [i * 0.5 for i in range(21)]
+            for x in xs if lane % 2 == 0 else reversed(xs):
+                points.append({"tenant_id": "tenant_001", "robot_id": robot_id,
+                               "floor_id": "floor_001", "x": x, "y": y, "timestamp": t})
+                t += 1
+        return points
+
+    def test_full_sweep(self, engine):
+        """测试完整清扫一个区域"""
+        assert engine.ingest_positions(self._sweep()) == 210
+
+        zone_a, zone_b = engine.zone_coverage("tenant_001", "floor_001", self.DAY)
+        assert zone_a.area_sqm == 100
+        assert zone_a.coverage_rate == 100
+        assert zone_a.clean_count == 1
+        assert zone_b.area_sqm == 40
+        assert 0 < zone_b.coverage_rate < 10  # 只有行端扫到走廊边缘
+
+        # 同一批内的两遍也分别计数
+        engine.ingest_positions(self._sweep(start=self.START + 3600) + self._sweep(start=self.START + 7200))
+        zone_a, _ = engine.zone_coverage("tenant_001", "floor_001", self.DAY)
+        assert zone_a.clean_count == 3
+        assert engine.zone_coverage("tenant_001", "floor_001", self.DAY + timedelta(days=1))[0].coverage_rate == 0
+
+    def test_incremental_matches_batch(self, engine):
+        """测试逐点写入与整批写入结果一致 (衔接处不重复计数)"""
+        incremental = CoverageEngine(footprint_width=1.0)
+        incremental.register_floor("tenant_001", "floor_001", self.ZONES, resolution=0.1)
+        engine.ingest_positions(self._sweep())
+        for point in self._sweep():
+            incremental.ingest_positions([point])
+
+        batch_floor = engine._floors[("tenant_001", "floor_001")]
+        incremental_floor = incremental._floors[("tenant_001", "floor_001")]
+        assert (batch_floor.days[self.DAY] == incremental_floor.days[self.DAY]).all()
+
+    def test_gaps_are_not_connected(self, engine):
+        """测试间隔过长 / 跳变的位置不连线"""
+        engine.ingest_positions([
+            {"tenant_id": "tenant_001", "robot_id": "r1", "floor_id": "floor_001",
+             "x": 1, "y": 5, "timestamp": self.START},
+            {"tenant_id": "tenant_001", "robot_id": "r1", "floor_id": "floor_001",
+             "x": 9, "y": 5, "timestamp": self.START + 1},
+            {"tenant_id": "tenant_001", "robot_id": "r1", "floor_id": "floor_002",
+             "x": 5, "y": 5, "timestamp": self.START + 2},
+        ])
+        zone_a, _ = engine.zone_coverage("tenant_001", "floor_001", self.DAY)
+        # 两个直径 1 米的圆
+        assert zone_a.cleaned_area == pytest.approx(2 * 3.14159 * 0.25, rel=0.1)
+
+    @pytest.mark.asyncio
+    async def test_query_service_uses_engine(self, engine):
+        """测试查询服务对已注册楼层返回实时覆盖率"""
+        engine.ingest_positions(self._sweep())
+        service = DataQueryService(coverage=engine)
+
+        result = await service.get_zone_coverage("tenant_001", "floor_001", self.DAY)
+        assert [z.zone_id for z in result] == ["zone_a", "zone_b"]
+        assert result[0].coverage_rate == 100
+
+        # 未注册楼层沿用模拟数据
+        assert await service.get_zone_coverage("tenant_001", "floor_999", self.DAY)
+
+
 class TestPagedResult:
     """分页结果测试"""
 
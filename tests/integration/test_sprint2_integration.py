@@ -336,6 +336,29 @@ class TestG8KnowledgeAPI:
         got = await api.get_template("pt-test-001")
         assert got["name"] == "Test Template"
 
+    @pytest.mark.asyncio
+    async def test_assemble_prompt_stable_prefix(self, api):
+        await api.create_template({
+            "template_id": "pt-test-002",
+            "agent_type": "cleaning_scheduler",
+            "name": "Stable Template",
+            "system_prompt": "You clean {{building_name}} at {{current_time}}.",
+            "variables": ["building_name", "current_time"],
+            "static_variables": ["building_name"],
+        })
+        request = {
+            "template_id": "pt-test-002",
+            "variables": {"building_name": "HQ", "current_time": "08:00"},
+            "scenario_category": "cleaning",
+        }
+        default = await api.assemble_prompt(request)
+        assert set(default) == {"prompt", "estimated_tokens"}
+
+        result = await api.assemble_prompt({**request, "stable_prefix": True})
+        assert result["static_prefix"] == "You clean HQ at [current_time]."
+        assert "- current_time: 08:00" in result["volatile_suffix"]
+        assert result["messages"][0]["cache_control"] is True
+
 
 # ============================================================
 # Test 5: G9 Rule Management API
@@ -0,0 +1,65 @@
+"""
+Claude客户端测试
+"""
+from src.shared.llm import (
+    ClaudeLLMClient,
+    LLMConfig,
+    Message,
+)
+
+
+def _client() -> ClaudeLLMClient:
+    return ClaudeLLMClient(LLMConfig(api_key="test-api-key"))
+
+
+def test_single_system_message_is_string():
+    """单条普通system消息保持字符串格式"""
+    system = _client()._extract_system([
+        Message(role="system", content="你是调度Agent"),
+        Message(role="user", content="你好"),
+    ])
+    assert system == "你是调度Agent"
+
+
+def test_only_first_system_message_is_used():
+    """只取第一条system消息"""
+    system = _client()._extract_system([
+        Message(role="system", content="你是调度Agent"),
+        Message(role="system", content="附加说明"),
+    ])
+    assert system == "你是调度Agent"
+
+
+def test_cache_breakpoint_on_stable_prefix():
+    """带cache_control的system消息转换为带ephemeral断点的text block"""
+    client = _client()
+    messages = [
+        Message(role="system", content="静态前缀", cache_control=True),
+        Message(role="user", content="易变后缀"),
+        Message(role="user", content="开始调度"),
+    ]
+
+    system = client._extract_system(messages)
+
+    assert system == [
+        {"type": "text", "text": "静态前缀", "cache_control": {"type": "ephemeral"}},
+    ]
+    assert client._convert_messages(messages) == [
+        {"role": "user", "content": "易变后缀"},
+        {"role": "user", "content": "开始调度"},
+    ]
+
+
+def test_usage_includes_cache_tokens():
+    """响应usage包含缓存写入/命中的token数"""
+    response = _client()._parse_response({
+        "content": [{"type": "text", "text": "ok"}],
+        "usage": {
+            "input_tokens": 120,
+            "output_tokens": 30,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 1800,
+        },
+    })
+    assert response.usage["cache_read_input_tokens"] == 1800
+    assert response.usage["prompt_tokens"] == 120
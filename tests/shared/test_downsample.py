@@ -0,0 +1,107 @@
+"""
+时序降采样测试
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import math
+
+from src.shared.downsample import (
+    MAX_POINTS,
+    bucketize,
+    choose_bucket_seconds,
+    clamp_points,
+    downsample_records,
+    latest_per_bucket,
+    lttb_indices,
+    shape_series,
+)
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class Sample:
+    timestamp: datetime
+    value: float
+    status: str = "idle"
+
+
+def test_choose_bucket_bounds_bucket_count():
+    for hours in (1, 24, 24 * 7, 24 * 90):
+        end = START + timedelta(hours=hours)
+        seconds = choose_bucket_seconds(START, end, points=200)
+        assert hours * 3600 / seconds <= 800
+
+
+def test_clamp_points():
+    assert clamp_points(None) == 200
+    assert clamp_points(1) == 3
+    assert clamp_points(10 ** 6) == MAX_POINTS
+
+
+def test_bucketize_aggregates():
+    records = [Sample(START + timedelta(seconds=i), float(i)) for i in range(120)]
+
+    buckets = bucketize(records, 60, timestamp=lambda r: r.timestamp, value=lambda r: r.value)
+
+    assert [b.count for b in buckets] == [60, 60]
+    assert buckets[0].min == 0 and buckets[0].max == 59
+    assert buckets[0].value == 29.5
+    assert buckets[1].timestamp == START + timedelta(minutes=1)
+
+
+def test_lttb_keeps_endpoints_and_peak():
+    xs = list(range(1000))
+    ys = [math.sin(i / 50) for i in xs]
+    ys[500] = 10.0
+
+    selected = lttb_indices(xs, ys, 50)
+
+    assert len(selected) == 50
+    assert selected[0] == 0 and selected[-1] == 999
+    assert 500 in selected
+    assert selected == sorted(selected)
+
+
+def test_shape_series_fixed_size():
+    records = [Sample(START + timedelta(minutes=i), float(i % 17)) for i in range(5000)]
+    buckets = bucketize(records, 60, timestamp=lambda r: r.timestamp, value=lambda r: r.value)
+
+    assert len(shape_series(buckets, 100)) == 100
+
+
+def test_downsample_keeps_status_changes():
+    records = [
+        Sample(START + timedelta(seconds=i), float(i % 7), "working" if 300 <= i < 310 else "idle")
+        for i in range(1000)
+    ]
+
+    result = downsample_records(
+        records, 50,
+        x=lambda r: r.timestamp.timestamp(), y=lambda r: r.value,
+        keep=lambda prev, cur: prev.status != cur.status
+    )
+
+    assert len(result) <= 50
+    assert records[300] in result and records[310] in result
+
+
+def test_latest_per_bucket():
+    records = [Sample(START + timedelta(seconds=i), float(i)) for i in range(180)]
+
+    result = latest_per_bucket(reversed(records), 60, timestamp=lambda r: r.timestamp)
+
+    assert [r.value for r in result] == [59.0, 119.0, 179.0]
+
+
+def test_lttb_multi_dimensional_y():
+    # 轨迹: 横轴为时间，纵坐标为 (x, y)；y 分量的尖峰同样要保留
+    xs = list(range(1000))
+    ys = [(float(i % 10), 0.0) for i in xs]
+    ys[700] = (5.0, 500.0)
+
+    selected = lttb_indices(xs, ys, 40)
+
+    assert len(selected) == 40
+    assert 700 in selected
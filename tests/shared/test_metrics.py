@@ -0,0 +1,141 @@
+"""
+指标与追踪测试
+"""
+import pytest
+
+from src.shared import metrics
+from src.shared.metrics import (
+    MetricsRegistry,
+    current_trace_id,
+    instrument,
+    recent_spans,
+    span,
+    trace,
+)
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_histogram_render(registry):
+    """直方图按累计桶输出Prometheus文本"""
+    hist = registry.histogram("op_seconds", "Op latency", ["tool"], buckets=(0.1, 1.0))
+    hist.observe(0.05, tool="a")
+    hist.observe(0.5, tool="a")
+    hist.observe(5, tool="a")
+
+    text = registry.render()
+
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{tool="a",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{tool="a",le="1"} 2' in text
+    assert 'op_seconds_bucket{tool="a",le="+Inf"} 3' in text
+    assert 'op_seconds_count{tool="a"} 3' in text
+    assert hist.sum(tool="a") == pytest.approx(5.55)
+
+
+def test_counter_and_label_escaping(registry):
+    """计数器累加，标签值转义"""
+    events = registry.counter("events_total", "Events", ["type"])
+    events.inc(type='a"b')
+    events.inc(2, type='a"b')
+
+    assert events.value(type='a"b') == 3
+    assert 'events_total{type="a\\"b"} 3' in registry.render()
+
+
+def test_gauge_set_and_adjust(registry):
+    """Gauge可设置、增减"""
+    depth = registry.gauge("queue_depth", "Depth", ["queue"])
+    depth.set(5, queue="events")
+    depth.inc(queue="events")
+    depth.dec(3, queue="events")
+
+    assert depth.value(queue="events") == 3
+    assert "# TYPE queue_depth gauge" in registry.render()
+    assert 'queue_depth{queue="events"} 3' in registry.render()
+
+
+def test_non_finite_values(registry):
+    """非有限值按Prometheus格式输出"""
+    level = registry.gauge("level", "Level", ["kind"])
+    level.set(float("inf"), kind="up")
+    level.set(float("-inf"), kind="down")
+    level.set(float("nan"), kind="none")
+
+    text = registry.render()
+    assert 'level{kind="up"} +Inf' in text
+    assert 'level{kind="down"} -Inf' in text
+    assert 'level{kind="none"} NaN' in text
+
+
+def test_registry_rejects_conflicting_labels(registry):
+    """同名指标标签不一致时报错"""
+    registry.counter("dup_total", "Dup", ["a"])
+    with pytest.raises(ValueError):
+        registry.counter("dup_total", "Dup", ["b"])
+
+
+def test_trace_nesting():
+    """嵌套trace沿用外层trace_id，只覆盖租户和Agent"""
+    assert current_trace_id() is None
+    with trace(tenant="t1") as outer:
+        with trace(agent="agent-1") as inner:
+            assert inner.trace_id == outer.trace_id
+            assert inner.tenant == "t1"
+        with trace(new=True) as fresh:
+            assert fresh.trace_id != outer.trace_id
+    assert current_trace_id() is None
+
+
+def test_span_records_context_labels():
+    """span从trace上下文补齐租户/Agent标签，异常记为error"""
+    hist = metrics.histogram("test_span_seconds", "Test", ["tenant", "agent", "tool", "status"])
+
+    with trace(trace_id="trace-1", tenant="t1", agent="a1"):
+        with span(hist, tool="ok"):
+            pass
+        with pytest.raises(RuntimeError):
+            with span(hist, tool="boom"):
+                raise RuntimeError("boom")
+
+    assert hist.count(tenant="t1", agent="a1", tool="ok", status="ok") == 1
+    assert hist.count(tenant="t1", agent="a1", tool="boom", status="error") == 1
+    assert [s["labels"]["tool"] for s in recent_spans("trace-1")] == ["ok", "boom"]
+
+
+@pytest.mark.asyncio
+async def test_instrument_tenant_argument():
+    """装饰器以函数名和租户参数作为标签"""
+    hist = metrics.histogram("test_query_seconds", "Test", ["tenant", "query", "status"])
+
+    @instrument(hist, name_label="query", tenant_arg="tenant_id")
+    async def get_summary(tenant_id, days=7):
+        return days
+
+    assert await get_summary("t1") == 7
+    assert await get_summary(tenant_id="t2", days=1) == 1
+    assert hist.count(tenant="t1", query="get_summary", status="ok") == 1
+    assert hist.count(tenant="t2", query="get_summary", status="ok") == 1
+
+
+def test_disabled_is_noop():
+    """关闭时装饰器返回原函数，span不记录"""
+    hist = metrics.histogram("test_disabled_seconds", "Test", ["status"])
+
+    async def fn():
+        return 1
+
+    metrics.set_enabled(False)
+    try:
+        assert instrument(hist)(fn) is fn
+        with span(hist) as s:
+            s.status = "error"
+            s.label(extra="x")
+    finally:
+        metrics.set_enabled(True)
+
+    assert hist.count(status="ok") == 0
+    assert hist.count(status="error") == 0
@@ -0,0 +1,56 @@
+"""
+游标分页测试
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.shared.pagination import (
+    CountCache,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+)
+
+
+def test_cursor_roundtrip_keeps_datetime():
+    ts = datetime(2024, 1, 1, 8, 30, tzinfo=timezone.utc)
+
+    token = encode_cursor([ts, "evt_1"], "time:desc,event_id:desc")
+
+    assert decode_cursor(token, "time:desc,event_id:desc") == [ts, "evt_1"]
+
+
+def test_cursor_rejects_other_scope_and_garbage():
+    token = encode_cursor([1], "id:asc")
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "id:desc")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+
+
+def test_keyset_page_walks_all_items():
+    items = sorted(range(23), reverse=True)
+    key = lambda v: (v,)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = keyset_page(items, key, 5, cursor, descending=True)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert seen == items
+
+
+def test_count_cache_ttl():
+    now = [0.0]
+    cache = CountCache(ttl_seconds=10, clock=lambda: now[0])
+
+    cache.set("q", 7)
+    assert cache.get("q") == 7
+    now[0] = 10.0
+    assert cache.get("q") is None
@@ -0,0 +1,62 @@
+"""
+时间分段存储测试
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.shared.segments import TimeSegments, to_epoch
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _store(minutes):
+    store = TimeSegments(3600, lambda item: item[1])
+    for i, m in enumerate(minutes):
+        store.add((i, BASE + timedelta(minutes=m)))
+    return store
+
+
+def test_drop_before_drops_whole_segments_only():
+    store = _store([0, 30, 70, 130, 150])
+
+    assert store.drop_before(BASE + timedelta(minutes=90)) == 2
+    assert [i for i, _ in store] == [2, 3, 4]
+    # 边界段未完全过期，保留
+    assert store.drop_before(BASE + timedelta(minutes=110)) == 0
+    assert store.segment_count == 2
+
+
+def test_out_of_order_add_and_range():
+    store = _store([130, 10, 70])
+
+    assert [i for i, _ in store] == [1, 2, 0]
+    in_range = list(store.iter_range(BASE + timedelta(minutes=65), BASE + timedelta(minutes=100)))
+    assert [i for i, _ in in_range] == [2]
+
+
+def test_trim_oldest():
+    store = _store([0, 10, 70, 80, 130])
+
+    assert store.trim_oldest(2) == 3
+    assert [i for i, _ in store] == [3, 4]
+    assert len(store) == 2
+
+
+def test_remove_covered_and_partial_segments():
+    store = _store([0, 30, 70, 130])
+
+    removed = store.remove(BASE + timedelta(minutes=20), BASE + timedelta(minutes=120))
+    assert removed == 2
+    assert [i for i, _ in store] == [0, 3]
+
+    removed = store.remove(BASE, BASE + timedelta(hours=3), lambda item: item[0] == 3)
+    assert removed == 1 and len(store) == 1
+
+
+def test_naive_and_string_times_are_utc():
+    assert to_epoch(datetime(2024, 1, 1)) == to_epoch(BASE)
+    assert to_epoch("2024-01-01T00:00:00Z") == to_epoch(BASE)
+    with pytest.raises(ValueError):
+        TimeSegments(0, lambda item: item)
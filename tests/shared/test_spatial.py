@@ -0,0 +1,52 @@
+"""
+区域空间索引测试
+"""
+
+import numpy as np
+
+from src.shared.spatial import FloorZoneIndex, ZoneSpatialIndex, points_in_polygon, polygon_area
+
+SQUARE = {"type": "polygon", "coordinates": [[0, 0], [10, 0], [10, 10], [0, 10]]}
+TRIANGLE = [[10, 0], [20, 0], [15, 8]]
+# 与 SQUARE 重叠，注册在后
+OVERLAP = [[8, 8], [12, 8], [12, 12], [8, 12]]
+
+
+def test_polygon_helpers():
+    assert polygon_area([(0, 0), (4, 0), (4, 3)]) == 6
+    inside = points_in_polygon([(0, 0), (4, 0), (4, 3)], np.array([3.0, 1.0]), np.array([1.0, 2.0]))
+    assert inside.tolist() == [True, False]
+
+
+def test_locate_matches_brute_force():
+    zones = [("square", SQUARE), ("triangle", TRIANGLE), ("overlap", OVERLAP)]
+    index = FloorZoneIndex(zones, cell_size=0.7)
+
+    rng = np.random.default_rng(7)
+    xs = rng.uniform(-2, 22, 20000)
+    ys = rng.uniform(-2, 14, 20000)
+    expected = np.full(xs.size, -1)
+    for z in reversed(range(len(zones))):
+        points = [(float(x), float(y)) for x, y in (SQUARE["coordinates"] if z == 0 else zones[z][1])]
+        expected[points_in_polygon(points, xs, ys)] = z
+
+    assert (index.locate_many(xs, ys) == expected).all()
+    assert index.locate(5, 5) == "square"
+    assert index.locate(9, 9) == "square"      # 重叠处先注册的优先
+    assert index.locate(11, 11) == "overlap"
+    assert index.locate(15, 1) == "triangle"
+    assert index.locate(30, 30) is None
+
+
+def test_invalidate_rebuilds_floor():
+    zones = {"floor_001": [("square", SQUARE)]}
+    index = ZoneSpatialIndex(lambda floor_id: zones.get(floor_id, []))
+
+    assert index.locate_many("floor_001", [5, 15], [5, 1]) == ["square", None]
+    zones["floor_001"].append(("triangle", TRIANGLE))
+    assert index.locate("floor_001", 15, 1) is None   # 未失效前沿用旧索引
+
+    index.invalidate("floor_001")
+    assert index.locate("floor_001", 15, 1) == "triangle"
+    assert index.locate(None, 5, 5) is None
+    assert index.locate("floor_999", 5, 5) is None
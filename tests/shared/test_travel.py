@@ -0,0 +1,123 @@
+"""
+区域间行程代价测试
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+from src.shared.travel import Place, TravelCostMatrix, TravelCostService
+
+SPEED = 0.5
+WAIT = 60.0
+PER_FLOOR = 4.0
+
+
+def _places(seed: int = 3):
+    rng = np.random.default_rng(seed)
+    places = []
+    for f in range(4):
+        for i in range(20):
+            x, y = rng.uniform(0, 40, 2)
+            places.append(Place(f"z{f}_{i:02d}", f"f{f}", f, float(x), float(y)))
+        places.append(Place(f"lift{f}", f"f{f}", f, 0.0, 0.0, "elevator"))
+        if f % 2 == 0:
+            # 只停偶数层的另一组电梯
+            places.append(Place(f"express{f}", f"f{f}", f, 40.0, 40.0, "elevator", "express"))
+    places.append(Place("charger_f3", "f3", 3, 35.0, 35.0, "charging"))
+    places.append(Place("charger_f1", "f1", 1, 5.0, 5.0, "charging"))
+    return places
+
+
+def _dijkstra(places, source):
+    """逐地点建图的 Dijkstra，作为对照"""
+    by_id = {p.id: p for p in places}
+    dist = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        pu = by_id[u]
+        for q in places:
+            if q.floor_id == pu.floor_id:
+                w = math.hypot(q.x - pu.x, q.y - pu.y) / SPEED
+            elif pu.kind == q.kind == "elevator" and pu.group == q.group:
+                w = WAIT + PER_FLOOR * abs(pu.floor_number - q.floor_number)
+            else:
+                continue
+            if d + w < dist.get(q.id, math.inf):
+                dist[q.id] = d + w
+                heapq.heappush(heap, (d + w, q.id))
+    return dist
+
+
+def _dense(matrix, ids):
+    return np.array([[matrix.cost(a, b) for b in ids] for a in ids])
+
+
+def test_matrix_matches_shortest_paths():
+    places = _places()
+    matrix = TravelCostMatrix(places, speed=SPEED, elevator_wait=WAIT, seconds_per_floor=PER_FLOOR)
+
+    for source in places[::9]:
+        expected = _dijkstra(places, source.id)
+        for target in places:
+            assert math.isclose(matrix.cost(source.id, target.id), expected[target.id], rel_tol=1e-5)
+
+    assert matrix.cost("z0_00", "z0_00") == 0
+    assert matrix.cost("z0_00", "unknown") is None
+
+
+def test_sync_updates_rows_incrementally():
+    places = _places()
+    matrix = TravelCostMatrix(places)
+
+    updated = [p for p in places if p.id != "z1_03"]
+    updated[0] = updated[0]._replace(x=1.0, y=2.0)
+    updated.append(Place("z2_new", "f2", 2, 12.0, 30.0))
+    matrix.sync(updated)
+
+    stats = matrix.get_stats()
+    assert stats["rebuilds"] == 1 and stats["incremental_updates"] == 1
+    assert "z1_03" not in matrix
+    ids = [p.id for p in updated]
+    assert np.allclose(_dense(matrix, ids), _dense(TravelCostMatrix(updated), ids))
+
+    # 电梯口变化时整体重建
+    matrix.sync(updated + [Place("lift1b", "f1", 1, 40.0, 0.0, "elevator")])
+    assert matrix.get_stats()["rebuilds"] == 2
+
+
+def test_nearest_charging_point():
+    matrix = TravelCostMatrix(_places())
+
+    place, seconds = matrix.nearest("f3", 30.0, 30.0)
+    assert place.id == "charger_f3"
+    assert math.isclose(seconds, math.hypot(5, 5) / 0.5, rel_tol=1e-6)
+
+    # f0 到 f1 的充电点要乘电梯
+    place, _ = matrix.nearest("f0", 1.0, 1.0)
+    assert place.id == "charger_f1"
+    assert matrix.nearest("f0", 1.0, 1.0, same_floor=True) is None
+    assert matrix.nearest("f9", 1.0, 1.0) is None
+
+
+def test_service_resolves_buildings():
+    buildings = {
+        "b1": [Place("a", "f1", 1, 0.0, 0.0), Place("b", "f1", 1, 3.0, 4.0)],
+        "b2": [Place("c", "f2", 1, 0.0, 0.0)],
+    }
+    owner = {"a": "b1", "b": "b1", "f1": "b1", "c": "b2", "f2": "b2"}
+    travel = TravelCostService(lambda building_id: list(buildings[building_id]), owner.get)
+
+    assert travel.cost("a", "b") == 10.0
+    assert travel.cost("a", "c") == math.inf
+    assert travel.cost("a", "missing") is None
+    assert travel.cost_from("f1", 0.0, 0.0, "b") == 10.0
+
+    buildings["b1"][1] = Place("b", "f1", 1, 6.0, 8.0)
+    assert travel.cost("a", "b") == 10.0   # 未失效前沿用旧矩阵
+    travel.invalidate("b1")
+    assert travel.cost("a", "b") == 20.0
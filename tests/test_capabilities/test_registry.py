@@ -109,6 +109,35 @@ class TestCapabilityRegistry:
         assert info.status == "busy"
         assert info.current_task == "task-123"
 
+    def test_find_agents_status_buckets(self):
+        """按状态分桶的能力索引测试"""
+        from src.capabilities.registry import CapabilityRegistry
+
+        registry = CapabilityRegistry()
+        registry.register_agent_capabilities("robot-001", "cleaning", ["cleaning.floor.vacuum"])
+        registry.register_agent_capabilities("robot-002", "cleaning", ["cleaning.floor.mop", "cleaning.glass"])
+        registry.register_agent_capabilities("drone-001", "drone", ["drone.patrol.aerial"])
+
+        registry.update_agent_status("robot-001", "busy", "task-1")
+        assert [a.agent_id for a in registry.find_agents_by_capability("cleaning.*")] == ["robot-002"]
+        assert [a.agent_id for a in registry.find_agents_by_capability("cleaning.*", status="busy")] == ["robot-001"]
+        # 不过滤状态时按注册顺序返回
+        assert [a.agent_id for a in registry.find_agents_by_capability("cleaning.floor.*", status=None)] == [
+            "robot-001", "robot-002"
+        ]
+        assert registry.find_agents_by_capability("cleaning.floor") == []
+
+        # 重新注册替换能力，保留注册顺序
+        registry.register_agent_capabilities("robot-001", "cleaning", ["cleaning.glass"])
+        assert [a.agent_id for a in registry.find_agents_by_capability("cleaning.glass")] == [
+            "robot-001", "robot-002"
+        ]
+        assert registry.find_agents_by_capability("cleaning.floor.vacuum") == []
+
+        registry.unregister_agent("robot-002")
+        assert [a.agent_id for a in registry.find_agents_by_capability("cleaning.*")] == ["robot-001"]
+        assert registry.find_agents_by_capability("delivery.*") == []
+
     def test_unregister_agent(self):
         """注销 Agent 测试"""
         from src.capabilities.registry import CapabilityRegistry
@@ -106,3 +106,51 @@ class TestFederationEvents:
         assert event["source"] == "ecis://test-system"
         assert event["data"]["task_id"] == "task-123"
         assert event["subject"] == "task-123"
+
+
+class TestEventHandler:
+    """Federation EventHandler 测试"""
+
+    def test_pattern_matcher_precedence(self):
+        """模式匹配按注册顺序取第一个"""
+        from src.federation.patterns import PatternMatcher
+
+        matcher = PatternMatcher()
+        matcher.add("ecis.robot.command.*", "command")
+        matcher.add("ecis.robot.command.pause", "pause")
+        matcher.add("ecis.*.assign", "assign")
+        matcher.add("ecis.orchestration.task.assign", "task")
+        matcher.add("ecis.robot*", "robot")
+
+        assert matcher.match("ecis.robot.command.pause") == "command"
+        assert matcher.match("ecis.robot.command.a.b") == "command"
+        assert matcher.match("ecis.robot.command") == "robot"
+        assert matcher.match("ecis.orchestration.task.assign") == "assign"
+        assert matcher.match("ecis.robotics") == "robot"
+        assert matcher.match("ecis.task.started") is None
+
+        assert matcher.remove("ecis.*.assign")
+        assert matcher.match("ecis.orchestration.task.assign") == "task"
+        # 重复注册替换处理器，保留优先级
+        matcher.add("ecis.robot.command.*", "command-v2")
+        assert matcher.match("ecis.robot.command.pause") == "command-v2"
+
+    @pytest.mark.asyncio
+    async def test_handle_routes_by_pattern(self):
+        """事件按预编译模式路由"""
+        from src.federation.handlers import EventHandler
+
+        handler = EventHandler()
+        calls = []
+
+        async def on_status(event):
+            calls.append(event["type"])
+            return {"status": "ok"}
+
+        handler.register("ecis.robot.status.*", on_status)
+
+        assert await handler.handle({"type": "ecis.robot.status.changed"}) == {"status": "ok"}
+        assert await handler.handle({"type": "ecis.unknown"}) is None
+        result = await handler.handle({"type": "ecis.robot.command.pause", "data": {"agent_id": "a-1"}})
+        assert result["reason"] == "agent_not_found"
+        assert calls == ["ecis.robot.status.changed"]
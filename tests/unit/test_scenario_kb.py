@@ -15,6 +15,8 @@ from knowledge.scenario_kb import (
     ScenarioKnowledge,
     ScenarioKnowledgeBase,
     PromptTemplate,
+    _estimate_tokens,
+    _truncate_to_tokens,
 )
 
 
@@ -547,6 +549,107 @@ class TestAssemblePrompt:
         assert "Append this fact." in prompt
 
 
+# ============================================================
+# Class: TestStablePrefixAssembly
+# ============================================================
+
+class TestStablePrefixAssembly:
+    """Tests for ScenarioKnowledgeBase.assemble_prompt_parts (stable prefix layout)."""
+
+    @staticmethod
+    async def _seed(kb):
+        await kb.create_knowledge(_make_knowledge(
+            knowledge_id="sk-stable",
+            applicable_building_types=["all"],
+            applicable_zones=["all"],
+            content={"fact": "Marble needs gentle detergent."},
+        ))
+        await kb.create_knowledge(_make_knowledge(
+            knowledge_id="sk-night",
+            name="Night Rule",
+            applicable_building_types=["all"],
+            applicable_zones=["all"],
+            applicable_time_ranges=[{"start": "22:00", "end": "06:00"}],
+            content={"fact": "Deep clean at night."},
+        ))
+        await kb.create_template(_make_template(
+            system_prompt=(
+                "You are a cleaning agent for {{building_name}}.\n"
+                "Time: {{current_time}}\n\n{{knowledge}}"
+            ),
+            variables=["building_name", "current_time"],
+            static_variables=["building_name"],
+        ))
+
+    async def _parts(self, kb, hour, live_context=None):
+        context = {"current_time": f"{hour:02d}:00"}
+        if live_context is not None:
+            context["live_context"] = live_context
+        return await kb.assemble_prompt_parts(
+            template_id="pt-test-001",
+            variables={"building_name": "HQ", "current_time": f"{hour:02d}:00"},
+            scenario_category="cleaning",
+            context=context,
+        )
+
+    @pytest.mark.asyncio
+    async def test_prefix_identical_across_cycles(self, kb):
+        """Volatile variables and time-ranged knowledge never enter the prefix."""
+        await self._seed(kb)
+        day = await self._parts(kb, 10, {"robots_idle": 3})
+        night = await self._parts(kb, 23, {"robots_idle": 5})
+
+        assert day.static_prefix == night.static_prefix
+        assert "for HQ" in day.static_prefix
+        assert "Time: [current_time]" in day.static_prefix
+        assert "Marble needs gentle detergent." in day.static_prefix
+
+        assert "- current_time: 10:00" in day.volatile_suffix
+        assert "Deep clean at night." not in day.prompt
+        assert "Deep clean at night." in night.volatile_suffix
+        assert "- robots_idle: 5" in night.volatile_suffix
+        assert night.knowledge_ids == ["sk-stable", "sk-night"]
+
+    @pytest.mark.asyncio
+    async def test_messages_mark_prefix(self, kb):
+        """The system prefix carries the cache breakpoint, the suffix is a user message."""
+        await self._seed(kb)
+        parts = await self._parts(kb, 10)
+
+        prefix_msg, suffix_msg = parts.to_messages()
+        assert prefix_msg["role"] == "system"
+        assert prefix_msg["cache_control"] is True
+        assert prefix_msg["content"] == parts.static_prefix
+        assert suffix_msg == {"role": "user", "content": parts.volatile_suffix}
+
+    @pytest.mark.asyncio
+    async def test_assemble_prompt_stable_mode(self, kb):
+        """assemble_prompt(stable_prefix=True) returns prefix followed by suffix."""
+        await self._seed(kb)
+        parts = await self._parts(kb, 10)
+        prompt = await kb.assemble_prompt(
+            template_id="pt-test-001",
+            variables={"building_name": "HQ", "current_time": "10:00"},
+            scenario_category="cleaning",
+            context={"current_time": "10:00"},
+            stable_prefix=True,
+        )
+        assert prompt == parts.prompt
+        assert prompt.startswith(parts.static_prefix)
+
+    @pytest.mark.asyncio
+    async def test_truncates_suffix_first(self, kb):
+        """Over-budget prompts keep the prefix and cut the volatile suffix."""
+        await self._seed(kb)
+        full = await self._parts(kb, 10)
+        kb._templates["pt-test-001"].max_total_tokens = full.prefix_tokens + 5
+
+        parts = await self._parts(kb, 10, "x" * 1000)
+
+        assert parts.static_prefix == full.static_prefix
+        assert _estimate_tokens(parts.volatile_suffix) <= 5
+
+
 # ============================================================
 # Class: TestRecordUsage
 # ============================================================
@@ -681,3 +784,20 @@ class TestInternalHelpers:
         text = "No placeholders here."
         result = ScenarioKnowledgeBase._fill_variables(text, {"name": "Alice"})
         assert result == text
+
+
+    # --- token estimation ---
+
+    def test_estimate_tokens_cjk(self):
+        """CJK characters count about one token each, ASCII about four chars per token."""
+        assert _estimate_tokens("清洁调度") == 4
+        assert _estimate_tokens("a" * 40) == 10
+        assert _estimate_tokens("清洁 robot") == 4
+        assert _estimate_tokens("") == 1
+
+    def test_truncate_to_tokens(self):
+        """Truncated text fits in the requested token budget."""
+        text = "大堂清洁标准 marble floor " * 50
+        truncated = _truncate_to_tokens(text, 30)
+        assert _estimate_tokens(truncated) <= 30
+        assert text.startswith(truncated)